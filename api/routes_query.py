@@ -1,20 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import inspect
 import json
 import logging
 import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator
 
 from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
 from chromadb.errors import InvalidDimensionException
 
 from api.schemas import (
+    QueryBatchItem,
+    QueryBatchRequest,
     QueryMeta,
     QueryFeedbackRequest,
     QueryFeedbackResponse,
     QueryRequest,
     QueryResponse,
     QuerySource,
+    SemanticSearchBatchMeta,
+    SemanticSearchBatchRequest,
+    SemanticSearchBatchResponse,
+    SemanticSearchBatchRoute,
     SemanticSearchMeta,
     SemanticSearchRequest,
     SemanticSearchResponse,
@@ -22,7 +33,22 @@ from api.schemas import (
 )
 from core.errors import QueryAPIError
 from core.settings import DEFAULT_COLLECTION_KEY, MAX_QUERY_COLLECTIONS, SEARCH_FETCH_K, SEARCH_K
-from services import collection_service, feedback_service, graph_lite_service, index_service, query_service, runtime_service
+from services import (
+    admission_service,
+    answer_cache_service,
+    collection_service,
+    budget_planner_service,
+    context_packing_service,
+    deadline_service,
+    feedback_service,
+    graph_lite_service,
+    index_service,
+    llm_client_cache_service,
+    query_analysis_service,
+    query_service,
+    runtime_service,
+    single_flight_service,
+)
 from common import create_chat_llm, default_llm_model, resolve_llm_config
 
 router = APIRouter()
@@ -30,6 +56,7 @@ logger = logging.getLogger("doc_rag.api")
 
 SEMANTIC_FALLBACK_CONTEXT_CHARS = 1200
 SEMANTIC_FALLBACK_SNIPPET_CHARS = 360
+QUERY_STREAM_MEDIA_TYPE = "application/x-ndjson"
 
 
 def _is_graph_lite_quality_opt_in(quality_mode: str, quality_stage: str) -> bool:
@@ -166,8 +193,71 @@ def _semantic_search_result(rank: int, item) -> SemanticSearchResult:
     )
 
 
+def _memoized(shared: dict[tuple[object, ...], object] | None, key: tuple[object, ...], factory):
+    if shared is None:
+        return factory()
+    if key not in shared:
+        shared[key] = factory()
+    return shared[key]
+
+
+def _probe_active_collection_keys(collection_keys: list[str], allow_default_fallback: bool) -> tuple[list[str], bool]:
+    """Return collections that have vectors, falling back to the default collection when routing allows it."""
+    active_collection_keys: list[str] = []
+    for key in collection_keys:
+        vectors = index_service.get_vector_count_snapshot(key)
+        if vectors is None:
+            db = index_service.get_db(key)
+            vectors = index_service.get_vector_count(db)
+        if (vectors or 0) > 0:
+            active_collection_keys.append(key)
+
+    if (
+        not active_collection_keys
+        and allow_default_fallback
+        and DEFAULT_COLLECTION_KEY not in collection_keys
+    ):
+        fallback_vector_count = index_service.get_vector_count_snapshot(DEFAULT_COLLECTION_KEY)
+        if fallback_vector_count is None:
+            fallback_db = index_service.get_db(DEFAULT_COLLECTION_KEY)
+            fallback_vector_count = index_service.get_vector_count(fallback_db)
+        if (fallback_vector_count or 0) > 0:
+            return [DEFAULT_COLLECTION_KEY], True
+    return active_collection_keys, False
+
+
+def _semantic_invalid_collection_error() -> QueryAPIError:
+    supported = ", ".join(collection_service.list_collection_keys())
+    return QueryAPIError(
+        code="INVALID_COLLECTION",
+        status_code=400,
+        message="지원하지 않는 collection입니다.",
+        hint=f"지원값: {supported}, 최대 {MAX_QUERY_COLLECTIONS}개 선택 가능",
+    )
+
+
+def _semantic_vectorstore_empty_error(collection_keys: list[str]) -> QueryAPIError:
+    selected_names = [collection_service.get_collection_name(key) for key in collection_keys]
+    hint_value = ",".join(selected_names)
+    return QueryAPIError(
+        code="VECTORSTORE_EMPTY",
+        status_code=400,
+        message="선택된 컬렉션에 인덱스가 없습니다. 먼저 /reindex를 실행하세요.",
+        hint=f"collections={hint_value} | Reindex 또는 build_index.py --reset 을 실행하세요.",
+    )
+
+
+def _semantic_embedding_mismatch_error() -> QueryAPIError:
+    return QueryAPIError(
+        code="VECTORSTORE_EMBEDDING_MISMATCH",
+        status_code=409,
+        message="현재 임베딩 모델과 저장된 인덱스 fingerprint가 맞지 않습니다.",
+        hint="Reindex 또는 build_index.py --reset 을 실행하고 DOC_RAG_EMBEDDING_MODEL 설정을 확인하세요.",
+    )
+
+
 @router.post("/semantic-search", response_model=SemanticSearchResponse)
-def semantic_search(req: SemanticSearchRequest, request: Request, response: Response) -> SemanticSearchResponse:
+async def semantic_search(req: SemanticSearchRequest, request: Request, response: Response) -> SemanticSearchResponse:
     from core.http import get_or_create_request_id
 
     request_id = get_or_create_request_id(request)
@@ -181,6 +271,8 @@ def semantic_search(req: SemanticSearchRequest, request: Request, response: Resp
     stage_timings["search_mode"] = "semantic_fallback"
     stage_timings["quality_mode"] = req.quality_mode
     response.headers["X-RAG-Quality-Mode"] = req.quality_mode
+    analysis = query_analysis_service.analyze_query(req.query)
+    stage_timings["query_analysis_ms"] = analysis.analysis_ms
 
     try:
         try:
@@ -190,40 +282,21 @@ def semantic_search(req: SemanticSearchRequest, request: Request, response: Resp
                 req.collection,
                 req.collections,
                 allow_keyword_routing=(resolved_query_profile == query_service.QUERY_PROFILE_SAMPLE_PACK),
+                keyword_matches=list(analysis.routing_collection_keys),
             )
             stage_timings["resolve_route_ms"] = round((time.perf_counter() - route_started_at) * 1000, 3)
             stage_timings["requested_collections"] = list(collection_keys)
         except ValueError as exc:
-            supported = ", ".join(collection_service.list_collection_keys())
-            raise QueryAPIError(
-                code="INVALID_COLLECTION",
-                status_code=400,
-                message="지원하지 않는 collection입니다.",
-                hint=f"지원값: {supported}, 최대 {MAX_QUERY_COLLECTIONS}개 선택 가능",
-            ) from exc
-
-        active_collection_keys: list[str] = []
+            raise _semantic_invalid_collection_error() from exc
+
         collection_probe_started_at = time.perf_counter()
-        for key in collection_keys:
-            vectors = index_service.get_vector_count_snapshot(key)
-            if vectors is None:
-                db = index_service.get_db(key)
-                vectors = index_service.get_vector_count(db)
-            if (vectors or 0) > 0:
-                active_collection_keys.append(key)
-
-        if (
-            not active_collection_keys
-            and allow_default_fallback
-            and DEFAULT_COLLECTION_KEY not in collection_keys
-        ):
-            fallback_vector_count = index_service.get_vector_count_snapshot(DEFAULT_COLLECTION_KEY)
-            if fallback_vector_count is None:
-                fallback_db = index_service.get_db(DEFAULT_COLLECTION_KEY)
-                fallback_vector_count = index_service.get_vector_count(fallback_db)
-            if (fallback_vector_count or 0) > 0:
-                active_collection_keys = [DEFAULT_COLLECTION_KEY]
-                route_reason = f"{route_reason}->fallback"
+        active_collection_keys, fallback_used = await asyncio.to_thread(
+            _probe_active_collection_keys,
+            collection_keys,
+            allow_default_fallback,
+        )
+        if fallback_used:
+            route_reason = f"{route_reason}->fallback"
         stage_timings["active_collection_probe_ms"] = round(
             (time.perf_counter() - collection_probe_started_at) * 1000,
             3,
@@ -231,24 +304,12 @@ def semantic_search(req: SemanticSearchRequest, request: Request, response: Resp
         stage_timings["active_collections"] = list(active_collection_keys)
 
         if not active_collection_keys:
-            selected_names = [collection_service.get_collection_name(key) for key in collection_keys]
-            hint_value = ",".join(selected_names)
-            raise QueryAPIError(
-                code="VECTORSTORE_EMPTY",
-                status_code=400,
-                message="선택된 컬렉션에 인덱스가 없습니다. 먼저 /reindex를 실행하세요.",
-                hint=f"collections={hint_value} | Reindex 또는 build_index.py --reset 을 실행하세요.",
-            )
+            raise _semantic_vectorstore_empty_error(collection_keys)
 
-        embedding_status = index_service.get_embedding_fingerprint_status(active_collection_keys)
+        embedding_status = await asyncio.to_thread(index_service.get_embedding_fingerprint_status, active_collection_keys)
         stage_timings["embedding_fingerprint_status"] = str(embedding_status["status"])
         if embedding_status["status"] == "mismatch":
-            raise QueryAPIError(
-                code="VECTORSTORE_EMBEDDING_MISMATCH",
-                status_code=409,
-                message="현재 임베딩 모델과 저장된 인덱스 fingerprint가 맞지 않습니다.",
-                hint="Reindex 또는 build_index.py --reset 을 실행하고 DOC_RAG_EMBEDDING_MODEL 설정을 확인하세요.",
-            )
+            raise _semantic_embedding_mismatch_error()
 
         active_collection_names = [collection_service.get_collection_name(key) for key in active_collection_keys]
         response.headers["X-RAG-Collection"] = active_collection_names[0]
@@ -264,12 +325,33 @@ def semantic_search(req: SemanticSearchRequest, request: Request, response: Resp
         )
         stage_timings["budget_profile"] = "semantic_fallback"
         retrieval_started_at = time.perf_counter()
-        docs = query_service.retrieve_collection_documents(
-            question=req.query,
-            collection_keys=active_collection_keys,
-            trace=context_trace,
-            budget=budget,
+
+        async def _retrieve() -> tuple[list, dict[str, object]]:
+            shared_trace: dict[str, object] = {}
+            shared_docs = await query_service.aretrieve_collection_documents(
+                question=req.query,
+                collection_keys=active_collection_keys,
+                trace=shared_trace,
+                budget=budget,
+                analysis=analysis,
+            )
+            return shared_docs, shared_trace
+
+        (docs, shared_trace), flight = await single_flight_service.run_single_flight(
+            (
+                "semantic-search",
+                answer_cache_service.normalize_question(req.query),
+                tuple(active_collection_keys),
+                tuple(index_service.get_collection_generation(key) for key in active_collection_keys),
+                req.max_results,
+                budget["per_collection_k"],
+                resolved_query_profile,
+            ),
+            _retrieve,
+            request_id=request_id,
         )
+        context_trace.update(copy.deepcopy(shared_trace))
+        _record_single_flight(stage_timings, response, flight)
         stage_timings["semantic_retrieval_ms"] = round((time.perf_counter() - retrieval_started_at) * 1000, 3)
         results = [
             _semantic_search_result(index, item)
@@ -320,398 +402,1221 @@ def semantic_search(req: SemanticSearchRequest, request: Request, response: Resp
         raise exc
 
 
-@router.post("/query", response_model=QueryResponse)
-def query(req: QueryRequest, request: Request, response: Response) -> QueryResponse:
-    from core.http import get_or_create_request_id
-
-    request_id = get_or_create_request_id(request)
-    response.headers["X-Request-ID"] = request_id
-    started_at = time.perf_counter()
-    log_provider = req.llm_provider
-    log_model = req.llm_model or "-"
-    log_collection = collection_service.get_collection_name(DEFAULT_COLLECTION_KEY)
-    route_reason = "-"
-    stage_timings: dict[str, int | float | str | list[str]] = {}
-    context_trace: dict[str, object] = {}
-    invoke_trace: dict[str, object] = {}
-    query_budget: dict[str, object] | None = None
-    resolved_query_profile = query_service.QUERY_PROFILE_GENERIC
-    quality_stage = req.quality_stage or req.quality_mode
-    graph_lite_result: dict[str, object] | None = None
-    last_context_text = ""
-
-    try:
-        stage_timings["quality_mode"] = req.quality_mode
-        stage_timings["quality_stage"] = quality_stage
-        graph_lite_enabled = _is_graph_lite_quality_opt_in(req.quality_mode, quality_stage)
-        stage_timings["graph_lite_enabled"] = graph_lite_enabled
-        response.headers["X-RAG-Quality-Mode"] = req.quality_mode
-        response.headers["X-RAG-Quality-Stage"] = quality_stage
-        response.headers["X-RAG-Graph-Lite"] = "not_run" if graph_lite_enabled else "disabled"
-        if req.quality_mode == "semantic":
-            raise QueryAPIError(
-                code="QUALITY_MODE_REQUIRES_SEMANTIC_SEARCH",
-                status_code=400,
-                message="semantic 모드는 LLM 질의 없이 /semantic-search를 사용해야 합니다.",
-                hint="/query에는 balanced 또는 quality 모드를 사용하고, semantic 전용 검색은 /semantic-search로 호출하세요.",
-            )
-
-        query_timeout_seconds = req.timeout_seconds or runtime_service.get_query_timeout_seconds()
-        stage_timings["timeout_seconds"] = query_timeout_seconds
+def _resolve_semantic_batch_routes(
+    analyses: list[query_analysis_service.QueryAnalysis],
+    req: SemanticSearchBatchRequest,
+    query_profile: str,
+) -> list[tuple[list[str], str]]:
+    shared: dict[tuple[object, ...], object] = {}
+    routes: list[tuple[list[str], str]] = []
+    for analysis in analyses:
         try:
-            config_started_at = time.perf_counter()
-            desired_model = req.llm_model or default_llm_model(req.llm_provider)
-            provider, model, api_key, base_url = resolve_llm_config(
-                provider=req.llm_provider,
-                model=desired_model,
-                api_key=req.llm_api_key,
-                base_url=req.llm_base_url,
-            )
-            stage_timings["resolve_config_ms"] = round((time.perf_counter() - config_started_at) * 1000, 3)
-        except ValueError as exc:
-            raise QueryAPIError(
-                code="INVALID_PROVIDER",
-                status_code=400,
-                message="지원하지 않는 llm_provider입니다.",
-                hint="openai, ollama, lmstudio, groq 중 하나를 사용하세요.",
-            ) from exc
-
-        log_provider = provider
-        log_model = model
-        resolved_query_profile = query_service.normalize_query_profile(req.query_profile)
-        stage_timings["query_profile"] = resolved_query_profile
-
-        try:
-            route_started_at = time.perf_counter()
             collection_keys, route_reason, allow_default_fallback = collection_service.resolve_collection_keys_for_query(
-                req.query,
+                analysis.question,
                 req.collection,
                 req.collections,
-                allow_keyword_routing=(resolved_query_profile == query_service.QUERY_PROFILE_SAMPLE_PACK),
+                allow_keyword_routing=(query_profile == query_service.QUERY_PROFILE_SAMPLE_PACK),
+                keyword_matches=list(analysis.routing_collection_keys),
             )
-            stage_timings["resolve_route_ms"] = round((time.perf_counter() - route_started_at) * 1000, 3)
-            stage_timings["requested_collections"] = list(collection_keys)
         except ValueError as exc:
-            supported = ", ".join(collection_service.list_collection_keys())
-            raise QueryAPIError(
-                code="INVALID_COLLECTION",
-                status_code=400,
-                message="지원하지 않는 collection입니다.",
-                hint=f"지원값: {supported}, 최대 {MAX_QUERY_COLLECTIONS}개 선택 가능",
-            ) from exc
-
-        active_collection_keys: list[str] = []
-        collection_probe_started_at = time.perf_counter()
-        for key in collection_keys:
-            vectors = index_service.get_vector_count_snapshot(key)
-            if vectors is None:
-                db = index_service.get_db(key)
-                vectors = index_service.get_vector_count(db)
-            if (vectors or 0) > 0:
-                active_collection_keys.append(key)
-
-        if (
-            not active_collection_keys
-            and allow_default_fallback
-            and DEFAULT_COLLECTION_KEY not in collection_keys
-        ):
-            fallback_vector_count = index_service.get_vector_count_snapshot(DEFAULT_COLLECTION_KEY)
-            if fallback_vector_count is None:
-                fallback_db = index_service.get_db(DEFAULT_COLLECTION_KEY)
-                fallback_vector_count = index_service.get_vector_count(fallback_db)
-            if (fallback_vector_count or 0) > 0:
-                active_collection_keys = [DEFAULT_COLLECTION_KEY]
-                route_reason = f"{route_reason}->fallback"
-        stage_timings["active_collection_probe_ms"] = round(
-            (time.perf_counter() - collection_probe_started_at) * 1000,
-            3,
+            raise _semantic_invalid_collection_error() from exc
+        active_collection_keys, fallback_used = _memoized(
+            shared,
+            ("probe", tuple(collection_keys), allow_default_fallback),
+            lambda: _probe_active_collection_keys(collection_keys, allow_default_fallback),
         )
-        stage_timings["active_collections"] = list(active_collection_keys)
-
+        if fallback_used:
+            route_reason = f"{route_reason}->fallback"
         if not active_collection_keys:
-            selected_names = [collection_service.get_collection_name(key) for key in collection_keys]
-            hint_value = ",".join(selected_names)
-            raise QueryAPIError(
-                code="VECTORSTORE_EMPTY",
-                status_code=400,
-                message="선택된 컬렉션에 인덱스가 없습니다. 먼저 /reindex를 실행하세요.",
-                hint=(
-                    f"collections={hint_value} | "
-                    "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
-                    "Reindex 또는 .venv\\Scripts\\python.exe build_index.py --reset 을 실행하세요."
-                ),
-            )
+            raise _semantic_vectorstore_empty_error(collection_keys)
+        embedding_status = _memoized(
+            shared,
+            ("embedding_fingerprint", tuple(active_collection_keys)),
+            lambda: index_service.get_embedding_fingerprint_status(list(active_collection_keys)),
+        )
+        if embedding_status["status"] == "mismatch":
+            raise _semantic_embedding_mismatch_error()
+        routes.append((list(active_collection_keys), route_reason))
+    return routes
 
-        active_collection_names = [collection_service.get_collection_name(key) for key in active_collection_keys]
-        log_collection = ",".join(active_collection_names)
-        response.headers["X-RAG-Collection"] = active_collection_names[0]
-        response.headers["X-RAG-Collections"] = ",".join(active_collection_names)
-        response.headers["X-RAG-Route-Reason"] = route_reason
-        response.headers["X-RAG-Query-Profile"] = resolved_query_profile
 
-        embedding_status = index_service.get_embedding_fingerprint_status(active_collection_keys)
-        stage_timings["embedding_fingerprint_status"] = str(embedding_status["status"])
-        if embedding_status["status"] == "mismatch":
-            raise QueryAPIError(
-                code="VECTORSTORE_EMBEDDING_MISMATCH",
-                status_code=409,
-                message="현재 임베딩 모델과 저장된 인덱스 fingerprint가 맞지 않습니다.",
-                hint=(
-                    "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
-                    "Reindex 또는 .venv\\Scripts\\python.exe build_index.py --reset 을 실행하세요. "
-                    "DOC_RAG_EMBEDDING_MODEL 설정도 함께 확인하세요."
-                ),
-            )
+@router.post("/semantic-search/batch", response_model=SemanticSearchBatchResponse)
+async def semantic_search_batch(
+    req: SemanticSearchBatchRequest,
+    request: Request,
+    response: Response,
+) -> SemanticSearchBatchResponse:
+    """Semantic search for many queries at once; results are keyed by query text.
 
-        query_budget = runtime_service.plan_query_budget(
-            provider=provider,
-            model=model,
-            timeout_seconds=query_timeout_seconds,
-            collection_count=len(active_collection_keys),
-            route_reason=route_reason,
-        )
-        response.headers["X-RAG-Budget-Profile"] = str(query_budget["profile"])
-        stage_timings["budget_profile"] = str(query_budget["profile"])
+    Queries share one embedding batch, one vector query per collection and one
+    lexical postings pass per collection. Duplicate queries are answered once.
+    """
+    from core.http import get_or_create_request_id
 
-        try:
-            llm_started_at = time.perf_counter()
-            llm = create_chat_llm(
-                provider=provider,
-                model=model,
-                temperature=0.0,
-                api_key=api_key,
-                base_url=base_url,
-                max_output_tokens=int(query_budget["max_output_tokens"]) if query_budget.get("max_output_tokens") else None,
-            )
-            stage_timings["llm_init_ms"] = round((time.perf_counter() - llm_started_at) * 1000, 3)
-        except Exception as exc:
-            raise QueryAPIError(
-                code="LLM_CONNECTION_FAILED",
-                status_code=502,
-                message="LLM 연결에 실패했습니다.",
-                hint=(
-                    "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
-                    "provider/base_url/api_key 설정과 모델 실행 상태를 점검하세요."
-                ),
-            ) from exc
-
-        def _context_builder(question: str) -> str:
-            nonlocal graph_lite_result, last_context_text
-            context = query_service.build_collection_context(
-                question=question,
-                collection_keys=active_collection_keys,
-                trace=context_trace,
-                budget=query_budget,
-            )
-            if not graph_lite_enabled:
-                context_trace["graph_lite"] = _graph_lite_trace(
-                    {
-                        "mode": graph_lite_service.GRAPH_LITE_RESULT_MODE,
-                        "status": "disabled",
-                        "relations": [],
-                    },
-                    enabled=False,
-                )
-                last_context_text = context
-                return context
-
-            graph_started_at = time.perf_counter()
-            try:
-                snapshot = graph_lite_service.load_default_relation_snapshot()
-                graph_lite_result = graph_lite_service.query_relation_snapshot(
-                    snapshot,
-                    question,
-                    collection_keys=active_collection_keys,
-                    max_hops=graph_lite_service.GRAPH_LITE_DEFAULT_MAX_HOPS,
-                    limit=graph_lite_service.GRAPH_LITE_DEFAULT_LIMIT,
-                )
-            except (FileNotFoundError, OSError, ValueError) as exc:
-                graph_lite_result = _graph_lite_fallback_result(
-                    question,
-                    "snapshot_unavailable",
-                    graph_started_at,
-                    error=type(exc).__name__,
-                )
-            except Exception as exc:
-                logger.warning("graph_lite_failed query=%s error=%s", question, type(exc).__name__)
-                graph_lite_result = _graph_lite_fallback_result(
-                    question,
-                    "graph_lite_error",
-                    graph_started_at,
-                    error=type(exc).__name__,
-                )
-
-            appended_context = graph_lite_service.append_graph_lite_context(
-                context,
-                graph_lite_result,
-                max_chars=graph_lite_service.GRAPH_LITE_DEFAULT_CONTEXT_CHARS,
-            )
-            context_added = appended_context != context
-            context_trace["graph_lite"] = _graph_lite_trace(
-                graph_lite_result,
-                enabled=True,
-                context_added=context_added,
+    request_id = get_or_create_request_id(request)
+    response.headers["X-Request-ID"] = request_id
+    response.headers["X-RAG-Search-Mode"] = "semantic_fallback"
+    started_at = time.perf_counter()
+    resolved_query_profile = query_service.normalize_query_profile(req.query_profile)
+    queries = list(dict.fromkeys(req.queries))
+    stage_timings: dict[str, object] = {
+        "query_profile": resolved_query_profile,
+        "search_mode": "semantic_fallback",
+        "quality_mode": req.quality_mode,
+        "query_count": len(queries),
+    }
+    try:
+        analyses = [query_analysis_service.analyze_query(query) for query in queries]
+        route_started_at = time.perf_counter()
+        routes = await asyncio.to_thread(_resolve_semantic_batch_routes, analyses, req, resolved_query_profile)
+        stage_timings["resolve_route_ms"] = round((time.perf_counter() - route_started_at) * 1000, 3)
+
+        budgets = [
+            _build_semantic_search_budget(
+                max_results=req.max_results,
+                collection_count=len(collection_keys),
+                route_reason=route_reason,
             )
-            if context_added:
-                context_trace["context_chars"] = len(appended_context)
-            last_context_text = appended_context
-            return appended_context
-
-        chain_started_at = time.perf_counter()
-        if "query_profile" in inspect.signature(query_service.build_query_chain).parameters:
-            chain = query_service.build_query_chain(_context_builder, llm, query_profile=resolved_query_profile)
-        else:
-            chain = query_service.build_query_chain(_context_builder, llm)
-        stage_timings["chain_build_ms"] = round((time.perf_counter() - chain_started_at) * 1000, 3)
-        try:
-            invoke_kwargs = {
-                "chain": chain,
-                "question": req.query,
-                "timeout_seconds": query_timeout_seconds,
-            }
-            if "trace" in inspect.signature(query_service.invoke_query_chain).parameters:
-                invoke_kwargs["trace"] = invoke_trace
-            if "query_profile" in inspect.signature(query_service.invoke_query_chain).parameters:
-                invoke_kwargs["query_profile"] = resolved_query_profile
-            answer = query_service.invoke_query_chain(**invoke_kwargs)
-        except TimeoutError as exc:
-            raise QueryAPIError(
-                code="LLM_TIMEOUT",
-                status_code=504,
-                message=f"LLM 응답 시간이 제한({query_timeout_seconds}초)을 초과했습니다.",
-                hint="모델 상태를 확인하고 더 짧은 질문으로 다시 시도하거나 /intro 상태에서 기본 런타임 준비를 다시 확인하세요.",
-            ) from exc
-        except InvalidDimensionException as exc:
-            raise QueryAPIError(
-                code="VECTORSTORE_EMBEDDING_MISMATCH",
-                status_code=409,
-                message="현재 임베딩 모델과 저장된 인덱스 차원이 맞지 않습니다.",
-                hint=(
-                    "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
-                    "Reindex 또는 .venv\\Scripts\\python.exe build_index.py --reset 을 실행하세요. "
-                    "DOC_RAG_EMBEDDING_MODEL 설정도 함께 확인하세요."
-                ),
-            ) from exc
-        except Exception as exc:
-            raise QueryAPIError(
-                code="LLM_CONNECTION_FAILED",
-                status_code=502,
-                message="LLM 응답 생성 중 연결 오류가 발생했습니다.",
-                hint=(
-                    "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
-                    "provider/base_url/api_key 설정과 모델 실행 상태를 점검하세요."
-                ),
-            ) from exc
-
-        if graph_lite_result is not None:
-            response.headers["X-RAG-Graph-Lite"] = str(graph_lite_result.get("status", "not_run"))
-        source_items = [
-            item
-            for item in context_trace.get("sources", [])
-            if isinstance(item, dict)
+            for collection_keys, route_reason in routes
         ]
-        citations = _build_citation_labels(source_items)
-        support_level, support_reason = _classify_support(
-            context_trace=context_trace,
-            invoke_trace=invoke_trace,
-            citations=citations,
-        )
-        if support_level in {"supported", "limited"} and query_service.is_insufficient_answer(answer):
-            fallback_answer = query_service.build_supported_context_fallback_answer(
-                req.query,
-                last_context_text,
-            )
-            if fallback_answer:
-                answer = fallback_answer
-                invoke_trace["answer_guard"] = {
-                    "applied": True,
-                    "reason": "supported_context_false_not_found",
-                    "strategy": "extractive_context_lines",
-                }
+        traces: list[dict[str, object]] = [{} for _ in queries]
+        batch_trace: dict[str, object] = {}
+        retrieval_started_at = time.perf_counter()
+        docs_per_query = await asyncio.to_thread(
+            query_service.retrieve_collection_documents_batch,
+            queries,
+            [collection_keys for collection_keys, _route_reason in routes],
+            traces=traces,
+            budgets=budgets,
+            batch_trace=batch_trace,
+            analyses=analyses,
+        )
+        retrieval_ms = round((time.perf_counter() - retrieval_started_at) * 1000, 3)
+        stage_timings.update(batch_trace)
+        stage_timings["semantic_retrieval_ms"] = retrieval_ms
+        stage_timings["queries_per_second"] = round(len(queries) / (retrieval_ms / 1000), 3) if retrieval_ms else None
+
+        results = {
+            query: [
+                _semantic_search_result(rank, item)
+                for rank, item in enumerate(docs[: req.max_results], start=1)
+            ]
+            for query, docs in zip(queries, docs_per_query)
+        }
         elapsed_ms = int((time.perf_counter() - started_at) * 1000)
         logger.info(
-            "query request_id=%s code=OK provider=%s model=%s collection=%s route=%s elapsed_ms=%d timings=%s",
+            "semantic_search_batch request_id=%s code=OK queries=%d elapsed_ms=%d timings=%s",
             request_id,
-            log_provider,
-            log_model,
-            log_collection,
-            route_reason,
+            len(queries),
             elapsed_ms,
-            _serialize_stage_timings(
-                route_reason=route_reason,
-                stage_timings=stage_timings,
-                context_trace=context_trace,
-                invoke_trace=invoke_trace,
-            ),
+            json.dumps(stage_timings, ensure_ascii=False, sort_keys=True, default=str),
         )
-        response_meta = None
-        if req.debug:
-            response_meta = QueryMeta(
+        return SemanticSearchBatchResponse(
+            results=results,
+            meta=SemanticSearchBatchMeta(
                 request_id=request_id,
                 query_profile=resolved_query_profile,
-                collections=active_collection_keys,
-                route_reason=route_reason,
-                budget_profile=str(query_budget["profile"]) if query_budget else None,
-                quality_mode=req.quality_mode,
-                quality_stage=quality_stage,
-                support_level=support_level,
-                support_reason=support_reason,
-                citations=citations,
-                stage_timings=stage_timings,
-                context={key: value for key, value in context_trace.items() if key != "sources"},
-                invoke=invoke_trace,
-                sources=[
-                    QuerySource(
-                        source=str(item.get("source", "unknown")),
-                        h2=str(item.get("h2", "")),
-                        collection_key=str(item.get("collection_key", "")),
+                query_count=len(queries),
+                routes={
+                    query: SemanticSearchBatchRoute(
+                        collections=collection_keys,
+                        route_reason=route_reason,
+                        retrieval_strategy=str(trace.get("retrieval_strategy", "-")),
                     )
-                    for item in source_items
-                ],
-            )
-        return QueryResponse(answer=answer, provider=provider, model=model, meta=response_meta)
+                    for query, (collection_keys, route_reason), trace in zip(queries, routes, traces)
+                },
+                stage_timings=stage_timings,
+            ),
+        )
     except QueryAPIError as exc:
         elapsed_ms = int((time.perf_counter() - started_at) * 1000)
         logger.warning(
-            "query request_id=%s code=%s provider=%s model=%s collection=%s elapsed_ms=%d timings=%s",
+            "semantic_search_batch request_id=%s code=%s queries=%d elapsed_ms=%d",
             request_id,
             exc.code,
-            log_provider,
-            log_model,
-            log_collection,
+            len(queries),
             elapsed_ms,
-            _serialize_stage_timings(
-                route_reason=route_reason,
-                stage_timings=stage_timings,
-                context_trace=context_trace,
-                invoke_trace=invoke_trace,
-            ),
         )
         raise exc
-    except Exception as exc:
-        elapsed_ms = int((time.perf_counter() - started_at) * 1000)
-        logger.exception(
-            "query request_id=%s code=INTERNAL_ERROR provider=%s model=%s collection=%s elapsed_ms=%d timings=%s",
-            request_id,
-            log_provider,
-            log_model,
-            log_collection,
-            elapsed_ms,
-            _serialize_stage_timings(
-                route_reason=route_reason,
-                stage_timings=stage_timings,
-                context_trace=context_trace,
-                invoke_trace=invoke_trace,
+
+
+@dataclass
+class _QueryRun:
+    req: QueryRequest
+    request_id: str
+    response: Response
+    started_at: float
+    log_provider: str
+    log_model: str
+    log_collection: str
+    route_reason: str = "-"
+    stage_timings: dict[str, object] = field(default_factory=dict)
+    context_trace: dict[str, object] = field(default_factory=dict)
+    invoke_trace: dict[str, object] = field(default_factory=dict)
+    query_budget: dict[str, object] | None = None
+    resolved_query_profile: str = query_service.QUERY_PROFILE_GENERIC
+    quality_stage: str = "balanced"
+    graph_lite_enabled: bool = False
+    graph_lite_result: dict[str, object] | None = None
+    last_context_text: str = ""
+    query_timeout_seconds: int = 0
+    provider: str = ""
+    model: str = ""
+    api_key: str | None = None
+    base_url: str | None = None
+    active_collection_keys: list[str] = field(default_factory=list)
+    answer_cache_key: tuple[object, ...] = ()
+    answer_cache_ttl_seconds: int = 0
+    cached_answer: answer_cache_service.AnswerCacheEntry | None = None
+    coalesced: bool = False
+    prebuilt_context: str | None = None
+    analysis: query_analysis_service.QueryAnalysis | None = None
+    deadline: deadline_service.QueryDeadline | None = None
+
+
+def _start_query_run(req: QueryRequest, request: Request, response: Response) -> _QueryRun:
+    from core.http import get_or_create_request_id
+
+    request_id = get_or_create_request_id(request)
+    response.headers["X-Request-ID"] = request_id
+    return _new_query_run(req, request_id, response)
+
+
+def _new_query_run(req: QueryRequest, request_id: str, response: Response) -> _QueryRun:
+    return _QueryRun(
+        req=req,
+        request_id=request_id,
+        response=response,
+        started_at=time.perf_counter(),
+        log_provider=req.llm_provider,
+        log_model=req.llm_model or "-",
+        log_collection=collection_service.get_collection_name(DEFAULT_COLLECTION_KEY),
+        quality_stage=req.quality_stage or req.quality_mode,
+    )
+
+
+def _prepare_query_run(run: _QueryRun, shared: dict[tuple[object, ...], object] | None = None) -> None:
+    """Validate the request, resolve routing and look up the answer cache.
+
+    `shared` lets a batch reuse collection probes and fingerprint checks across
+    questions that resolve to the same collections.
+    """
+    req = run.req
+    response = run.response
+    stage_timings = run.stage_timings
+    quality_stage = run.quality_stage
+    stage_timings["quality_mode"] = req.quality_mode
+    stage_timings["quality_stage"] = quality_stage
+    run.graph_lite_enabled = _is_graph_lite_quality_opt_in(req.quality_mode, quality_stage)
+    stage_timings["graph_lite_enabled"] = run.graph_lite_enabled
+    response.headers["X-RAG-Quality-Mode"] = req.quality_mode
+    response.headers["X-RAG-Quality-Stage"] = quality_stage
+    response.headers["X-RAG-Graph-Lite"] = "not_run" if run.graph_lite_enabled else "disabled"
+    if req.quality_mode == "semantic":
+        raise QueryAPIError(
+            code="QUALITY_MODE_REQUIRES_SEMANTIC_SEARCH",
+            status_code=400,
+            message="semantic 모드는 LLM 질의 없이 /semantic-search를 사용해야 합니다.",
+            hint="/query에는 fast, balanced 또는 quality 모드를 사용하고, semantic 전용 검색은 /semantic-search로 호출하세요.",
+        )
+
+    run.query_timeout_seconds = req.timeout_seconds or runtime_service.get_query_timeout_seconds()
+    stage_timings["timeout_seconds"] = run.query_timeout_seconds
+    run.deadline = deadline_service.QueryDeadline(run.query_timeout_seconds, started_at=run.started_at)
+    try:
+        config_started_at = time.perf_counter()
+        desired_model = req.llm_model or default_llm_model(req.llm_provider)
+        run.provider, run.model, run.api_key, run.base_url = resolve_llm_config(
+            provider=req.llm_provider,
+            model=desired_model,
+            api_key=req.llm_api_key,
+            base_url=req.llm_base_url,
+        )
+        stage_timings["resolve_config_ms"] = round((time.perf_counter() - config_started_at) * 1000, 3)
+    except ValueError as exc:
+        raise QueryAPIError(
+            code="INVALID_PROVIDER",
+            status_code=400,
+            message="지원하지 않는 llm_provider입니다.",
+            hint="openai, ollama, lmstudio, groq 중 하나를 사용하세요.",
+        ) from exc
+
+    run.log_provider = run.provider
+    run.log_model = run.model
+    run.resolved_query_profile = query_service.normalize_query_profile(req.query_profile)
+    stage_timings["query_profile"] = run.resolved_query_profile
+    run.analysis = query_analysis_service.analyze_query(req.query)
+    stage_timings["query_analysis_ms"] = run.analysis.analysis_ms
+
+    try:
+        route_started_at = time.perf_counter()
+        collection_keys, run.route_reason, allow_default_fallback = collection_service.resolve_collection_keys_for_query(
+            req.query,
+            req.collection,
+            req.collections,
+            allow_keyword_routing=(run.resolved_query_profile == query_service.QUERY_PROFILE_SAMPLE_PACK),
+            keyword_matches=list(run.analysis.routing_collection_keys),
+        )
+        stage_timings["resolve_route_ms"] = round((time.perf_counter() - route_started_at) * 1000, 3)
+        stage_timings["requested_collections"] = list(collection_keys)
+    except ValueError as exc:
+        supported = ", ".join(collection_service.list_collection_keys())
+        raise QueryAPIError(
+            code="INVALID_COLLECTION",
+            status_code=400,
+            message="지원하지 않는 collection입니다.",
+            hint=f"지원값: {supported}, 최대 {MAX_QUERY_COLLECTIONS}개 선택 가능",
+        ) from exc
+
+    collection_probe_started_at = time.perf_counter()
+    active_collection_keys, fallback_used = _memoized(
+        shared,
+        ("probe", tuple(collection_keys), allow_default_fallback),
+        lambda: _probe_active_collection_keys(collection_keys, allow_default_fallback),
+    )
+    active_collection_keys = list(active_collection_keys)
+    if fallback_used:
+        run.route_reason = f"{run.route_reason}->fallback"
+    stage_timings["active_collection_probe_ms"] = round(
+        (time.perf_counter() - collection_probe_started_at) * 1000,
+        3,
+    )
+    stage_timings["active_collections"] = list(active_collection_keys)
+
+    if not active_collection_keys:
+        selected_names = [collection_service.get_collection_name(key) for key in collection_keys]
+        hint_value = ",".join(selected_names)
+        raise QueryAPIError(
+            code="VECTORSTORE_EMPTY",
+            status_code=400,
+            message="선택된 컬렉션에 인덱스가 없습니다. 먼저 /reindex를 실행하세요.",
+            hint=(
+                f"collections={hint_value} | "
+                "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
+                "Reindex 또는 .venv\\Scripts\\python.exe build_index.py --reset 을 실행하세요."
             ),
         )
+
+    run.active_collection_keys = active_collection_keys
+    active_collection_names = [collection_service.get_collection_name(key) for key in active_collection_keys]
+    run.log_collection = ",".join(active_collection_names)
+    response.headers["X-RAG-Collection"] = active_collection_names[0]
+    response.headers["X-RAG-Collections"] = ",".join(active_collection_names)
+    response.headers["X-RAG-Route-Reason"] = run.route_reason
+    response.headers["X-RAG-Query-Profile"] = run.resolved_query_profile
+
+    embedding_status = _memoized(
+        shared,
+        ("embedding_fingerprint", tuple(active_collection_keys)),
+        lambda: index_service.get_embedding_fingerprint_status(active_collection_keys),
+    )
+    stage_timings["embedding_fingerprint_status"] = str(embedding_status["status"])
+    if embedding_status["status"] == "mismatch":
         raise QueryAPIError(
-            code="INTERNAL_ERROR",
-            status_code=500,
-            message="요청 처리 중 내부 오류가 발생했습니다.",
-            hint="잠시 후 다시 시도하거나 서버 로그에서 request_id를 확인하세요.",
+            code="VECTORSTORE_EMBEDDING_MISMATCH",
+            status_code=409,
+            message="현재 임베딩 모델과 저장된 인덱스 fingerprint가 맞지 않습니다.",
+            hint=(
+                "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
+                "Reindex 또는 .venv\\Scripts\\python.exe build_index.py --reset 을 실행하세요. "
+                "DOC_RAG_EMBEDDING_MODEL 설정도 함께 확인하세요."
+            ),
+        )
+
+    run.query_budget = runtime_service.plan_query_budget(
+        provider=run.provider,
+        model=run.model,
+        timeout_seconds=run.query_timeout_seconds,
+        collection_count=len(active_collection_keys),
+        route_reason=run.route_reason,
+    )
+    run.query_budget = budget_planner_service.adapt_query_budget(
+        run.query_budget,
+        provider=run.provider,
+        model=run.model,
+        timeout_seconds=run.query_timeout_seconds,
+        collection_count=len(active_collection_keys),
+    )
+    response.headers["X-RAG-Budget-Profile"] = str(run.query_budget["profile"])
+    stage_timings["budget_profile"] = str(run.query_budget["profile"])
+    adaptive_plan = run.query_budget["adaptive"]
+    stage_timings["adaptive_budget"] = adaptive_plan
+    run.deadline.generation_fit = budget_planner_service.get_latency_model(run.provider, run.model).fit()
+    budget_label = str(run.query_budget["profile"])
+    if adaptive_plan.get("applied"):
+        budget_label = f"{budget_label}@x{adaptive_plan['scale']}"
+
+    run.answer_cache_ttl_seconds = runtime_service.get_answer_cache_ttl_seconds()
+    run.answer_cache_key = answer_cache_service.build_answer_cache_key(
+        question=req.query,
+        collection_keys=active_collection_keys,
+        collection_generations=[index_service.get_collection_generation(key) for key in active_collection_keys],
+        provider=run.provider,
+        model=run.model,
+        base_url=run.base_url,
+        budget_profile=budget_label,
+        query_profile=run.resolved_query_profile,
+        # quality_mode="fast" answers are extractive (no LLM); /app sends quality_stage="fast" for LLM answers.
+        quality_mode=req.quality_mode,
+        quality_stage=quality_stage,
+        graph_lite_enabled=run.graph_lite_enabled,
+    )
+    run.cached_answer = answer_cache_service.get_cached_answer(
+        run.answer_cache_key,
+        ttl_seconds=run.answer_cache_ttl_seconds,
+    )
+    if run.answer_cache_ttl_seconds <= 0:
+        answer_cache_status = "disabled"
+    else:
+        answer_cache_status = "hit" if run.cached_answer is not None else "miss"
+    stage_timings["answer_cache"] = answer_cache_status
+    response.headers["X-RAG-Answer-Cache"] = answer_cache_status
+    run.deadline.checkpoint("prepare")
+
+
+def _create_query_llm(run: _QueryRun):
+    try:
+        llm_started_at = time.perf_counter()
+        max_output_tokens = (
+            int(run.query_budget["max_output_tokens"])
+            if run.query_budget and run.query_budget.get("max_output_tokens")
+            else None
+        )
+        client_key = llm_client_cache_service.build_llm_client_key(
+            provider=run.provider,
+            model=run.model,
+            base_url=run.base_url,
+            api_key=run.api_key,
+            temperature=0.0,
+            max_output_tokens=max_output_tokens,
+            request_timeout_seconds=run.query_timeout_seconds,
+        )
+        llm, cache_hit = llm_client_cache_service.get_or_create_chat_llm(
+            client_key,
+            lambda: create_chat_llm(
+                provider=run.provider,
+                model=run.model,
+                temperature=0.0,
+                api_key=run.api_key,
+                base_url=run.base_url,
+                max_output_tokens=max_output_tokens,
+                request_timeout_seconds=run.query_timeout_seconds,
+            ),
+        )
+        run.stage_timings["llm_init_ms"] = round((time.perf_counter() - llm_started_at) * 1000, 3)
+        run.stage_timings["llm_client_cache"] = "hit" if cache_hit else "miss"
+        run.stage_timings["llm_client_cache_hit_rate"] = llm_client_cache_service.get_llm_client_cache_stats()[
+            "clients"
+        ]["hit_rate"]
+        return llm
+    except Exception as exc:
+        raise QueryAPIError(
+            code="LLM_CONNECTION_FAILED",
+            status_code=502,
+            message="LLM 연결에 실패했습니다.",
+            hint=(
+                "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
+                "provider/base_url/api_key 설정과 모델 실행 상태를 점검하세요."
+            ),
         ) from exc
 
 
+def _query_analysis_for(run: _QueryRun, question: str) -> query_analysis_service.QueryAnalysis | None:
+    if run.analysis is not None and run.analysis.question == question:
+        return run.analysis
+    return None
+
+
+def _build_query_context(run: _QueryRun, question: str) -> str:
+    context_trace = run.context_trace
+    analysis = _query_analysis_for(run, question)
+    deadline = run.deadline
+    if run.prebuilt_context is not None:
+        context = run.prebuilt_context
+    else:
+        deadline.check("retrieval")
+        context_kwargs: dict[str, object] = {}
+        if analysis is not None and "analysis" in inspect.signature(query_service.build_collection_context).parameters:
+            context_kwargs["analysis"] = analysis
+        context = query_service.build_collection_context(
+            question=question,
+            collection_keys=run.active_collection_keys,
+            trace=context_trace,
+            budget=deadline.shrink_retrieval_budget(run.query_budget),
+            **context_kwargs,
+        )
+    deadline.context_tokens = int(context_trace.get("context_tokens") or 0)
+    if not run.graph_lite_enabled:
+        context_trace["graph_lite"] = _graph_lite_trace(
+            {
+                "mode": graph_lite_service.GRAPH_LITE_RESULT_MODE,
+                "status": "disabled",
+                "relations": [],
+            },
+            enabled=False,
+        )
+        run.last_context_text = context
+        return context
+
+    graph_started_at = time.perf_counter()
+    deadline.checkpoint("graph_lite")
+    try:
+        if not deadline.allows_graph_lite():
+            raise deadline_service.DeadlineExceeded("graph_lite", run.query_timeout_seconds)
+        snapshot = graph_lite_service.load_default_relation_snapshot()
+        graph_kwargs: dict[str, object] = {}
+        if analysis is not None and "intent" in inspect.signature(graph_lite_service.query_relation_snapshot).parameters:
+            graph_kwargs["intent"] = analysis.relation_intent(snapshot)
+        run.graph_lite_result = graph_lite_service.query_relation_snapshot(
+            snapshot,
+            question,
+            collection_keys=run.active_collection_keys,
+            max_hops=graph_lite_service.GRAPH_LITE_DEFAULT_MAX_HOPS,
+            limit=graph_lite_service.GRAPH_LITE_DEFAULT_LIMIT,
+            **graph_kwargs,
+        )
+    except deadline_service.DeadlineExceeded:
+        run.graph_lite_result = _graph_lite_fallback_result(question, "deadline_low", graph_started_at)
+    except (FileNotFoundError, OSError, ValueError) as exc:
+        run.graph_lite_result = _graph_lite_fallback_result(
+            question,
+            "snapshot_unavailable",
+            graph_started_at,
+            error=type(exc).__name__,
+        )
+    except Exception as exc:
+        logger.warning("graph_lite_failed query=%s error=%s", question, type(exc).__name__)
+        run.graph_lite_result = _graph_lite_fallback_result(
+            question,
+            "graph_lite_error",
+            graph_started_at,
+            error=type(exc).__name__,
+        )
+
+    appended_context = graph_lite_service.append_graph_lite_context(
+        context,
+        run.graph_lite_result,
+        max_chars=graph_lite_service.GRAPH_LITE_DEFAULT_CONTEXT_CHARS,
+    )
+    context_added = appended_context != context
+    context_trace["graph_lite"] = _graph_lite_trace(
+        run.graph_lite_result,
+        enabled=True,
+        context_added=context_added,
+    )
+    if context_added:
+        context_trace["context_chars"] = len(appended_context)
+        context_trace["context_tokens"] = context_packing_service.count_context_tokens(appended_context)
+        deadline.context_tokens = int(context_trace["context_tokens"])
+    run.last_context_text = appended_context
+    return appended_context
+
+
+def _llm_invoke_error(run: _QueryRun, exc: Exception) -> QueryAPIError:
+    if isinstance(exc, deadline_service.DeadlineExceeded):
+        return QueryAPIError(
+            code="LLM_TIMEOUT",
+            status_code=504,
+            message=f"요청 시간 제한({run.query_timeout_seconds}초)을 {exc.stage} 단계 전에 모두 사용했습니다.",
+            hint="stage_timings의 deadline_remaining_ms에서 시간을 많이 쓴 단계를 확인하고 timeout_seconds를 늘리거나 더 짧은 질문으로 다시 시도하세요.",
+        )
+    if isinstance(exc, TimeoutError):
+        return QueryAPIError(
+            code="LLM_TIMEOUT",
+            status_code=504,
+            message=f"LLM 응답 시간이 제한({run.query_timeout_seconds}초)을 초과했습니다.",
+            hint="모델 상태를 확인하고 더 짧은 질문으로 다시 시도하거나 /intro 상태에서 기본 런타임 준비를 다시 확인하세요.",
+        )
+    if isinstance(exc, InvalidDimensionException):
+        return QueryAPIError(
+            code="VECTORSTORE_EMBEDDING_MISMATCH",
+            status_code=409,
+            message="현재 임베딩 모델과 저장된 인덱스 차원이 맞지 않습니다.",
+            hint=(
+                "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
+                "Reindex 또는 .venv\\Scripts\\python.exe build_index.py --reset 을 실행하세요. "
+                "DOC_RAG_EMBEDDING_MODEL 설정도 함께 확인하세요."
+            ),
+        )
+    return QueryAPIError(
+        code="LLM_CONNECTION_FAILED",
+        status_code=502,
+        message="LLM 응답 생성 중 연결 오류가 발생했습니다.",
+        hint=(
+            "run_doc_rag.bat로 서버를 연 뒤 /intro 상태를 확인하고 "
+            "provider/base_url/api_key 설정과 모델 실행 상태를 점검하세요."
+        ),
+    )
+
+
+def _llm_busy_error(run: _QueryRun, exc: admission_service.AdmissionRejected) -> QueryAPIError:
+    run.stage_timings["admission_rejected"] = exc.reason
+    run.stage_timings["admission_queue_depth"] = exc.queue_depth
+    run.stage_timings["admission_predicted_wait_ms"] = round(exc.predicted_wait_seconds * 1000, 3)
+    return QueryAPIError(
+        code="LLM_BUSY",
+        status_code=429,
+        message="LLM 요청이 몰려 현재 처리할 수 없습니다. 잠시 후 다시 시도하세요.",
+        hint=(
+            f"reason={exc.reason}, queue_depth={exc.queue_depth}, "
+            f"예상 대기 {exc.predicted_wait_seconds:.1f}초 / timeout {run.query_timeout_seconds}초. "
+            f"{exc.retry_after_seconds}초 뒤 다시 시도하세요."
+        ),
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
+
+
+def _record_admission(run: _QueryRun, ticket: admission_service.AdmissionTicket) -> None:
+    run.stage_timings.update(ticket.to_stage_timings())
+    run.stage_timings["admission_active"] = ticket.controller.active
+
+
+async def _aadmit_llm_request(run: _QueryRun) -> admission_service.AdmissionTicket:
+    controller = admission_service.get_admission_controller(run.provider, run.model)
+    try:
+        ticket = await controller.acquire(timeout_seconds=run.deadline.timeout_seconds_left())
+    except admission_service.AdmissionRejected as exc:
+        raise _llm_busy_error(run, exc) from exc
+    _record_admission(run, ticket)
+    return ticket
+
+
+def _admit_llm_request(run: _QueryRun) -> admission_service.AdmissionTicket:
+    controller = admission_service.get_admission_controller(run.provider, run.model)
+    try:
+        ticket = controller.acquire_blocking(timeout_seconds=run.deadline.timeout_seconds_left())
+    except admission_service.AdmissionRejected as exc:
+        raise _llm_busy_error(run, exc) from exc
+    _record_admission(run, ticket)
+    return ticket
+
+
+def _release_admission(run: _QueryRun, ticket: admission_service.AdmissionTicket | None) -> None:
+    if ticket is None:
+        return
+    generation_seconds = None
+    if run.invoke_trace.get("status") == "ok" and isinstance(run.invoke_trace.get("invoke_ms"), (int, float)):
+        generation_seconds = float(run.invoke_trace["invoke_ms"]) / 1000
+    ticket.release(generation_seconds=generation_seconds)
+
+
+def _build_fast_query_answer(run: _QueryRun) -> str:
+    """`quality_mode="fast"`: answer from the top-ranked context lines without an LLM call or admission slot."""
+    context_started_at = time.perf_counter()
+    try:
+        context = _build_query_context(run, run.req.query)
+    except Exception as exc:
+        raise _llm_invoke_error(run, exc) from exc
+    run.stage_timings["context_build_ms"] = round((time.perf_counter() - context_started_at) * 1000, 3)
+    return query_service.build_extractive_answer(
+        run.req.query,
+        context,
+        analysis=_query_analysis_for(run, run.req.query),
+        trace=run.invoke_trace,
+    )
+
+
+async def _agenerate_query_answer(run: _QueryRun) -> str:
+    if run.req.quality_mode == "fast":
+        return await asyncio.to_thread(_build_fast_query_answer, run)
+    llm = _create_query_llm(run)
+    # Retrieval runs before admission so the LLM slot and its latency samples only cover generation.
+    context_started_at = time.perf_counter()
+    try:
+        context = await asyncio.to_thread(_build_query_context, run, run.req.query)
+    except Exception as exc:
+        raise _llm_invoke_error(run, exc) from exc
+    run.stage_timings["context_build_ms"] = round((time.perf_counter() - context_started_at) * 1000, 3)
+
+    def _context_builder(question: str) -> str:
+        return context if question == run.req.query else _build_query_context(run, question)
+
+    chain_started_at = time.perf_counter()
+    chain_kwargs: dict[str, object] = {}
+    build_chain_parameters = inspect.signature(query_service.build_query_chain).parameters
+    if "query_profile" in build_chain_parameters:
+        chain_kwargs["query_profile"] = run.resolved_query_profile
+    if "trace" in build_chain_parameters:
+        chain_kwargs["trace"] = run.stage_timings
+    chain = query_service.build_query_chain(_context_builder, llm, **chain_kwargs)
+    run.stage_timings["chain_build_ms"] = round((time.perf_counter() - chain_started_at) * 1000, 3)
+    if "query_chain_cache" in run.stage_timings:
+        run.stage_timings["query_chain_cache_hit_rate"] = llm_client_cache_service.get_llm_client_cache_stats()[
+            "pipelines"
+        ]["hit_rate"]
+    try:
+        invoke_kwargs = {
+            "chain": chain,
+            "question": run.req.query,
+            "timeout_seconds": run.deadline.timeout_seconds_left(),
+        }
+        invoke_parameters = inspect.signature(query_service.ainvoke_query_chain).parameters
+        if "trace" in invoke_parameters:
+            invoke_kwargs["trace"] = run.invoke_trace
+        if "query_profile" in invoke_parameters:
+            invoke_kwargs["query_profile"] = run.resolved_query_profile
+        if "deadline" in invoke_parameters:
+            invoke_kwargs["deadline"] = run.deadline
+    except Exception as exc:
+        raise _llm_invoke_error(run, exc) from exc
+    ticket = await _aadmit_llm_request(run)
+    try:
+        return await query_service.ainvoke_query_chain(**invoke_kwargs)
+    except Exception as exc:
+        raise _llm_invoke_error(run, exc) from exc
+    finally:
+        _release_admission(run, ticket)
+
+
+def _record_single_flight(
+    stage_timings: dict[str, object],
+    response: Response,
+    flight: single_flight_service.SingleFlightInfo,
+) -> None:
+    stage_timings["single_flight"] = flight.role
+    response.headers["X-RAG-Single-Flight"] = flight.role
+    if flight.coalesced:
+        stage_timings["single_flight_leader_request_id"] = flight.leader_request_id
+
+
+async def _acoalesced_query_answer(run: _QueryRun) -> str:
+    """Generate the answer once per identical in-flight query; followers replay the leader's result.
+
+    Flights share the answer cache key, so extractive `fast` answers and LLM answers never coalesce.
+    """
+
+    async def _lead() -> answer_cache_service.AnswerCacheEntry:
+        answer = await _agenerate_query_answer(run)
+        return answer_cache_service.AnswerCacheEntry(
+            answer=answer,
+            context_trace=copy.deepcopy(run.context_trace),
+            invoke_trace=copy.deepcopy(run.invoke_trace),
+            context_text=run.last_context_text,
+            collection_keys=tuple(run.active_collection_keys),
+            created_at=time.monotonic(),
+        )
+
+    try:
+        entry, flight = await single_flight_service.run_single_flight(
+            ("query", *run.answer_cache_key),
+            _lead,
+            request_id=run.request_id,
+            follower_timeout_seconds=run.deadline.timeout_seconds_left(),
+        )
+    except TimeoutError as exc:
+        raise _llm_invoke_error(run, exc) from exc
+    _record_single_flight(run.stage_timings, run.response, flight)
+    if not flight.coalesced:
+        return entry.answer
+    run.coalesced = True
+    return _restore_cached_answer(run, entry)
+
+
+def _restore_cached_answer(run: _QueryRun, cached_answer: answer_cache_service.AnswerCacheEntry) -> str:
+    run.context_trace.update(copy.deepcopy(cached_answer.context_trace))
+    run.invoke_trace.update(copy.deepcopy(cached_answer.invoke_trace))
+    run.last_context_text = cached_answer.context_text
+    cached_graph_lite = run.context_trace.get("graph_lite")
+    if run.graph_lite_enabled and isinstance(cached_graph_lite, dict):
+        run.response.headers["X-RAG-Graph-Lite"] = str(cached_graph_lite.get("status", "not_run"))
+    return cached_answer.answer
+
+
+def _source_items(run: _QueryRun) -> list[dict[str, object]]:
+    return [
+        item
+        for item in run.context_trace.get("sources", [])
+        if isinstance(item, dict)
+    ]
+
+
+def _query_sources(source_items: list[dict[str, object]]) -> list[QuerySource]:
+    return [
+        QuerySource(
+            source=str(item.get("source", "unknown")),
+            h2=str(item.get("h2", "")),
+            collection_key=str(item.get("collection_key", "")),
+        )
+        for item in source_items
+    ]
+
+
+def _record_deadline(run: _QueryRun) -> None:
+    if run.deadline is not None:
+        run.stage_timings.update(run.deadline.to_stage_timings())
+
+
+def _record_query_latency(run: _QueryRun, answer: str) -> None:
+    """Feed a fresh LLM generation into the adaptive budget planner's latency model."""
+    if run.cached_answer is not None or run.coalesced or run.invoke_trace.get("llm_skipped"):
+        return
+    invoke_ms = run.invoke_trace.get("invoke_ms")
+    if str(run.invoke_trace.get("status", "ok")) != "ok" or not isinstance(invoke_ms, (int, float)):
+        return
+    context_tokens = run.context_trace.get("context_tokens")
+    if not isinstance(context_tokens, int):
+        context_tokens = context_packing_service.count_context_tokens(run.last_context_text)
+    retrieval_ms = run.context_trace.get("elapsed_ms")
+    budget_planner_service.record_query_latency(
+        run.provider,
+        run.model,
+        context_tokens=context_tokens,
+        output_tokens=context_packing_service.count_context_tokens(answer),
+        generation_ms=float(invoke_ms),
+        retrieval_ms=float(retrieval_ms) if isinstance(retrieval_ms, (int, float)) else None,
+        collection_count=len(run.active_collection_keys),
+    )
+
+
+def _finalize_query_answer(run: _QueryRun, answer: str) -> tuple[str, QueryMeta]:
+    if run.graph_lite_result is not None:
+        run.response.headers["X-RAG-Graph-Lite"] = str(run.graph_lite_result.get("status", "not_run"))
+    source_items = _source_items(run)
+    citations = _build_citation_labels(source_items)
+    support_level, support_reason = _classify_support(
+        context_trace=run.context_trace,
+        invoke_trace=run.invoke_trace,
+        citations=citations,
+    )
+    if (
+        run.cached_answer is None
+        and support_level in {"supported", "limited"}
+        and query_service.is_insufficient_answer(answer)
+    ):
+        fallback_answer = query_service.build_supported_context_fallback_answer(
+            run.req.query,
+            run.last_context_text,
+            analysis=_query_analysis_for(run, run.req.query),
+        )
+        if fallback_answer:
+            answer = fallback_answer
+            run.invoke_trace["answer_guard"] = {
+                "applied": True,
+                "reason": "supported_context_false_not_found",
+                "strategy": "extractive_context_lines",
+            }
+    if run.cached_answer is None and not run.coalesced and str(run.invoke_trace.get("status", "ok")) == "ok":
+        answer_cache_service.store_cached_answer(
+            run.answer_cache_key,
+            answer=answer,
+            context_trace=run.context_trace,
+            invoke_trace=run.invoke_trace,
+            context_text=run.last_context_text,
+            collection_keys=run.active_collection_keys,
+            ttl_seconds=run.answer_cache_ttl_seconds,
+        )
+    _record_query_latency(run, answer)
+    _record_deadline(run)
+    elapsed_ms = int((time.perf_counter() - run.started_at) * 1000)
+    logger.info(
+        "query request_id=%s code=OK provider=%s model=%s collection=%s route=%s elapsed_ms=%d timings=%s",
+        run.request_id,
+        run.log_provider,
+        run.log_model,
+        run.log_collection,
+        run.route_reason,
+        elapsed_ms,
+        _serialize_stage_timings(
+            route_reason=run.route_reason,
+            stage_timings=run.stage_timings,
+            context_trace=run.context_trace,
+            invoke_trace=run.invoke_trace,
+        ),
+    )
+    meta = QueryMeta(
+        request_id=run.request_id,
+        query_profile=run.resolved_query_profile,
+        collections=run.active_collection_keys,
+        route_reason=run.route_reason,
+        budget_profile=str(run.query_budget["profile"]) if run.query_budget else None,
+        quality_mode=run.req.quality_mode,
+        quality_stage=run.quality_stage,
+        support_level=support_level,
+        support_reason=support_reason,
+        citations=citations,
+        stage_timings=run.stage_timings,
+        context={key: value for key, value in run.context_trace.items() if key != "sources"},
+        invoke=run.invoke_trace,
+        sources=_query_sources(source_items),
+    )
+    return answer, meta
+
+
+def _log_query_failure(run: _QueryRun, code: str, *, exc_info: bool = False) -> None:
+    _record_deadline(run)
+    elapsed_ms = int((time.perf_counter() - run.started_at) * 1000)
+    log = logger.exception if exc_info else logger.warning
+    log(
+        "query request_id=%s code=%s provider=%s model=%s collection=%s elapsed_ms=%d timings=%s",
+        run.request_id,
+        code,
+        run.log_provider,
+        run.log_model,
+        run.log_collection,
+        elapsed_ms,
+        _serialize_stage_timings(
+            route_reason=run.route_reason,
+            stage_timings=run.stage_timings,
+            context_trace=run.context_trace,
+            invoke_trace=run.invoke_trace,
+        ),
+    )
+
+
+def _internal_query_error() -> QueryAPIError:
+    return QueryAPIError(
+        code="INTERNAL_ERROR",
+        status_code=500,
+        message="요청 처리 중 내부 오류가 발생했습니다.",
+        hint="잠시 후 다시 시도하거나 서버 로그에서 request_id를 확인하세요.",
+    )
+
+
+@router.post("/query", response_model=QueryResponse)
+async def query(req: QueryRequest, request: Request, response: Response) -> QueryResponse:
+    run = _start_query_run(req, request, response)
+    try:
+        await asyncio.to_thread(_prepare_query_run, run)
+        if run.cached_answer is not None:
+            answer = _restore_cached_answer(run, run.cached_answer)
+        else:
+            answer = await _acoalesced_query_answer(run)
+        answer, meta = _finalize_query_answer(run, answer)
+        return QueryResponse(
+            answer=answer,
+            provider=run.provider,
+            model=run.model,
+            meta=meta if req.debug else None,
+        )
+    except QueryAPIError as exc:
+        _log_query_failure(run, exc.code)
+        raise exc
+    except Exception as exc:
+        _log_query_failure(run, "INTERNAL_ERROR", exc_info=True)
+        raise _internal_query_error() from exc
+
+
+def _ndjson_event(event: str, payload: dict[str, object]) -> bytes:
+    return (json.dumps({"event": event, **payload}, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _sources_event(run: _QueryRun) -> bytes:
+    source_items = _source_items(run)
+    return _ndjson_event(
+        "sources",
+        {
+            "request_id": run.request_id,
+            "collections": run.active_collection_keys,
+            "citations": _build_citation_labels(source_items),
+            "sources": [_model_dump(item) for item in _query_sources(source_items)],
+        },
+    )
+
+
+def _error_payload(run: _QueryRun, exc: QueryAPIError) -> dict[str, object]:
+    return {
+        "request_id": run.request_id,
+        "code": exc.code,
+        "status_code": exc.status_code,
+        "message": exc.message,
+        "hint": exc.hint,
+    }
+
+
+def _error_event(run: _QueryRun, exc: QueryAPIError) -> bytes:
+    return _ndjson_event("error", _error_payload(run, exc))
+
+
+def _stream_query_events(run: _QueryRun, ticket: admission_service.AdmissionTicket | None = None) -> Iterator[bytes]:
+    try:
+        if run.cached_answer is not None:
+            answer = _restore_cached_answer(run, run.cached_answer)
+            yield _sources_event(run)
+            yield _ndjson_event("token", {"delta": answer})
+        elif run.req.quality_mode == "fast":
+            answer = _build_fast_query_answer(run)
+            run.stage_timings["time_to_sources_ms"] = round((time.perf_counter() - run.started_at) * 1000, 3)
+            yield _sources_event(run)
+            yield _ndjson_event("token", {"delta": answer})
+        else:
+            llm = _create_query_llm(run)
+            context_started_at = time.perf_counter()
+            try:
+                context = _build_query_context(run, run.req.query)
+            except Exception as exc:
+                raise _llm_invoke_error(run, exc) from exc
+            run.stage_timings["context_build_ms"] = round((time.perf_counter() - context_started_at) * 1000, 3)
+            run.stage_timings["time_to_sources_ms"] = round((time.perf_counter() - run.started_at) * 1000, 3)
+            yield _sources_event(run)
+
+            deltas: list[str] = []
+            stream_kwargs: dict[str, object] = {}
+            if "deadline" in inspect.signature(query_service.stream_query_answer).parameters:
+                stream_kwargs["deadline"] = run.deadline
+            try:
+                for delta in query_service.stream_query_answer(
+                    llm,
+                    run.req.query,
+                    context,
+                    timeout_seconds=run.deadline.timeout_seconds_left(),
+                    trace=run.invoke_trace,
+                    query_profile=run.resolved_query_profile,
+                    **stream_kwargs,
+                ):
+                    if not deltas:
+                        run.stage_timings["time_to_first_token_ms"] = round(
+                            (time.perf_counter() - run.started_at) * 1000,
+                            3,
+                        )
+                    deltas.append(delta)
+                    yield _ndjson_event("token", {"delta": delta})
+            except Exception as exc:
+                raise _llm_invoke_error(run, exc) from exc
+            answer = query_service.postprocess_answer(
+                run.req.query,
+                "".join(deltas),
+                query_profile=run.resolved_query_profile,
+            )
+        answer, meta = _finalize_query_answer(run, answer)
+        yield _ndjson_event(
+            "final",
+            {
+                "answer": answer,
+                "provider": run.provider,
+                "model": run.model,
+                "meta": _model_dump(meta),
+            },
+        )
+    except QueryAPIError as exc:
+        _log_query_failure(run, exc.code)
+        yield _error_event(run, exc)
+    except Exception:
+        _log_query_failure(run, "INTERNAL_ERROR", exc_info=True)
+        yield _error_event(run, _internal_query_error())
+    finally:
+        _release_admission(run, ticket)
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """Stream that returns its admission slot even if the body generator never starts or finishes.
+
+    The ticket is taken before the response so saturation can still answer `429 LLM_BUSY`; the
+    generator's own `finally` only runs once iteration starts, so a client that disconnects before
+    the first chunk would otherwise hold the slot forever. Releasing twice is a no-op.
+    """
+
+    def __init__(self, content, *, run: _QueryRun, ticket: admission_service.AdmissionTicket | None, **kwargs):
+        super().__init__(content, **kwargs)
+        self._run = run
+        self._ticket = ticket
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            _release_admission(self._run, self._ticket)
+
+
+@router.post("/query/stream")
+def query_stream(req: QueryRequest, request: Request) -> StreamingResponse:
+    run = _start_query_run(req, request, Response())
+    ticket = None
+    try:
+        _prepare_query_run(run)
+        if run.cached_answer is None and req.quality_mode != "fast":
+            ticket = _admit_llm_request(run)
+    except QueryAPIError as exc:
+        _log_query_failure(run, exc.code)
+        raise exc
+    except Exception as exc:
+        _log_query_failure(run, "INTERNAL_ERROR", exc_info=True)
+        raise _internal_query_error() from exc
+
+    headers = {key: value for key, value in run.response.headers.items() if key.lower().startswith("x-")}
+    headers["Cache-Control"] = "no-cache"
+    headers["X-Accel-Buffering"] = "no"
+    return _AdmittedStreamingResponse(
+        _stream_query_events(run, ticket),
+        run=run,
+        ticket=ticket,
+        media_type=QUERY_STREAM_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+def _batch_item_request(req: QueryBatchRequest, item: QueryBatchItem | str) -> QueryRequest:
+    if isinstance(item, str):
+        item = QueryBatchItem(query=item)
+    shared_fields = {
+        key: value
+        for key, value in _model_dump(req).items()
+        if key not in {"queries", "max_concurrency"}
+    }
+    overrides = {key: value for key, value in _model_dump(item).items() if value is not None}
+    return QueryRequest(**{**shared_fields, **overrides})
+
+
+def _prepare_query_batch(runs: list[_QueryRun]) -> dict[int, QueryAPIError]:
+    """Prepare every question, then build all pending contexts in one batched retrieval pass."""
+    shared: dict[tuple[object, ...], object] = {}
+    failures: dict[int, QueryAPIError] = {}
+    for index, run in enumerate(runs):
+        try:
+            _prepare_query_run(run, shared=shared)
+        except QueryAPIError as exc:
+            _log_query_failure(run, exc.code)
+            failures[index] = exc
+        except Exception:
+            _log_query_failure(run, "INTERNAL_ERROR", exc_info=True)
+            failures[index] = _internal_query_error()
+
+    pending = [
+        (index, run)
+        for index, run in enumerate(runs)
+        if index not in failures and run.cached_answer is None
+    ]
+    if not pending:
+        return failures
+    batch_trace: dict[str, object] = {}
+    try:
+        contexts = query_service.build_collection_contexts_batch(
+            [run.req.query for _index, run in pending],
+            [run.active_collection_keys for _index, run in pending],
+            traces=[run.context_trace for _index, run in pending],
+            budgets=[run.query_budget for _index, run in pending],
+            batch_trace=batch_trace,
+            analyses=[run.analysis for _index, run in pending],
+        )
+    except Exception as exc:
+        for index, run in pending:
+            failures[index] = _llm_invoke_error(run, exc)
+            _log_query_failure(run, failures[index].code, exc_info=True)
+        return failures
+    for (_index, run), context in zip(pending, contexts):
+        run.prebuilt_context = context
+        run.stage_timings.update(batch_trace)
+    return failures
+
+
+async def _run_batch_item(index: int, run: _QueryRun, semaphore: asyncio.Semaphore) -> tuple[bool, bytes]:
+    run.stage_timings["batch_index"] = index
+    try:
+        if run.cached_answer is not None:
+            answer = _restore_cached_answer(run, run.cached_answer)
+        else:
+            queued_at = time.perf_counter()
+            async with semaphore:
+                run.stage_timings["batch_wait_ms"] = round((time.perf_counter() - queued_at) * 1000, 3)
+                answer = await _acoalesced_query_answer(run)
+        answer, meta = _finalize_query_answer(run, answer)
+    except QueryAPIError as exc:
+        _log_query_failure(run, exc.code)
+        return False, _batch_error_event(index, run, exc)
+    except Exception:
+        _log_query_failure(run, "INTERNAL_ERROR", exc_info=True)
+        return False, _batch_error_event(index, run, _internal_query_error())
+    return True, _ndjson_event(
+        "result",
+        {
+            "index": index,
+            "request_id": run.request_id,
+            "query": run.req.query,
+            "answer": answer,
+            "provider": run.provider,
+            "model": run.model,
+            "stage_timings": run.stage_timings,
+            "meta": _model_dump(meta) if run.req.debug else None,
+        },
+    )
+
+
+def _batch_error_event(index: int, run: _QueryRun, exc: QueryAPIError) -> bytes:
+    return _ndjson_event(
+        "error",
+        {
+            "index": index,
+            "query": run.req.query,
+            **_error_payload(run, exc),
+            "stage_timings": run.stage_timings,
+        },
+    )
+
+
+async def _stream_query_batch_events(
+    runs: list[_QueryRun],
+    failures: dict[int, QueryAPIError],
+    *,
+    batch_request_id: str,
+    started_at: float,
+    max_concurrency: int,
+) -> AsyncIterator[bytes]:
+    succeeded = 0
+    for index in sorted(failures):
+        yield _batch_error_event(index, runs[index], failures[index])
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [
+        asyncio.create_task(_run_batch_item(index, run, semaphore))
+        for index, run in enumerate(runs)
+        if index not in failures
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            ok, event = await next_done
+            succeeded += int(ok)
+            yield event
+        yield _ndjson_event(
+            "done",
+            {
+                "request_id": batch_request_id,
+                "count": len(runs),
+                "succeeded": succeeded,
+                "failed": len(runs) - succeeded,
+                "max_concurrency": max_concurrency,
+                "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 3),
+            },
+        )
+    finally:
+        # A disconnected client closes the generator; stop the remaining LLM calls with it.
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/query/batch")
+async def query_batch(req: QueryBatchRequest, request: Request) -> StreamingResponse:
+    """Answer many questions in one call and stream one NDJSON result per question as it completes.
+
+    Routing checks are shared between questions that hit the same collections,
+    all question embeddings come from one encoder call, and LLM calls run under
+    `max_concurrency` (on top of the per-model admission limit).
+    """
+    from core.http import get_or_create_request_id
+
+    started_at = time.perf_counter()
+    batch_request_id = get_or_create_request_id(request)
+    runs = [
+        _new_query_run(_batch_item_request(req, item), f"{batch_request_id}-{index}", Response())
+        for index, item in enumerate(req.queries)
+    ]
+    failures = await asyncio.to_thread(_prepare_query_batch, runs)
+    max_concurrency = req.max_concurrency or runtime_service.get_query_batch_max_concurrency()
+    return StreamingResponse(
+        _stream_query_batch_events(
+            runs,
+            failures,
+            batch_request_id=batch_request_id,
+            started_at=started_at,
+            max_concurrency=max_concurrency,
+        ),
+        media_type=QUERY_STREAM_MEDIA_TYPE,
+        headers={
+            "X-Request-ID": batch_request_id,
+            "X-RAG-Batch-Size": str(len(runs)),
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.post("/query-feedback", response_model=QueryFeedbackResponse)
 def query_feedback(
     req: QueryFeedbackRequest,
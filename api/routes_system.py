@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException
 
 from api.schemas import AdminAuthRequest, ReindexRequest
 from core.settings import DEFAULT_COLLECTION_KEY, PERSIST_DIR, REQUEST_STATUS_PENDING, REQUEST_STATUSES
-from services import collection_service, index_service, runtime_service, upload_service
+from services import admission_service, budget_planner_service, collection_service, index_service, runtime_service, upload_service
 
 router = APIRouter()
 OPS_BASELINE_REPORT_PATH = Path(__file__).resolve().parents[1] / "docs/reports/ops_baseline_gate_latest.json"
@@ -126,6 +126,8 @@ def health() -> dict[str, object]:
         "release_web_status": release_web["status"],
         "release_web_headline": release_web["headline"],
         "release_web_steps": release_web["steps"],
+        "llm_admission": admission_service.get_admission_stats(),
+        "adaptive_query_budget": budget_planner_service.get_budget_planner_stats(),
     }
 
 
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Literal
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, Field
 
-QualityMode = Literal["semantic", "balanced", "quality"]
+from core.settings import MAX_QUERY_BATCH_SIZE
+
+QualityMode = Literal["semantic", "fast", "balanced", "quality"]
 
 
 class QueryRequest(BaseModel):
@@ -22,6 +24,29 @@ class QueryRequest(BaseModel):
     debug: bool = False
 
 
+class QueryBatchItem(BaseModel):
+    query: str = Field(..., min_length=1)
+    query_profile: str | None = None
+    collection: str | None = None
+    collections: list[str] | None = None
+
+
+class QueryBatchRequest(BaseModel):
+    queries: list[QueryBatchItem | Annotated[str, Field(min_length=1)]] = Field(..., min_length=1, max_length=MAX_QUERY_BATCH_SIZE)
+    llm_provider: str = Field(default="ollama")
+    llm_model: str | None = None
+    llm_api_key: str | None = None
+    llm_base_url: str | None = None
+    query_profile: str | None = None
+    collection: str | None = None
+    collections: list[str] | None = None
+    timeout_seconds: int | None = Field(default=None, ge=1, le=180)
+    quality_mode: QualityMode = "balanced"
+    quality_stage: str | None = None
+    max_concurrency: int | None = Field(default=None, ge=1, le=8)
+    debug: bool = False
+
+
 class QuerySource(BaseModel):
     source: str
     h2: str = ""
@@ -86,6 +111,35 @@ class SemanticSearchResponse(BaseModel):
     meta: SemanticSearchMeta
 
 
+class SemanticSearchBatchRequest(BaseModel):
+    queries: list[Annotated[str, Field(min_length=1)]] = Field(..., min_length=1, max_length=MAX_QUERY_BATCH_SIZE)
+    query_profile: str | None = None
+    collection: str | None = None
+    collections: list[str] | None = None
+    max_results: int = Field(default=3, ge=1, le=8)
+    quality_mode: QualityMode = "semantic"
+
+
+class SemanticSearchBatchRoute(BaseModel):
+    collections: list[str] = Field(default_factory=list)
+    route_reason: str = "-"
+    retrieval_strategy: str = "-"
+
+
+class SemanticSearchBatchMeta(BaseModel):
+    request_id: str
+    query_profile: str = "generic"
+    search_mode: str = "semantic_fallback"
+    query_count: int = 0
+    routes: dict[str, SemanticSearchBatchRoute] = Field(default_factory=dict)
+    stage_timings: dict[str, Any] = Field(default_factory=dict)
+
+
+class SemanticSearchBatchResponse(BaseModel):
+    results: dict[str, list[SemanticSearchResult]] = Field(default_factory=dict)
+    meta: SemanticSearchBatchMeta
+
+
 class QueryFeedbackRequest(BaseModel):
     request_id: str | None = None
     query: str = Field(..., min_length=1)
@@ -83,7 +83,7 @@ def query_api_error_handler(request: Request, exc: QueryAPIError) -> JSONRespons
     return JSONResponse(
         status_code=exc.status_code,
         content=payload,
-        headers={"X-Request-ID": request_id},
+        headers={**exc.headers, "X-Request-ID": request_id},
     )
 
 
@@ -89,6 +89,50 @@ async function apiFetch(path, options = {}) {
   return data;
 }
 
+async function apiStream(path, options = {}, onEvent = () => {}) {
+  const response = await fetch(`${getServerUrl()}${path}`, {
+    ...options,
+    headers: {
+      "Content-Type": "application/json",
+      ...(options.headers || {}),
+    },
+  });
+  if (!response.ok) {
+    const text = await response.text();
+    let data = {};
+    try {
+      data = text ? JSON.parse(text) : {};
+    } catch {
+      data = {detail: text};
+    }
+    throw new Error(data.message || data.detail || `HTTP ${response.status}`);
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let finalEvent = null;
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    const event = JSON.parse(line);
+    if (event.event === "error") {
+      throw new Error(event.message || event.code || "stream error");
+    }
+    if (event.event === "final") finalEvent = event;
+    onEvent(event);
+  };
+  while (true) {
+    const {value, done} = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, {stream: true});
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer + decoder.decode());
+  if (!finalEvent) throw new Error("stream ended without final event");
+  return finalEvent;
+}
+
 function graphLiteSummary(meta) {
   const graphLite = meta?.context?.graph_lite;
   if (!graphLite || typeof graphLite !== "object") return "graph-lite=not-reported";
@@ -194,7 +238,8 @@ async function askLocalRag() {
   refs.askBtn.disabled = true;
   showResult("질의 중...");
   try {
-    const data = await apiFetch("/query", {
+    let streamedText = "";
+    const data = await apiStream("/query/stream", {
       method: "POST",
       body: JSON.stringify({
         query,
@@ -203,6 +248,14 @@ async function askLocalRag() {
         timeout_seconds: qualityMode === "quality" ? 120 : 60,
         debug: true,
       }),
+    }, (event) => {
+      if (event.event === "sources") {
+        const citations = Array.isArray(event.citations) && event.citations.length ? event.citations.join(" | ") : "citations=-";
+        showResult("답변 생성 중...", citations);
+      } else if (event.event === "token") {
+        streamedText += event.delta || "";
+        showResult(streamedText);
+      }
     });
     const meta = data.meta || {};
     const citations = Array.isArray(meta.citations) && meta.citations.length
@@ -2,21 +2,33 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import json
 import os
 import re
+import threading
 import urllib.error
-import urllib.request
+import weakref
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator
+
+import httpx
 
 from dotenv import load_dotenv
 from langchain_core.documents import Document
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
-from langchain_core.runnables import RunnableLambda
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
 from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
 from core.collection_manifest import COUNTRY_BY_STEM, DEFAULT_FILE_NAMES, build_seed_document_metadata
+from core.http_pool import (
+    DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS,
+    DEFAULT_HTTP_POOL_SIZE,
+    HTTPTimeouts,
+    KeepAliveHTTPPool,
+    get_shared_http_pool,
+)
 
 try:
     from langchain_openai import ChatOpenAI
@@ -37,7 +49,15 @@ SUPPORTED_CHUNKING_MODES = {CHUNKING_MODE_CHAR, CHUNKING_MODE_TOKEN}
 DEFAULT_TOKEN_ENCODING = "cl100k_base"
 OLLAMA_NUM_PREDICT_ENV_KEY = "DOC_RAG_OLLAMA_NUM_PREDICT"
 EMBEDDING_DEVICE_ENV_KEY = "DOC_RAG_EMBEDDING_DEVICE"
+OLLAMA_POOL_SIZE_ENV_KEY = "DOC_RAG_OLLAMA_POOL_SIZE"
+OLLAMA_CONNECT_TIMEOUT_ENV_KEY = "DOC_RAG_OLLAMA_CONNECT_TIMEOUT_SECONDS"
 DEFAULT_OLLAMA_HTTP_TIMEOUT_SECONDS = 120
+# RunnableConfig["configurable"] key holding `(read_timeout_seconds, num_predict) -> (read_timeout_seconds, num_predict)`.
+LLM_CALL_LIMITS_CONFIG_KEY = "doc_rag_llm_call_limits"
+CHUNK_SECTION_METADATA_KEY = "chunk_section"
+CHUNK_ORDINAL_METADATA_KEY = "chunk_ordinal"
+CHUNK_START_METADATA_KEY = "chunk_start"
+CHUNK_END_METADATA_KEY = "chunk_end"
 TOKEN_FALLBACK_PATTERN = re.compile(r"[가-힣]|[A-Za-z0-9_]+|[^\s]")
 
 logger = logging.getLogger("doc_rag.common")
@@ -150,6 +170,7 @@ def create_chat_llm(
     api_key: str | None = None,
     base_url: str | None = None,
     max_output_tokens: int | None = None,
+    request_timeout_seconds: float | None = None,
 ):
     provider, model, api_key, base_url = resolve_llm_config(
         provider=provider,
@@ -203,6 +224,7 @@ def create_chat_llm(
         temperature=temperature,
         base_url=base_url or "http://localhost:11434",
         num_predict=max_output_tokens,
+        request_timeout_seconds=request_timeout_seconds,
     )
 
 
@@ -257,14 +279,15 @@ def build_ollama_response_message(payload: dict[str, Any]) -> AIMessage:
     return AIMessage(content=content, additional_kwargs=extra)
 
 
-def invoke_ollama_chat(
+def _build_ollama_chat_request(
     prompt: Any,
     *,
     model: str,
     temperature: float,
     base_url: str,
-    num_predict: int | None = None,
-) -> AIMessage:
+    num_predict: int | None,
+    stream: bool,
+) -> tuple[str, bytes]:
     resolved_num_predict = num_predict
     if resolved_num_predict is None:
         resolved_num_predict = parse_optional_positive_int_env(OLLAMA_NUM_PREDICT_ENV_KEY)
@@ -275,17 +298,51 @@ def invoke_ollama_chat(
     body = {
         "model": model,
         "messages": build_ollama_messages(prompt),
-        "stream": False,
+        "stream": stream,
         "options": options,
     }
-    request = urllib.request.Request(
-        f"{base_url.rstrip('/')}/api/chat",
-        data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
-        method="POST",
-        headers={"Content-Type": "application/json"},
+    return f"{base_url.rstrip('/')}/api/chat", json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+def get_ollama_http_pool() -> KeepAliveHTTPPool:
+    pool_size = parse_optional_positive_int_env(OLLAMA_POOL_SIZE_ENV_KEY) or DEFAULT_HTTP_POOL_SIZE
+    return get_shared_http_pool(pool_size)
+
+
+def resolve_ollama_http_timeouts(read_timeout_seconds: float | None = None) -> HTTPTimeouts:
+    """Connect timeout comes from env; read timeout follows the caller's query budget when given."""
+    read_timeout = float(read_timeout_seconds or 0) or float(DEFAULT_OLLAMA_HTTP_TIMEOUT_SECONDS)
+    connect_timeout = float(
+        parse_optional_positive_int_env(OLLAMA_CONNECT_TIMEOUT_ENV_KEY) or DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS
+    )
+    return HTTPTimeouts(connect_seconds=min(connect_timeout, read_timeout), read_seconds=read_timeout)
+
+
+def invoke_ollama_chat(
+    prompt: Any,
+    *,
+    model: str,
+    temperature: float,
+    base_url: str,
+    num_predict: int | None = None,
+    read_timeout_seconds: float | None = None,
+) -> AIMessage:
+    url, body = _build_ollama_chat_request(
+        prompt,
+        model=model,
+        temperature=temperature,
+        base_url=base_url,
+        num_predict=num_predict,
+        stream=False,
     )
     try:
-        with urllib.request.urlopen(request, timeout=DEFAULT_OLLAMA_HTTP_TIMEOUT_SECONDS) as response:
+        with get_ollama_http_pool().request(
+            "POST",
+            url,
+            body=body,
+            headers={"Content-Type": "application/json"},
+            timeouts=resolve_ollama_http_timeouts(read_timeout_seconds),
+        ) as response:
             raw = response.read().decode("utf-8")
     except urllib.error.HTTPError as exc:
         detail = exc.read().decode("utf-8", errors="replace")
@@ -300,21 +357,299 @@ def invoke_ollama_chat(
     return build_ollama_response_message(payload)
 
 
-def build_ollama_chat_runnable(
+class _OllamaStreamDecoder:
+    """Incremental NDJSON decoder shared by the sync and async Ollama stream readers."""
+
+    def __init__(self):
+        self.thinking_parts: list[str] = []
+        self.content_seen = False
+        self.done = False
+
+    def feed(self, raw_line: bytes | str) -> str:
+        line = raw_line.decode("utf-8") if isinstance(raw_line, bytes) else raw_line
+        line = line.strip()
+        if not line:
+            return ""
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise RuntimeError("Ollama returned invalid JSON.") from exc
+        if payload.get("error"):
+            raise RuntimeError(f"Ollama stream error: {payload['error']}")
+        self.done = bool(payload.get("done"))
+        message = payload.get("message", {})
+        if not isinstance(message, dict):
+            return ""
+        content = str(message.get("content") or "")
+        if content:
+            self.content_seen = True
+            return content
+        if not self.content_seen and message.get("thinking"):
+            self.thinking_parts.append(str(message["thinking"]))
+        return ""
+
+    def finish(self) -> str:
+        if not self.content_seen and self.thinking_parts:
+            return "".join(self.thinking_parts).strip()
+        return ""
+
+
+def iter_ollama_stream_deltas(lines: Iterable[bytes | str]) -> Iterator[str]:
+    """Yield answer text from Ollama's NDJSON stream, falling back to `thinking` only if no content arrives."""
+    decoder = _OllamaStreamDecoder()
+    for raw_line in lines:
+        delta = decoder.feed(raw_line)
+        if delta:
+            yield delta
+        if decoder.done:
+            break
+    fallback = decoder.finish()
+    if fallback:
+        yield fallback
+
+
+async def aiter_ollama_stream_deltas(lines: AsyncIterable[bytes | str]) -> AsyncIterator[str]:
+    decoder = _OllamaStreamDecoder()
+    async for raw_line in lines:
+        delta = decoder.feed(raw_line)
+        if delta:
+            yield delta
+        if decoder.done:
+            break
+    fallback = decoder.finish()
+    if fallback:
+        yield fallback
+
+
+def stream_ollama_chat(
+    prompt: Any,
     *,
     model: str,
     temperature: float,
     base_url: str,
     num_predict: int | None = None,
-):
-    return RunnableLambda(
-        lambda prompt: invoke_ollama_chat(
-            prompt,
-            model=model,
-            temperature=temperature,
-            base_url=base_url,
+    read_timeout_seconds: float | None = None,
+) -> Iterator[str]:
+    url, body = _build_ollama_chat_request(
+        prompt,
+        model=model,
+        temperature=temperature,
+        base_url=base_url,
+        num_predict=num_predict,
+        stream=True,
+    )
+    try:
+        with get_ollama_http_pool().request(
+            "POST",
+            url,
+            body=body,
+            headers={"Content-Type": "application/json"},
+            timeouts=resolve_ollama_http_timeouts(read_timeout_seconds),
+        ) as response:
+            yield from iter_ollama_stream_deltas(response)
+    except urllib.error.HTTPError as exc:
+        detail = exc.read().decode("utf-8", errors="replace")
+        raise RuntimeError(f"Ollama HTTP error: {exc.code} {detail}") from exc
+    except urllib.error.URLError as exc:
+        raise RuntimeError(f"Ollama connection failed: {exc}") from exc
+
+
+_ASYNC_OLLAMA_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_ASYNC_OLLAMA_CLIENTS_LOCK = threading.Lock()
+
+
+def get_async_ollama_client() -> httpx.AsyncClient:
+    """Return the keep-alive async client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _ASYNC_OLLAMA_CLIENTS_LOCK:
+        client = _ASYNC_OLLAMA_CLIENTS.get(loop)
+        if client is None or client.is_closed:
+            pool_size = parse_optional_positive_int_env(OLLAMA_POOL_SIZE_ENV_KEY) or DEFAULT_HTTP_POOL_SIZE
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=pool_size),
+            )
+            _ASYNC_OLLAMA_CLIENTS[loop] = client
+        return client
+
+
+def _httpx_timeout(read_timeout_seconds: float | None) -> httpx.Timeout:
+    timeouts = resolve_ollama_http_timeouts(read_timeout_seconds)
+    return httpx.Timeout(timeouts.read_seconds, connect=timeouts.connect_seconds)
+
+
+def _raise_async_ollama_error(exc: httpx.HTTPError, detail: str = "") -> None:
+    if isinstance(exc, httpx.TimeoutException):
+        raise TimeoutError("Ollama request timed out.") from exc
+    if isinstance(exc, httpx.HTTPStatusError):
+        raise RuntimeError(f"Ollama HTTP error: {exc.response.status_code} {detail}") from exc
+    raise RuntimeError(f"Ollama connection failed: {exc}") from exc
+
+
+async def ainvoke_ollama_chat(
+    prompt: Any,
+    *,
+    model: str,
+    temperature: float,
+    base_url: str,
+    num_predict: int | None = None,
+    read_timeout_seconds: float | None = None,
+) -> AIMessage:
+    url, body = _build_ollama_chat_request(
+        prompt,
+        model=model,
+        temperature=temperature,
+        base_url=base_url,
+        num_predict=num_predict,
+        stream=False,
+    )
+    try:
+        response = await get_async_ollama_client().post(
+            url,
+            content=body,
+            headers={"Content-Type": "application/json"},
+            timeout=_httpx_timeout(read_timeout_seconds),
+        )
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        _raise_async_ollama_error(exc, exc.response.text)
+    except httpx.HTTPError as exc:
+        _raise_async_ollama_error(exc)
+
+    try:
+        payload = response.json()
+    except json.JSONDecodeError as exc:
+        raise RuntimeError("Ollama returned invalid JSON.") from exc
+    return build_ollama_response_message(payload)
+
+
+async def astream_ollama_chat(
+    prompt: Any,
+    *,
+    model: str,
+    temperature: float,
+    base_url: str,
+    num_predict: int | None = None,
+    read_timeout_seconds: float | None = None,
+) -> AsyncIterator[str]:
+    url, body = _build_ollama_chat_request(
+        prompt,
+        model=model,
+        temperature=temperature,
+        base_url=base_url,
+        num_predict=num_predict,
+        stream=True,
+    )
+    try:
+        async with get_async_ollama_client().stream(
+            "POST",
+            url,
+            content=body,
+            headers={"Content-Type": "application/json"},
+            timeout=_httpx_timeout(read_timeout_seconds),
+        ) as response:
+            if response.is_error:
+                detail = (await response.aread()).decode("utf-8", errors="replace")
+                _raise_async_ollama_error(
+                    httpx.HTTPStatusError("Ollama HTTP error", request=response.request, response=response),
+                    detail,
+                )
+            async for delta in aiter_ollama_stream_deltas(response.aiter_lines()):
+                yield delta
+    except httpx.HTTPError as exc:
+        _raise_async_ollama_error(exc)
+
+
+class OllamaChatRunnable(Runnable):
+    """Minimal Ollama chat runnable.
+
+    `invoke`/`stream` go through the pooled sync HTTP client; `ainvoke`/`astream`
+    use the per-loop async client so cancelling the awaiting task aborts the
+    upstream request instead of leaving it running in a worker thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        temperature: float,
+        base_url: str,
+        num_predict: int | None = None,
+        request_timeout_seconds: float | None = None,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.base_url = base_url
+        self.num_predict = num_predict
+        self.request_timeout_seconds = request_timeout_seconds
+
+    def _call_limits(self, config: Any) -> tuple[float | None, int | None]:
+        """Per-call read timeout and num_predict; a request deadline in the config can only tighten them."""
+        limits = ((config or {}).get("configurable") or {}).get(LLM_CALL_LIMITS_CONFIG_KEY)
+        if limits is None:
+            return self.request_timeout_seconds, self.num_predict
+        return limits(self.request_timeout_seconds, self.num_predict)
+
+    def invoke(self, input: Any, config: Any = None, **kwargs: Any) -> AIMessage:
+        read_timeout_seconds, num_predict = self._call_limits(config)
+        return invoke_ollama_chat(
+            input,
+            model=self.model,
+            temperature=self.temperature,
+            base_url=self.base_url,
             num_predict=num_predict,
+            read_timeout_seconds=read_timeout_seconds,
         )
+
+    def stream(self, input: Any, config: Any = None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        read_timeout_seconds, num_predict = self._call_limits(config)
+        for delta in stream_ollama_chat(
+            input,
+            model=self.model,
+            temperature=self.temperature,
+            base_url=self.base_url,
+            num_predict=num_predict,
+            read_timeout_seconds=read_timeout_seconds,
+        ):
+            yield AIMessageChunk(content=delta)
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs: Any) -> AIMessage:
+        read_timeout_seconds, num_predict = self._call_limits(config)
+        return await ainvoke_ollama_chat(
+            input,
+            model=self.model,
+            temperature=self.temperature,
+            base_url=self.base_url,
+            num_predict=num_predict,
+            read_timeout_seconds=read_timeout_seconds,
+        )
+
+    async def astream(self, input: Any, config: Any = None, **kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        read_timeout_seconds, num_predict = self._call_limits(config)
+        async for delta in astream_ollama_chat(
+            input,
+            model=self.model,
+            temperature=self.temperature,
+            base_url=self.base_url,
+            num_predict=num_predict,
+            read_timeout_seconds=read_timeout_seconds,
+        ):
+            yield AIMessageChunk(content=delta)
+
+
+def build_ollama_chat_runnable(
+    *,
+    model: str,
+    temperature: float,
+    base_url: str,
+    num_predict: int | None = None,
+    request_timeout_seconds: float | None = None,
+) -> OllamaChatRunnable:
+    return OllamaChatRunnable(
+        model=model,
+        temperature=temperature,
+        base_url=base_url,
+        num_predict=num_predict,
+        request_timeout_seconds=request_timeout_seconds,
     )
 
 
@@ -388,19 +723,27 @@ def approximate_token_count(text: str) -> int:
     return max(len(tokens), 1)
 
 
-def count_text_tokens(text: str, encoding_name: str = DEFAULT_TOKEN_ENCODING) -> int:
+@lru_cache(maxsize=8)
+def get_token_encoder(encoding_name: str = DEFAULT_TOKEN_ENCODING) -> Any | None:
+    """Load a tiktoken encoder once per encoding; None (cached too) when it cannot be loaded."""
     try:
         import tiktoken
 
-        encoder = tiktoken.get_encoding(encoding_name)
-        return max(len(encoder.encode(text)), 1)
+        return tiktoken.get_encoding(encoding_name)
     except Exception as exc:
         logger.warning(
             "token count fallback to approximate counter: encoding=%s error=%s",
             encoding_name,
             exc,
         )
+        return None
+
+
+def count_text_tokens(text: str, encoding_name: str = DEFAULT_TOKEN_ENCODING) -> int:
+    encoder = get_token_encoder(encoding_name)
+    if encoder is None:
         return approximate_token_count(text)
+    return max(len(encoder.encode(text)), 1)
 
 
 def split_by_markdown_headers(
@@ -427,9 +770,21 @@ def split_by_markdown_headers(
         if not header_docs:
             header_docs = [Document(page_content=doc.page_content, metadata={})]
 
-        for part in header_docs:
+        for section_index, part in enumerate(header_docs):
             part.metadata = {**doc.metadata, **part.metadata}
-
-        chunks.extend(text_splitter.split_documents(header_docs))
+            # Offsets let overlapping neighbours be stitched at query time; the search starts one overlap
+            # before the previous chunk's end, like the splitter's own add_start_index.
+            previous_start, previous_end = -1, 0
+            for ordinal, chunk in enumerate(text_splitter.split_documents([part])):
+                chunk.metadata[CHUNK_SECTION_METADATA_KEY] = section_index
+                chunk.metadata[CHUNK_ORDINAL_METADATA_KEY] = ordinal
+                start = part.page_content.find(chunk.page_content, max(previous_start + 1, previous_end - chunk_overlap))
+                if start < 0:
+                    start = part.page_content.find(chunk.page_content, previous_start + 1)
+                if start >= 0:
+                    chunk.metadata[CHUNK_START_METADATA_KEY] = start
+                    chunk.metadata[CHUNK_END_METADATA_KEY] = start + len(chunk.page_content)
+                    previous_start, previous_end = start, start + len(chunk.page_content)
+                chunks.append(chunk)
 
     return chunks
@@ -4,12 +4,20 @@ from fastapi.exceptions import RequestValidationError
 
 
 class QueryAPIError(Exception):
-    def __init__(self, code: str, status_code: int, message: str, hint: str | None = None):
+    def __init__(
+        self,
+        code: str,
+        status_code: int,
+        message: str,
+        hint: str | None = None,
+        headers: dict[str, str] | None = None,
+    ):
         super().__init__(message)
         self.code = code
         self.status_code = status_code
         self.message = message
         self.hint = hint
+        self.headers = headers or {}
 
 
 def build_query_error_payload(
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import http.client
+import io
+import threading
+import urllib.error
+import urllib.parse
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Mapping
+
+DEFAULT_HTTP_POOL_SIZE = 8
+DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS = 5.0
+DEFAULT_HTTP_READ_TIMEOUT_SECONDS = 120.0
+
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+PoolKey = tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class HTTPTimeouts:
+    connect_seconds: float = DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS
+    read_seconds: float = DEFAULT_HTTP_READ_TIMEOUT_SECONDS
+
+
+class PooledHTTPResponse:
+    """Thin wrapper over `http.client.HTTPResponse` mirroring the parts of `urlopen` we use."""
+
+    def __init__(self, response: http.client.HTTPResponse):
+        self._response = response
+        self.status = response.status
+        self.headers = response.headers
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self._response.read(amt)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            line = self._response.readline()
+            if not line:
+                return
+            yield line
+
+    @property
+    def will_close(self) -> bool:
+        return bool(self._response.will_close)
+
+    @property
+    def is_drained(self) -> bool:
+        return self._response.isclosed()
+
+
+class KeepAliveHTTPPool:
+    """Thread-safe keep-alive connection pool keyed by (scheme, host, port).
+
+    `pool_size` bounds how many idle connections are kept per host; concurrent
+    requests beyond that still get their own connection but it is closed on
+    release instead of parked. A connection is only returned to the pool once
+    its response body has been fully read, so half-consumed streams never leak
+    into the next request.
+    """
+
+    def __init__(self, *, pool_size: int = DEFAULT_HTTP_POOL_SIZE):
+        self.pool_size = max(1, int(pool_size))
+        self._idle: dict[PoolKey, deque[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "reused": 0, "discarded": 0, "retried": 0}
+
+    def _checkout(self, key: PoolKey, timeouts: HTTPTimeouts) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._stats["reused"] += 1
+                return idle.pop(), True
+            self._stats["created"] += 1
+        scheme, host, port = key
+        connection_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_cls(host, port, timeout=timeouts.connect_seconds), False
+
+    def _checkin(self, key: PoolKey, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.pool_size:
+                idle.append(connection)
+                return
+            self._stats["discarded"] += 1
+        connection.close()
+
+    def _discard(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._stats["discarded"] += 1
+        connection.close()
+
+    @staticmethod
+    def _pool_key(url: str) -> tuple[PoolKey, str]:
+        parsed = urllib.parse.urlsplit(url)
+        scheme = (parsed.scheme or "http").lower()
+        if scheme not in {"http", "https"}:
+            raise ValueError(f"unsupported URL scheme: {scheme}")
+        host = parsed.hostname or "localhost"
+        port = parsed.port or (443 if scheme == "https" else 80)
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        return (scheme, host, port), path
+
+    def _send(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: Mapping[str, str],
+        timeouts: HTTPTimeouts,
+    ) -> http.client.HTTPResponse:
+        if connection.sock is None:
+            connection.timeout = timeouts.connect_seconds
+            connection.connect()
+        connection.sock.settimeout(timeouts.read_seconds)
+        connection.request(method, path, body=body, headers=dict(headers))
+        return connection.getresponse()
+
+    @contextmanager
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeouts: HTTPTimeouts | None = None,
+    ) -> Iterator[PooledHTTPResponse]:
+        """Send a request on a pooled connection; errors follow `urllib.request.urlopen`.
+
+        Connection failures raise `urllib.error.URLError`, non-2xx responses raise
+        `urllib.error.HTTPError`, and socket read timeouts surface as `TimeoutError`.
+        """
+        resolved_timeouts = timeouts or HTTPTimeouts()
+        key, path = self._pool_key(url)
+        request_headers = {"Connection": "keep-alive", **(headers or {})}
+
+        connection, reused = self._checkout(key, resolved_timeouts)
+        try:
+            try:
+                raw_response = self._send(connection, method, path, body, request_headers, resolved_timeouts)
+            except _STALE_CONNECTION_ERRORS:
+                # The server may close an idle keep-alive socket at any time; retry once on a fresh one.
+                self._discard(connection)
+                if not reused:
+                    raise
+                with self._lock:
+                    self._stats["retried"] += 1
+                    self._stats["created"] += 1
+                scheme, host, port = key
+                connection_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+                connection = connection_cls(host, port, timeout=resolved_timeouts.connect_seconds)
+                raw_response = self._send(connection, method, path, body, request_headers, resolved_timeouts)
+        except TimeoutError:
+            connection.close()
+            raise
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise urllib.error.URLError(exc) from exc
+
+        if raw_response.status >= 400:
+            detail = raw_response.read()
+            if raw_response.will_close:
+                self._discard(connection)
+            else:
+                self._checkin(key, connection)
+            raise urllib.error.HTTPError(
+                url,
+                raw_response.status,
+                raw_response.reason,
+                raw_response.headers,
+                io.BytesIO(detail),
+            )
+
+        response = PooledHTTPResponse(raw_response)
+        try:
+            yield response
+        except BaseException:
+            self._discard(connection)
+            raise
+        if response.will_close or not response.is_drained:
+            self._discard(connection)
+        else:
+            self._checkin(key, connection)
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "idle": sum(len(idle) for idle in self._idle.values()), "pool_size": self.pool_size}
+
+    def close(self) -> None:
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+_SHARED_POOLS: dict[int, KeepAliveHTTPPool] = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+def get_shared_http_pool(pool_size: int = DEFAULT_HTTP_POOL_SIZE) -> KeepAliveHTTPPool:
+    resolved_size = max(1, int(pool_size))
+    with _SHARED_POOLS_LOCK:
+        pool = _SHARED_POOLS.get(resolved_size)
+        if pool is None:
+            pool = KeepAliveHTTPPool(pool_size=resolved_size)
+            _SHARED_POOLS[resolved_size] = pool
+        return pool
+
+
+def close_shared_http_pools() -> None:
+    with _SHARED_POOLS_LOCK:
+        pools = list(_SHARED_POOLS.values())
+        _SHARED_POOLS.clear()
+    for pool in pools:
+        pool.close()
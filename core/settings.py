@@ -23,8 +23,24 @@ SEARCH_LAMBDA = 0.3
 CHUNK_SIZE = 800
 CHUNK_OVERLAP = 120
 MAX_QUERY_COLLECTIONS = 2
+DEFAULT_RETRIEVAL_MAX_WORKERS = 4
+RETRIEVAL_MMR_SCOPE_COLLECTION = "collection"
+RETRIEVAL_MMR_SCOPE_GLOBAL = "global"
+SUPPORTED_RETRIEVAL_MMR_SCOPES = {RETRIEVAL_MMR_SCOPE_COLLECTION, RETRIEVAL_MMR_SCOPE_GLOBAL}
+DEFAULT_RETRIEVAL_MMR_SCOPE = RETRIEVAL_MMR_SCOPE_COLLECTION
+CONTEXT_COMPRESSION_AUTO = "auto"
+CONTEXT_COMPRESSION_ON = "on"
+CONTEXT_COMPRESSION_OFF = "off"
+SUPPORTED_CONTEXT_COMPRESSION_MODES = {CONTEXT_COMPRESSION_AUTO, CONTEXT_COMPRESSION_ON, CONTEXT_COMPRESSION_OFF}
+DEFAULT_CONTEXT_COMPRESSION_MODE = CONTEXT_COMPRESSION_AUTO
+DEFAULT_ANSWER_CACHE_TTL_SECONDS = 600
+DEFAULT_LLM_MAX_CONCURRENCY = 2
+DEFAULT_LLM_MAX_QUEUE_DEPTH = 8
+DEFAULT_QUERY_BATCH_MAX_CONCURRENCY = 2
+MAX_QUERY_BATCH_SIZE = 32
 DEFAULT_QUERY_TIMEOUT_SECONDS = 30
 DEFAULT_MAX_CONTEXT_CHARS = 1500
+DEFAULT_MAX_CONTEXT_TOKENS = 1024
 COLLECTION_SOFT_CAP = 30_000
 COLLECTION_HARD_CAP = 50_000
 ADMIN_CODE_ENV_KEY = "DOC_RAG_ADMIN_CODE"
@@ -33,6 +49,15 @@ CHUNKING_MODE_ENV_KEY = "DOC_RAG_CHUNKING_MODE"
 CHUNK_TOKEN_ENCODING_ENV_KEY = "DOC_RAG_CHUNK_TOKEN_ENCODING"
 QUERY_TIMEOUT_SECONDS_ENV_KEY = "DOC_RAG_QUERY_TIMEOUT_SECONDS"
 MAX_CONTEXT_CHARS_ENV_KEY = "DOC_RAG_MAX_CONTEXT_CHARS"
+MAX_CONTEXT_TOKENS_ENV_KEY = "DOC_RAG_MAX_CONTEXT_TOKENS"
+RETRIEVAL_MAX_WORKERS_ENV_KEY = "DOC_RAG_RETRIEVAL_MAX_WORKERS"
+RETRIEVAL_MMR_SCOPE_ENV_KEY = "DOC_RAG_RETRIEVAL_MMR_SCOPE"
+CONTEXT_COMPRESSION_ENV_KEY = "DOC_RAG_CONTEXT_COMPRESSION"
+ADAPTIVE_BUDGET_ENV_KEY = "DOC_RAG_ADAPTIVE_BUDGET"
+ANSWER_CACHE_TTL_SECONDS_ENV_KEY = "DOC_RAG_ANSWER_CACHE_TTL_SECONDS"
+LLM_MAX_CONCURRENCY_ENV_KEY = "DOC_RAG_LLM_MAX_CONCURRENCY"
+LLM_MAX_QUEUE_DEPTH_ENV_KEY = "DOC_RAG_LLM_MAX_QUEUE_DEPTH"
+QUERY_BATCH_MAX_CONCURRENCY_ENV_KEY = "DOC_RAG_QUERY_BATCH_MAX_CONCURRENCY"
 UPLOAD_REQUEST_STORE_FILE = "upload_requests.json"
 REQUEST_STATUS_PENDING = "pending"
 REQUEST_STATUS_APPROVED = "approved"
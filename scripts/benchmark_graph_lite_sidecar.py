@@ -2,7 +2,13 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import random
+import resource
+import subprocess
 import sys
+import tempfile
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -10,7 +16,9 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from services import graph_lite_service
+from services import graph_lite_binary_service, graph_lite_service, graphrag_poc_service
+
+SCALE_COLLECTIONS = ("uk", "fr", "de", "us")
 
 
 def _read_fixtures(path: Path, bucket: str) -> list[dict[str, object]]:
@@ -79,6 +87,112 @@ def build_markdown_report(payload: dict[str, object]) -> str:
     return "\n".join(lines) + "\n"
 
 
+def build_synthetic_snapshot(entity_count: int, relation_count: int, *, seed: int = 7) -> dict[str, object]:
+    """Random co-occurrence graph in the graphrag export shape, for load-time scaling runs."""
+    rng = random.Random(seed)
+    nodes = [
+        {
+            "id": f"entity_{index}",
+            "label": f"인물{index}",
+            "sources": [f"doc_{index % 97}.md"],
+            "collections": [SCALE_COLLECTIONS[index % len(SCALE_COLLECTIONS)]],
+        }
+        for index in range(entity_count)
+    ]
+    edges = []
+    for index in range(relation_count):
+        source, target = rng.sample(range(entity_count), 2)
+        edges.append(
+            {
+                "source": f"entity_{source}",
+                "target": f"entity_{target}",
+                "weight": rng.randint(1, 5),
+                "collections": [rng.choice(SCALE_COLLECTIONS)],
+                "evidence": [
+                    {
+                        "source": f"doc_{index % 97}.md",
+                        "heading": f"섹션 {index % 13}",
+                        "excerpt": f"인물{source}와 인물{target}이 같은 단락에 등장한다.",
+                    }
+                ],
+            }
+        )
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "stats": {"builder": "benchmark_graph_lite_sidecar.scale", "nodes": entity_count, "edges": relation_count},
+    }
+
+
+def _rss_kb() -> int:
+    """Current resident set size; peak RSS from getrusage where /proc is unavailable."""
+    try:
+        resident_pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def measure_snapshot_load(snapshot_dir: Path, snapshot_format: str) -> dict[str, object]:
+    """Load once in this process and report load time, RSS growth and the first query latency."""
+    rss_before_kb = _rss_kb()
+    started = time.perf_counter()
+    if snapshot_format == "binary":
+        snapshot = graph_lite_binary_service.load_binary_snapshot(snapshot_dir / graph_lite_service.DEFAULT_BINARY_FILE)
+    else:
+        snapshot = graph_lite_service.load_relation_snapshot(snapshot_dir, prefer_binary=False)
+    load_ms = (time.perf_counter() - started) * 1000
+    rss_after_load_kb = _rss_kb()
+    started = time.perf_counter()
+    result = graph_lite_service.query_relation_snapshot(snapshot, "인물1와 인물2의 관계를 설명해줘.", force=True)
+    first_query_ms = (time.perf_counter() - started) * 1000
+    return {
+        "format": snapshot_format,
+        "load_ms": round(load_ms, 3),
+        "rss_growth_kb": rss_after_load_kb - rss_before_kb,
+        "rss_growth_after_query_kb": _rss_kb() - rss_before_kb,
+        "first_query_ms": round(first_query_ms, 3),
+        "first_query_status": result.get("status"),
+        "relation_count": len(snapshot.relations),
+    }
+
+
+def run_scale_benchmark(entity_count: int, relation_count: int) -> dict[str, object]:
+    """Compile a synthetic snapshot and measure each format in a fresh interpreter so RSS is not shared."""
+    with tempfile.TemporaryDirectory(prefix="graph_lite_scale_") as temp_dir:
+        snapshot_dir = Path(temp_dir)
+        graphrag_poc_service.export_snapshot_jsonl(build_synthetic_snapshot(entity_count, relation_count), snapshot_dir)
+        loaded = graph_lite_service.load_relation_snapshot(snapshot_dir, prefer_binary=False)
+        graph_lite_binary_service.write_binary_snapshot(loaded, snapshot_dir)
+        del loaded
+        file_bytes = {path.name: path.stat().st_size for path in sorted(snapshot_dir.iterdir())}
+        measurements = []
+        for snapshot_format in ("jsonl", "binary"):
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(Path(__file__).resolve()),
+                    "--measure-load",
+                    str(snapshot_dir),
+                    "--format",
+                    snapshot_format,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            measurements.append(json.loads(completed.stdout))
+    return {
+        "generated_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "contract_version": graph_lite_service.GRAPH_LITE_CONTRACT_VERSION,
+        "binary_format": graph_lite_binary_service.GRAPH_LITE_BINARY_FORMAT,
+        "entity_count": entity_count,
+        "relation_count": relation_count,
+        "file_bytes": file_bytes,
+        "measurements": measurements,
+    }
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Benchmark local graph-lite relation sidecar retrieval.")
     parser.add_argument(
@@ -91,6 +205,20 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--bucket", default="graph-candidate")
     parser.add_argument("--max-hops", type=int, default=2)
     parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument(
+        "--scale-relations",
+        type=int,
+        default=0,
+        help="Scale mode: compare JSONL and binary snapshot load time/RSS on a synthetic graph with this many relations.",
+    )
+    parser.add_argument(
+        "--scale-entities",
+        type=int,
+        default=0,
+        help="Entities in the synthetic scale graph (default: relations / 8, at least 2).",
+    )
+    parser.add_argument("--measure-load", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--format", choices=("jsonl", "binary"), default="jsonl", help=argparse.SUPPRESS)
     parser.add_argument(
         "--output-json",
         type=Path,
@@ -106,6 +234,13 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
+    if args.measure_load is not None:
+        print(json.dumps(measure_snapshot_load(args.measure_load, args.format)))
+        return
+    if args.scale_relations > 0:
+        entity_count = args.scale_entities or max(2, args.scale_relations // 8)
+        print(json.dumps(run_scale_benchmark(entity_count, args.scale_relations), ensure_ascii=False, indent=2))
+        return
     snapshot = graph_lite_service.load_relation_snapshot(args.snapshot_dir)
     fixtures = _read_fixtures(args.fixtures, args.bucket)
     results: list[dict[str, object]] = []
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from langchain_core.documents import Document
+
+from services import lexical_index_service, query_service
+
+DEFAULT_CHUNK_COUNTS = (4_000, 30_000, 50_000)
+VOCABULARY_SIZE = 6000
+TOKENS_PER_CHUNK = 60
+QUERY_COUNT = 24
+CANDIDATE_LIMIT = 3
+PARTICLES = ("", "", "", "의", "는", "에서", "으로", "와")
+
+
+def _vocabulary(size: int) -> list[str]:
+    syllables = "가나다라마바사아자차카타파하거너더러머버서어저처"
+    return [
+        f"{syllables[index % len(syllables)]}{syllables[(index // len(syllables)) % len(syllables)]}학{index}"
+        for index in range(size)
+    ]
+
+
+def build_corpus(chunk_count: int, *, seed: int) -> tuple[list[Document], list[list[str]]]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(VOCABULARY_SIZE)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    docs: list[Document] = []
+    for index in range(chunk_count):
+        tokens = rng.choices(vocabulary, weights=weights, k=TOKENS_PER_CHUNK)
+        text = " ".join(f"{token}{rng.choice(PARTICLES)}" for token in tokens)
+        docs.append(
+            Document(
+                page_content=text,
+                metadata={
+                    "source": f"doc_{index // 40:04d}.md",
+                    "h2": " ".join(rng.sample(vocabulary[:300], 2)),
+                    "collection_key": "synthetic",
+                },
+            )
+        )
+    queries = [
+        lexical_index_service.extract_lexical_query_terms(" ".join(rng.sample(vocabulary[:600], 4)))
+        for _ in range(QUERY_COUNT)
+    ]
+    return docs, queries
+
+
+def postings_dict_rank(index: lexical_index_service.LexicalIndex, query_terms: list[str]) -> list[tuple[int, float, list[str]]]:
+    """Previous per-position dict/set scoring over the postings, kept here as the reference."""
+    metadata_hits: dict[int, set[str]] = {}
+    content_hits: dict[int, set[str]] = {}
+    bm25_scores: dict[int, float] = {}
+    avg_doc_length = index.avg_doc_length or 1.0
+    for term in query_terms:
+        frequencies: dict[int, int] = {}
+        for token in lexical_index_service.expand_query_term(index, term):
+            for position, mask, frequency in index.postings.get(token, ()):
+                if mask & lexical_index_service.FIELD_METADATA:
+                    metadata_hits.setdefault(position, set()).add(term)
+                if mask & lexical_index_service.FIELD_CONTENT:
+                    content_hits.setdefault(position, set()).add(term)
+                frequencies[position] = frequencies.get(position, 0) + frequency
+        if not frequencies:
+            continue
+        document_frequency = len(frequencies)
+        idf = math.log(1.0 + (index.doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+        for position, frequency in frequencies.items():
+            length_ratio = index.doc_lengths[position] / avg_doc_length
+            denominator = frequency + lexical_index_service.BM25_K1 * (
+                1.0 - lexical_index_service.BM25_B + lexical_index_service.BM25_B * length_ratio
+            )
+            bm25_scores[position] = bm25_scores.get(position, 0.0) + idf * frequency * (
+                lexical_index_service.BM25_K1 + 1.0
+            ) / denominator
+
+    items: list[tuple[float, int, float, int, list[str]]] = []
+    for position in sorted(set(metadata_hits) | set(content_hits)):
+        metadata = metadata_hits.get(position, set())
+        content = content_hits.get(position, set())
+        matched = sorted(metadata | content)
+        items.append((float(len(metadata) * 2 + len(content)), len(matched), bm25_scores.get(position, 0.0), position, matched))
+    items.sort(key=lambda item: (-item[0], -item[1], -item[2], item[3]))
+    return [(position, score, matched) for score, _hits, _bm25, position, matched in items[:CANDIDATE_LIMIT]]
+
+
+def term_matrix_rank(index: lexical_index_service.LexicalIndex, query_terms: list[str]) -> list[tuple[int, float, list[str]]]:
+    lookup = lexical_index_service.lookup_query_terms(index, query_terms)
+    positions, _eligible = lookup.rank_candidates(exclude=[], limit=CANDIDATE_LIMIT)
+    return [(position, *lookup.score(position)) for position in positions]
+
+
+def substring_scan_rank(docs: list[Document], query_terms: list[str]) -> list[tuple[int, float, list[str]]]:
+    """Un-indexed `term in text` scan (`_score_doc_lexical_match`) over the whole collection."""
+    scored = [
+        (score, position, matched)
+        for position, (score, matched) in enumerate(
+            query_service._score_doc_lexical_match(doc, query_terms) for doc in docs
+        )
+        if score > 0
+    ]
+    scored.sort(key=lambda item: (-item[0], -len(item[2]), item[1]))
+    return [(position, score, matched) for score, position, matched in scored[:CANDIDATE_LIMIT]]
+
+
+def _time_mode(runner, queries: list[list[str]], rounds: int) -> tuple[dict[str, object], list[object]]:
+    elapsed: list[float] = []
+    outputs: list[object] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        outputs = [runner(terms) for terms in queries]
+        elapsed.append(time.perf_counter() - started)
+    best = min(elapsed)
+    return {
+        "best_ms_per_query": round(best * 1000 / len(queries), 3),
+        "queries_per_second": round(len(queries) / best, 2) if best else None,
+    }, outputs
+
+
+def benchmark_size(chunk_count: int, *, rounds: int, seed: int, include_scan: bool) -> dict[str, object]:
+    docs, queries = build_corpus(chunk_count, seed=seed)
+    build_started = time.perf_counter()
+    index = lexical_index_service.build_lexical_index(docs)
+    build_seconds = round(time.perf_counter() - build_started, 2)
+
+    postings_dict, reference = _time_mode(lambda terms: postings_dict_rank(index, terms), queries, rounds)
+    term_matrix, ranked = _time_mode(lambda terms: term_matrix_rank(index, terms), queries, rounds)
+    result: dict[str, object] = {
+        "chunks": chunk_count,
+        "vocabulary": len(index.vocabulary),
+        "postings": int(index.term_matrix.indptr[-1]),
+        "index_build_seconds": build_seconds,
+        "postings_dict": postings_dict,
+        "term_matrix": term_matrix,
+        "speedup": round(
+            float(postings_dict["best_ms_per_query"]) / float(term_matrix["best_ms_per_query"]),
+            2,
+        )
+        if term_matrix["best_ms_per_query"]
+        else None,
+        "identical_results": sum(1 for left, right in zip(reference, ranked) if left == right),
+        "queries": len(queries),
+    }
+    if include_scan:
+        substring_scan, _outputs = _time_mode(lambda terms: substring_scan_rank(docs, terms), queries, 1)
+        result["substring_scan"] = substring_scan
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare dict/set postings scoring with the array-backed term-document matrix."
+    )
+    parser.add_argument(
+        "--chunks",
+        type=int,
+        action="append",
+        help="Collection sizes to benchmark (default: 4000, 30000, 50000).",
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per mode; the best round is reported.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--include-substring-scan",
+        action="store_true",
+        help="Also time the un-indexed `term in text` scan over every chunk (slow on large collections).",
+    )
+    parser.add_argument("--output", type=Path, help="Optional JSON output file path.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.rounds < 1:
+        raise ValueError("--rounds must be >= 1")
+    sizes = args.chunks or list(DEFAULT_CHUNK_COUNTS)
+    payload = {
+        "generated_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "rounds": args.rounds,
+        "candidate_limit": CANDIDATE_LIMIT,
+        "results": [
+            benchmark_size(size, rounds=args.rounds, seed=args.seed, include_scan=args.include_substring_scan)
+            for size in sizes
+        ],
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from langchain_core.documents import Document
+
+from services import collection_service, index_service, lexical_index_service, query_service
+
+
+DEFAULT_SAMPLE_PACK_QUERIES = [
+    "에콜 폴리테크니크의 역할을 설명해줘",
+    "훔볼트 대학의 연구 중심 모델은 무엇인가",
+    "프랑스와 독일의 과학 교육 제도를 비교해줘",
+    "영국 왕립학회의 설립 배경을 알려줘",
+    "이탈리아 르네상스 시기의 과학자들을 정리해줘",
+    "독일 화학 산업이 성장한 이유는 무엇인가",
+    "프랑스 과학 아카데미의 기능을 요약해줘",
+    "유럽 대학의 실험실 문화가 어떻게 발전했나",
+]
+SYNTHETIC_COLLECTION_KEY = "synthetic"
+SYNTHETIC_EMBEDDING_DIM = 64
+SYNTHETIC_VOCABULARY_SIZE = 4000
+SYNTHETIC_TOKENS_PER_CHUNK = 40
+CHROMA_ADD_BATCH_SIZE = 4000
+SEMANTIC_BENCHMARK_BUDGET = {
+    "profile": "semantic_fallback",
+    "per_collection_k": 3,
+    "per_collection_fetch_k": 10,
+    "max_total_docs": 3,
+    "max_context_chars": 1200,
+}
+
+
+class SyntheticHashEmbeddings:
+    """Deterministic bag-of-tokens hash embedding; stands in for bge-m3 so the benchmark needs no model download."""
+
+    def __init__(self, dim: int = SYNTHETIC_EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = [0.0] * self.dim
+        for token in lexical_index_service.tokenize_lexical_text(text):
+            bucket = zlib.crc32(token.encode("utf-8")) % self.dim
+            vector[bucket] += 1.0
+        norm = sum(value * value for value in vector) ** 0.5 or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+def _synthetic_vocabulary(size: int) -> list[str]:
+    syllables = "가나다라마바사아자차카타파하거너더러머버서어저처"
+    return [
+        f"{syllables[index % len(syllables)]}{syllables[(index // len(syllables)) % len(syllables)]}용어{index}"
+        for index in range(size)
+    ]
+
+
+def build_synthetic_collection(chunk_count: int, *, seed: int):
+    import chromadb
+    from langchain_chroma import Chroma
+
+    rng = random.Random(seed)
+    vocabulary = _synthetic_vocabulary(SYNTHETIC_VOCABULARY_SIZE)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    texts: list[str] = []
+    metadatas: list[dict[str, object]] = []
+    for index in range(chunk_count):
+        tokens = rng.choices(vocabulary, weights=weights, k=SYNTHETIC_TOKENS_PER_CHUNK)
+        texts.append(" ".join(tokens))
+        metadatas.append(
+            {
+                "source": f"synthetic_{index // 50:04d}.md",
+                "h2": f"섹션 {index % 50}",
+                "collection_key": SYNTHETIC_COLLECTION_KEY,
+            }
+        )
+
+    embeddings = SyntheticHashEmbeddings()
+    db = Chroma(
+        collection_name=f"benchmark_synthetic_{chunk_count}",
+        embedding_function=embeddings,
+        client=chromadb.EphemeralClient(),
+    )
+    ids = [f"synthetic-{index}" for index in range(chunk_count)]
+    for start in range(0, chunk_count, CHROMA_ADD_BATCH_SIZE):
+        end = start + CHROMA_ADD_BATCH_SIZE
+        db.add_texts(texts[start:end], metadatas=metadatas[start:end], ids=ids[start:end])
+    lexical_index = lexical_index_service.build_lexical_index(
+        [Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)],
+        doc_ids=ids,
+    )
+    queries = [" ".join(rng.sample(vocabulary[:400], 3)) for _ in range(64)]
+    return db, lexical_index, embeddings, queries
+
+
+@contextmanager
+def synthetic_collection(db, lexical_index, embeddings) -> Iterator[None]:
+    """Route index_service lookups for the synthetic key to the in-memory collection for the duration of the run."""
+    original_get_db = index_service.get_db
+    original_get_lexical_index = index_service.get_collection_lexical_index
+    original_get_embeddings = index_service.get_embeddings
+
+    def _get_db(collection_key: str = SYNTHETIC_COLLECTION_KEY):
+        return db if collection_key == SYNTHETIC_COLLECTION_KEY else original_get_db(collection_key)
+
+    def _get_lexical_index(collection_key: str = SYNTHETIC_COLLECTION_KEY):
+        if collection_key == SYNTHETIC_COLLECTION_KEY:
+            return lexical_index
+        return original_get_lexical_index(collection_key)
+
+    index_service.get_db = _get_db
+    index_service.get_collection_lexical_index = _get_lexical_index
+    index_service.get_embeddings = lambda model_name=None: embeddings
+    try:
+        yield
+    finally:
+        index_service.get_db = original_get_db
+        index_service.get_collection_lexical_index = original_get_lexical_index
+        index_service.get_embeddings = original_get_embeddings
+
+
+def run_sequential(queries: list[str], collection_keys: list[str]) -> list[list[str]]:
+    results: list[list[str]] = []
+    for query in queries:
+        docs = query_service.retrieve_collection_documents(
+            query,
+            collection_keys,
+            budget=SEMANTIC_BENCHMARK_BUDGET,
+        )
+        results.append([str(doc.metadata.get("source", "")) for doc in docs])
+    return results
+
+
+def run_batched(queries: list[str], collection_keys: list[str]) -> list[list[str]]:
+    docs_per_query = query_service.retrieve_collection_documents_batch(
+        queries,
+        [collection_keys for _ in queries],
+        budgets=[SEMANTIC_BENCHMARK_BUDGET for _ in queries],
+    )
+    return [[str(doc.metadata.get("source", "")) for doc in docs] for docs in docs_per_query]
+
+
+def measure(mode: str, runner, queries: list[str], collection_keys: list[str], rounds: int) -> dict[str, object]:
+    elapsed: list[float] = []
+    sources: list[list[str]] = []
+    for _ in range(rounds):
+        # Cold query-embedding cache each round so both modes pay the encoder cost.
+        index_service.clear_query_embedding_cache()
+        started = time.perf_counter()
+        sources = runner(queries, collection_keys)
+        elapsed.append(time.perf_counter() - started)
+    best = min(elapsed)
+    return {
+        "mode": mode,
+        "rounds": rounds,
+        "queries": len(queries),
+        "best_seconds": round(best, 4),
+        "avg_seconds": round(sum(elapsed) / len(elapsed), 4),
+        "queries_per_second": round(len(queries) / best, 2) if best else None,
+        "sources": sources,
+    }
+
+
+def benchmark_dataset(name: str, queries: list[str], collection_keys: list[str], rounds: int) -> dict[str, object]:
+    sequential = measure("sequential", run_sequential, queries, collection_keys, rounds)
+    batched = measure("batched", run_batched, queries, collection_keys, rounds)
+    matches = sum(1 for left, right in zip(sequential.pop("sources"), batched.pop("sources")) if left == right)
+    sequential_qps = float(sequential["queries_per_second"] or 0.0)
+    batched_qps = float(batched["queries_per_second"] or 0.0)
+    return {
+        "dataset": name,
+        "collection_keys": collection_keys,
+        "sequential": sequential,
+        "batched": batched,
+        "speedup": round(batched_qps / sequential_qps, 2) if sequential_qps else None,
+        "identical_results": matches,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare per-query vs batched semantic-search retrieval throughput (queries/sec)."
+    )
+    parser.add_argument(
+        "--dataset",
+        action="append",
+        choices=["sample_pack", "synthetic"],
+        help="Datasets to benchmark (default: both). sample_pack needs an indexed compatibility bundle.",
+    )
+    parser.add_argument("--query", action="append", help="Custom sample-pack query. Can be used multiple times.")
+    parser.add_argument("--batch-size", type=int, default=16, help="Queries per batch (default: 16).")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per mode; the best round is reported.")
+    parser.add_argument("--synthetic-chunks", type=int, default=30_000, help="Synthetic collection size.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="Optional JSON output file path.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.rounds < 1 or args.batch_size < 1:
+        raise ValueError("--rounds and --batch-size must be >= 1")
+    datasets = args.dataset or ["sample_pack", "synthetic"]
+
+    results: list[dict[str, object]] = []
+    if "sample_pack" in datasets:
+        base_queries = args.query or DEFAULT_SAMPLE_PACK_QUERIES
+        queries = [base_queries[index % len(base_queries)] for index in range(args.batch_size)]
+        sample_keys = collection_service.list_compatibility_collection_keys()[:2] or ["all"]
+        results.append(benchmark_dataset("sample_pack", queries, sample_keys, args.rounds))
+
+    if "synthetic" in datasets:
+        build_started = time.perf_counter()
+        db, lexical_index, embeddings, synthetic_queries = build_synthetic_collection(
+            args.synthetic_chunks,
+            seed=args.seed,
+        )
+        build_seconds = round(time.perf_counter() - build_started, 2)
+        queries = [synthetic_queries[index % len(synthetic_queries)] for index in range(args.batch_size)]
+        with synthetic_collection(db, lexical_index, embeddings):
+            result = benchmark_dataset(
+                f"synthetic_{args.synthetic_chunks}",
+                queries,
+                [SYNTHETIC_COLLECTION_KEY],
+                args.rounds,
+            )
+        result["build_seconds"] = build_seconds
+        results.append(result)
+
+    payload = {
+        "generated_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "batch_size": args.batch_size,
+        "rounds": args.rounds,
+        "results": results,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,11 @@ def parse_args() -> argparse.Namespace:
         default=graph_lite_snapshot_builder.DEFAULT_GRAPH_LITE_OUTPUT_DIR,
         help="Directory to write entities.jsonl, relations.jsonl, ingest_stats.json, and build summary.",
     )
+    parser.add_argument(
+        "--no-binary",
+        action="store_true",
+        help="Do not compile graph_lite.snapshot.bin; the service then loads the JSONL files.",
+    )
     parser.add_argument(
         "--no-summary",
         action="store_true",
@@ -37,6 +42,7 @@ def main() -> None:
     payload = graph_lite_snapshot_builder.build_and_export_graph_lite_snapshot(
         collection_key=args.collection_key,
         output_dir=args.output_dir,
+        compile_binary=not args.no_binary,
     )
     if not args.no_summary:
         payload["summary_paths"] = graph_lite_snapshot_builder.write_build_summary(
@@ -3,11 +3,18 @@ from __future__ import annotations
 import argparse
 import json
 import statistics
+import sys
 import time
 import urllib.error
-import urllib.request
+from pathlib import Path
 from typing import Any
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.http_pool import DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS, HTTPTimeouts, get_shared_http_pool
+
 DEFAULT_BASE_URL = "http://localhost:11434"
 DEFAULT_MODEL = "gemma4:e4b"
 DEFAULT_PROMPT = "다음 문장을 그대로 한 번만 출력하세요: 확인"
@@ -70,16 +77,20 @@ def call_ollama_chat(
         "stream": False,
         "options": options,
     }
-    request = urllib.request.Request(
-        f"{base_url.rstrip('/')}/api/chat",
-        data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
-        method="POST",
-        headers={"Content-Type": "application/json"},
+    timeouts = HTTPTimeouts(
+        connect_seconds=min(DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS, float(timeout_seconds)),
+        read_seconds=float(timeout_seconds),
     )
 
     started_at = time.perf_counter()
     try:
-        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+        with get_shared_http_pool().request(
+            "POST",
+            f"{base_url.rstrip('/')}/api/chat",
+            body=json.dumps(body, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            timeouts=timeouts,
+        ) as response:
             raw = response.read().decode("utf-8")
     except urllib.error.HTTPError as exc:
         detail = exc.read().decode("utf-8", errors="replace")
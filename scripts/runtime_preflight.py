@@ -5,7 +5,6 @@ import json
 import os
 import sys
 import urllib.error
-import urllib.request
 from pathlib import Path
 from typing import Any
 
@@ -14,6 +13,7 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from common import load_project_env
+from core.http_pool import DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS, HTTPTimeouts, get_shared_http_pool
 from services import runtime_service
 
 REQUIRED_HEALTH_KEYS = {
@@ -104,8 +104,11 @@ def find_local_embedding_model(model_name: str, roots: list[Path] | None = None)
 
 
 def fetch_json(url: str, timeout_seconds: int) -> dict[str, Any]:
-    request = urllib.request.Request(url, method="GET")
-    with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+    timeouts = HTTPTimeouts(
+        connect_seconds=min(DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS, float(timeout_seconds)),
+        read_seconds=float(timeout_seconds),
+    )
+    with get_shared_http_pool().request("GET", url, timeouts=timeouts) as response:
         payload = response.read()
     return json.loads(payload.decode("utf-8"))
 
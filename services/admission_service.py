@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from services import runtime_service
+
+ADMISSION_LATENCY_WINDOW = 20
+ADMISSION_REASON_QUEUE_FULL = "queue_full"
+ADMISSION_REASON_PREDICTED_WAIT = "predicted_wait_exceeds_budget"
+ADMISSION_REASON_QUEUE_TIMEOUT = "queue_timeout"
+
+AdmissionKey = tuple[str, str]
+
+
+class AdmissionRejected(Exception):
+    def __init__(
+        self,
+        *,
+        reason: str,
+        retry_after_seconds: int,
+        queue_depth: int,
+        predicted_wait_seconds: float,
+    ):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+        self.queue_depth = queue_depth
+        self.predicted_wait_seconds = predicted_wait_seconds
+
+
+@dataclass
+class _Waiter:
+    wake: Callable[[], None]
+    admitted: bool = False
+
+
+@dataclass
+class AdmissionTicket:
+    controller: "AdmissionController"
+    queued_at: float
+    admitted_at: float
+    queue_depth: int
+    predicted_wait_seconds: float
+    released: bool = field(default=False, repr=False)
+
+    @property
+    def wait_ms(self) -> float:
+        return round((self.admitted_at - self.queued_at) * 1000, 3)
+
+    def release(self, *, generation_seconds: float | None = None) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.controller.release(generation_seconds=generation_seconds)
+
+    def to_stage_timings(self) -> dict[str, object]:
+        return {
+            "admission_queue_depth": self.queue_depth,
+            "admission_wait_ms": self.wait_ms,
+            "admission_predicted_wait_ms": round(self.predicted_wait_seconds * 1000, 3),
+        }
+
+
+class AdmissionController:
+    """Bounded-concurrency gate for one provider/model with a FIFO wait queue.
+
+    Freed slots are handed directly to the oldest waiter, so `active` never
+    drops below the number of admitted requests. Wait time is predicted from
+    the rolling mean of recent generation latencies; with no history the
+    controller admits optimistically and only the queue depth bound applies.
+    """
+
+    def __init__(self, key: AdmissionKey, *, max_concurrency: int, max_queue_depth: int):
+        self.key = key
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue_depth = max(0, int(max_queue_depth))
+        self.active = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._latencies: deque[float] = deque(maxlen=ADMISSION_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "total_wait_ms": 0.0}
+
+    def configure(self, *, max_concurrency: int, max_queue_depth: int) -> None:
+        with self._lock:
+            self.max_concurrency = max(1, int(max_concurrency))
+            self.max_queue_depth = max(0, int(max_queue_depth))
+
+    def _average_latency_locked(self) -> float | None:
+        if not self._latencies:
+            return None
+        return sum(self._latencies) / len(self._latencies)
+
+    def _predict_wait_locked(self) -> float:
+        if self.active < self.max_concurrency and not self._waiters:
+            return 0.0
+        average = self._average_latency_locked()
+        if average is None:
+            return 0.0
+        return average * (len(self._waiters) + 1) / self.max_concurrency
+
+    def _reject_locked(self, reason: str, predicted: float) -> AdmissionRejected:
+        self._stats["rejected"] += 1
+        average = self._average_latency_locked() or 1.0
+        retry_after = predicted if predicted > 0 else average
+        return AdmissionRejected(
+            reason=reason,
+            retry_after_seconds=max(1, math.ceil(retry_after)),
+            queue_depth=len(self._waiters),
+            predicted_wait_seconds=predicted,
+        )
+
+    def _reserve(self, timeout_seconds: float, wake: Callable[[], None]) -> tuple[AdmissionTicket | None, _Waiter | None]:
+        queued_at = time.perf_counter()
+        with self._lock:
+            depth = len(self._waiters)
+            if self.active < self.max_concurrency and not self._waiters:
+                self.active += 1
+                self._stats["admitted"] += 1
+                return AdmissionTicket(self, queued_at, queued_at, depth, 0.0), None
+            predicted = self._predict_wait_locked()
+            if depth >= self.max_queue_depth:
+                raise self._reject_locked(ADMISSION_REASON_QUEUE_FULL, predicted)
+            if predicted > timeout_seconds:
+                raise self._reject_locked(ADMISSION_REASON_PREDICTED_WAIT, predicted)
+            waiter = _Waiter(wake=wake)
+            self._waiters.append(waiter)
+            self._stats["queued"] += 1
+        return AdmissionTicket(self, queued_at, queued_at, depth, predicted), waiter
+
+    def _admit_waiter(self, ticket: AdmissionTicket) -> AdmissionTicket:
+        ticket.admitted_at = time.perf_counter()
+        with self._lock:
+            self._stats["admitted"] += 1
+            self._stats["total_wait_ms"] += ticket.wait_ms
+        return ticket
+
+    def _abandon_waiter(self, waiter: _Waiter) -> bool:
+        """Drop a waiter that gave up; returns True if it had already been handed a slot."""
+        with self._lock:
+            if waiter.admitted:
+                return True
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            return False
+
+    def _queue_timeout(self, ticket: AdmissionTicket) -> AdmissionRejected:
+        with self._lock:
+            return self._reject_locked(ADMISSION_REASON_QUEUE_TIMEOUT, ticket.predicted_wait_seconds)
+
+    async def acquire(self, *, timeout_seconds: float) -> AdmissionTicket:
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def _wake() -> None:
+            loop.call_soon_threadsafe(lambda: admitted.done() or admitted.set_result(None))
+
+        ticket, waiter = self._reserve(timeout_seconds, _wake)
+        if waiter is None:
+            return ticket
+        try:
+            await asyncio.wait_for(asyncio.shield(admitted), timeout=timeout_seconds)
+        except TimeoutError:
+            if self._abandon_waiter(waiter):
+                return self._admit_waiter(ticket)
+            raise self._queue_timeout(ticket) from None
+        except asyncio.CancelledError:
+            if self._abandon_waiter(waiter):
+                self.release()
+            raise
+        return self._admit_waiter(ticket)
+
+    def acquire_blocking(self, *, timeout_seconds: float) -> AdmissionTicket:
+        admitted = threading.Event()
+        ticket, waiter = self._reserve(timeout_seconds, admitted.set)
+        if waiter is None:
+            return ticket
+        if not admitted.wait(timeout=timeout_seconds):
+            if self._abandon_waiter(waiter):
+                return self._admit_waiter(ticket)
+            raise self._queue_timeout(ticket)
+        return self._admit_waiter(ticket)
+
+    def release(self, *, generation_seconds: float | None = None) -> None:
+        with self._lock:
+            if generation_seconds is not None and generation_seconds >= 0:
+                self._latencies.append(generation_seconds)
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.admitted = True
+                waiter.wake()
+                return
+            self.active = max(0, self.active - 1)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            average = self._average_latency_locked()
+            admitted = self._stats["admitted"]
+            return {
+                "provider": self.key[0],
+                "model": self.key[1],
+                "max_concurrency": self.max_concurrency,
+                "max_queue_depth": self.max_queue_depth,
+                "active": self.active,
+                "queue_depth": len(self._waiters),
+                "predicted_wait_ms": round(self._predict_wait_locked() * 1000, 3),
+                "avg_generation_ms": round(average * 1000, 3) if average is not None else None,
+                "admitted": admitted,
+                "queued": self._stats["queued"],
+                "rejected": self._stats["rejected"],
+                "avg_wait_ms": round(self._stats["total_wait_ms"] / admitted, 3) if admitted else 0.0,
+            }
+
+
+_CONTROLLERS: dict[AdmissionKey, AdmissionController] = {}
+_CONTROLLERS_LOCK = threading.Lock()
+
+
+def get_admission_controller(provider: str, model: str) -> AdmissionController:
+    key = (str(provider or ""), str(model or ""))
+    max_concurrency = runtime_service.get_llm_max_concurrency()
+    max_queue_depth = runtime_service.get_llm_max_queue_depth()
+    with _CONTROLLERS_LOCK:
+        controller = _CONTROLLERS.get(key)
+        if controller is None:
+            controller = AdmissionController(key, max_concurrency=max_concurrency, max_queue_depth=max_queue_depth)
+            _CONTROLLERS[key] = controller
+            return controller
+    controller.configure(max_concurrency=max_concurrency, max_queue_depth=max_queue_depth)
+    return controller
+
+
+def get_admission_stats() -> dict[str, object]:
+    with _CONTROLLERS_LOCK:
+        controllers = list(_CONTROLLERS.values())
+    controller_stats = [item.stats() for item in controllers]
+    return {
+        "max_concurrency": runtime_service.get_llm_max_concurrency(),
+        "max_queue_depth": runtime_service.get_llm_max_queue_depth(),
+        "active": sum(int(item["active"]) for item in controller_stats),
+        "queue_depth": sum(int(item["queue_depth"]) for item in controller_stats),
+        "controllers": controller_stats,
+    }
+
+
+def clear_admission_state() -> None:
+    with _CONTROLLERS_LOCK:
+        _CONTROLLERS.clear()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+ANSWER_CACHE_MAX_ENTRIES = 128
+
+AnswerCacheKey = tuple[object, ...]
+
+
+@dataclass(frozen=True)
+class AnswerCacheEntry:
+    answer: str
+    context_trace: dict[str, object]
+    invoke_trace: dict[str, object]
+    context_text: str
+    collection_keys: tuple[str, ...]
+    created_at: float
+
+
+_ANSWER_CACHE: OrderedDict[AnswerCacheKey, AnswerCacheEntry] = OrderedDict()
+_ANSWER_CACHE_STATS = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_ANSWER_CACHE_LOCK = threading.RLock()
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(str(question or "").split()).lower()
+
+
+def build_answer_cache_key(
+    *,
+    question: str,
+    collection_keys: list[str],
+    collection_generations: list[int],
+    provider: str,
+    model: str,
+    base_url: str | None,
+    budget_profile: str,
+    query_profile: str,
+    quality_mode: str,
+    quality_stage: str,
+    graph_lite_enabled: bool,
+    extra: tuple[object, ...] = (),
+) -> AnswerCacheKey:
+    return (
+        normalize_question(question),
+        tuple(collection_keys),
+        tuple(int(item) for item in collection_generations),
+        provider,
+        model,
+        base_url or "",
+        budget_profile,
+        query_profile,
+        quality_mode,
+        quality_stage,
+        bool(graph_lite_enabled),
+        *extra,
+    )
+
+
+def get_cached_answer(key: AnswerCacheKey, *, ttl_seconds: float) -> AnswerCacheEntry | None:
+    if ttl_seconds <= 0:
+        return None
+    now = time.monotonic()
+    with _ANSWER_CACHE_LOCK:
+        entry = _ANSWER_CACHE.get(key)
+        if entry is not None and (now - entry.created_at) > ttl_seconds:
+            _ANSWER_CACHE.pop(key, None)
+            entry = None
+        if entry is None:
+            _ANSWER_CACHE_STATS["misses"] += 1
+            return None
+        _ANSWER_CACHE.move_to_end(key)
+        _ANSWER_CACHE_STATS["hits"] += 1
+    return AnswerCacheEntry(
+        answer=entry.answer,
+        context_trace=copy.deepcopy(entry.context_trace),
+        invoke_trace=copy.deepcopy(entry.invoke_trace),
+        context_text=entry.context_text,
+        collection_keys=entry.collection_keys,
+        created_at=entry.created_at,
+    )
+
+
+def store_cached_answer(
+    key: AnswerCacheKey,
+    *,
+    answer: str,
+    context_trace: dict[str, object],
+    invoke_trace: dict[str, object],
+    context_text: str,
+    collection_keys: list[str],
+    ttl_seconds: float,
+) -> None:
+    if ttl_seconds <= 0:
+        return
+    entry = AnswerCacheEntry(
+        answer=answer,
+        context_trace=copy.deepcopy(context_trace),
+        invoke_trace=copy.deepcopy(invoke_trace),
+        context_text=context_text,
+        collection_keys=tuple(collection_keys),
+        created_at=time.monotonic(),
+    )
+    with _ANSWER_CACHE_LOCK:
+        _ANSWER_CACHE[key] = entry
+        _ANSWER_CACHE.move_to_end(key)
+        _ANSWER_CACHE_STATS["stores"] += 1
+        while len(_ANSWER_CACHE) > ANSWER_CACHE_MAX_ENTRIES:
+            _ANSWER_CACHE.popitem(last=False)
+            _ANSWER_CACHE_STATS["evictions"] += 1
+
+
+def invalidate_answer_cache(collection_keys: list[str] | None = None) -> int:
+    with _ANSWER_CACHE_LOCK:
+        if collection_keys is None:
+            removed = len(_ANSWER_CACHE)
+            _ANSWER_CACHE.clear()
+            return removed
+        key_set = set(collection_keys)
+        stale_keys = [
+            key
+            for key, entry in _ANSWER_CACHE.items()
+            if key_set.intersection(entry.collection_keys)
+        ]
+        for key in stale_keys:
+            _ANSWER_CACHE.pop(key, None)
+        return len(stale_keys)
+
+
+def get_answer_cache_stats() -> dict[str, int]:
+    with _ANSWER_CACHE_LOCK:
+        return {
+            **_ANSWER_CACHE_STATS,
+            "size": len(_ANSWER_CACHE),
+            "max_entries": ANSWER_CACHE_MAX_ENTRIES,
+        }
+
+
+def clear_answer_cache() -> None:
+    with _ANSWER_CACHE_LOCK:
+        _ANSWER_CACHE.clear()
+        for name in _ANSWER_CACHE_STATS:
+            _ANSWER_CACHE_STATS[name] = 0
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.settings import DEFAULT_MAX_CONTEXT_CHARS
+from services import runtime_service
+
+ADAPTIVE_BUDGET_WINDOW = 64
+ADAPTIVE_BUDGET_MIN_OBSERVATIONS = 5
+ADAPTIVE_BUDGET_TARGET_PERCENTILE = 0.9
+# Share of the request timeout that retrieval plus generation may use at the target percentile.
+ADAPTIVE_BUDGET_TIMEOUT_HEADROOM = 0.8
+ADAPTIVE_BUDGET_SCALES = (2.0, 1.5, 1.25, 1.0, 0.75, 0.5)
+ADAPTIVE_BUDGET_MAX_OUTPUT_SCALE = 2.0
+
+BudgetPlannerKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class LatencyObservation:
+    context_tokens: int
+    output_tokens: int
+    generation_ms: float
+
+
+@dataclass(frozen=True)
+class LatencyFit:
+    """Linear generation-latency model: overhead + prefill per context token + decode per output token."""
+
+    overhead_ms: float
+    prefill_ms_per_token: float
+    decode_ms_per_token: float
+    residual_ms: float
+    observations: int
+
+    def predict_ms(self, context_tokens: int, output_tokens: int) -> float:
+        return (
+            self.overhead_ms
+            + self.prefill_ms_per_token * context_tokens
+            + self.decode_ms_per_token * output_tokens
+            + self.residual_ms
+        )
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "overhead_ms": round(self.overhead_ms, 3),
+            "prefill_ms_per_token": round(self.prefill_ms_per_token, 4),
+            "decode_ms_per_token": round(self.decode_ms_per_token, 4),
+            "residual_ms": round(self.residual_ms, 3),
+            "observations": self.observations,
+        }
+
+
+def fit_latency_model(
+    observations: list[LatencyObservation],
+    *,
+    percentile: float = ADAPTIVE_BUDGET_TARGET_PERCENTILE,
+) -> LatencyFit | None:
+    """Least-squares fit of generation latency; the residual at `percentile` is added to predictions."""
+    if len(observations) < ADAPTIVE_BUDGET_MIN_OBSERVATIONS:
+        return None
+    features = np.array(
+        [[1.0, item.context_tokens, item.output_tokens] for item in observations],
+        dtype=np.float64,
+    )
+    latencies = np.array([item.generation_ms for item in observations], dtype=np.float64)
+    coefficients, *_ = np.linalg.lstsq(features, latencies, rcond=None)
+    # Latency never shrinks with more tokens; a negative slope is noise from too little spread in the window.
+    coefficients = np.maximum(coefficients, 0.0)
+    residuals = latencies - features @ coefficients
+    residual_ms = max(0.0, float(np.quantile(residuals, percentile)))
+    return LatencyFit(
+        overhead_ms=float(coefficients[0]),
+        prefill_ms_per_token=float(coefficients[1]),
+        decode_ms_per_token=float(coefficients[2]),
+        residual_ms=residual_ms,
+        observations=len(observations),
+    )
+
+
+class LatencyModel:
+    """Rolling generation and retrieval latencies observed for one provider/model."""
+
+    def __init__(self, key: BudgetPlannerKey):
+        self.key = key
+        self._observations: deque[LatencyObservation] = deque(maxlen=ADAPTIVE_BUDGET_WINDOW)
+        self._retrieval_ms: dict[int, deque[float]] = {}
+        self._last_plan: dict[str, object] | None = None
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        observation: LatencyObservation,
+        *,
+        retrieval_ms: float | None,
+        collection_count: int,
+    ) -> None:
+        with self._lock:
+            self._observations.append(observation)
+            if retrieval_ms is not None and retrieval_ms >= 0:
+                window = self._retrieval_ms.setdefault(collection_count, deque(maxlen=ADAPTIVE_BUDGET_WINDOW))
+                window.append(float(retrieval_ms))
+
+    def fit(self) -> LatencyFit | None:
+        with self._lock:
+            observations = list(self._observations)
+        return fit_latency_model(observations)
+
+    def retrieval_ms(self, collection_count: int) -> float:
+        with self._lock:
+            window = list(self._retrieval_ms.get(collection_count, ()))
+            if not window:
+                # Fall back to the closest collection count we have seen.
+                nearest = min(self._retrieval_ms, key=lambda count: abs(count - collection_count), default=None)
+                window = list(self._retrieval_ms.get(nearest, ())) if nearest is not None else []
+        if not window:
+            return 0.0
+        return float(np.quantile(window, ADAPTIVE_BUDGET_TARGET_PERCENTILE))
+
+    def observation_count(self) -> int:
+        with self._lock:
+            return len(self._observations)
+
+    def remember_plan(self, plan: dict[str, object]) -> None:
+        with self._lock:
+            self._last_plan = plan
+
+    def stats(self) -> dict[str, object]:
+        fit = self.fit()
+        with self._lock:
+            observations = len(self._observations)
+            retrieval_counts = sorted(self._retrieval_ms)
+            last_plan = self._last_plan
+        return {
+            "provider": self.key[0],
+            "model": self.key[1],
+            "observations": observations,
+            "fit": fit.to_dict() if fit is not None else None,
+            "retrieval_ms": {str(count): round(self.retrieval_ms(count), 3) for count in retrieval_counts},
+            "last_plan": last_plan,
+        }
+
+
+_MODELS: dict[BudgetPlannerKey, LatencyModel] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def get_latency_model(provider: str, model: str) -> LatencyModel:
+    key = (str(provider or ""), str(model or ""))
+    with _MODELS_LOCK:
+        latency_model = _MODELS.get(key)
+        if latency_model is None:
+            latency_model = LatencyModel(key)
+            _MODELS[key] = latency_model
+        return latency_model
+
+
+def record_query_latency(
+    provider: str,
+    model: str,
+    *,
+    context_tokens: int,
+    output_tokens: int,
+    generation_ms: float,
+    retrieval_ms: float | None,
+    collection_count: int,
+) -> None:
+    get_latency_model(provider, model).record(
+        LatencyObservation(
+            context_tokens=max(0, int(context_tokens)),
+            output_tokens=max(0, int(output_tokens)),
+            generation_ms=float(generation_ms),
+        ),
+        retrieval_ms=retrieval_ms,
+        collection_count=collection_count,
+    )
+
+
+def _budget_candidates(budget: dict[str, object]) -> list[tuple[float, int, int, int]]:
+    """(scale, context tokens, context chars, output tokens), largest first, capped by the configured maxima."""
+    base_tokens = int(budget.get("max_context_tokens") or runtime_service.get_max_context_tokens())
+    base_chars = int(budget.get("max_context_chars") or runtime_service.get_max_context_chars() or DEFAULT_MAX_CONTEXT_CHARS)
+    base_output = int(budget.get("max_output_tokens") or 0)
+    token_cap = max(base_tokens, runtime_service.get_max_context_tokens())
+    char_cap = max(base_chars, runtime_service.get_max_context_chars() or DEFAULT_MAX_CONTEXT_CHARS)
+    candidates: list[tuple[float, int, int, int]] = []
+    seen: set[tuple[int, int, int]] = set()
+    for scale in ADAPTIVE_BUDGET_SCALES:
+        values = (
+            min(token_cap, max(1, math.floor(base_tokens * scale))),
+            min(char_cap, max(1, math.floor(base_chars * scale))),
+            min(
+                math.floor(base_output * ADAPTIVE_BUDGET_MAX_OUTPUT_SCALE),
+                max(1, math.floor(base_output * scale)),
+            )
+            if base_output
+            else 0,
+        )
+        if values in seen:
+            continue
+        seen.add(values)
+        candidates.append((scale, *values))
+    return candidates
+
+
+def adapt_query_budget(
+    budget: dict[str, object],
+    *,
+    provider: str,
+    model: str,
+    timeout_seconds: int,
+    collection_count: int,
+) -> dict[str, object]:
+    """Pick the largest context/output budget whose predicted latency fits the timeout.
+
+    The static profile budget is the 1.0 scale. Predictions use the rolling
+    fit for this provider/model at the target percentile plus the observed
+    retrieval latency for the same collection count. The plan is always
+    computed and reported under `adaptive`; it only replaces the static
+    numbers when DOC_RAG_ADAPTIVE_BUDGET is on.
+    """
+    enabled = runtime_service.is_adaptive_budget_enabled()
+    latency_model = get_latency_model(provider, model)
+    fit = latency_model.fit()
+    plan: dict[str, object] = {
+        "enabled": enabled,
+        "applied": False,
+        "target_percentile": ADAPTIVE_BUDGET_TARGET_PERCENTILE,
+        "timeout_ms": timeout_seconds * 1000,
+    }
+    if fit is None:
+        plan["status"] = "warming_up"
+        plan["observations"] = latency_model.observation_count()
+        return {**budget, "adaptive": plan}
+
+    retrieval_ms = latency_model.retrieval_ms(collection_count)
+    limit_ms = timeout_seconds * 1000 * ADAPTIVE_BUDGET_TIMEOUT_HEADROOM
+    candidates = _budget_candidates(budget)
+    chosen = candidates[-1]
+    status = "over_budget"
+    for candidate in candidates:
+        _scale, context_tokens, _context_chars, output_tokens = candidate
+        if fit.predict_ms(context_tokens, output_tokens) + retrieval_ms <= limit_ms:
+            chosen = candidate
+            status = "fitted"
+            break
+    scale, context_tokens, context_chars, output_tokens = chosen
+    generation_ms = fit.predict_ms(context_tokens, output_tokens)
+    plan.update(
+        {
+            "status": status,
+            "observations": fit.observations,
+            "scale": scale,
+            "max_context_tokens": context_tokens,
+            "max_context_chars": context_chars,
+            "max_output_tokens": output_tokens or None,
+            "predicted_generation_ms": round(generation_ms, 3),
+            "predicted_retrieval_ms": round(retrieval_ms, 3),
+            "predicted_total_ms": round(generation_ms + retrieval_ms, 3),
+            "latency_limit_ms": round(limit_ms, 3),
+        }
+    )
+    adapted = dict(budget)
+    if enabled:
+        plan["applied"] = True
+        adapted["max_context_tokens"] = context_tokens
+        adapted["max_context_chars"] = context_chars
+        if output_tokens:
+            adapted["max_output_tokens"] = output_tokens
+        adapted["summary"] = f"{budget.get('summary', '')} | adaptive=x{scale}"
+    latency_model.remember_plan({"profile": budget.get("profile"), **plan})
+    adapted["adaptive"] = plan
+    return adapted
+
+
+def get_budget_planner_stats() -> dict[str, object]:
+    with _MODELS_LOCK:
+        models = list(_MODELS.values())
+    return {
+        "enabled": runtime_service.is_adaptive_budget_enabled(),
+        "target_percentile": ADAPTIVE_BUDGET_TARGET_PERCENTILE,
+        "min_observations": ADAPTIVE_BUDGET_MIN_OBSERVATIONS,
+        "models": [item.stats() for item in models],
+    }
+
+
+def clear_budget_planner_state() -> None:
+    with _MODELS_LOCK:
+        _MODELS.clear()
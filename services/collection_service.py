@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Callable
 
 from core.settings import (
@@ -12,6 +13,7 @@ from core.settings import (
     MAX_QUERY_COLLECTIONS,
     SEED_CORPUS_CONFIG,
 )
+from services.keyword_matcher_service import KeywordMatcher
 
 
 def default_country_for_collection(collection_key: str) -> str:
@@ -49,28 +51,23 @@ def get_collection_config(collection_key: str) -> dict[str, object]:
     return config
 
 
+@lru_cache(maxsize=1)
+def _collection_keyword_matcher() -> KeywordMatcher[str]:
+    """Routing keywords of every manifest collection, in manifest order."""
+    return KeywordMatcher(
+        (str(keyword).lower(), key)
+        for key, config in COLLECTION_CONFIGS.items()
+        if key != DEFAULT_COLLECTION_KEY
+        for keyword in config.get("keywords", ())
+    )
+
+
 def guess_collection_key_from_query(query: str) -> str:
-    normalized = query.strip().lower()
-    for key, config in COLLECTION_CONFIGS.items():
-        if key == DEFAULT_COLLECTION_KEY:
-            continue
-        for keyword in config.get("keywords", ()):
-            if str(keyword).lower() in normalized:
-                return key
-    return DEFAULT_COLLECTION_KEY
+    return _collection_keyword_matcher().first_match(query.strip().lower()) or DEFAULT_COLLECTION_KEY
 
 
 def guess_collection_keys_from_query(query: str) -> list[str]:
-    normalized = query.strip().lower()
-    matched: list[str] = []
-    for key, config in COLLECTION_CONFIGS.items():
-        if key == DEFAULT_COLLECTION_KEY:
-            continue
-        for keyword in config.get("keywords", ()):
-            if str(keyword).lower() in normalized:
-                matched.append(key)
-                break
-    return dedupe_collection_keys(matched)
+    return _collection_keyword_matcher().matches(query.strip().lower())
 
 
 def resolve_collection_for_query(query: str, requested_collection: str | None) -> tuple[str, str]:
@@ -101,6 +98,7 @@ def resolve_collection_keys_for_query(
     requested_collections: list[str] | None,
     *,
     allow_keyword_routing: bool = False,
+    keyword_matches: list[str] | None = None,
 ) -> tuple[list[str], str, bool]:
     explicit_values = [value.strip() for value in (requested_collections or []) if value.strip()]
     if explicit_values:
@@ -125,7 +123,7 @@ def resolve_collection_keys_for_query(
     if not allow_keyword_routing:
         return [DEFAULT_COLLECTION_KEY], "default", False
 
-    matched_keys = guess_collection_keys_from_query(query)
+    matched_keys = keyword_matches if keyword_matches is not None else guess_collection_keys_from_query(query)
     if not matched_keys:
         return [DEFAULT_COLLECTION_KEY], "default", False
     if len(matched_keys) == 1:
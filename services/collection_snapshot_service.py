@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+
+from langchain_core.documents import Document
+
+SNAPSHOT_COLUMN_FIELDS = ("source", "h1", "h2", "h3", "collection_key")
+_EMPTY_EXTRAS: Mapping[str, object] = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class CollectionSnapshot:
+    """Read-only columnar view of a collection's chunks shared by every query.
+
+    Columns are tuples aligned by position; only `materialize` creates `Document`
+    objects, so callers get a private copy without cloning the whole pool.
+    """
+
+    ids: tuple[str, ...]
+    texts: tuple[str, ...]
+    sources: tuple[str, ...]
+    h1s: tuple[str, ...]
+    h2s: tuple[str, ...]
+    h3s: tuple[str, ...]
+    collection_keys: tuple[str, ...]
+    extras: tuple[Mapping[str, object], ...]
+    fingerprint_positions: dict[str, int] = field(default_factory=dict, compare=False, repr=False)
+    duplicate_fingerprint_positions: dict[str, tuple[int, ...]] = field(default_factory=dict, compare=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.texts)
+
+    def fingerprint_at(self, position: int) -> str:
+        return f"{self.sources[position]}|{self.h2s[position]}|{self.texts[position]}"
+
+    def positions_of_fingerprints(self, fingerprints: set[str]) -> list[int]:
+        """Every position whose fingerprint is in `fingerprints`, including repeated chunks."""
+        positions: list[int] = []
+        for fingerprint in fingerprints:
+            duplicates = self.duplicate_fingerprint_positions.get(fingerprint)
+            if duplicates is not None:
+                positions.extend(duplicates)
+                continue
+            position = self.fingerprint_positions.get(fingerprint)
+            if position is not None:
+                positions.append(position)
+        return positions
+
+    def metadata_text_at(self, position: int) -> str:
+        return " ".join((self.sources[position], self.h1s[position], self.h2s[position], self.h3s[position]))
+
+    def metadata_at(self, position: int) -> dict[str, object]:
+        metadata: dict[str, object] = dict(self.extras[position])
+        for name, column in (
+            ("source", self.sources),
+            ("h1", self.h1s),
+            ("h2", self.h2s),
+            ("h3", self.h3s),
+            ("collection_key", self.collection_keys),
+        ):
+            value = column[position]
+            if value:
+                metadata[name] = value
+        return metadata
+
+    def materialize(self, position: int) -> Document:
+        return Document(page_content=self.texts[position], metadata=self.metadata_at(position))
+
+    def materialize_many(self, positions: list[int]) -> list[Document]:
+        return [self.materialize(position) for position in positions]
+
+    def materialize_all(self) -> list[Document]:
+        return [self.materialize(position) for position in range(len(self.texts))]
+
+
+def build_collection_snapshot(
+    texts: list[str],
+    metadatas: list[Mapping[str, object]],
+    *,
+    ids: list[str] | None = None,
+) -> CollectionSnapshot:
+    if len(metadatas) != len(texts):
+        raise ValueError("metadatas must align with texts")
+    resolved_ids = [str(item) for item in ids] if ids is not None else [str(index) for index in range(len(texts))]
+    if len(resolved_ids) != len(texts):
+        raise ValueError("ids must align with texts")
+
+    columns: dict[str, list[str]] = {name: [] for name in SNAPSHOT_COLUMN_FIELDS}
+    extras: list[Mapping[str, object]] = []
+    for metadata in metadatas:
+        remaining = dict(metadata)
+        for name in SNAPSHOT_COLUMN_FIELDS:
+            value = remaining.pop(name, "")
+            columns[name].append(str(value) if value is not None else "")
+        extras.append(MappingProxyType(remaining) if remaining else _EMPTY_EXTRAS)
+
+    snapshot = CollectionSnapshot(
+        ids=tuple(resolved_ids),
+        texts=tuple(str(text) for text in texts),
+        sources=tuple(columns["source"]),
+        h1s=tuple(columns["h1"]),
+        h2s=tuple(columns["h2"]),
+        h3s=tuple(columns["h3"]),
+        collection_keys=tuple(columns["collection_key"]),
+        extras=tuple(extras),
+    )
+    fingerprint_groups: dict[str, list[int]] = {}
+    for position in range(len(snapshot)):
+        fingerprint_groups.setdefault(snapshot.fingerprint_at(position), []).append(position)
+    snapshot.fingerprint_positions.update(
+        (fingerprint, positions[-1]) for fingerprint, positions in fingerprint_groups.items()
+    )
+    snapshot.duplicate_fingerprint_positions.update(
+        (fingerprint, tuple(positions)) for fingerprint, positions in fingerprint_groups.items() if len(positions) > 1
+    )
+    return snapshot
+
+
+def snapshot_from_documents(docs: list[Document], *, ids: list[str] | None = None) -> CollectionSnapshot:
+    return build_collection_snapshot(
+        [str(doc.page_content or "") for doc in docs],
+        [doc.metadata for doc in docs],
+        ids=ids,
+    )
+
+
+EMPTY_COLLECTION_SNAPSHOT = build_collection_snapshot([], [])
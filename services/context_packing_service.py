@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from langchain_core.documents import Document
+
+from common import (
+    CHUNK_END_METADATA_KEY,
+    CHUNK_ORDINAL_METADATA_KEY,
+    CHUNK_SECTION_METADATA_KEY,
+    CHUNK_START_METADATA_KEY,
+    count_text_tokens,
+    get_token_encoder,
+)
+from services import runtime_service
+
+CONTEXT_SEPARATOR = "\n\n"
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?<=[.!?。])\s+")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|[\s:|-]+\|?\s*$")
+CONTEXT_COMPRESSION_MAX_SENTENCES = 3
+
+TokenCounter = Callable[[str], int]
+
+
+@dataclass(frozen=True)
+class PackedContext:
+    text: str
+    tokens: int
+    docs: list[Document] = field(default_factory=list)
+    max_tokens: int | None = None
+    max_chars: int | None = None
+    token_counter: str = "approximate"
+    trimmed_docs: int = 0
+    dropped_docs: int = 0
+    stitched_chunks: int = 0
+    stitched_overlap_chars: int = 0
+    compression: dict[str, object] | None = None
+
+    def to_trace(self) -> dict[str, object]:
+        return {
+            "context_chars": len(self.text),
+            "context_tokens": self.tokens,
+            "max_context_tokens": self.max_tokens,
+            "context_token_counter": self.token_counter,
+            "context_packed_docs": len(self.docs),
+            "context_trimmed_docs": self.trimmed_docs,
+            "context_dropped_docs": self.dropped_docs,
+            "context_stitched_chunks": self.stitched_chunks,
+            "context_stitched_overlap_chars": self.stitched_overlap_chars,
+            "context_compression": self.compression,
+        }
+
+
+def resolve_token_counter() -> tuple[TokenCounter, str]:
+    """Token counter for prompt budgets: the chunking tiktoken encoding when it loads, else the approximate counter."""
+    encoding_name = runtime_service.get_chunking_config()["token_encoding"]
+    name = "approximate" if get_token_encoder(encoding_name) is None else f"tiktoken:{encoding_name}"
+    return (lambda text: count_text_tokens(text, encoding_name)), name
+
+
+def count_context_tokens(text: str) -> int:
+    if not text:
+        return 0
+    counter, _name = resolve_token_counter()
+    return counter(text)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split into sentences, keeping each one's trailing separator; markdown table rows stay whole."""
+    sentences: list[str] = []
+    for line in text.splitlines(keepends=True):
+        if not line.strip():
+            if sentences:
+                sentences[-1] += line
+            continue
+        if line.lstrip().startswith("|"):
+            sentences.append(line)
+            continue
+        start = 0
+        for match in SENTENCE_BOUNDARY_PATTERN.finditer(line):
+            if match.start() > start:
+                sentences.append(line[start : match.end()])
+            start = match.end()
+        if start < len(line):
+            sentences.append(line[start:])
+    return sentences
+
+
+def _metadata_int(metadata: dict[str, object], key: str) -> int | None:
+    value = metadata.get(key)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def _stitch_run(run: list[Document]) -> tuple[Document, int]:
+    """Join chunks of one section in ordinal order, dropping the characters their offsets say overlap."""
+    first = run[0]
+    text = first.page_content
+    start = _metadata_int(first.metadata, CHUNK_START_METADATA_KEY)
+    end = _metadata_int(first.metadata, CHUNK_END_METADATA_KEY)
+    removed = 0
+    for doc in run[1:]:
+        next_start = _metadata_int(doc.metadata, CHUNK_START_METADATA_KEY)
+        next_end = _metadata_int(doc.metadata, CHUNK_END_METADATA_KEY)
+        if end is not None and next_start is not None and next_end is not None and next_start <= end:
+            overlap = end - next_start
+            if next_end <= end:
+                removed += len(doc.page_content)
+                continue
+            if text.endswith(doc.page_content[:overlap]):
+                text += doc.page_content[overlap:]
+                removed += overlap
+                end = next_end
+                continue
+        text += "\n" + doc.page_content
+        end = next_end
+    metadata = dict(first.metadata)
+    if start is not None and end is not None:
+        metadata[CHUNK_END_METADATA_KEY] = end
+    metadata["stitched_chunks"] = len(run)
+    return Document(page_content=text, metadata=metadata, id=first.id), removed
+
+
+@dataclass(frozen=True)
+class _StitchedBlock:
+    """The best-ranked chunk of a stitched block and what stitching it folded in."""
+
+    best: Document
+    folded_chunks: int
+    overlap_chars: int
+
+
+def _stitch_blocks(docs: list[Document]) -> tuple[list[Document], list[_StitchedBlock | None], int, int]:
+    runs_by_section: dict[tuple[str, str, int], list[list[tuple[int, int]]]] = {}
+    ordered: list[tuple[int, int, tuple[str, str, int]]] = []
+    for rank, doc in enumerate(docs):
+        section = _metadata_int(doc.metadata, CHUNK_SECTION_METADATA_KEY)
+        ordinal = _metadata_int(doc.metadata, CHUNK_ORDINAL_METADATA_KEY)
+        if section is None or ordinal is None:
+            continue
+        key = (str(doc.metadata.get("source", "")), str(doc.metadata.get("collection_key", "")), section)
+        ordered.append((rank, ordinal, key))
+    for rank, ordinal, key in sorted(ordered, key=lambda item: (item[2], item[1])):
+        runs = runs_by_section.setdefault(key, [])
+        if runs and ordinal - runs[-1][-1][1] <= 1:
+            runs[-1].append((rank, ordinal))
+        else:
+            runs.append([(rank, ordinal)])
+
+    merged_at: dict[int, tuple[Document, _StitchedBlock]] = {}
+    folded: set[int] = set()
+    stitched_chunks = 0
+    overlap_chars = 0
+    for runs in runs_by_section.values():
+        for run in runs:
+            if len(run) < 2:
+                continue
+            ranks = [rank for rank, _ordinal in run]
+            best_rank = min(ranks)
+            stitched, removed = _stitch_run([docs[rank] for rank in ranks])
+            merged_at[best_rank] = (stitched, _StitchedBlock(docs[best_rank], len(run) - 1, removed))
+            folded.update(rank for rank in ranks if rank != best_rank)
+            stitched_chunks += len(run) - 1
+            overlap_chars += removed
+    if not merged_at:
+        return list(docs), [None] * len(docs), 0, 0
+    stitched_docs: list[Document] = []
+    blocks: list[_StitchedBlock | None] = []
+    for rank, doc in enumerate(docs):
+        if rank in folded:
+            continue
+        stitched, block = merged_at.get(rank, (doc, None))
+        stitched_docs.append(stitched)
+        blocks.append(block)
+    return stitched_docs, blocks, stitched_chunks, overlap_chars
+
+
+def stitch_adjacent_chunks(docs: list[Document]) -> tuple[list[Document], int, int]:
+    """Merge retrieved chunks that are neighbours in the same indexed section.
+
+    Chunks indexed with `chunk_section`/`chunk_ordinal` metadata are grouped by
+    source, collection and section; runs of consecutive ordinals become one
+    block at the rank of the run's best chunk. Returns the stitched docs, the
+    number of chunks folded into another block and the overlap characters removed.
+    """
+    stitched_docs, _blocks, stitched_chunks, overlap_chars = _stitch_blocks(docs)
+    return stitched_docs, stitched_chunks, overlap_chars
+
+
+def _compress_text(text: str, query_terms: list[str], *, max_sentences: int) -> tuple[str, int, int]:
+    """Keep headings and table headers plus the `max_sentences` sentences matching the most query terms, in text order."""
+    sentences = split_sentences(text)
+    scored: list[tuple[int, int]] = []
+    keep: set[int] = set()
+    for index, sentence in enumerate(sentences):
+        if sentence.lstrip().startswith("#"):
+            keep.add(index)
+            continue
+        if TABLE_SEPARATOR_PATTERN.match(sentence):
+            # Keep a table's header row and separator so any kept row still reads as a table.
+            keep.update({index, index - 1} if index else {index})
+            continue
+        lowered = sentence.lower()
+        hits = sum(1 for term in query_terms if term in lowered)
+        if hits:
+            scored.append((hits, index))
+    body_count = len(sentences) - len(keep)
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    selected = [index for _hits, index in scored[:max_sentences]]
+    if not selected:
+        # No sentence mentions the query: keep the lead sentence so the chunk still says what it is about.
+        selected = [index for index in range(len(sentences)) if index not in keep][:1]
+    keep.update(selected)
+    compressed = "".join(sentence for index, sentence in enumerate(sentences) if index in keep).rstrip()
+    return compressed, len(selected), body_count
+
+
+def compress_docs(
+    docs: list[Document],
+    query_terms: list[str],
+    *,
+    max_sentences: int = CONTEXT_COMPRESSION_MAX_SENTENCES,
+) -> tuple[list[Document], dict[str, object]]:
+    """Extractive sentence-level compression of each chunk against the query terms."""
+    started_at = time.perf_counter()
+    compressed_docs: list[Document] = []
+    original_chars = 0
+    compressed_chars = 0
+    kept_sentences = 0
+    total_sentences = 0
+    for doc in docs:
+        text, kept, total = _compress_text(doc.page_content, query_terms, max_sentences=max_sentences)
+        original_chars += len(doc.page_content)
+        compressed_chars += len(text)
+        kept_sentences += kept
+        total_sentences += total
+        compressed_docs.append(
+            doc if text == doc.page_content else Document(page_content=text, metadata=dict(doc.metadata), id=doc.id)
+        )
+    return compressed_docs, {
+        "max_sentences": max_sentences,
+        "original_chars": original_chars,
+        "compressed_chars": compressed_chars,
+        "ratio": round(compressed_chars / original_chars, 3) if original_chars else 1.0,
+        "kept_sentences": kept_sentences,
+        "total_sentences": total_sentences,
+        "compression_ms": round((time.perf_counter() - started_at) * 1000, 3),
+    }
+
+
+def _trim_to_sentences(
+    text: str,
+    *,
+    max_tokens: int,
+    max_chars: int | None,
+    count_tokens: TokenCounter,
+) -> str:
+    """Longest leading run of whole sentences that fits both limits; empty when even the first does not."""
+    kept: list[str] = []
+    used_tokens = 0
+    used_chars = 0
+    for sentence in split_sentences(text):
+        stripped = sentence.rstrip()
+        sentence_tokens = count_tokens(stripped)
+        if used_tokens + sentence_tokens > max_tokens:
+            break
+        if max_chars is not None and used_chars + len(stripped) > max_chars:
+            break
+        kept.append(sentence)
+        used_tokens += sentence_tokens
+        used_chars += len(sentence)
+    trimmed = "".join(kept).rstrip()
+    # Token counts of concatenated text can exceed the per-sentence sum by a few merges at the joins.
+    while kept and count_tokens(trimmed) > max_tokens:
+        kept.pop()
+        trimmed = "".join(kept).rstrip()
+    return trimmed
+
+
+def pack_context(
+    docs: list[Document],
+    *,
+    max_tokens: int | None,
+    max_chars: int | None = None,
+    count_tokens: TokenCounter | None = None,
+    token_counter_name: str | None = None,
+    compress_terms: list[str] | None = None,
+) -> PackedContext:
+    """Pack reranked chunks into a prompt context bounded by tokens (and optionally characters).
+
+    `docs` arrive best-first from the rerank. Whole chunks are taken in that
+    order while they fit; a chunk that does not fit is cut back to its leading
+    whole sentences, and lower-ranked chunks are still tried in case a shorter
+    one fits the remainder. Chunks are never cut mid-sentence. Neighbouring
+    chunks of one section are stitched into a single block first, so their
+    overlap and repeated header are not paid for twice; a block that does not
+    fit whole is replaced by its best chunk alone, since trimming keeps leading
+    sentences and would cut the best chunk in favour of a lower-ranked neighbour.
+    With `compress_terms` each block is then reduced to its sentences that best
+    match those terms.
+    """
+    docs, blocks, stitched_chunks, stitched_overlap_chars = _stitch_blocks(docs)
+    compression = None
+    if compress_terms is not None:
+        docs, compression = compress_docs(docs, compress_terms)
+    if count_tokens is None:
+        count_tokens, resolved_name = resolve_token_counter()
+        token_counter_name = token_counter_name or resolved_name
+    token_budget = max_tokens if max_tokens is not None else float("inf")
+    char_budget = max_chars if max_chars is not None else float("inf")
+    separator_tokens = count_tokens(CONTEXT_SEPARATOR.strip() or CONTEXT_SEPARATOR) if docs else 0
+
+    parts: list[str] = []
+    packed_docs: list[Document] = []
+    used_tokens = 0
+    used_chars = 0
+    trimmed_docs = 0
+    dropped_docs = 0
+    for doc, block in zip(docs, blocks):
+        separator = CONTEXT_SEPARATOR if parts else ""
+        header = f"[{len(parts) + 1}] source={doc.metadata.get('source', 'unknown')} h2={doc.metadata.get('h2', '')}\n"
+        overhead_tokens = count_tokens(header.strip()) + (separator_tokens if separator else 0)
+        remaining_tokens = token_budget - used_tokens - overhead_tokens
+        remaining_chars = char_budget - used_chars - len(separator) - len(header)
+        if remaining_tokens <= 0 or remaining_chars <= 0:
+            dropped_docs += 1
+            continue
+        content = doc.page_content
+        content_tokens = count_tokens(content) if content else 0
+        if block is not None and (content_tokens > remaining_tokens or len(content) > remaining_chars):
+            doc = block.best
+            if compress_terms is not None:
+                doc = compress_docs([doc], compress_terms)[0][0]
+            content = doc.page_content
+            content_tokens = count_tokens(content) if content else 0
+            stitched_chunks -= block.folded_chunks
+            stitched_overlap_chars -= block.overlap_chars
+        if content_tokens > remaining_tokens or len(content) > remaining_chars:
+            content = _trim_to_sentences(
+                content,
+                max_tokens=int(min(remaining_tokens, content_tokens)),
+                max_chars=None if remaining_chars == float("inf") else int(remaining_chars),
+                count_tokens=count_tokens,
+            )
+            if not content:
+                dropped_docs += 1
+                continue
+            trimmed_docs += 1
+            content_tokens = count_tokens(content)
+            doc = Document(page_content=content, metadata=dict(doc.metadata), id=doc.id)
+        rendered = f"{separator}{header}{content}"
+        parts.append(rendered)
+        packed_docs.append(doc)
+        used_tokens += overhead_tokens + content_tokens
+        used_chars += len(rendered)
+
+    text = "".join(parts)
+    return PackedContext(
+        text=text,
+        tokens=count_tokens(text) if text else 0,
+        docs=packed_docs,
+        max_tokens=max_tokens,
+        max_chars=max_chars,
+        token_counter=token_counter_name or "custom",
+        trimmed_docs=trimmed_docs,
+        dropped_docs=dropped_docs,
+        stitched_chunks=stitched_chunks,
+        stitched_overlap_chars=stitched_overlap_chars,
+        compression=compression,
+    )
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+
+from common import LLM_CALL_LIMITS_CONFIG_KEY
+from services.budget_planner_service import LatencyFit
+
+# Below this share of the request timeout, retrieval depth is halved before searching.
+DEADLINE_LOW_FRACTION = 0.5
+# Below this share (or DEADLINE_GRAPH_LITE_MIN_SECONDS), graph-lite expansion is skipped.
+DEADLINE_GRAPH_LITE_FRACTION = 0.25
+DEADLINE_GRAPH_LITE_MIN_SECONDS = 1.0
+DEADLINE_MIN_OUTPUT_TOKENS = 64
+
+
+class DeadlineExceeded(TimeoutError):
+    def __init__(self, stage: str, timeout_seconds: float):
+        super().__init__(f"request deadline exceeded before {stage}")
+        self.stage = stage
+        self.timeout_seconds = timeout_seconds
+
+
+@dataclass
+class QueryDeadline:
+    """Per-request deadline shared by routing, retrieval, graph-lite and generation.
+
+    `started_at` is a `time.perf_counter()` value, normally the request start.
+    Every `checkpoint` records the budget left at that stage so stage timings
+    show where the request timeout went.
+    """
+
+    timeout_seconds: float
+    started_at: float = field(default_factory=time.perf_counter)
+    generation_fit: LatencyFit | None = None
+    context_tokens: int = 0
+    remaining_ms: dict[str, float] = field(default_factory=dict)
+    adjustments: list[str] = field(default_factory=list)
+
+    def remaining_seconds(self) -> float:
+        return self.timeout_seconds - (time.perf_counter() - self.started_at)
+
+    def remaining_fraction(self) -> float:
+        if self.timeout_seconds <= 0:
+            return 0.0
+        return max(0.0, self.remaining_seconds() / self.timeout_seconds)
+
+    def timeout_seconds_left(self) -> int:
+        """Whole seconds left for APIs that take an integer timeout; never below 1."""
+        return max(1, math.ceil(self.remaining_seconds()))
+
+    def checkpoint(self, stage: str) -> float:
+        remaining = self.remaining_seconds()
+        self.remaining_ms[stage] = round(remaining * 1000, 3)
+        return remaining
+
+    def check(self, stage: str) -> float:
+        remaining = self.checkpoint(stage)
+        if remaining <= 0:
+            raise DeadlineExceeded(stage, self.timeout_seconds)
+        return remaining
+
+    def shrink_retrieval_budget(self, budget: dict[str, object] | None) -> dict[str, object] | None:
+        """Halve candidate depth and total docs when less than half of the timeout is left."""
+        if budget is None or self.remaining_fraction() >= DEADLINE_LOW_FRACTION:
+            return budget
+        shrunk = dict(budget)
+        per_collection_k = int(budget.get("per_collection_k") or 1)
+        if isinstance(budget.get("per_collection_fetch_k"), int):
+            shrunk["per_collection_fetch_k"] = max(per_collection_k, int(budget["per_collection_fetch_k"]) // 2)
+        if isinstance(budget.get("max_total_docs"), int):
+            shrunk["max_total_docs"] = max(1, int(budget["max_total_docs"]) // 2)
+        self.adjustments.append("retrieval_depth_halved")
+        return shrunk
+
+    def allows_graph_lite(self) -> bool:
+        remaining = self.remaining_seconds()
+        if remaining < DEADLINE_GRAPH_LITE_MIN_SECONDS or self.remaining_fraction() < DEADLINE_GRAPH_LITE_FRACTION:
+            self.adjustments.append("graph_lite_skipped")
+            return False
+        return True
+
+    def affordable_output_tokens(self, remaining_seconds: float, num_predict: int) -> int:
+        """Output tokens that still fit the remaining time.
+
+        With a fitted latency model this is the decode budget left after
+        overhead and prefill of the built context; without one the static cap
+        is scaled down linearly once less than half of the timeout is left.
+        """
+        fit = self.generation_fit
+        if fit is not None and fit.decode_ms_per_token > 0:
+            spare_ms = (
+                remaining_seconds * 1000
+                - fit.overhead_ms
+                - fit.residual_ms
+                - fit.prefill_ms_per_token * self.context_tokens
+            )
+            return math.floor(spare_ms / fit.decode_ms_per_token)
+        fraction = self.remaining_fraction()
+        if fraction >= DEADLINE_LOW_FRACTION:
+            return num_predict
+        return math.floor(num_predict * fraction / DEADLINE_LOW_FRACTION)
+
+    def llm_call_limits(
+        self,
+        read_timeout_seconds: float | None,
+        num_predict: int | None,
+    ) -> tuple[float | None, int | None]:
+        """`(read timeout, num_predict)` for an LLM call starting now."""
+        remaining = self.check("llm")
+        read_timeout = remaining if read_timeout_seconds is None else min(float(read_timeout_seconds), remaining)
+        if num_predict:
+            limited = max(DEADLINE_MIN_OUTPUT_TOKENS, min(num_predict, self.affordable_output_tokens(remaining, num_predict)))
+            if limited < num_predict:
+                self.adjustments.append(f"num_predict={limited}")
+                num_predict = limited
+        return read_timeout, num_predict
+
+    def runnable_config(self) -> dict[str, object]:
+        """LangChain config that lets deadline-aware LLM runnables size their HTTP call from the remaining time."""
+        return {"configurable": {LLM_CALL_LIMITS_CONFIG_KEY: self.llm_call_limits}}
+
+    def to_stage_timings(self) -> dict[str, object]:
+        return {
+            "deadline_remaining_ms": dict(self.remaining_ms),
+            "deadline_adjustments": list(self.adjustments),
+        }
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Iterator, Mapping, Sequence
+
+import numpy as np
+
+from services import graph_lite_service
+from services.graph_lite_service import (
+    DEFAULT_BINARY_FILE,
+    DEFAULT_ENTITIES_FILE,
+    DEFAULT_RELATIONS_FILE,
+    DEFAULT_STATS_FILE,
+    CollectionFilterKey,
+    GraphLiteEntity,
+    GraphLiteRelation,
+    GraphLiteSnapshot,
+)
+
+GRAPH_LITE_BINARY_MAGIC = b"GLSNAP\x00\x01"
+GRAPH_LITE_BINARY_FORMAT = "graph_lite.binary_snapshot.v1"
+_HEADER_LENGTH = struct.Struct("<I")
+_SECTION_ALIGNMENT = 8
+DEFAULT_SOURCE_FILES = (DEFAULT_ENTITIES_FILE, DEFAULT_RELATIONS_FILE, DEFAULT_STATS_FILE)
+
+
+def _source_stat_signature(base_dir: Path, source_files: tuple[str, ...]) -> list[list[object] | None]:
+    signature: list[list[object] | None] = []
+    for name in source_files:
+        try:
+            stat = (base_dir / name).stat()
+        except FileNotFoundError:
+            signature.append(None)
+            continue
+        signature.append([name, stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def _source_sha256(base_dir: Path, source_files: tuple[str, ...]) -> str:
+    digest = hashlib.sha256()
+    for name in source_files:
+        path = base_dir / name
+        digest.update(name.encode("utf-8") + b"\0")
+        if not path.exists():
+            digest.update(b"<missing>\0")
+            continue
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def source_fingerprint(base_dir: str | Path, source_files: tuple[str, ...] = DEFAULT_SOURCE_FILES) -> dict[str, object]:
+    """Stat signature plus content hash of the JSONL contract files a binary snapshot was compiled from."""
+    base_path = Path(base_dir)
+    return {
+        "files": _source_stat_signature(base_path, source_files),
+        "sha256": _source_sha256(base_path, source_files),
+    }
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.ids)
+        return string_id
+
+    def intern_many(self, values: Sequence[str]) -> list[int]:
+        return [self.intern(value) for value in values]
+
+
+def _csr(rows: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(rows) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(row) for row in rows], dtype=np.uint64) if rows else []
+    values = np.fromiter((value for row in rows for value in row), dtype=np.uint32, count=int(offsets[-1]))
+    return offsets, values
+
+
+def _blob(chunks: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(chunks) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(chunk) for chunk in chunks], dtype=np.uint64) if chunks else []
+    return offsets, np.frombuffer(b"".join(chunks), dtype=np.uint8)
+
+
+def write_binary_snapshot(
+    snapshot: GraphLiteSnapshot,
+    output_dir: str | Path,
+    *,
+    source_files: tuple[str, ...] = DEFAULT_SOURCE_FILES,
+) -> Path:
+    """Compile `snapshot` into `graph_lite.snapshot.bin` next to the JSONL files it was loaded from.
+
+    Layout: magic, a little-endian u32 header length, a JSON header (stats,
+    counts, source fingerprint, section table) and 8-byte aligned arrays:
+    an interned string table, node/entity columns, relation columns, CSR
+    adjacency (relation indices per node) and an offset table into the
+    evidence JSON blob.
+    """
+    output_path = Path(output_dir)
+    strings = _StringTable()
+    entity_ids = list(snapshot.entities)
+    node_ids = list(entity_ids)
+    node_positions = {entity_id: position for position, entity_id in enumerate(node_ids)}
+    for relation in snapshot.relations:
+        for endpoint in (relation.source, relation.target):
+            if endpoint not in node_positions:
+                node_positions[endpoint] = len(node_ids)
+                node_ids.append(endpoint)
+
+    entities = [snapshot.entities[entity_id] for entity_id in entity_ids]
+    adjacency_rows: list[list[int]] = [[] for _ in node_ids]
+    for index, relation in enumerate(snapshot.relations):
+        adjacency_rows[node_positions[relation.source]].append(index)
+        adjacency_rows[node_positions[relation.target]].append(index)
+
+    sections: dict[str, np.ndarray] = {
+        "node_string": np.array(strings.intern_many(node_ids), dtype=np.uint32),
+        "entity_label": np.array(strings.intern_many([entity.label for entity in entities]), dtype=np.uint32),
+        "relation_source": np.array([node_positions[item.source] for item in snapshot.relations], dtype=np.uint32),
+        "relation_target": np.array([node_positions[item.target] for item in snapshot.relations], dtype=np.uint32),
+        "relation_predicate": np.array(
+            strings.intern_many([item.predicate for item in snapshot.relations]), dtype=np.uint32
+        ),
+        "relation_weight": np.array([item.weight for item in snapshot.relations], dtype=np.uint32),
+    }
+    for name, rows in (
+        ("entity_alias", [strings.intern_many(entity.aliases) for entity in entities]),
+        ("entity_source", [strings.intern_many(entity.sources) for entity in entities]),
+        ("entity_collection", [strings.intern_many(entity.collections) for entity in entities]),
+        ("relation_collection", [strings.intern_many(item.collections) for item in snapshot.relations]),
+        ("adjacency", adjacency_rows),
+    ):
+        sections[f"{name}_offsets"], sections[f"{name}_ids"] = _csr(rows)
+    sections["evidence_offsets"], sections["evidence_blob"] = _blob(
+        [json.dumps(list(item.evidence), ensure_ascii=False).encode("utf-8") for item in snapshot.relations]
+    )
+    sections["string_offsets"], sections["string_blob"] = _blob([value.encode("utf-8") for value in strings.ids])
+
+    section_table: dict[str, list[object]] = {}
+    offset = 0
+    for name, array in sections.items():
+        section_table[name] = [offset, array.dtype.str, int(array.size)]
+        offset += -(-array.nbytes // _SECTION_ALIGNMENT) * _SECTION_ALIGNMENT
+    header = json.dumps(
+        {
+            "format": GRAPH_LITE_BINARY_FORMAT,
+            "contract_version": graph_lite_service.GRAPH_LITE_CONTRACT_VERSION,
+            "stats": snapshot.stats,
+            "entity_count": len(entity_ids),
+            "node_count": len(node_ids),
+            "relation_count": len(snapshot.relations),
+            "source": source_fingerprint(output_path, source_files),
+            "sections": section_table,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    binary_path = output_path / DEFAULT_BINARY_FILE
+    temp_path = binary_path.with_suffix(".tmp")
+    with temp_path.open("wb") as handle:
+        handle.write(GRAPH_LITE_BINARY_MAGIC)
+        handle.write(_HEADER_LENGTH.pack(len(header)))
+        handle.write(header)
+        handle.write(b"\0" * (-handle.tell() % _SECTION_ALIGNMENT))
+        for array in sections.values():
+            handle.write(array.tobytes())
+            handle.write(b"\0" * (-array.nbytes % _SECTION_ALIGNMENT))
+    os.replace(temp_path, binary_path)
+    return binary_path
+
+
+class GraphLiteBinaryStore:
+    """Read-only view over a memory-mapped binary snapshot.
+
+    Opening maps the file and wraps each section in a numpy view (plus a
+    memoryview of it for cheap scalar reads); nothing is decoded until a
+    string, entity, relation or evidence list is requested, and decoded
+    objects are memoized so repeated queries share them.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buffer[: len(GRAPH_LITE_BINARY_MAGIC)] != GRAPH_LITE_BINARY_MAGIC:
+            raise ValueError(f"Not a graph-lite binary snapshot: {self.path}")
+        header_start = len(GRAPH_LITE_BINARY_MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._buffer, len(GRAPH_LITE_BINARY_MAGIC))
+        self.header: dict[str, object] = json.loads(self._buffer[header_start : header_start + header_length])
+        if self.header.get("format") != GRAPH_LITE_BINARY_FORMAT:
+            raise ValueError(f"Unsupported graph-lite binary format: {self.header.get('format')}")
+        data_start = header_start + header_length
+        data_start += -data_start % _SECTION_ALIGNMENT
+        self.arrays: dict[str, np.ndarray] = {}
+        for name, (offset, dtype, count) in dict(self.header["sections"]).items():
+            self.arrays[name] = (
+                np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+                if count
+                else np.empty(0, dtype=np.dtype(dtype))
+            )
+        self._columns = {name: array.data for name, array in self.arrays.items()}
+        self.node_count = int(self.header["node_count"])
+        self.entity_count = int(self.header["entity_count"])
+        self.relation_count = int(self.header["relation_count"])
+        self._strings: dict[int, str] = {}
+        self._node_positions: dict[str, int] | None = None
+        self._entities: dict[int, GraphLiteEntity] = {}
+        self._relations: dict[int, GraphLiteRelation] = {}
+        self._lock = threading.Lock()
+
+    def string(self, string_id: int) -> str:
+        value = self._strings.get(string_id)
+        if value is None:
+            offsets = self._columns["string_offsets"]
+            value = bytes(self._columns["string_blob"][offsets[string_id] : offsets[string_id + 1]]).decode("utf-8")
+            self._strings[string_id] = value
+        return value
+
+    def _row(self, name: str, position: int) -> memoryview:
+        offsets = self._columns[f"{name}_offsets"]
+        return self._columns[f"{name}_ids"][offsets[position] : offsets[position + 1]]
+
+    def _strings_of(self, name: str, position: int) -> tuple[str, ...]:
+        return tuple(self.string(string_id) for string_id in self._row(name, position))
+
+    def node_id(self, position: int) -> str:
+        return self.string(self._columns["node_string"][position])
+
+    def node_position(self, node_id: str) -> int | None:
+        if self._node_positions is None:
+            positions = {self.node_id(position): position for position in range(self.node_count)}
+            with self._lock:
+                self._node_positions = positions
+        return self._node_positions.get(node_id)
+
+    def entity(self, position: int) -> GraphLiteEntity:
+        entity = self._entities.get(position)
+        if entity is None:
+            entity_id = self.node_id(position)
+            label = self.string(self._columns["entity_label"][position])
+            entity = GraphLiteEntity(
+                id=entity_id,
+                label=label,
+                aliases=graph_lite_service.entity_aliases(entity_id, label, self._strings_of("entity_alias", position)),
+                sources=self._strings_of("entity_source", position),
+                collections=self._strings_of("entity_collection", position),
+            )
+            self._entities[position] = entity
+        return entity
+
+    def relation(self, index: int) -> GraphLiteRelation:
+        relation = self._relations.get(index)
+        if relation is None:
+            evidence_offsets = self._columns["evidence_offsets"]
+            evidence = json.loads(
+                bytes(self._columns["evidence_blob"][evidence_offsets[index] : evidence_offsets[index + 1]])
+            )
+            relation = GraphLiteRelation(
+                source=self.node_id(self._columns["relation_source"][index]),
+                target=self.node_id(self._columns["relation_target"][index]),
+                predicate=self.string(self._columns["relation_predicate"][index]),
+                weight=self._columns["relation_weight"][index],
+                collections=self._strings_of("relation_collection", index),
+                evidence=tuple(item for item in evidence if isinstance(item, dict)),
+            )
+            with self._lock:
+                relation = self._relations.setdefault(index, relation)
+        return relation
+
+    def adjacency(self, filter_key: CollectionFilterKey) -> _CSRAdjacency:
+        return _CSRAdjacency(self, filter_key)
+
+    def incident_relations(self, node_id: str, filter_key: CollectionFilterKey) -> tuple[GraphLiteRelation, ...]:
+        position = self.node_position(node_id)
+        if position is None:
+            return ()
+        relations = (self.relation(index) for index in self._row("adjacency", position))
+        return tuple(relation for relation in relations if graph_lite_service._relation_in_filter(relation, filter_key))
+
+    def to_snapshot(self) -> GraphLiteSnapshot:
+        return GraphLiteSnapshot(
+            entities=_BinaryEntities(self),
+            relations=_BinaryRelations(self),
+            stats=dict(self.header.get("stats") or {}),
+            source_dir=str(self.path.parent),
+            adjacency_provider=self.adjacency,
+        )
+
+
+class _BinaryEntities(Mapping[str, GraphLiteEntity]):
+    def __init__(self, store: GraphLiteBinaryStore):
+        self._store = store
+
+    def __getitem__(self, entity_id: str) -> GraphLiteEntity:
+        position = self._store.node_position(entity_id)
+        if position is None or position >= self._store.entity_count:
+            raise KeyError(entity_id)
+        return self._store.entity(position)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._store.node_id(position) for position in range(self._store.entity_count))
+
+    def __len__(self) -> int:
+        return self._store.entity_count
+
+
+class _BinaryRelations(Sequence[GraphLiteRelation]):
+    def __init__(self, store: GraphLiteBinaryStore):
+        self._store = store
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._store.relation(item) for item in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._store.relation(index)
+
+    def __len__(self) -> int:
+        return self._store.relation_count
+
+
+class _CSRAdjacency(Mapping[str, tuple[GraphLiteRelation, ...]]):
+    """Per-entity incident relations read from the CSR arrays on first access."""
+
+    def __init__(self, store: GraphLiteBinaryStore, filter_key: CollectionFilterKey):
+        self._store = store
+        self._filter_key = filter_key
+        self._rows: dict[str, tuple[GraphLiteRelation, ...]] = {}
+
+    def __getitem__(self, node_id: str) -> tuple[GraphLiteRelation, ...]:
+        row = self._rows.get(node_id)
+        if row is None:
+            row = self._rows[node_id] = self._store.incident_relations(node_id, self._filter_key)
+        if not row:
+            raise KeyError(node_id)
+        return row
+
+    def __iter__(self) -> Iterator[str]:
+        return (
+            node_id
+            for node_id in (self._store.node_id(position) for position in range(self._store.node_count))
+            if node_id in self
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _node_id in self)
+
+
+def load_binary_snapshot(path: str | Path) -> GraphLiteSnapshot:
+    return GraphLiteBinaryStore(path).to_snapshot()
+
+
+def load_compatible_binary_snapshot(
+    base_dir: str | Path,
+    *,
+    source_files: tuple[str, ...] = DEFAULT_SOURCE_FILES,
+) -> GraphLiteSnapshot | None:
+    """The binary snapshot in `base_dir` when it was compiled from the JSONL files now on disk, else `None`.
+
+    The recorded stat signature is checked first; a mismatch (for example
+    after copying the directory) falls back to comparing content hashes.
+    Without JSONL files the binary snapshot is used on its own.
+    """
+    base_path = Path(base_dir)
+    try:
+        store = GraphLiteBinaryStore(base_path / DEFAULT_BINARY_FILE)
+    except (OSError, ValueError, KeyError):
+        return None
+    if store.header.get("contract_version") != graph_lite_service.GRAPH_LITE_CONTRACT_VERSION:
+        return None
+    recorded = store.header.get("source") if isinstance(store.header.get("source"), dict) else {}
+    if any((base_path / name).exists() for name in source_files):
+        if (
+            recorded.get("files") != _source_stat_signature(base_path, source_files)
+            and recorded.get("sha256") != _source_sha256(base_path, source_files)
+        ):
+            return None
+    return store.to_snapshot()
@@ -3,11 +3,16 @@ from __future__ import annotations
 import json
 import os
 import re
+import threading
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
+from typing import Callable, Mapping, Sequence
 
 from core.settings import DEFAULT_COLLECTION_KEY
+from services.keyword_matcher_service import KeywordMatcher
 
 GRAPH_LITE_CONTRACT_VERSION = "graph_lite.relation_snapshot.v1"
 GRAPH_LITE_RESULT_MODE = "graph_lite"
@@ -15,11 +20,13 @@ GRAPH_LITE_RESULT_MODE = "graph_lite"
 DEFAULT_ENTITIES_FILE = "entities.jsonl"
 DEFAULT_RELATIONS_FILE = "relations.jsonl"
 DEFAULT_STATS_FILE = "ingest_stats.json"
+DEFAULT_BINARY_FILE = "graph_lite.snapshot.bin"
 GRAPH_LITE_SNAPSHOT_DIR_ENV_KEY = "DOC_RAG_GRAPH_LITE_SNAPSHOT_DIR"
 DEFAULT_SNAPSHOT_DIR = Path("docs/reports/graphrag_snapshot_2026-03-17")
 GRAPH_LITE_DEFAULT_MAX_HOPS = 2
 GRAPH_LITE_DEFAULT_LIMIT = 8
 GRAPH_LITE_DEFAULT_CONTEXT_CHARS = 1200
+GRAPH_LITE_TRAVERSAL_CACHE_MAX_ENTRIES = 512
 
 RELATION_HEAVY_KEYWORDS = (
     "관계",
@@ -67,6 +74,8 @@ KNOWN_ENTITY_ALIASES: dict[str, tuple[str, ...]] = {
     "enlightenment": ("계몽주의", "enlightenment"),
 }
 
+_RELATION_KEYWORD_MATCHER = KeywordMatcher((keyword, keyword) for keyword in RELATION_HEAVY_KEYWORDS)
+
 
 @dataclass(frozen=True)
 class GraphLiteEntity:
@@ -87,12 +96,102 @@ class GraphLiteRelation:
     evidence: tuple[dict[str, object], ...]
 
 
+CollectionFilterKey = frozenset[str] | None
+TraversalKey = tuple[frozenset[str], CollectionFilterKey, int]
+Traversal = tuple[tuple[GraphLiteRelation, ...], frozenset[str]]
+Adjacency = Mapping[str, tuple[GraphLiteRelation, ...]]
+
+
 @dataclass(frozen=True)
 class GraphLiteSnapshot:
-    entities: dict[str, GraphLiteEntity]
-    relations: tuple[GraphLiteRelation, ...]
+    """Loaded relation snapshot plus lazily built, per-snapshot query caches.
+
+    The snapshot is immutable once loaded, so adjacency per collection filter
+    and traversals per (seed entities, collection filter, hops) are derived
+    once and shared by every query until the files change and a new snapshot
+    replaces this one. Snapshots loaded from the compiled binary format pass
+    lazy `entities`/`relations` views and an `adjacency_provider` backed by
+    the file's CSR arrays instead of materialized tuples.
+    """
+
+    entities: Mapping[str, GraphLiteEntity]
+    relations: Sequence[GraphLiteRelation]
     stats: dict[str, object]
     source_dir: str | None = None
+    adjacency_provider: Callable[[CollectionFilterKey], Adjacency] | None = field(
+        default=None, compare=False, repr=False
+    )
+    adjacency_by_filter: dict[CollectionFilterKey, Adjacency] = field(default_factory=dict, compare=False, repr=False)
+    traversal_cache: OrderedDict[TraversalKey, Traversal] = field(default_factory=OrderedDict, compare=False, repr=False)
+    relation_texts: dict[int, str] = field(default_factory=dict, compare=False, repr=False)
+    cache_lock: threading.Lock = field(default_factory=threading.Lock, compare=False, repr=False)
+
+    @cached_property
+    def entity_matcher(self) -> KeywordMatcher[str]:
+        """Alias automaton over every entity, built once per loaded snapshot."""
+        return KeywordMatcher(
+            (_normalize_text(alias), entity_id)
+            for entity_id, entity in sorted(self.entities.items())
+            for alias in entity.aliases
+        )
+
+    def adjacency_for(self, collection_keys: list[str] | None) -> Adjacency:
+        filter_key = _collection_filter_key(collection_keys)
+        with self.cache_lock:
+            adjacency = self.adjacency_by_filter.get(filter_key)
+        if adjacency is not None:
+            return adjacency
+        if self.adjacency_provider is not None:
+            adjacency = self.adjacency_provider(filter_key)
+        else:
+            adjacency = _build_adjacency(
+                [relation for relation in self.relations if _relation_in_filter(relation, filter_key)]
+            )
+        with self.cache_lock:
+            return self.adjacency_by_filter.setdefault(filter_key, adjacency)
+
+    def traverse(self, seed_entities: set[str], collection_keys: list[str] | None, max_hops: int) -> Traversal:
+        """Relations within `max_hops` of the seeds (deduplicated by endpoints and predicate) and every visited entity."""
+        hops = max(1, int(max_hops))
+        cache_key = (frozenset(seed_entities), _collection_filter_key(collection_keys), hops)
+        with self.cache_lock:
+            cached = self.traversal_cache.get(cache_key)
+            if cached is not None:
+                self.traversal_cache.move_to_end(cache_key)
+                return cached
+        traversal = _traverse_relations(self.adjacency_for(collection_keys), seed_entities, hops)
+        with self.cache_lock:
+            self.traversal_cache[cache_key] = traversal
+            while len(self.traversal_cache) > GRAPH_LITE_TRAVERSAL_CACHE_MAX_ENTRIES:
+                self.traversal_cache.popitem(last=False)
+        return traversal
+
+    def relation_text(self, relation: GraphLiteRelation) -> str:
+        """Lowercased labels, predicate and evidence used for keyword scoring, built once per relation."""
+        cache_key = id(relation)
+        text = self.relation_texts.get(cache_key)
+        if text is None:
+            text = " ".join(
+                [
+                    entity_label(self, relation.source),
+                    entity_label(self, relation.target),
+                    relation.predicate,
+                    _evidence_text(relation),
+                ]
+            ).lower()
+            self.relation_texts[cache_key] = text
+        return text
+
+
+@dataclass(frozen=True)
+class _SnapshotFileSignature:
+    directory_mtime_ns: int
+    files: tuple[tuple[str, int, int] | None, ...]
+
+
+_SNAPSHOT_CACHE: dict[str, tuple[_SnapshotFileSignature, GraphLiteSnapshot]] = {}
+_SNAPSHOT_CACHE_STATS = {"hits": 0, "loads": 0, "reloads": 0}
+_SNAPSHOT_CACHE_LOCK = threading.Lock()
 
 
 def _normalize_text(value: str) -> str:
@@ -137,23 +236,22 @@ def _load_stats(path: Path) -> dict[str, object]:
     return payload if isinstance(payload, dict) else {}
 
 
+def entity_aliases(entity_id: str, label: str, extra_aliases: tuple[str, ...] = ()) -> tuple[str, ...]:
+    """Id, label, built-in aliases and snapshot aliases, deduplicated in that order."""
+    alias_candidates = [entity_id, label, *KNOWN_ENTITY_ALIASES.get(entity_id, ()), *extra_aliases]
+    return tuple(dict.fromkeys(item for item in alias_candidates if item.strip()))
+
+
 def _build_entity(record: dict[str, object]) -> GraphLiteEntity:
     entity_id = str(record.get("id", "")).strip()
     if not entity_id:
         raise ValueError("Graph-lite entity record requires id")
 
     label = str(record.get("label", entity_id)).strip() or entity_id
-    alias_candidates = [
-        entity_id,
-        label,
-        *KNOWN_ENTITY_ALIASES.get(entity_id, ()),
-        *_as_string_tuple(record.get("aliases")),
-    ]
-    aliases = tuple(dict.fromkeys(item for item in alias_candidates if item.strip()))
     return GraphLiteEntity(
         id=entity_id,
         label=label,
-        aliases=aliases,
+        aliases=entity_aliases(entity_id, label, _as_string_tuple(record.get("aliases"))),
         sources=_as_string_tuple(record.get("sources")),
         collections=_as_string_tuple(record.get("collections")),
     )
@@ -183,8 +281,19 @@ def load_relation_snapshot(
     entities_file: str = DEFAULT_ENTITIES_FILE,
     relations_file: str = DEFAULT_RELATIONS_FILE,
     stats_file: str = DEFAULT_STATS_FILE,
+    prefer_binary: bool = True,
 ) -> GraphLiteSnapshot:
+    """Load a snapshot directory, preferring the compiled binary file when it matches the JSONL files."""
     base_dir = Path(snapshot_dir)
+    if prefer_binary and (base_dir / DEFAULT_BINARY_FILE).exists():
+        from services import graph_lite_binary_service
+
+        snapshot = graph_lite_binary_service.load_compatible_binary_snapshot(
+            base_dir,
+            source_files=(entities_file, relations_file, stats_file),
+        )
+        if snapshot is not None:
+            return snapshot
     entity_records = _read_jsonl(base_dir / entities_file)
     relation_records = _read_jsonl(base_dir / relations_file)
     built_entities = [_build_entity(record) for record in entity_records]
@@ -209,8 +318,62 @@ def get_default_snapshot_dir() -> Path:
     return Path(__file__).resolve().parents[1] / DEFAULT_SNAPSHOT_DIR
 
 
+def _snapshot_file_signature(base_dir: Path, file_names: tuple[str, ...]) -> _SnapshotFileSignature:
+    files: list[tuple[str, int, int] | None] = []
+    for name in file_names:
+        try:
+            stat = (base_dir / name).stat()
+        except FileNotFoundError:
+            files.append(None)
+            continue
+        files.append((name, stat.st_mtime_ns, stat.st_size))
+    return _SnapshotFileSignature(directory_mtime_ns=base_dir.stat().st_mtime_ns, files=tuple(files))
+
+
+def load_cached_relation_snapshot(
+    snapshot_dir: str | Path,
+    *,
+    entities_file: str = DEFAULT_ENTITIES_FILE,
+    relations_file: str = DEFAULT_RELATIONS_FILE,
+    stats_file: str = DEFAULT_STATS_FILE,
+) -> GraphLiteSnapshot:
+    """Process-wide snapshot reused until the directory or a snapshot file changes mtime or size."""
+    base_dir = Path(snapshot_dir)
+    if not base_dir.is_dir():
+        raise FileNotFoundError(f"Graph-lite snapshot directory not found: {base_dir}")
+    cache_key = str(base_dir.resolve())
+    signature = _snapshot_file_signature(base_dir, (entities_file, relations_file, stats_file, DEFAULT_BINARY_FILE))
+    with _SNAPSHOT_CACHE_LOCK:
+        cached = _SNAPSHOT_CACHE.get(cache_key)
+        if cached is not None and cached[0] == signature:
+            _SNAPSHOT_CACHE_STATS["hits"] += 1
+            return cached[1]
+    snapshot = load_relation_snapshot(
+        base_dir,
+        entities_file=entities_file,
+        relations_file=relations_file,
+        stats_file=stats_file,
+    )
+    with _SNAPSHOT_CACHE_LOCK:
+        _SNAPSHOT_CACHE_STATS["reloads" if cache_key in _SNAPSHOT_CACHE else "loads"] += 1
+        _SNAPSHOT_CACHE[cache_key] = (signature, snapshot)
+    return snapshot
+
+
 def load_default_relation_snapshot() -> GraphLiteSnapshot:
-    return load_relation_snapshot(get_default_snapshot_dir())
+    return load_cached_relation_snapshot(get_default_snapshot_dir())
+
+
+def get_relation_snapshot_cache_stats() -> dict[str, int]:
+    with _SNAPSHOT_CACHE_LOCK:
+        return {**_SNAPSHOT_CACHE_STATS, "snapshots": len(_SNAPSHOT_CACHE)}
+
+
+def clear_relation_snapshot_cache() -> None:
+    with _SNAPSHOT_CACHE_LOCK:
+        _SNAPSHOT_CACHE.clear()
+        for name in _SNAPSHOT_CACHE_STATS:
+            _SNAPSHOT_CACHE_STATS[name] = 0
 
 
 def entity_label(snapshot: GraphLiteSnapshot, entity_id: str) -> str:
@@ -219,21 +382,25 @@ def entity_label(snapshot: GraphLiteSnapshot, entity_id: str) -> str:
 
 
 def detect_query_entities(snapshot: GraphLiteSnapshot, question: str) -> list[str]:
-    normalized_question = _normalize_text(question)
-    matched: list[str] = []
-    for entity_id, entity in snapshot.entities.items():
-        for alias in entity.aliases:
-            normalized_alias = _normalize_text(alias)
-            if normalized_alias and normalized_alias in normalized_question:
-                matched.append(entity_id)
-                break
-    return sorted(dict.fromkeys(matched))
-
-
-def detect_relation_query_intent(snapshot: GraphLiteSnapshot, question: str) -> dict[str, object]:
-    normalized_question = _normalize_text(question)
-    entity_ids = detect_query_entities(snapshot, question)
-    keyword_hits = [keyword for keyword in RELATION_HEAVY_KEYWORDS if keyword in normalized_question]
+    return snapshot.entity_matcher.matches(_normalize_text(question))
+
+
+def detect_relation_keyword_hits(question: str) -> list[str]:
+    return _RELATION_KEYWORD_MATCHER.matches(_normalize_text(question))
+
+
+def detect_relation_query_intent(
+    snapshot: GraphLiteSnapshot,
+    question: str,
+    *,
+    entity_ids: list[str] | None = None,
+    keyword_hits: list[str] | None = None,
+) -> dict[str, object]:
+    """Classify a question; callers holding a query analysis pass its precomputed hits to skip rematching."""
+    if entity_ids is None:
+        entity_ids = detect_query_entities(snapshot, question)
+    if keyword_hits is None:
+        keyword_hits = detect_relation_keyword_hits(question)
     relation_heavy = len(entity_ids) >= 2 and bool(keyword_hits)
     reason = "keyword_and_multi_entity" if relation_heavy else "not_relation_heavy"
     if not entity_ids:
@@ -251,23 +418,54 @@ def detect_relation_query_intent(snapshot: GraphLiteSnapshot, question: str) ->
     }
 
 
-def _relation_matches_collections(relation: GraphLiteRelation, collection_keys: list[str] | None) -> bool:
+def _collection_filter_key(collection_keys: list[str] | None) -> CollectionFilterKey:
+    """`None` when the filter admits every relation (no keys, or the default `all` collection)."""
     if not collection_keys:
-        return True
-    normalized_keys = {str(item).strip() for item in collection_keys if str(item).strip()}
+        return None
+    normalized_keys = frozenset(str(item).strip() for item in collection_keys if str(item).strip())
     if not normalized_keys or DEFAULT_COLLECTION_KEY in normalized_keys:
+        return None
+    return normalized_keys
+
+
+def _relation_in_filter(relation: GraphLiteRelation, filter_key: CollectionFilterKey) -> bool:
+    if filter_key is None:
         return True
     if not relation.collections:
         return False
-    return not normalized_keys.isdisjoint(set(relation.collections))
+    return not filter_key.isdisjoint(relation.collections)
 
 
-def _build_adjacency(relations: list[GraphLiteRelation]) -> dict[str, list[GraphLiteRelation]]:
+def _build_adjacency(relations: list[GraphLiteRelation]) -> dict[str, tuple[GraphLiteRelation, ...]]:
     adjacency: dict[str, list[GraphLiteRelation]] = {}
     for relation in relations:
         adjacency.setdefault(relation.source, []).append(relation)
         adjacency.setdefault(relation.target, []).append(relation)
-    return adjacency
+    return {entity_id: tuple(items) for entity_id, items in adjacency.items()}
+
+
+def _traverse_relations(
+    adjacency: Adjacency,
+    seed_entities: set[str],
+    max_hops: int,
+) -> Traversal:
+    selected: dict[tuple[str, str, str], GraphLiteRelation] = {}
+    visited_entities = set(seed_entities)
+    frontier = set(seed_entities)
+    for _depth in range(max_hops):
+        next_frontier: set[str] = set()
+        for entity_id in frontier:
+            for relation in adjacency.get(entity_id, ()):
+                key = tuple(sorted((relation.source, relation.target)) + [relation.predicate])
+                selected[key] = relation
+                for endpoint in (relation.source, relation.target):
+                    if endpoint not in visited_entities:
+                        next_frontier.add(endpoint)
+        visited_entities.update(next_frontier)
+        frontier = next_frontier
+        if not frontier:
+            break
+    return tuple(selected.values()), frozenset(visited_entities)
 
 
 def _evidence_text(relation: GraphLiteRelation) -> str:
@@ -296,14 +494,7 @@ def _score_relation(
     if seed_overlap == 2:
         score += 2.0
 
-    relation_text = " ".join(
-        [
-            entity_label(snapshot, relation.source),
-            entity_label(snapshot, relation.target),
-            relation.predicate,
-            _evidence_text(relation),
-        ]
-    ).lower()
+    relation_text = snapshot.relation_text(relation)
     score += sum(0.35 for keyword in keyword_hits if keyword.lower() in relation_text)
     return round(score, 4)
 
@@ -334,9 +525,11 @@ def query_relation_snapshot(
     max_hops: int = 2,
     limit: int = 8,
     force: bool = False,
+    intent: dict[str, object] | None = None,
 ) -> dict[str, object]:
     started = time.perf_counter()
-    intent = detect_relation_query_intent(snapshot, question)
+    if intent is None:
+        intent = detect_relation_query_intent(snapshot, question)
     query_entities = [str(item) for item in intent.get("entity_ids", [])]
     keyword_hits = [str(item) for item in intent.get("keyword_hits", [])]
     if not force and not bool(intent["relation_heavy"]):
@@ -371,28 +564,8 @@ def query_relation_snapshot(
             "latency_ms": round((time.perf_counter() - started) * 1000.0, 3),
         }
 
-    filtered_relations = [
-        relation for relation in snapshot.relations if _relation_matches_collections(relation, collection_keys)
-    ]
-    adjacency = _build_adjacency(filtered_relations)
     seed_entities = set(query_entities)
-    selected: dict[tuple[str, str, str], GraphLiteRelation] = {}
-    visited_entities = set(seed_entities)
-    frontier = set(seed_entities)
-
-    for _depth in range(max(1, int(max_hops))):
-        next_frontier: set[str] = set()
-        for entity_id in frontier:
-            for relation in adjacency.get(entity_id, []):
-                key = tuple(sorted((relation.source, relation.target)) + [relation.predicate])
-                selected[key] = relation
-                for endpoint in (relation.source, relation.target):
-                    if endpoint not in visited_entities:
-                        next_frontier.add(endpoint)
-        visited_entities.update(next_frontier)
-        frontier = next_frontier
-        if not frontier:
-            break
+    selected, visited_entities = snapshot.traverse(seed_entities, collection_keys, max_hops)
 
     if not selected:
         return {
@@ -415,7 +588,7 @@ def query_relation_snapshot(
             _score_relation(snapshot, relation, seed_entities, keyword_hits),
             relation,
         )
-        for relation in selected.values()
+        for relation in selected
     ]
     scored.sort(key=lambda item: (-item[0], item[1].source, item[1].target, item[1].predicate))
     relation_payloads = [_relation_to_payload(snapshot, relation, score) for score, relation in scored[: max(1, limit)]]
@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from core.settings import DEFAULT_COLLECTION_KEY
-from services import graph_lite_service, graphrag_poc_service
+from services import graph_lite_binary_service, graph_lite_service, graphrag_poc_service
 
 DEFAULT_GRAPH_LITE_OUTPUT_DIR = Path("chroma_db/graph_lite_snapshot")
 
@@ -32,10 +32,17 @@ def build_graph_lite_snapshot(collection_key: str = DEFAULT_COLLECTION_KEY) -> d
     }
 
 
-def export_graph_lite_snapshot(snapshot: dict[str, object], output_dir: str | Path) -> dict[str, object]:
+def export_graph_lite_snapshot(
+    snapshot: dict[str, object],
+    output_dir: str | Path,
+    *,
+    compile_binary: bool = True,
+) -> dict[str, object]:
     output_path = Path(output_dir)
     paths = graphrag_poc_service.export_snapshot_jsonl(snapshot, output_path)
-    loaded = graph_lite_service.load_relation_snapshot(output_path)
+    loaded = graph_lite_service.load_relation_snapshot(output_path, prefer_binary=False)
+    if compile_binary:
+        paths["binary"] = str(graph_lite_binary_service.write_binary_snapshot(loaded, output_path))
     return {
         "output_dir": str(output_path),
         "paths": paths,
@@ -49,9 +56,10 @@ def build_and_export_graph_lite_snapshot(
     *,
     collection_key: str = DEFAULT_COLLECTION_KEY,
     output_dir: str | Path = DEFAULT_GRAPH_LITE_OUTPUT_DIR,
+    compile_binary: bool = True,
 ) -> dict[str, object]:
     snapshot = build_graph_lite_snapshot(collection_key=collection_key)
-    exported = export_graph_lite_snapshot(snapshot, output_dir)
+    exported = export_graph_lite_snapshot(snapshot, output_dir, compile_binary=compile_binary)
     return {
         "contract_version": graph_lite_service.GRAPH_LITE_CONTRACT_VERSION,
         "collection_key": collection_key,
@@ -84,6 +92,7 @@ def build_markdown_report(payload: dict[str, object]) -> str:
         f"- entities: `{paths.get('entities', '-')}`",
         f"- relations: `{paths.get('relations', '-')}`",
         f"- stats: `{paths.get('stats', '-')}`",
+        f"- binary: `{paths.get('binary', '-')}`",
         "",
         "## Next",
         f"- Set `DOC_RAG_GRAPH_LITE_SNAPSHOT_DIR={payload.get('output_dir', '-')}` to use this snapshot.",
@@ -3,11 +3,13 @@ from __future__ import annotations
 import json
 import re
 import time
+from functools import lru_cache
 from itertools import combinations
 from pathlib import Path
 
 from core.settings import DEFAULT_COLLECTION_KEY
 from services import index_service
+from services.keyword_matcher_service import KeywordMatcher
 
 SECTION_HEADING_PATTERN = re.compile(r"^(?:##+|\d+\.)\s+")
 KOREAN_TEXT_PATTERN = re.compile(r"[가-힣]")
@@ -168,18 +170,18 @@ def split_markdown_sections(text: str, *, source_name: str) -> list[dict[str, st
     return sections
 
 
+@lru_cache(maxsize=1)
+def _entity_matcher() -> KeywordMatcher[str]:
+    return KeywordMatcher(
+        (_normalize_text(str(alias)), str(spec["id"]))
+        for spec in ENTITY_SPECS
+        if isinstance(spec["aliases"], list)
+        for alias in spec["aliases"]
+    )
+
+
 def detect_entity_ids(text: str) -> list[str]:
-    normalized = _normalize_text(text)
-    matched: list[str] = []
-    for spec in ENTITY_SPECS:
-        aliases = spec["aliases"]
-        if not isinstance(aliases, list):
-            continue
-        for alias in aliases:
-            if _normalize_text(str(alias)) in normalized:
-                matched.append(str(spec["id"]))
-                break
-    return matched
+    return _entity_matcher().matches(_normalize_text(text))
 
 
 def build_graph_snapshot(collection_key: str = "all") -> dict[str, object]:
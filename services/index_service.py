@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 import hashlib
 import json
 from pathlib import Path
@@ -21,13 +22,27 @@ from core.settings import (
     PERSIST_DIR,
 )
 from scripts.validate_rag_doc import validate_loaded_documents
-from services import collection_service, project_doc_service, runtime_service, upload_service
+from services import (
+    answer_cache_service,
+    collection_service,
+    collection_snapshot_service,
+    lexical_index_service,
+    project_doc_service,
+    runtime_service,
+    upload_service,
+)
 
 EMBEDDING_FINGERPRINTS_FILE = "embedding_fingerprints.json"
+LEXICAL_INDEX_DIR = "lexical_index"
 VECTOR_COUNT_CACHE_TTL_SECONDS = 5.0
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 256
 _EMBEDDINGS_CACHE: dict[str, object] = {}
 _DB_CACHE: dict[tuple[str, str], Chroma] = {}
-_COLLECTION_DOCS_CACHE: dict[tuple[str, str], list[Document]] = {}
+_COLLECTION_SNAPSHOT_CACHE: dict[tuple[str, str], collection_snapshot_service.CollectionSnapshot] = {}
+_LEXICAL_INDEX_CACHE: dict[tuple[str, str], lexical_index_service.LexicalIndex] = {}
+_COLLECTION_GENERATIONS: dict[str, int] = {}
+_QUERY_EMBEDDING_CACHE: OrderedDict[tuple[str, str], tuple[float, ...]] = OrderedDict()
+_QUERY_EMBEDDING_STATS = {"hits": 0, "misses": 0}
 _VECTOR_COUNT_CACHE: dict[str, tuple[float, int | None]] = {}
 _CACHE_LOCK = threading.RLock()
 
@@ -56,6 +71,103 @@ def _set_cached_db(collection_key: str, embedding_model: str, db: Chroma) -> Non
         _DB_CACHE[_db_cache_key(collection_key, embedding_model)] = db
 
 
+def normalize_query_for_embedding(question: str) -> str:
+    return " ".join(str(question or "").split())
+
+
+def get_query_embedding(question: str) -> tuple[list[float], bool]:
+    normalized = normalize_query_for_embedding(question)
+    embedding_model = runtime_service.get_embedding_model()
+    cache_key = (normalized, build_embedding_fingerprint(embedding_model))
+    with _CACHE_LOCK:
+        cached = _QUERY_EMBEDDING_CACHE.get(cache_key)
+        if cached is not None:
+            _QUERY_EMBEDDING_CACHE.move_to_end(cache_key)
+            _QUERY_EMBEDDING_STATS["hits"] += 1
+            return list(cached), True
+
+    vector = tuple(float(value) for value in get_embeddings(embedding_model).embed_query(normalized))
+    with _CACHE_LOCK:
+        _QUERY_EMBEDDING_STATS["misses"] += 1
+        _QUERY_EMBEDDING_CACHE[cache_key] = vector
+        _QUERY_EMBEDDING_CACHE.move_to_end(cache_key)
+        while len(_QUERY_EMBEDDING_CACHE) > QUERY_EMBEDDING_CACHE_MAX_ENTRIES:
+            _QUERY_EMBEDDING_CACHE.popitem(last=False)
+    return list(vector), False
+
+
+def get_query_embeddings(questions: list[str]) -> list[tuple[list[float], bool]]:
+    """Embed many questions at once; cache misses share one batched encoder call.
+
+    Returns `(vector, cache_hit)` per question in input order. Duplicate
+    questions are encoded once.
+    """
+    embedding_model = runtime_service.get_embedding_model()
+    fingerprint = build_embedding_fingerprint(embedding_model)
+    normalized_questions = [normalize_query_for_embedding(question) for question in questions]
+    vectors: dict[str, tuple[float, ...]] = {}
+    hits: set[str] = set()
+    with _CACHE_LOCK:
+        for normalized in normalized_questions:
+            if normalized in vectors:
+                continue
+            cached = _QUERY_EMBEDDING_CACHE.get((normalized, fingerprint))
+            if cached is None:
+                continue
+            _QUERY_EMBEDDING_CACHE.move_to_end((normalized, fingerprint))
+            _QUERY_EMBEDDING_STATS["hits"] += 1
+            vectors[normalized] = cached
+            hits.add(normalized)
+
+    missing = list(dict.fromkeys(normalized for normalized in normalized_questions if normalized not in vectors))
+    if missing:
+        encoded = get_embeddings(embedding_model).embed_documents(missing)
+        with _CACHE_LOCK:
+            for normalized, raw_vector in zip(missing, encoded):
+                vector = tuple(float(value) for value in raw_vector)
+                vectors[normalized] = vector
+                _QUERY_EMBEDDING_STATS["misses"] += 1
+                _QUERY_EMBEDDING_CACHE[(normalized, fingerprint)] = vector
+                _QUERY_EMBEDDING_CACHE.move_to_end((normalized, fingerprint))
+            while len(_QUERY_EMBEDDING_CACHE) > QUERY_EMBEDDING_CACHE_MAX_ENTRIES:
+                _QUERY_EMBEDDING_CACHE.popitem(last=False)
+    return [(list(vectors[normalized]), normalized in hits) for normalized in normalized_questions]
+
+
+def get_query_embedding_cache_stats() -> dict[str, int]:
+    with _CACHE_LOCK:
+        return {
+            "hits": _QUERY_EMBEDDING_STATS["hits"],
+            "misses": _QUERY_EMBEDDING_STATS["misses"],
+            "size": len(_QUERY_EMBEDDING_CACHE),
+            "max_entries": QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+        }
+
+
+def clear_query_embedding_cache() -> None:
+    with _CACHE_LOCK:
+        _QUERY_EMBEDDING_CACHE.clear()
+        _QUERY_EMBEDDING_STATS["hits"] = 0
+        _QUERY_EMBEDDING_STATS["misses"] = 0
+
+
+class QueryEmbedding:
+    """Request-scoped lazy query vector shared by every collection in one fan-out."""
+
+    def __init__(self, question: str, *, vector: list[float] | None = None, cache_status: str | None = None):
+        self.question = question
+        self.cache_status: str | None = cache_status
+        self._vector: list[float] | None = vector
+        self._lock = threading.Lock()
+
+    def vector(self) -> list[float]:
+        with self._lock:
+            if self._vector is None:
+                self._vector, cache_hit = get_query_embedding(self.question)
+                self.cache_status = "hit" if cache_hit else "miss"
+            return self._vector
+
+
 def get_db(collection_key: str = DEFAULT_COLLECTION_KEY) -> Chroma:
     persist_path = Path(PERSIST_DIR)
     persist_path.mkdir(parents=True, exist_ok=True)
@@ -118,13 +230,6 @@ def get_vector_count_snapshot(
     return vectors
 
 
-def _clone_documents(docs: list[Document]) -> list[Document]:
-    return [
-        Document(page_content=str(doc.page_content), metadata=dict(doc.metadata))
-        for doc in docs
-    ]
-
-
 def _normalize_vectorstore_metadata(metadata: dict[str, object]) -> dict[str, str | int | float | bool]:
     normalized: dict[str, str | int | float | bool] = {}
     for raw_key, value in metadata.items():
@@ -148,47 +253,164 @@ def _prepare_vectorstore_documents(docs: list[Document]) -> list[Document]:
     ]
 
 
-def get_collection_documents_from_store(collection_key: str = DEFAULT_COLLECTION_KEY) -> list[Document]:
+def get_collection_generation(collection_key: str) -> int:
+    with _CACHE_LOCK:
+        return _COLLECTION_GENERATIONS.get(collection_key, 0)
+
+
+def _publish_collection_cache(
+    cache: dict[tuple[str, str], object],
+    cache_key: tuple[str, str],
+    value: object,
+    generation: int,
+) -> None:
+    # A rebuild that raced with invalidate_runtime_state must not resurrect stale data.
+    with _CACHE_LOCK:
+        if _COLLECTION_GENERATIONS.get(cache_key[0], 0) == generation:
+            cache[cache_key] = value
+
+
+def get_collection_snapshot(
+    collection_key: str = DEFAULT_COLLECTION_KEY,
+) -> collection_snapshot_service.CollectionSnapshot:
     embedding_model = runtime_service.get_embedding_model()
     cache_key = _db_cache_key(collection_key, embedding_model)
     with _CACHE_LOCK:
-        cached = _COLLECTION_DOCS_CACHE.get(cache_key)
+        cached = _COLLECTION_SNAPSHOT_CACHE.get(cache_key)
     if cached is not None:
-        return _clone_documents(cached)
+        return cached
 
+    generation = get_collection_generation(collection_key)
     try:
         db = get_db(collection_key)
         payload = db._collection.get(include=["documents", "metadatas"])
     except Exception:
-        return []
+        return collection_snapshot_service.EMPTY_COLLECTION_SNAPSHOT
 
     if not isinstance(payload, dict):
-        return []
+        return collection_snapshot_service.EMPTY_COLLECTION_SNAPSHOT
 
     documents = payload.get("documents", [])
     metadatas = payload.get("metadatas", [])
+    ids = payload.get("ids", [])
     if not isinstance(documents, list):
-        return []
+        return collection_snapshot_service.EMPTY_COLLECTION_SNAPSHOT
     if not isinstance(metadatas, list):
         metadatas = []
+    if not isinstance(ids, list):
+        ids = []
 
-    loaded_docs: list[Document] = []
+    loaded_ids: list[str] = []
+    loaded_texts: list[str] = []
+    loaded_metadatas: list[dict[str, object]] = []
     for index, text in enumerate(documents):
         if not isinstance(text, str) or not text.strip():
             continue
         metadata = metadatas[index] if index < len(metadatas) and isinstance(metadatas[index], dict) else {}
-        loaded_docs.append(Document(page_content=text, metadata=dict(metadata)))
+        loaded_ids.append(str(ids[index]) if index < len(ids) else str(index))
+        loaded_texts.append(text)
+        loaded_metadatas.append(metadata)
+
+    snapshot = collection_snapshot_service.build_collection_snapshot(
+        loaded_texts,
+        loaded_metadatas,
+        ids=loaded_ids,
+    )
+    _publish_collection_cache(_COLLECTION_SNAPSHOT_CACHE, cache_key, snapshot, generation)
+    return snapshot
+
+
+def get_collection_documents_from_store(collection_key: str = DEFAULT_COLLECTION_KEY) -> list[Document]:
+    return get_collection_snapshot(collection_key).materialize_all()
+
+
+def lexical_index_path(collection_key: str) -> Path:
+    collection_name = collection_service.get_collection_name(collection_key)
+    return Path(PERSIST_DIR) / LEXICAL_INDEX_DIR / f"{collection_name}.json"
+
+
+def _read_persisted_lexical_index(collection_key: str) -> lexical_index_service.LexicalIndex | None:
+    path = lexical_index_path(collection_key)
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(payload, dict):
+            return None
+        return lexical_index_service.lexical_index_from_payload(payload)
+    except Exception:
+        return None
 
+
+def _write_persisted_lexical_index(collection_key: str, index: lexical_index_service.LexicalIndex) -> Path:
+    path = lexical_index_path(collection_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = lexical_index_service.lexical_index_to_payload(
+        index,
+        collection_key=collection_key,
+        collection_name=collection_service.get_collection_name(collection_key),
+        embedding_model=normalize_embedding_identity(runtime_service.get_embedding_model()),
+        updated_at=runtime_service.utc_now_iso(),
+    )
+    temp_path = path.with_suffix(".json.tmp")
+    temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(path)
+    return path
+
+
+def refresh_collection_lexical_index(collection_key: str = DEFAULT_COLLECTION_KEY) -> dict[str, object]:
+    generation = get_collection_generation(collection_key)
+    snapshot = get_collection_snapshot(collection_key)
+    index = lexical_index_service.build_lexical_index(snapshot)
+    path = _write_persisted_lexical_index(collection_key, index)
+    _publish_collection_cache(
+        _LEXICAL_INDEX_CACHE,
+        _db_cache_key(collection_key, runtime_service.get_embedding_model()),
+        index,
+        generation,
+    )
+    return {
+        "path": str(path),
+        "docs": index.doc_count,
+        "terms": len(index.vocabulary),
+    }
+
+
+def get_collection_lexical_index(collection_key: str = DEFAULT_COLLECTION_KEY) -> lexical_index_service.LexicalIndex:
+    cache_key = _db_cache_key(collection_key, runtime_service.get_embedding_model())
     with _CACHE_LOCK:
-        _COLLECTION_DOCS_CACHE[cache_key] = _clone_documents(loaded_docs)
-    return loaded_docs
+        cached = _LEXICAL_INDEX_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    generation = get_collection_generation(collection_key)
+    snapshot = get_collection_snapshot(collection_key)
+    if not len(snapshot):
+        return lexical_index_service.build_lexical_index(snapshot)
+
+    persisted = _read_persisted_lexical_index(collection_key)
+    if persisted is not None and persisted.doc_ids == snapshot.ids:
+        index = lexical_index_service.attach_snapshot(persisted, snapshot)
+    else:
+        index = lexical_index_service.build_lexical_index(snapshot)
+        try:
+            _write_persisted_lexical_index(collection_key, index)
+        except OSError:
+            pass
+
+    _publish_collection_cache(_LEXICAL_INDEX_CACHE, cache_key, index, generation)
+    return index
 
 
 def invalidate_runtime_state(collection_keys: list[str] | None = None) -> None:
+    answer_cache_service.invalidate_answer_cache(collection_keys)
     with _CACHE_LOCK:
         if collection_keys is None:
+            for key in {*_COLLECTION_GENERATIONS, *collection_service.list_collection_keys()}:
+                _COLLECTION_GENERATIONS[key] = _COLLECTION_GENERATIONS.get(key, 0) + 1
             _DB_CACHE.clear()
-            _COLLECTION_DOCS_CACHE.clear()
+            _COLLECTION_SNAPSHOT_CACHE.clear()
+            _LEXICAL_INDEX_CACHE.clear()
             _VECTOR_COUNT_CACHE.clear()
             return
 
@@ -200,9 +422,14 @@ def invalidate_runtime_state(collection_keys: list[str] | None = None) -> None:
         db_keys = [key for key in _DB_CACHE if key[0] in key_set]
         for key in db_keys:
             _DB_CACHE.pop(key, None)
-        doc_keys = [key for key in _COLLECTION_DOCS_CACHE if key[0] in key_set]
-        for key in doc_keys:
-            _COLLECTION_DOCS_CACHE.pop(key, None)
+        for key in key_set:
+            _COLLECTION_GENERATIONS[key] = _COLLECTION_GENERATIONS.get(key, 0) + 1
+        snapshot_keys = [key for key in _COLLECTION_SNAPSHOT_CACHE if key[0] in key_set]
+        for key in snapshot_keys:
+            _COLLECTION_SNAPSHOT_CACHE.pop(key, None)
+        lexical_keys = [key for key in _LEXICAL_INDEX_CACHE if key[0] in key_set]
+        for key in lexical_keys:
+            _LEXICAL_INDEX_CACHE.pop(key, None)
         for collection_name in collection_names:
             _VECTOR_COUNT_CACHE.pop(collection_name, None)
 
@@ -567,7 +794,10 @@ def index_documents_for_collection(
             db.add_documents(chunks)
 
     vectors = get_vector_count(db)
+    invalidate_runtime_state([collection_key])
+    _set_cached_db(collection_key, embedding_model, db)
     _set_vector_count_snapshot(collection_name, vectors)
+    lexical_index = refresh_collection_lexical_index(collection_key)
     record_collection_embedding_fingerprint(
         collection_key,
         model_name=embedding_model,
@@ -580,6 +810,7 @@ def index_documents_for_collection(
         "cap": cap_status,
         "collection": collection_name,
         "collection_key": collection_key,
+        "lexical_index": lexical_index,
         "chunking": {
             "mode": chunking["mode"],
             "token_encoding": chunking["token_encoding"],
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Generic, Hashable, Iterable, TypeVar
+
+PayloadT = TypeVar("PayloadT", bound=Hashable)
+
+
+class KeywordMatcher(Generic[PayloadT]):
+    """Aho-Corasick automaton answering "which patterns occur as substrings of this text" in one pass.
+
+    Each pattern carries a payload (an entity id, collection key, keyword...);
+    several patterns may share one. `matches` returns each payload found at
+    most once, in the order payloads were first registered, so callers that
+    used to loop over their dictionaries keep the same result order. Patterns
+    and texts are matched verbatim: callers normalize both the same way.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, PayloadT]]):
+        self._payloads: list[PayloadT] = []
+        payload_ranks: dict[PayloadT, int] = {}
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[set[int]] = [set()]
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            rank = payload_ranks.get(payload)
+            if rank is None:
+                rank = payload_ranks[payload] = len(self._payloads)
+                self._payloads.append(payload)
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(rank)
+
+        # Breadth-first fail links; root children fail to the root, so the queue starts one level down.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [frozenset(item) for item in outputs]
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def matched_ranks(self, text: str) -> set[int]:
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+                if len(found) == len(self._payloads):
+                    break
+        return found
+
+    def matches(self, text: str) -> list[PayloadT]:
+        return [self._payloads[rank] for rank in sorted(self.matched_ranks(text))]
+
+    def first_match(self, text: str) -> PayloadT | None:
+        ranks = self.matched_ranks(text)
+        return self._payloads[min(ranks)] if ranks else None
@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import bisect
+import math
+import re
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+
+import numpy as np
+from langchain_core.documents import Document
+
+from services.collection_snapshot_service import (
+    EMPTY_COLLECTION_SNAPSHOT,
+    CollectionSnapshot,
+    snapshot_from_documents,
+)
+
+LEXICAL_INDEX_VERSION = "lexical_index.v1"
+LEXICAL_TOKEN_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+KOREAN_PARTICLE_SUFFIXES = (
+    "으로부터",
+    "에게서는",
+    "이라고",
+    "라면",
+    "으로는",
+    "에서는",
+    "에게서",
+    "했다면",
+    "했는지",
+    "있는지",
+    "는지",
+    "인지",
+    "으로",
+    "에서",
+    "에게",
+    "부터",
+    "까지",
+    "처럼",
+    "보다",
+    "이다",
+    "와",
+    "과",
+    "의",
+    "은",
+    "는",
+    "이",
+    "가",
+    "을",
+    "를",
+    "에",
+    "로",
+    "도",
+    "만",
+)
+LEXICAL_STOPWORDS = {
+    "문서",
+    "기준",
+    "설명",
+    "설명해줘",
+    "요약",
+    "요약해줘",
+    "정리",
+    "정리해줘",
+    "무엇",
+    "어떻게",
+    "어떤",
+    "당시",
+    "관련",
+    "해주세요",
+    "해줘",
+}
+LEXICAL_TOKEN_CACHE_SIZE = 65536
+MIN_STRIPPED_TOKEN_LENGTH = 2
+FIELD_METADATA = 1
+FIELD_CONTENT = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+_SUFFIX_PRIORITY = ""
+
+
+def _compile_suffix_automaton(suffixes: tuple[str, ...]) -> dict[str, object]:
+    """Reversed-suffix trie; terminal nodes keep the suffix's position in `suffixes` as its priority."""
+    root: dict[str, object] = {}
+    for priority, suffix in enumerate(suffixes):
+        node = root
+        for char in reversed(suffix):
+            node = node.setdefault(char, {})
+        node.setdefault(_SUFFIX_PRIORITY, priority)
+    return root
+
+
+_PARTICLE_SUFFIX_AUTOMATON = _compile_suffix_automaton(KOREAN_PARTICLE_SUFFIXES)
+
+
+def _particle_suffix_length(token: str) -> int:
+    """Length of the particle suffix to strip, walking the token once from its end.
+
+    Matches the first entry of `KOREAN_PARTICLE_SUFFIXES` (in tuple order) that
+    ends the token and leaves at least `MIN_STRIPPED_TOKEN_LENGTH` characters.
+    """
+    node = _PARTICLE_SUFFIX_AUTOMATON
+    max_length = len(token) - MIN_STRIPPED_TOKEN_LENGTH
+    best_priority: int | None = None
+    best_length = 0
+    for length, char in enumerate(reversed(token), start=1):
+        if length > max_length:
+            break
+        node = node.get(char)
+        if node is None:
+            break
+        priority = node.get(_SUFFIX_PRIORITY)
+        if priority is not None and (best_priority is None or priority < best_priority):
+            best_priority = priority
+            best_length = length
+    return best_length
+
+
+@lru_cache(maxsize=LEXICAL_TOKEN_CACHE_SIZE)
+def normalize_lexical_token(token: str) -> str:
+    normalized = token.strip().lower()
+    if not normalized:
+        return ""
+
+    suffix_length = _particle_suffix_length(normalized)
+    if suffix_length:
+        normalized = normalized[:-suffix_length]
+    return normalized.strip()
+
+
+def extract_lexical_query_terms(question: str) -> list[str]:
+    terms: list[str] = []
+    for raw_token in LEXICAL_TOKEN_PATTERN.findall(question.lower()):
+        token = normalize_lexical_token(raw_token)
+        if not token:
+            continue
+        if token in LEXICAL_STOPWORDS:
+            continue
+        if len(token) < 2 and not token.isdigit():
+            continue
+        terms.append(token)
+    return list(dict.fromkeys(terms))
+
+
+def tokenize_lexical_text(text: str) -> list[str]:
+    tokens: list[str] = []
+    for raw_token in LEXICAL_TOKEN_PATTERN.findall(text.lower()):
+        token = normalize_lexical_token(raw_token)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def build_doc_fingerprint(doc: Document) -> str:
+    source = str(doc.metadata.get("source", ""))
+    h2 = str(doc.metadata.get("h2", ""))
+    return f"{source}|{h2}|{doc.page_content}"
+
+
+@dataclass(frozen=True)
+class LexicalTermMatrix:
+    """Array-backed CSR incidence matrix: one row per vocabulary token, one column per chunk.
+
+    Rows follow the sorted vocabulary; a query term's postings are the slices of
+    every row whose token contains it (see `LexicalIndex.suffix_table`).
+    `metadata` and `content` are the per-field incidence flags of each entry.
+    """
+
+    indptr: np.ndarray
+    positions: np.ndarray
+    metadata: np.ndarray
+    content: np.ndarray
+    frequencies: np.ndarray
+    doc_lengths: np.ndarray
+
+
+EMPTY_TERM_MATRIX = LexicalTermMatrix(
+    indptr=np.zeros(1, dtype=np.int64),
+    positions=np.zeros(0, dtype=np.int32),
+    metadata=np.zeros(0, dtype=bool),
+    content=np.zeros(0, dtype=bool),
+    frequencies=np.zeros(0, dtype=np.float64),
+    doc_lengths=np.zeros(0, dtype=np.float64),
+)
+
+
+def build_term_matrix(
+    vocabulary: tuple[str, ...],
+    postings: dict[str, tuple[tuple[int, int, int], ...]],
+    doc_lengths: tuple[int, ...],
+) -> LexicalTermMatrix:
+    row_lengths = np.fromiter((len(postings[token]) for token in vocabulary), dtype=np.int64, count=len(vocabulary))
+    indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum(row_lengths, out=indptr[1:])
+    entries = np.fromiter(
+        (value for token in vocabulary for entry in postings[token] for value in entry),
+        dtype=np.int64,
+        count=int(indptr[-1]) * 3,
+    ).reshape(-1, 3)
+    masks = entries[:, 1]
+    return LexicalTermMatrix(
+        indptr=indptr,
+        positions=entries[:, 0].astype(np.int32),
+        metadata=(masks & FIELD_METADATA) != 0,
+        content=(masks & FIELD_CONTENT) != 0,
+        frequencies=entries[:, 2].astype(np.float64),
+        doc_lengths=np.asarray(doc_lengths, dtype=np.float64),
+    )
+
+
+@dataclass(frozen=True)
+class LexicalIndex:
+    doc_ids: tuple[str, ...]
+    doc_lengths: tuple[int, ...]
+    avg_doc_length: float
+    vocabulary: tuple[str, ...]
+    postings: dict[str, tuple[tuple[int, int, int], ...]]
+    snapshot: CollectionSnapshot = EMPTY_COLLECTION_SNAPSHOT
+    term_matrix: LexicalTermMatrix = field(default=EMPTY_TERM_MATRIX, compare=False, repr=False)
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.doc_lengths)
+
+    def position_of(self, doc: Document) -> int | None:
+        return self.snapshot.fingerprint_positions.get(build_doc_fingerprint(doc))
+
+    @cached_property
+    def suffix_table(self) -> tuple[list[str], np.ndarray]:
+        """Every suffix of every vocabulary token, sorted, with the vocabulary row it came from.
+
+        A term occurs inside a token exactly when it prefixes one of the token's
+        suffixes, so one bisect over this table finds the tokens containing the
+        term (`graph` in `subgraph`, `사회` in `시민사회`), matching the substring
+        semantics of the original chunk scan. Built on first lookup.
+        """
+        entries = sorted(
+            (token[offset:], row) for row, token in enumerate(self.vocabulary) for offset in range(len(token))
+        )
+        return [suffix for suffix, _row in entries], np.fromiter(
+            (row for _suffix, row in entries), dtype=np.int64, count=len(entries)
+        )
+
+
+@dataclass(frozen=True)
+class _TermPostings:
+    """One query term's matches: sorted unique positions per field plus its BM25 contribution."""
+
+    positions: np.ndarray
+    metadata_positions: np.ndarray
+    content_positions: np.ndarray
+    bm25: np.ndarray
+    postings_touched: int
+
+    def contains(self, position: int) -> bool:
+        index = int(np.searchsorted(self.positions, position))
+        return index < len(self.positions) and int(self.positions[index]) == position
+
+
+@dataclass(frozen=True)
+class LexicalLookup:
+    """Dense per-chunk lexical scores for one query over one collection.
+
+    `scores` is the field-weighted hit count (metadata hits x2 + content hits),
+    `term_hits` the number of distinct query terms matching each chunk.
+    """
+
+    query_terms: tuple[str, ...]
+    terms: tuple[str, ...]
+    term_postings: tuple[_TermPostings, ...]
+    scores: np.ndarray
+    term_hits: np.ndarray
+    bm25: np.ndarray
+    postings_touched: int
+
+    @property
+    def bm25_scores(self) -> dict[int, float]:
+        return {int(position): float(self.bm25[position]) for position in np.flatnonzero(self.term_hits)}
+
+    def matched_positions(self) -> list[int]:
+        return np.flatnonzero(self.term_hits).tolist()
+
+    def score(self, position: int) -> tuple[float, list[str]]:
+        score = float(self.scores[position])
+        if not score:
+            return 0.0, []
+        matched_terms = [term for term, postings in zip(self.terms, self.term_postings) if postings.contains(position)]
+        return score, sorted(matched_terms)
+
+    def rank_candidates(self, *, exclude: list[int], limit: int) -> tuple[list[int], int]:
+        """Top `limit` matched positions outside `exclude`, plus how many positions were eligible.
+
+        Order is score desc, distinct matched terms desc, BM25 desc, position asc.
+        """
+        eligible = self.term_hits > 0
+        if exclude:
+            eligible[np.asarray(exclude, dtype=np.int64)] = False
+        candidates = np.flatnonzero(eligible)
+        if not len(candidates) or limit < 1:
+            return [], len(candidates)
+        order = np.lexsort(
+            (
+                candidates,
+                -self.bm25[candidates],
+                -self.term_hits[candidates],
+                -self.scores[candidates],
+            )
+        )
+        return candidates[order[:limit]].tolist(), len(candidates)
+
+
+def build_lexical_index(
+    docs: list[Document] | CollectionSnapshot,
+    *,
+    doc_ids: list[str] | None = None,
+) -> LexicalIndex:
+    snapshot = docs if isinstance(docs, CollectionSnapshot) else snapshot_from_documents(docs, ids=doc_ids)
+    if doc_ids is not None and len(doc_ids) != len(snapshot):
+        raise ValueError("doc_ids must align with docs")
+
+    term_entries: dict[str, list[tuple[int, int, int]]] = {}
+    doc_lengths: list[int] = []
+    for position in range(len(snapshot)):
+        metadata_tokens = tokenize_lexical_text(snapshot.metadata_text_at(position))
+        content_tokens = tokenize_lexical_text(snapshot.texts[position])
+        doc_lengths.append(len(metadata_tokens) + len(content_tokens))
+
+        field_masks: dict[str, int] = {}
+        frequencies: dict[str, int] = {}
+        for token in metadata_tokens:
+            field_masks[token] = field_masks.get(token, 0) | FIELD_METADATA
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for token in content_tokens:
+            field_masks[token] = field_masks.get(token, 0) | FIELD_CONTENT
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for token, mask in field_masks.items():
+            term_entries.setdefault(token, []).append((position, mask, frequencies[token]))
+
+    return _assemble_lexical_index(
+        doc_ids=snapshot.ids,
+        doc_lengths=doc_lengths,
+        postings={token: tuple(entries) for token, entries in term_entries.items()},
+        snapshot=snapshot,
+    )
+
+
+def _assemble_lexical_index(
+    *,
+    doc_ids: list[str] | tuple[str, ...],
+    doc_lengths: list[int] | tuple[int, ...],
+    postings: dict[str, tuple[tuple[int, int, int], ...]],
+    snapshot: CollectionSnapshot = EMPTY_COLLECTION_SNAPSHOT,
+) -> LexicalIndex:
+    lengths = tuple(int(item) for item in doc_lengths)
+    avg_doc_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+    vocabulary = tuple(sorted(postings))
+    return LexicalIndex(
+        doc_ids=tuple(doc_ids),
+        doc_lengths=lengths,
+        avg_doc_length=avg_doc_length,
+        vocabulary=vocabulary,
+        postings=postings,
+        snapshot=snapshot,
+        term_matrix=build_term_matrix(vocabulary, postings, lengths),
+    )
+
+
+def attach_snapshot(index: LexicalIndex, snapshot: CollectionSnapshot) -> LexicalIndex:
+    if len(snapshot) != index.doc_count:
+        raise ValueError("snapshot must align with the lexical index")
+    return LexicalIndex(
+        doc_ids=index.doc_ids,
+        doc_lengths=index.doc_lengths,
+        avg_doc_length=index.avg_doc_length,
+        vocabulary=index.vocabulary,
+        postings=index.postings,
+        snapshot=snapshot,
+        term_matrix=index.term_matrix,
+    )
+
+
+# Sorts after every character a lexical token can contain, so `term + _SUFFIX_TABLE_END` bounds the prefix range.
+_SUFFIX_TABLE_END = "\U0010ffff"
+
+
+def _expanded_rows(index: LexicalIndex, term: str) -> np.ndarray:
+    """Sorted vocabulary rows whose token contains `term`."""
+    suffixes, rows = index.suffix_table
+    start = bisect.bisect_left(suffixes, term)
+    end = bisect.bisect_left(suffixes, term + _SUFFIX_TABLE_END, lo=start)
+    return np.unique(rows[start:end])
+
+
+def expand_query_term(index: LexicalIndex, term: str) -> list[str]:
+    return [index.vocabulary[row] for row in _expanded_rows(index, term).tolist()]
+
+
+def _entry_indices(matrix: LexicalTermMatrix, rows: np.ndarray) -> np.ndarray:
+    """Flat entry indices of `rows`, row by row, without a Python loop over rows."""
+    starts = matrix.indptr[rows]
+    lengths = matrix.indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+def _collect_term_postings(index: LexicalIndex, term: str) -> _TermPostings:
+    matrix = index.term_matrix
+    entries = _entry_indices(matrix, _expanded_rows(index, term))
+    entry_positions = matrix.positions[entries]
+    positions, inverse = np.unique(entry_positions, return_inverse=True)
+    frequencies = np.bincount(inverse, weights=matrix.frequencies[entries], minlength=len(positions))
+    bm25 = np.zeros(0, dtype=np.float64)
+    if len(positions):
+        document_frequency = len(positions)
+        idf = math.log(1.0 + (index.doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+        length_ratio = matrix.doc_lengths[positions] / (index.avg_doc_length or 1.0)
+        denominator = frequencies + BM25_K1 * (1.0 - BM25_B + BM25_B * length_ratio)
+        bm25 = idf * frequencies * (BM25_K1 + 1.0) / denominator
+    return _TermPostings(
+        positions=positions,
+        metadata_positions=np.unique(entry_positions[matrix.metadata[entries]]),
+        content_positions=np.unique(entry_positions[matrix.content[entries]]),
+        bm25=bm25,
+        postings_touched=len(entries),
+    )
+
+
+def _assemble_lookup(index: LexicalIndex, query_terms: list[str], term_postings: dict[str, _TermPostings]) -> LexicalLookup:
+    doc_count = index.doc_count
+    metadata_counts = np.zeros(doc_count, dtype=np.int64)
+    content_counts = np.zeros(doc_count, dtype=np.int64)
+    term_hits = np.zeros(doc_count, dtype=np.int64)
+    bm25 = np.zeros(doc_count, dtype=np.float64)
+    postings_touched = 0
+
+    terms = tuple(dict.fromkeys(query_terms))
+    for term in terms:
+        postings = term_postings[term]
+        metadata_counts[postings.metadata_positions] += 1
+        content_counts[postings.content_positions] += 1
+        term_hits[postings.positions] += 1
+    # BM25 and postings_touched follow every occurrence in query order, as repeated terms always have.
+    for term in query_terms:
+        postings = term_postings[term]
+        postings_touched += postings.postings_touched
+        bm25[postings.positions] += postings.bm25
+
+    return LexicalLookup(
+        query_terms=tuple(query_terms),
+        terms=terms,
+        term_postings=tuple(term_postings[term] for term in terms),
+        scores=(metadata_counts * 2 + content_counts).astype(np.float64),
+        term_hits=term_hits,
+        bm25=bm25,
+        postings_touched=postings_touched,
+    )
+
+
+def lookup_query_terms(index: LexicalIndex, query_terms: list[str]) -> LexicalLookup:
+    return lookup_query_terms_batch(index, [query_terms])[0]
+
+
+def lookup_query_terms_batch(index: LexicalIndex, query_terms_list: list[list[str]]) -> list[LexicalLookup]:
+    """Look up many queries against one index, expanding and reading each distinct term's postings once.
+
+    `postings_touched` on each lookup still reports the per-query cost, so
+    traces stay comparable with single-query lookups.
+    """
+    term_postings: dict[str, _TermPostings] = {}
+    for query_terms in query_terms_list:
+        for term in query_terms:
+            if term not in term_postings:
+                term_postings[term] = _collect_term_postings(index, term)
+    return [_assemble_lookup(index, query_terms, term_postings) for query_terms in query_terms_list]
+
+
+def lexical_index_to_payload(index: LexicalIndex, **extra: object) -> dict[str, object]:
+    return {
+        "version": LEXICAL_INDEX_VERSION,
+        **extra,
+        "doc_count": index.doc_count,
+        "avg_doc_length": round(index.avg_doc_length, 4),
+        "doc_ids": list(index.doc_ids),
+        "doc_lengths": list(index.doc_lengths),
+        "postings": {
+            token: [value for entry in entries for value in entry]
+            for token, entries in index.postings.items()
+        },
+    }
+
+
+def lexical_index_from_payload(payload: dict[str, object]) -> LexicalIndex:
+    if payload.get("version") != LEXICAL_INDEX_VERSION:
+        raise ValueError(f"Unsupported lexical index version: {payload.get('version')}")
+    doc_ids = payload.get("doc_ids", [])
+    doc_lengths = payload.get("doc_lengths", [])
+    raw_postings = payload.get("postings", {})
+    if not isinstance(doc_ids, list) or not isinstance(doc_lengths, list) or not isinstance(raw_postings, dict):
+        raise ValueError("Lexical index payload is malformed")
+    if len(doc_ids) != len(doc_lengths):
+        raise ValueError("Lexical index doc_ids and doc_lengths must align")
+
+    postings: dict[str, tuple[tuple[int, int, int], ...]] = {}
+    for token, flat in raw_postings.items():
+        if not isinstance(flat, list) or len(flat) % 3:
+            raise ValueError(f"Lexical index postings are malformed for token: {token}")
+        postings[str(token)] = tuple(
+            (int(flat[offset]), int(flat[offset + 1]), int(flat[offset + 2]))
+            for offset in range(0, len(flat), 3)
+        )
+    return _assemble_lexical_index(
+        doc_ids=[str(item) for item in doc_ids],
+        doc_lengths=[int(item) for item in doc_lengths],
+        postings=postings,
+    )
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+LLM_CLIENT_CACHE_MAX_ENTRIES = 16
+ANSWER_PIPELINE_CACHE_MAX_ENTRIES = 32
+
+LLMClientKey = tuple[object, ...]
+
+
+class _BoundedCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Any | None:
+        value = self.entries.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        existing = self.entries.get(key)
+        if existing is not None:
+            # Another request built the same client concurrently; keep the first one.
+            self.entries.move_to_end(key)
+            return existing
+        self.entries[key] = value
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return value
+
+    def snapshot(self) -> dict[str, float | int]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+        for name in self.stats:
+            self.stats[name] = 0
+
+
+_LLM_CLIENT_CACHE = _BoundedCache(LLM_CLIENT_CACHE_MAX_ENTRIES)
+_ANSWER_PIPELINE_CACHE = _BoundedCache(ANSWER_PIPELINE_CACHE_MAX_ENTRIES)
+_LLM_CLIENT_CACHE_LOCK = threading.RLock()
+
+
+def hash_api_key(api_key: str | None) -> str:
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def build_llm_client_key(
+    *,
+    provider: str,
+    model: str,
+    base_url: str | None,
+    api_key: str | None,
+    temperature: float,
+    max_output_tokens: int | None,
+    request_timeout_seconds: float | None,
+) -> LLMClientKey:
+    return (
+        provider,
+        model,
+        base_url or "",
+        hash_api_key(api_key),
+        float(temperature),
+        max_output_tokens,
+        request_timeout_seconds,
+    )
+
+
+def get_or_create_chat_llm(key: LLMClientKey, factory: Callable[[], Any]) -> tuple[Any, bool]:
+    """Return `(llm, cache_hit)`; the factory runs outside the lock so a slow client build never blocks lookups."""
+    with _LLM_CLIENT_CACHE_LOCK:
+        cached = _LLM_CLIENT_CACHE.get(key)
+    if cached is not None:
+        return cached, True
+    llm = factory()
+    with _LLM_CLIENT_CACHE_LOCK:
+        return _LLM_CLIENT_CACHE.put(key, llm), False
+
+
+def get_or_create_answer_pipeline(llm: Any, query_profile: str, factory: Callable[[], Any]) -> tuple[Any, bool]:
+    """Cache the `prompt | llm | parser` tail per llm object and query profile.
+
+    Entries keep a reference to `llm`, so its `id()` cannot be reused while the
+    entry is alive.
+    """
+    key = (id(llm), query_profile)
+    with _LLM_CLIENT_CACHE_LOCK:
+        cached = _ANSWER_PIPELINE_CACHE.get(key)
+    if cached is not None and cached[0] is llm:
+        return cached[1], True
+    pipeline = factory()
+    with _LLM_CLIENT_CACHE_LOCK:
+        _ANSWER_PIPELINE_CACHE.entries.pop(key, None)
+        return _ANSWER_PIPELINE_CACHE.put(key, (llm, pipeline))[1], False
+
+
+def get_llm_client_cache_stats() -> dict[str, dict[str, float | int]]:
+    with _LLM_CLIENT_CACHE_LOCK:
+        return {
+            "clients": _LLM_CLIENT_CACHE.snapshot(),
+            "pipelines": _ANSWER_PIPELINE_CACHE.snapshot(),
+        }
+
+
+def clear_llm_client_cache() -> None:
+    with _LLM_CLIENT_CACHE_LOCK:
+        _LLM_CLIENT_CACHE.clear()
+        _ANSWER_PIPELINE_CACHE.clear()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+from services import collection_service, graph_lite_service
+from services.lexical_index_service import extract_lexical_query_terms
+
+
+@dataclass(frozen=True)
+class QueryAnalysis:
+    """Per-request analysis of one question, computed once and shared by every stage.
+
+    Retrieval, lexical rerank, coverage rerank and the answer guard read
+    `lexical_terms`; routing reads `routing_collection_keys`; graph-lite reads
+    `relation_keyword_hits` and the snapshot-dependent entity hits, which are
+    matched lazily because most requests never load a graph-lite snapshot.
+    """
+
+    question: str
+    lexical_terms: tuple[str, ...]
+    relation_keyword_hits: tuple[str, ...]
+    routing_collection_keys: tuple[str, ...]
+    analysis_ms: float = 0.0
+    _entity_hits: dict[int, tuple[object, tuple[str, ...]]] = field(
+        default_factory=dict,
+        compare=False,
+        repr=False,
+    )
+
+    @property
+    def query_terms(self) -> list[str]:
+        return list(self.lexical_terms)
+
+    def graph_entity_ids(self, snapshot: graph_lite_service.GraphLiteSnapshot) -> list[str]:
+        cached = self._entity_hits.get(id(snapshot))
+        if cached is None or cached[0] is not snapshot:
+            cached = (snapshot, tuple(graph_lite_service.detect_query_entities(snapshot, self.question)))
+            self._entity_hits[id(snapshot)] = cached
+        return list(cached[1])
+
+    def relation_intent(self, snapshot: graph_lite_service.GraphLiteSnapshot) -> dict[str, object]:
+        return graph_lite_service.detect_relation_query_intent(
+            snapshot,
+            self.question,
+            entity_ids=self.graph_entity_ids(snapshot),
+            keyword_hits=list(self.relation_keyword_hits),
+        )
+
+
+def analyze_query(question: str) -> QueryAnalysis:
+    started_at = time.perf_counter()
+    lexical_terms = tuple(extract_lexical_query_terms(question))
+    relation_keyword_hits = tuple(graph_lite_service.detect_relation_keyword_hits(question))
+    routing_collection_keys = tuple(collection_service.guess_collection_keys_from_query(question))
+    return QueryAnalysis(
+        question=question,
+        lexical_terms=lexical_terms,
+        relation_keyword_hits=relation_keyword_hits,
+        routing_collection_keys=routing_collection_keys,
+        analysis_ms=round((time.perf_counter() - started_at) * 1000, 3),
+    )
+
+
+def query_terms_for(question: str, analysis: QueryAnalysis | None) -> list[str]:
+    """Lexical terms for `question`, reusing `analysis` when it was built for the same question."""
+    if analysis is not None and analysis.question == question:
+        return analysis.query_terms
+    return extract_lexical_query_terms(question)
@@ -1,20 +1,47 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import re
 import time
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import TimeoutError as FuturesTimeoutError
-from typing import Any
+from typing import Any, Iterator
 
+import numpy as np
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
-
-from core.settings import DEFAULT_QUERY_TIMEOUT_SECONDS, SEARCH_FETCH_K, SEARCH_K, SEARCH_LAMBDA
-from services import index_service, runtime_service
+from langchain_chroma.vectorstores import maximal_marginal_relevance
+
+from core.settings import (
+    DEFAULT_QUERY_TIMEOUT_SECONDS,
+    RETRIEVAL_MMR_SCOPE_COLLECTION,
+    RETRIEVAL_MMR_SCOPE_GLOBAL,
+    SEARCH_FETCH_K,
+    SEARCH_K,
+    SEARCH_LAMBDA,
+)
+from services import index_service, llm_client_cache_service, query_analysis_service, runtime_service
+from services.collection_snapshot_service import CollectionSnapshot
+from services.context_packing_service import PackedContext, pack_context
+from services.deadline_service import QueryDeadline
+from services.lexical_index_service import (
+    KOREAN_PARTICLE_SUFFIXES,
+    LEXICAL_STOPWORDS,
+    LEXICAL_TOKEN_PATTERN,
+    LexicalIndex,
+    LexicalLookup,
+    build_doc_fingerprint,
+    build_lexical_index,
+    extract_lexical_query_terms,
+    lookup_query_terms,
+    lookup_query_terms_batch,
+    normalize_lexical_token,
+)
+from services.query_analysis_service import QueryAnalysis, analyze_query, query_terms_for
 
 logger = logging.getLogger("doc_rag.query")
 
@@ -93,59 +120,6 @@ ANSWER_LABEL_PATTERNS = [
 ]
 CONTEXT_SOURCE_LINE_PATTERN = re.compile(r"^\[\d+\]\s+source=.*$")
 MARKDOWN_TABLE_SEPARATOR_PATTERN = re.compile(r"^\|\s*[-: ]+\|")
-LEXICAL_TOKEN_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
-KOREAN_PARTICLE_SUFFIXES = (
-    "으로부터",
-    "에게서는",
-    "이라고",
-    "라면",
-    "으로는",
-    "에서는",
-    "에게서",
-    "했다면",
-    "했는지",
-    "있는지",
-    "는지",
-    "인지",
-    "으로",
-    "에서",
-    "에게",
-    "부터",
-    "까지",
-    "처럼",
-    "보다",
-    "이다",
-    "와",
-    "과",
-    "의",
-    "은",
-    "는",
-    "이",
-    "가",
-    "을",
-    "를",
-    "에",
-    "로",
-    "도",
-    "만",
-)
-LEXICAL_STOPWORDS = {
-    "문서",
-    "기준",
-    "설명",
-    "설명해줘",
-    "요약",
-    "요약해줘",
-    "정리",
-    "정리해줘",
-    "무엇",
-    "어떻게",
-    "어떤",
-    "당시",
-    "관련",
-    "해주세요",
-    "해줘",
-}
 RETRIEVAL_STRATEGY_MMR = "mmr"
 RETRIEVAL_STRATEGY_MMR_WITH_LEXICAL = "mmr+light_lexical_boost"
 RETRIEVAL_STRATEGY_MMR_WITH_COVERAGE = "mmr+coverage_rerank"
@@ -154,7 +128,6 @@ RETRIEVAL_STRATEGY_MMR_WITH_HYBRID = "mmr+light_hybrid"
 RETRIEVAL_STRATEGY_MMR_WITH_HYBRID_AND_LEXICAL = "mmr+light_hybrid+lexical_boost"
 RETRIEVAL_STRATEGY_MMR_WITH_HYBRID_AND_COVERAGE = "mmr+light_hybrid+coverage_rerank"
 RETRIEVAL_STRATEGY_MMR_WITH_HYBRID_AND_LEXICAL_AND_COVERAGE = "mmr+light_hybrid+lexical_boost+coverage_rerank"
-HYBRID_LEXICAL_SCAN_MAX_DOCS = 4000
 HYBRID_LEXICAL_CANDIDATE_LIMIT = 2
 
 
@@ -228,35 +201,6 @@ def is_insufficient_answer(answer: str) -> bool:
     return normalized.rstrip(".。").strip() == expected
 
 
-def normalize_lexical_token(token: str) -> str:
-    normalized = token.strip().lower()
-    if not normalized:
-        return ""
-
-    for suffix in KOREAN_PARTICLE_SUFFIXES:
-        if not normalized.endswith(suffix):
-            continue
-        if len(normalized) - len(suffix) < 2:
-            continue
-        normalized = normalized[: -len(suffix)]
-        break
-    return normalized.strip()
-
-
-def extract_lexical_query_terms(question: str) -> list[str]:
-    terms: list[str] = []
-    for raw_token in LEXICAL_TOKEN_PATTERN.findall(question.lower()):
-        token = normalize_lexical_token(raw_token)
-        if not token:
-            continue
-        if token in LEXICAL_STOPWORDS:
-            continue
-        if len(token) < 2 and not token.isdigit():
-            continue
-        terms.append(token)
-    return list(dict.fromkeys(terms))
-
-
 def _score_doc_lexical_match(doc: Document, query_terms: list[str]) -> tuple[float, list[str]]:
     if not query_terms:
         return 0.0, []
@@ -287,11 +231,43 @@ def _score_doc_lexical_match(doc: Document, query_terms: list[str]) -> tuple[flo
     return score, sorted(total_hits)
 
 
+def _score_docs_lexical(
+    docs: list[Document],
+    query_terms: list[str],
+    lexical_indexes: dict[str, LexicalIndex] | None = None,
+    lookups: dict[str, LexicalLookup] | None = None,
+) -> list[tuple[float, list[str]]]:
+    lookups = dict(lookups or {})
+    scored: list[tuple[float, list[str]]] = []
+    for doc in docs:
+        collection_key = str(doc.metadata.get("collection_key", "")).strip()
+        index = None
+        if lexical_indexes:
+            index = lexical_indexes.get(collection_key)
+            if index is None and len(lexical_indexes) == 1:
+                index = next(iter(lexical_indexes.values()))
+        position = index.position_of(doc) if index is not None else None
+        if index is None or position is None:
+            scored.append(_score_doc_lexical_match(doc, query_terms))
+            continue
+        lookup_key = str(id(index))
+        lookup = lookups.get(lookup_key)
+        if lookup is None:
+            lookup = lookup_query_terms(index, query_terms)
+            lookups[lookup_key] = lookup
+        scored.append(lookup.score(position))
+    return scored
+
+
 def rerank_docs_with_light_lexical_boost(
     docs: list[Document],
     question: str,
+    *,
+    lexical_index: LexicalIndex | None = None,
+    lexical_lookup: LexicalLookup | None = None,
+    analysis: QueryAnalysis | None = None,
 ) -> tuple[list[Document], dict[str, object]]:
-    query_terms = extract_lexical_query_terms(question)
+    query_terms = query_terms_for(question, analysis)
     if len(docs) < 2 or not query_terms:
         return docs, {
             "strategy": RETRIEVAL_STRATEGY_MMR,
@@ -301,8 +277,11 @@ def rerank_docs_with_light_lexical_boost(
 
     ranked_items: list[dict[str, object]] = []
     has_non_zero_score = False
-    for index, doc in enumerate(docs):
-        score, matched_terms = _score_doc_lexical_match(doc, query_terms)
+    lexical_indexes = {"": lexical_index} if lexical_index is not None else None
+    lookups = {str(id(lexical_index)): lexical_lookup} if lexical_index is not None and lexical_lookup else None
+    for index, (doc, (score, matched_terms)) in enumerate(
+        zip(docs, _score_docs_lexical(docs, query_terms, lexical_indexes, lookups))
+    ):
         if score > 0:
             has_non_zero_score = True
         ranked_items.append(
@@ -334,17 +313,14 @@ def rerank_docs_with_light_lexical_boost(
     }
 
 
-def build_doc_fingerprint(doc: Document) -> str:
-    source = str(doc.metadata.get("source", ""))
-    h2 = str(doc.metadata.get("h2", ""))
-    return f"{source}|{h2}|{doc.page_content}"
-
-
 def rerank_docs_with_light_multi_collection_coverage(
     docs: list[Document],
     question: str,
+    *,
+    lexical_indexes: dict[str, LexicalIndex] | None = None,
+    analysis: QueryAnalysis | None = None,
 ) -> tuple[list[Document], dict[str, object]]:
-    query_terms = extract_lexical_query_terms(question)
+    query_terms = query_terms_for(question, analysis)
     collection_keys = [
         str(doc.metadata.get("collection_key", "")).strip()
         for doc in docs
@@ -371,8 +347,9 @@ def rerank_docs_with_light_multi_collection_coverage(
 
     ranked_items: list[dict[str, object]] = []
     has_non_zero_score = False
-    for index, doc in enumerate(docs):
-        score, matched_terms = _score_doc_lexical_match(doc, query_terms)
+    for index, (doc, (score, matched_terms)) in enumerate(
+        zip(docs, _score_docs_lexical(docs, query_terms, lexical_indexes))
+    ):
         if score > 0:
             has_non_zero_score = True
         ranked_items.append(
@@ -448,121 +425,87 @@ def rerank_docs_with_light_multi_collection_coverage(
     }
 
 
+def _hybrid_merge_info(
+    *,
+    query_terms: list[str],
+    applied: bool,
+    candidate_count: int,
+    candidate_limit: int,
+    collection_doc_count: int,
+    postings_touched: int,
+    matched_doc_count: int,
+    skipped: str | None = None,
+) -> dict[str, object]:
+    info: dict[str, object] = {
+        "query_terms": query_terms,
+        "applied": applied,
+        "candidate_count": candidate_count,
+        "candidate_limit": candidate_limit,
+        "collection_doc_count": collection_doc_count,
+        "postings_touched": postings_touched,
+        "matched_doc_count": matched_doc_count,
+    }
+    if skipped:
+        info["skipped"] = skipped
+    return info
+
+
 def merge_docs_with_light_hybrid_candidates(
     dense_docs: list[Document],
-    collection_docs: list[Document],
+    collection_docs: list[Document] | CollectionSnapshot | LexicalIndex,
     question: str,
     *,
     max_candidates: int = HYBRID_LEXICAL_CANDIDATE_LIMIT,
+    lexical_lookup: LexicalLookup | None = None,
+    analysis: QueryAnalysis | None = None,
 ) -> tuple[list[Document], dict[str, object]]:
-    collection_doc_count = len(collection_docs)
+    lexical_index = collection_docs if isinstance(collection_docs, LexicalIndex) else build_lexical_index(collection_docs)
+    collection_doc_count = lexical_index.doc_count
     candidate_limit = max(0, int(max_candidates))
-    query_terms = extract_lexical_query_terms(question)
+    query_terms = query_terms_for(question, analysis)
+    skip_reason = ""
     if not query_terms:
-        return dense_docs, {
-            "query_terms": query_terms,
-            "applied": False,
-            "candidate_count": 0,
-            "candidate_limit": candidate_limit,
-            "collection_doc_count": collection_doc_count,
-            "scan_doc_count": 0,
-            "matched_doc_count": 0,
-            "skipped": "no_query_terms",
-        }
-
-    if not collection_docs:
-        return dense_docs, {
-            "query_terms": query_terms,
-            "applied": False,
-            "candidate_count": 0,
-            "candidate_limit": candidate_limit,
-            "collection_doc_count": collection_doc_count,
-            "scan_doc_count": 0,
-            "matched_doc_count": 0,
-            "skipped": "empty_collection",
-        }
-
-    if candidate_limit < 1:
-        return dense_docs, {
-            "query_terms": query_terms,
-            "applied": False,
-            "candidate_count": 0,
-            "candidate_limit": candidate_limit,
-            "collection_doc_count": collection_doc_count,
-            "scan_doc_count": 0,
-            "matched_doc_count": 0,
-            "skipped": "candidate_limit_zero",
-        }
-
-    if collection_doc_count > HYBRID_LEXICAL_SCAN_MAX_DOCS:
-        return dense_docs, {
-            "query_terms": query_terms,
-            "applied": False,
-            "candidate_count": 0,
-            "candidate_limit": candidate_limit,
-            "collection_doc_count": collection_doc_count,
-            "scan_doc_count": 0,
-            "matched_doc_count": 0,
-            "skipped": "collection_too_large",
-        }
-
-    existing_fingerprints = {build_doc_fingerprint(doc) for doc in dense_docs}
-    candidate_items: list[dict[str, object]] = []
-    for index, doc in enumerate(collection_docs):
-        fingerprint = build_doc_fingerprint(doc)
-        if fingerprint in existing_fingerprints:
-            continue
-        score, matched_terms = _score_doc_lexical_match(doc, query_terms)
-        if score <= 0:
-            continue
-        candidate_items.append(
-            {
-                "doc": doc,
-                "score": score,
-                "matched_terms": matched_terms,
-                "index": index,
-            }
+        skip_reason = "no_query_terms"
+    elif not collection_doc_count:
+        skip_reason = "empty_collection"
+    elif candidate_limit < 1:
+        skip_reason = "candidate_limit_zero"
+    if skip_reason:
+        return dense_docs, _hybrid_merge_info(
+            query_terms=query_terms,
+            applied=False,
+            candidate_count=0,
+            candidate_limit=candidate_limit,
+            collection_doc_count=collection_doc_count,
+            postings_touched=0,
+            matched_doc_count=0,
+            skipped=skip_reason,
         )
 
-    if not candidate_items:
-        return dense_docs, {
-            "query_terms": query_terms,
-            "applied": False,
-            "candidate_count": 0,
-            "candidate_limit": candidate_limit,
-            "collection_doc_count": collection_doc_count,
-            "scan_doc_count": collection_doc_count,
-            "matched_doc_count": 0,
-        }
-
-    ordered_items = sorted(
-        candidate_items,
-        key=lambda item: (
-            -float(item["score"]),
-            -len(item["matched_terms"]),
-            int(item["index"]),
-        ),
-    )
-    selected_docs = [item["doc"] for item in ordered_items[:candidate_limit]]
+    lookup = lexical_lookup if lexical_lookup is not None else lookup_query_terms(lexical_index, query_terms)
+    snapshot = lexical_index.snapshot
+    existing_positions = snapshot.positions_of_fingerprints({build_doc_fingerprint(doc) for doc in dense_docs})
+    selected_positions, matched_doc_count = lookup.rank_candidates(exclude=existing_positions, limit=candidate_limit)
+    selected_docs = snapshot.materialize_many(selected_positions)
     if not selected_docs:
-        return dense_docs, {
-            "query_terms": query_terms,
-            "applied": False,
-            "candidate_count": 0,
-            "candidate_limit": candidate_limit,
-            "collection_doc_count": collection_doc_count,
-            "scan_doc_count": collection_doc_count,
-            "matched_doc_count": len(candidate_items),
-        }
-    return [*dense_docs, *selected_docs], {
-        "query_terms": query_terms,
-        "applied": True,
-        "candidate_count": len(selected_docs),
-        "candidate_limit": candidate_limit,
-        "collection_doc_count": collection_doc_count,
-        "scan_doc_count": collection_doc_count,
-        "matched_doc_count": len(candidate_items),
-    }
+        return dense_docs, _hybrid_merge_info(
+            query_terms=query_terms,
+            applied=False,
+            candidate_count=0,
+            candidate_limit=candidate_limit,
+            collection_doc_count=collection_doc_count,
+            postings_touched=lookup.postings_touched,
+            matched_doc_count=matched_doc_count,
+        )
+    return [*dense_docs, *selected_docs], _hybrid_merge_info(
+        query_terms=query_terms,
+        applied=True,
+        candidate_count=len(selected_docs),
+        candidate_limit=candidate_limit,
+        collection_doc_count=collection_doc_count,
+        postings_touched=lookup.postings_touched,
+        matched_doc_count=matched_doc_count,
+    )
 
 
 def topic_particle(value: str) -> str:
@@ -735,8 +678,14 @@ def _render_context_evidence_line(line: str) -> str:
     return line
 
 
-def select_supported_context_evidence(question: str, context: str, *, limit: int = 3) -> list[str]:
-    query_terms = extract_lexical_query_terms(question)
+def select_supported_context_evidence(
+    question: str,
+    context: str,
+    *,
+    limit: int = 3,
+    analysis: QueryAnalysis | None = None,
+) -> list[str]:
+    query_terms = query_terms_for(question, analysis)
     ranked: list[tuple[int, int, int, str]] = []
     seen: set[str] = set()
     for index, line in enumerate(_iter_context_evidence_lines(context)):
@@ -753,14 +702,45 @@ def select_supported_context_evidence(question: str, context: str, *, limit: int
     return [item[3] for item in ranked[:limit]]
 
 
-def build_supported_context_fallback_answer(question: str, context: str, *, limit: int = 3) -> str:
-    evidence_lines = select_supported_context_evidence(question, context, limit=limit)
-    if not evidence_lines:
-        return ""
+def _render_evidence_answer(evidence_lines: list[str]) -> str:
     rendered_lines = "\n".join(f"- {line}" for line in evidence_lines)
     return f"문서 근거로 확인되는 내용입니다.\n{rendered_lines}"
 
 
+def build_supported_context_fallback_answer(
+    question: str,
+    context: str,
+    *,
+    limit: int = 3,
+    analysis: QueryAnalysis | None = None,
+) -> str:
+    evidence_lines = select_supported_context_evidence(question, context, limit=limit, analysis=analysis)
+    if not evidence_lines:
+        return ""
+    return _render_evidence_answer(evidence_lines)
+
+
+def build_extractive_answer(
+    question: str,
+    context: str,
+    *,
+    limit: int = 3,
+    analysis: QueryAnalysis | None = None,
+    trace: dict[str, Any] | None = None,
+) -> str:
+    """Answer from the top-ranked context evidence lines without calling an LLM."""
+    started_at = time.perf_counter()
+    evidence_lines = select_supported_context_evidence(question, context, limit=limit, analysis=analysis)
+    answer = _render_evidence_answer(evidence_lines) if evidence_lines else INSUFFICIENT_ANSWER_TEXT
+    if trace is not None:
+        trace["invoke_ms"] = int((time.perf_counter() - started_at) * 1000)
+        trace["status"] = "ok"
+        trace["strategy"] = "extractive_context_lines"
+        trace["llm_skipped"] = True
+        trace["evidence_lines"] = len(evidence_lines)
+    return answer
+
+
 def format_docs(docs: list[Document]) -> str:
     lines = []
     for idx, doc in enumerate(docs, 1):
@@ -770,29 +750,327 @@ def format_docs(docs: list[Document]) -> str:
     return "\n\n".join(lines)
 
 
-def format_docs_with_limit(docs: list[Document], *, max_chars: int | None) -> str:
-    if max_chars is None:
-        return format_docs(docs)
+def _retrieve_single_collection(
+    key: str,
+    question: str,
+    *,
+    per_collection_k: int,
+    per_collection_fetch_k: int,
+    hybrid_candidate_limit: int,
+    fanout_started_at: float,
+    query_embedding: index_service.QueryEmbedding | None = None,
+    analysis: QueryAnalysis | None = None,
+) -> dict[str, Any]:
+    collection_started_at = time.perf_counter()
+    db = index_service.get_db(key)
+    search_by_vector = getattr(db, "max_marginal_relevance_search_by_vector", None)
+    if query_embedding is not None and callable(search_by_vector):
+        items = search_by_vector(
+            query_embedding.vector(),
+            k=per_collection_k,
+            fetch_k=per_collection_fetch_k,
+            lambda_mult=SEARCH_LAMBDA,
+        )
+    else:
+        retriever = db.as_retriever(
+            search_type="mmr",
+            search_kwargs={
+                "k": per_collection_k,
+                "fetch_k": per_collection_fetch_k,
+                "lambda_mult": SEARCH_LAMBDA,
+            },
+        )
+        items = retriever.invoke(question)
+    retriever_ms = round((time.perf_counter() - collection_started_at) * 1000, 3)
+    lexical_index = index_service.get_collection_lexical_index(key)
+    return _rerank_collection_items(
+        key,
+        items,
+        question,
+        lexical_index=lexical_index,
+        hybrid_candidate_limit=hybrid_candidate_limit,
+        retriever_ms=retriever_ms,
+        queue_wait_ms=round((collection_started_at - fanout_started_at) * 1000, 3),
+        started_at=collection_started_at,
+        analysis=analysis,
+    )
+
+
+def _rerank_collection_items(
+    key: str,
+    items: list[Document],
+    question: str,
+    *,
+    lexical_index: LexicalIndex,
+    hybrid_candidate_limit: int,
+    retriever_ms: float,
+    queue_wait_ms: float,
+    started_at: float,
+    lexical_lookup: LexicalLookup | None = None,
+    analysis: QueryAnalysis | None = None,
+) -> dict[str, Any]:
+    hybrid_items, hybrid_info = merge_docs_with_light_hybrid_candidates(
+        items,
+        lexical_index,
+        question,
+        max_candidates=hybrid_candidate_limit,
+        lexical_lookup=lexical_lookup,
+        analysis=analysis,
+    )
+    reranked_items, lexical_info = rerank_docs_with_light_lexical_boost(
+        hybrid_items,
+        question,
+        lexical_index=lexical_index,
+        lexical_lookup=lexical_lookup,
+        analysis=analysis,
+    )
+    return {
+        "key": key,
+        "items": items,
+        "reranked_items": reranked_items,
+        "hybrid_info": hybrid_info,
+        "lexical_info": lexical_info,
+        "lexical_index": lexical_index,
+        "retriever_ms": retriever_ms,
+        "queue_wait_ms": queue_wait_ms,
+        "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 3),
+    }
+
+
+def _query_mmr_candidates(db, vectors: list[list[float]], *, fetch_k: int) -> list[list[tuple[Document, Any]]] | None:
+    """Fetch `fetch_k` nearest chunks and their stored embeddings for every vector in one Chroma call.
+
+    Returns None for stores without a raw collection handle.
+    """
+    collection = getattr(db, "_collection", None)
+    if collection is None or not callable(getattr(collection, "query", None)):
+        return None
+    results = collection.query(
+        query_embeddings=vectors,
+        n_results=fetch_k,
+        include=["metadatas", "documents", "distances", "embeddings"],
+    )
+    return [
+        [
+            (
+                Document(page_content=str(text or ""), metadata=dict(metadata or {}), id=str(doc_id)),
+                embedding,
+            )
+            for doc_id, text, metadata, embedding in zip(
+                results["ids"][query_index],
+                results["documents"][query_index],
+                results["metadatas"][query_index],
+                results["embeddings"][query_index],
+            )
+        ]
+        for query_index in range(len(vectors))
+    ]
 
-    lines: list[str] = []
-    current_length = 0
-    for idx, doc in enumerate(docs, 1):
-        source = doc.metadata.get("source", "unknown")
-        h2 = doc.metadata.get("h2", "")
-        rendered = f"[{idx}] source={source} h2={h2}\n{doc.page_content}"
-        separator = "\n\n" if lines else ""
-        remaining = max_chars - current_length - len(separator)
-        if remaining <= 0:
-            break
-        if len(rendered) > remaining:
-            rendered = rendered[:remaining].rstrip()
-            if not rendered:
-                break
-        lines.append(separator + rendered if separator else rendered)
-        current_length += len(lines[-1])
-        if current_length >= max_chars:
-            break
-    return "".join(lines)
+
+def _select_collection_mmr(vector: list[float], candidates: list[tuple[Document, Any]], *, k: int) -> list[Document]:
+    selected = set(
+        maximal_marginal_relevance(
+            np.array(vector, dtype=np.float32),
+            [embedding for _doc, embedding in candidates],
+            k=k,
+            lambda_mult=SEARCH_LAMBDA,
+        )
+    )
+    return [doc for position, (doc, _embedding) in enumerate(candidates) if position in selected]
+
+
+def _mmr_search_many(db, vectors: list[list[float]], *, k: int, fetch_k: int) -> list[list[Document]]:
+    """Run MMR for several query vectors with a single Chroma query call.
+
+    Mirrors `Chroma.max_marginal_relevance_search_by_vector` per vector (same
+    candidate order and selection); stores without a raw collection handle fall
+    back to one search per vector.
+    """
+    candidates_per_vector = _query_mmr_candidates(db, vectors, fetch_k=fetch_k)
+    if candidates_per_vector is None:
+        return [
+            db.max_marginal_relevance_search_by_vector(vector, k=k, fetch_k=fetch_k, lambda_mult=SEARCH_LAMBDA)
+            for vector in vectors
+        ]
+    return [
+        _select_collection_mmr(vector, candidates, k=k)
+        for vector, candidates in zip(vectors, candidates_per_vector)
+    ]
+
+
+def _mmr_indices(query_vector: list[float], embeddings: np.ndarray, *, k: int, lambda_mult: float) -> list[int]:
+    """Vectorized MMR: each step rescores every candidate with one matrix-vector product."""
+    count = len(embeddings)
+    if min(k, count) <= 0:
+        return []
+    norms = np.linalg.norm(embeddings, axis=1)
+    norms[norms == 0] = 1.0
+    unit = embeddings / norms[:, None]
+    query = np.asarray(query_vector, dtype=np.float64)
+    relevance = unit @ (query / (np.linalg.norm(query) or 1.0))
+
+    selected = [int(np.argmax(relevance))]
+    available = np.ones(count, dtype=bool)
+    available[selected[0]] = False
+    redundancy = unit @ unit[selected[0]]
+    while len(selected) < min(k, count):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, unit @ unit[best])
+    return selected
+
+
+def _select_global_mmr(
+    vector: list[float],
+    candidates_by_key: list[tuple[str, list[tuple[Document, Any]]]],
+    *,
+    k: int,
+) -> tuple[dict[str, list[Document]], dict[str, Any]]:
+    """One MMR pass over the union of every collection's candidates.
+
+    Exact duplicate chunks keep their first collection in request order, the
+    same rule the per-collection merge applies. Selected documents are handed
+    back per collection in each collection's candidate order.
+    """
+    started_at = time.perf_counter()
+    pool_keys: list[str] = []
+    pool_docs: list[Document] = []
+    pool_embeddings: list[Any] = []
+    seen_fingerprints: set[str] = set()
+    candidate_count = 0
+    for key, candidates in candidates_by_key:
+        for doc, embedding in candidates:
+            candidate_count += 1
+            fingerprint = build_doc_fingerprint(doc)
+            if fingerprint in seen_fingerprints:
+                continue
+            seen_fingerprints.add(fingerprint)
+            pool_keys.append(key)
+            pool_docs.append(doc)
+            pool_embeddings.append(embedding)
+
+    selected: set[int] = set()
+    if pool_embeddings:
+        # An empty pool has no embedding width to reshape to; every collection just selects nothing.
+        embeddings = np.asarray(pool_embeddings, dtype=np.float64).reshape(len(pool_embeddings), -1)
+        selected = set(_mmr_indices(vector, embeddings, k=k, lambda_mult=SEARCH_LAMBDA))
+    selected_by_key: dict[str, list[Document]] = {key: [] for key, _candidates in candidates_by_key}
+    for position, (key, doc) in enumerate(zip(pool_keys, pool_docs)):
+        if position in selected:
+            selected_by_key[key].append(doc)
+    return selected_by_key, {
+        "candidate_count": candidate_count,
+        "duplicate_candidates": candidate_count - len(pool_docs),
+        "selected_count": len(selected),
+        "k": k,
+        "selected_per_collection": {key: len(docs) for key, docs in selected_by_key.items()},
+        "mmr_ms": round((time.perf_counter() - started_at) * 1000, 3),
+    }
+
+
+def _retrieve_global_mmr(
+    question: str,
+    collection_keys: list[str],
+    *,
+    per_collection_k: int,
+    per_collection_fetch_k: int,
+    hybrid_candidate_limit: int,
+    query_embedding: index_service.QueryEmbedding,
+    analysis: QueryAnalysis | None,
+) -> tuple[list[dict[str, Any]] | None, dict[str, Any]]:
+    fetch_started_at = time.perf_counter()
+    vector = query_embedding.vector()
+    candidates_by_key: list[tuple[str, list[tuple[Document, Any]]]] = []
+    fetch_ms: dict[str, float] = {}
+    for key in collection_keys:
+        collection_started_at = time.perf_counter()
+        candidates = _query_mmr_candidates(index_service.get_db(key), [vector], fetch_k=per_collection_fetch_k)
+        if candidates is None:
+            return None, {"fallback": "vector_store_without_raw_collection"}
+        candidates_by_key.append((key, candidates[0]))
+        fetch_ms[key] = round((time.perf_counter() - collection_started_at) * 1000, 3)
+    total_fetch_ms = round((time.perf_counter() - fetch_started_at) * 1000, 3)
+
+    selected_by_key, info = _select_global_mmr(vector, candidates_by_key, k=per_collection_k * len(collection_keys))
+    info["fetch_ms"] = total_fetch_ms
+    results: list[dict[str, Any]] = []
+    for key in collection_keys:
+        rerank_started_at = time.perf_counter()
+        results.append(
+            _rerank_collection_items(
+                key,
+                selected_by_key[key],
+                question,
+                lexical_index=index_service.get_collection_lexical_index(key),
+                hybrid_candidate_limit=hybrid_candidate_limit,
+                retriever_ms=fetch_ms[key],
+                queue_wait_ms=0.0,
+                started_at=rerank_started_at,
+                analysis=analysis,
+            )
+        )
+    return results, info
+
+
+def _budget_context_limits(budget: dict[str, object] | None) -> tuple[int | None, int]:
+    max_context_chars = (
+        int(budget["max_context_chars"])
+        if budget and isinstance(budget.get("max_context_chars"), int)
+        else runtime_service.get_max_context_chars()
+    )
+    max_context_tokens = (
+        int(budget["max_context_tokens"])
+        if budget and isinstance(budget.get("max_context_tokens"), int)
+        else runtime_service.get_max_context_tokens()
+    )
+    return max_context_chars, max_context_tokens
+
+
+def pack_budget_context(
+    docs: list[Document],
+    budget: dict[str, object] | None,
+    *,
+    question: str = "",
+    analysis: QueryAnalysis | None = None,
+) -> PackedContext:
+    max_context_chars, max_context_tokens = _budget_context_limits(budget)
+    compress_terms = query_terms_for(question, analysis) if budget and budget.get("context_compression") else None
+    return pack_context(
+        docs,
+        max_tokens=max_context_tokens,
+        max_chars=max_context_chars,
+        compress_terms=compress_terms,
+    )
+
+
+class RetrievedDocuments(list[Document]):
+    """Selected documents plus the prompt context packed from them, so callers don't pack twice."""
+
+    def __init__(self, docs: list[Document], packed_context: PackedContext):
+        super().__init__(docs)
+        self.packed_context = packed_context
+
+
+def _packed_context_for(
+    docs: list[Document],
+    budget: dict[str, object] | None,
+    *,
+    question: str,
+    analysis: QueryAnalysis | None,
+) -> PackedContext:
+    packed_context = getattr(docs, "packed_context", None)
+    if isinstance(packed_context, PackedContext):
+        return packed_context
+    return pack_budget_context(docs, budget, question=question, analysis=analysis)
+
+
+def _budget_search_k(budget: dict[str, object] | None) -> tuple[int, int]:
+    per_collection_k = int(budget.get("per_collection_k", SEARCH_K)) if budget else SEARCH_K
+    per_collection_fetch_k = int(budget.get("per_collection_fetch_k", SEARCH_FETCH_K)) if budget else SEARCH_FETCH_K
+    return per_collection_k, per_collection_fetch_k
 
 
 def retrieve_collection_documents(
@@ -800,69 +1078,116 @@ def retrieve_collection_documents(
     collection_keys: list[str],
     trace: dict[str, Any] | None = None,
     budget: dict[str, object] | None = None,
+    query_embedding: index_service.QueryEmbedding | None = None,
+    prefetched_results: dict[str, dict[str, Any]] | None = None,
+    analysis: QueryAnalysis | None = None,
+    prefetched_global_mmr: dict[str, Any] | None = None,
 ) -> list[Document]:
     started_at = time.perf_counter()
     docs: list[Document] = []
     fingerprints: set[str] = set()
     collection_stats: list[dict[str, Any]] = []
-    lexical_query_terms = extract_lexical_query_terms(question)
+    if analysis is None or analysis.question != question:
+        analysis = analyze_query(question)
+    lexical_query_terms = analysis.query_terms
     lexical_boost_applied = False
     coverage_rerank_applied = False
     hybrid_candidate_merge_applied = False
     hybrid_candidate_count = 0
-    hybrid_scan_doc_count = 0
+    hybrid_postings_touched = 0
+    lexical_indexes: dict[str, LexicalIndex] = {}
     hybrid_skipped_collections: list[dict[str, str]] = []
     coverage_rerank_skipped = ""
     coverage_rerank_collection_count = 0
     coverage_rerank_covered_term_count = 0
-    per_collection_k = int(budget.get("per_collection_k", SEARCH_K)) if budget else SEARCH_K
-    per_collection_fetch_k = int(budget.get("per_collection_fetch_k", SEARCH_FETCH_K)) if budget else SEARCH_FETCH_K
+    per_collection_k, per_collection_fetch_k = _budget_search_k(budget)
     hybrid_candidate_limit = min(HYBRID_LEXICAL_CANDIDATE_LIMIT, per_collection_k)
     max_total_docs = int(budget.get("max_total_docs", max(SEARCH_K * len(collection_keys), SEARCH_K))) if budget else max(
         SEARCH_K * len(collection_keys),
         SEARCH_K,
     )
-    max_context_chars = (
-        int(budget["max_context_chars"])
-        if budget and isinstance(budget.get("max_context_chars"), int)
-        else runtime_service.get_max_context_chars()
-    )
-
-    for key in collection_keys:
-        collection_started_at = time.perf_counter()
-        db = index_service.get_db(key)
-        retriever = db.as_retriever(
-            search_type="mmr",
-            search_kwargs={
-                "k": per_collection_k,
-                "fetch_k": per_collection_fetch_k,
-                "lambda_mult": SEARCH_LAMBDA,
-            },
-        )
-        items = retriever.invoke(question)
-        collection_docs = index_service.get_collection_documents_from_store(key)
-        hybrid_items, hybrid_info = merge_docs_with_light_hybrid_candidates(
-            items,
-            collection_docs,
+    max_context_chars, max_context_tokens = _budget_context_limits(budget)
+
+    if query_embedding is None:
+        query_embedding = index_service.QueryEmbedding(question)
+    max_workers = min(len(collection_keys), runtime_service.get_retrieval_max_workers())
+    mmr_scope = RETRIEVAL_MMR_SCOPE_COLLECTION
+    global_mmr_info = prefetched_global_mmr
+    fanout_started_at = time.perf_counter()
+    collection_results: list[dict[str, Any]] | None = None
+    if prefetched_results is not None:
+        collection_results = [prefetched_results[key] for key in collection_keys]
+    elif len(collection_keys) > 1 and runtime_service.get_retrieval_mmr_scope() == RETRIEVAL_MMR_SCOPE_GLOBAL:
+        collection_results, global_mmr_info = _retrieve_global_mmr(
             question,
-            max_candidates=hybrid_candidate_limit,
+            collection_keys,
+            per_collection_k=per_collection_k,
+            per_collection_fetch_k=per_collection_fetch_k,
+            hybrid_candidate_limit=hybrid_candidate_limit,
+            query_embedding=query_embedding,
+            analysis=analysis,
         )
-        hybrid_scan_doc_count += int(hybrid_info.get("scan_doc_count", 0))
+    if global_mmr_info is not None and "fallback" not in global_mmr_info:
+        mmr_scope = RETRIEVAL_MMR_SCOPE_GLOBAL
+    retrieval_parallel = max_workers > 1 and collection_results is None
+    if retrieval_parallel:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="doc-rag-retrieval")
+        try:
+            futures = [
+                executor.submit(
+                    _retrieve_single_collection,
+                    key,
+                    question,
+                    per_collection_k=per_collection_k,
+                    per_collection_fetch_k=per_collection_fetch_k,
+                    hybrid_candidate_limit=hybrid_candidate_limit,
+                    fanout_started_at=fanout_started_at,
+                    query_embedding=query_embedding,
+                    analysis=analysis,
+                )
+                for key in collection_keys
+            ]
+            collection_results = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    elif collection_results is None:
+        collection_results = [
+            _retrieve_single_collection(
+                key,
+                question,
+                per_collection_k=per_collection_k,
+                per_collection_fetch_k=per_collection_fetch_k,
+                hybrid_candidate_limit=hybrid_candidate_limit,
+                fanout_started_at=fanout_started_at,
+                query_embedding=query_embedding,
+                analysis=analysis,
+            )
+            for key in collection_keys
+        ]
+    fanout_ms = round((time.perf_counter() - fanout_started_at) * 1000, 3)
+    critical_path_key = max(collection_results, key=lambda result: float(result["elapsed_ms"]))["key"] if collection_results else None
+
+    # Merge in request order so parallel and serial runs yield identical context.
+    for result in collection_results:
+        key = str(result["key"])
+        items = result["items"]
+        hybrid_info = result["hybrid_info"]
+        lexical_info = result["lexical_info"]
+        lexical_index = result["lexical_index"]
+        lexical_indexes[key] = lexical_index
+        hybrid_postings_touched += int(hybrid_info.get("postings_touched", 0))
         hybrid_skip_reason = str(hybrid_info.get("skipped", "")).strip()
         if hybrid_skip_reason:
             hybrid_skipped_collections.append({"key": key, "reason": hybrid_skip_reason})
         if bool(hybrid_info.get("applied")):
             hybrid_candidate_merge_applied = True
             hybrid_candidate_count += int(hybrid_info.get("candidate_count", 0))
-        reranked_items, lexical_info = rerank_docs_with_light_lexical_boost(hybrid_items, question)
         if bool(lexical_info.get("applied")):
             lexical_boost_applied = True
         unique_before = len(docs)
-        for item in reranked_items:
+        for item in result["reranked_items"]:
             item.metadata.setdefault("collection_key", key)
-            source = str(item.metadata.get("source", ""))
-            h2 = str(item.metadata.get("h2", ""))
-            fingerprint = f"{source}|{h2}|{item.page_content}"
+            fingerprint = build_doc_fingerprint(item)
             if fingerprint in fingerprints:
                 continue
             fingerprints.add(fingerprint)
@@ -872,17 +1197,25 @@ def retrieve_collection_documents(
                 "key": key,
                 "retrieved_docs": len(items),
                 "unique_docs": len(docs) - unique_before,
-                "collection_doc_count": int(hybrid_info.get("collection_doc_count", len(collection_docs))),
-                "hybrid_scan_doc_count": int(hybrid_info.get("scan_doc_count", 0)),
+                "collection_doc_count": int(hybrid_info.get("collection_doc_count", lexical_index.doc_count)),
+                "hybrid_postings_touched": int(hybrid_info.get("postings_touched", 0)),
                 "hybrid_matched_doc_count": int(hybrid_info.get("matched_doc_count", 0)),
                 "hybrid_candidate_count": int(hybrid_info.get("candidate_count", 0)),
                 "hybrid_candidate_limit": int(hybrid_info.get("candidate_limit", hybrid_candidate_limit)),
                 "hybrid_skipped": hybrid_skip_reason or None,
-                "elapsed_ms": round((time.perf_counter() - collection_started_at) * 1000, 3),
+                "retriever_ms": result["retriever_ms"],
+                "queue_wait_ms": result["queue_wait_ms"],
+                "on_critical_path": key == critical_path_key,
+                "elapsed_ms": result["elapsed_ms"],
             }
         )
 
-    reranked_docs, coverage_info = rerank_docs_with_light_multi_collection_coverage(docs, question)
+    reranked_docs, coverage_info = rerank_docs_with_light_multi_collection_coverage(
+        docs,
+        question,
+        lexical_indexes=lexical_indexes,
+        analysis=analysis,
+    )
     docs = reranked_docs
     coverage_rerank_applied = bool(coverage_info.get("applied"))
     coverage_rerank_skipped = str(coverage_info.get("skipped", "")).strip()
@@ -890,10 +1223,11 @@ def retrieve_collection_documents(
     coverage_rerank_covered_term_count = int(coverage_info.get("covered_term_count", 0))
 
     selected_docs = docs[:max_total_docs]
-    context_preview = format_docs_with_limit(selected_docs, max_chars=max_context_chars)
+    packed_context = pack_budget_context(selected_docs, budget, question=question, analysis=analysis)
     elapsed_ms = round((time.perf_counter() - started_at) * 1000, 3)
 
     if trace is not None:
+        query_embedding_cache_stats = index_service.get_query_embedding_cache_stats()
         retrieval_strategy = RETRIEVAL_STRATEGY_MMR
         if hybrid_candidate_merge_applied and lexical_boost_applied and coverage_rerank_applied:
             retrieval_strategy = RETRIEVAL_STRATEGY_MMR_WITH_HYBRID_AND_LEXICAL_AND_COVERAGE
@@ -916,7 +1250,7 @@ def retrieve_collection_documents(
                 "docs_total": len(docs),
                 "max_docs": max_total_docs,
                 "max_context_chars": max_context_chars,
-                "context_chars": len(context_preview),
+                **packed_context.to_trace(),
                 "budget_profile": None if budget is None else budget.get("profile"),
                 "retrieval_strategy": retrieval_strategy,
                 "lexical_query_terms": lexical_query_terms,
@@ -928,11 +1262,20 @@ def retrieve_collection_documents(
                 "hybrid_candidate_merge_applied": hybrid_candidate_merge_applied,
                 "hybrid_candidate_count": hybrid_candidate_count,
                 "hybrid_candidate_limit": hybrid_candidate_limit,
-                "hybrid_scan_limit": HYBRID_LEXICAL_SCAN_MAX_DOCS,
-                "hybrid_scan_doc_count": hybrid_scan_doc_count,
+                "hybrid_postings_touched": hybrid_postings_touched,
                 "hybrid_skipped_collections": hybrid_skipped_collections,
                 "per_collection_k": per_collection_k,
                 "per_collection_fetch_k": per_collection_fetch_k,
+                "retrieval_parallel": retrieval_parallel,
+                "retrieval_batched": prefetched_results is not None,
+                "mmr_scope": mmr_scope,
+                "global_mmr": global_mmr_info,
+                "retrieval_workers": max(1, max_workers),
+                "retrieval_fanout_ms": fanout_ms,
+                "retrieval_critical_path_key": critical_path_key,
+                "query_embedding_cache": query_embedding.cache_status,
+                "query_embedding_cache_hits": query_embedding_cache_stats["hits"],
+                "query_embedding_cache_misses": query_embedding_cache_stats["misses"],
                 "elapsed_ms": elapsed_ms,
                 "sources": [
                     {
@@ -946,16 +1289,168 @@ def retrieve_collection_documents(
         )
 
     logger.info(
-        "context_build collections=%s docs_total=%d max_docs=%d context_chars=%d max_context_chars=%s elapsed_ms=%.3f per_collection=%s",
+        "context_build collections=%s docs_total=%d max_docs=%d context_chars=%d context_tokens=%d max_context_tokens=%s elapsed_ms=%.3f per_collection=%s",
         ",".join(collection_keys),
         len(docs),
         max_total_docs,
-        len(context_preview),
-        max_context_chars,
+        len(packed_context.text),
+        packed_context.tokens,
+        max_context_tokens,
         elapsed_ms,
         collection_stats,
     )
-    return selected_docs
+    return RetrievedDocuments(selected_docs, packed_context)
+
+
+def retrieve_collection_documents_batch(
+    questions: list[str],
+    collection_keys: list[list[str]],
+    traces: list[dict[str, Any] | None] | None = None,
+    budgets: list[dict[str, object] | None] | None = None,
+    batch_trace: dict[str, Any] | None = None,
+    analyses: list[QueryAnalysis | None] | None = None,
+) -> list[list[Document]]:
+    """Retrieve documents for many questions, batching work per collection.
+
+    All questions are embedded in one encoder call. Each collection then runs
+    one vector query with every question vector that targets it, and one
+    lexical lookup pass that reads each distinct term's postings once. The
+    per-question merge, dedupe and coverage rerank are the same as
+    `retrieve_collection_documents`.
+    """
+    started_at = time.perf_counter()
+    embeddings = index_service.get_query_embeddings(questions)
+    embedding_ms = round((time.perf_counter() - started_at) * 1000, 3)
+    resolved_budgets = budgets or [None] * len(questions)
+    analyses = [
+        analysis if analysis is not None and analysis.question == question else analyze_query(question)
+        for question, analysis in zip(questions, analyses or [None] * len(questions))
+    ]
+
+    groups: dict[tuple[str, int, int], list[int]] = {}
+    for position, keys in enumerate(collection_keys):
+        per_collection_k, per_collection_fetch_k = _budget_search_k(resolved_budgets[position])
+        for key in keys:
+            groups.setdefault((key, per_collection_k, per_collection_fetch_k), []).append(position)
+
+    prefetched: list[dict[str, dict[str, Any]]] = [{} for _ in questions]
+    collection_batches: list[dict[str, Any]] = []
+    global_scope = runtime_service.get_retrieval_mmr_scope() == RETRIEVAL_MMR_SCOPE_GLOBAL
+    global_positions = {position for position, keys in enumerate(collection_keys) if global_scope and len(keys) > 1}
+    pending_global: dict[int, list[tuple[str, list[tuple[Document, Any]], LexicalIndex, LexicalLookup, float]]] = {}
+    global_fallback: set[int] = set()
+    global_mmr_infos: dict[int, dict[str, Any]] = {}
+
+    def _rerank_prefetched(
+        position: int,
+        key: str,
+        items: list[Document],
+        lexical_index: LexicalIndex,
+        lookup: LexicalLookup,
+        retriever_ms: float,
+        started: float,
+    ) -> None:
+        per_collection_k, _per_collection_fetch_k = _budget_search_k(resolved_budgets[position])
+        prefetched[position][key] = _rerank_collection_items(
+            key,
+            items,
+            questions[position],
+            lexical_index=lexical_index,
+            hybrid_candidate_limit=min(HYBRID_LEXICAL_CANDIDATE_LIMIT, per_collection_k),
+            retriever_ms=retriever_ms,
+            queue_wait_ms=0.0,
+            started_at=started,
+            lexical_lookup=lookup,
+            analysis=analyses[position],
+        )
+
+    for (key, per_collection_k, per_collection_fetch_k), positions in groups.items():
+        collection_started_at = time.perf_counter()
+        db = index_service.get_db(key)
+        vectors = [embeddings[position][0] for position in positions]
+        candidates_per_vector = None
+        if global_positions.intersection(positions):
+            candidates_per_vector = _query_mmr_candidates(db, vectors, fetch_k=per_collection_fetch_k)
+        if candidates_per_vector is None:
+            searched = _mmr_search_many(db, vectors, k=per_collection_k, fetch_k=per_collection_fetch_k)
+            global_fallback.update(global_positions.intersection(positions))
+        else:
+            searched = [
+                None if position in global_positions else _select_collection_mmr(vector, candidates, k=per_collection_k)
+                for position, vector, candidates in zip(positions, vectors, candidates_per_vector)
+            ]
+        retriever_ms = round((time.perf_counter() - collection_started_at) * 1000, 3)
+        lexical_started_at = time.perf_counter()
+        lexical_index = index_service.get_collection_lexical_index(key)
+        lookups = lookup_query_terms_batch(
+            lexical_index,
+            [analyses[position].query_terms for position in positions],
+        )
+        for offset, (position, items, lookup) in enumerate(zip(positions, searched, lookups)):
+            if items is None:
+                pending_global.setdefault(position, []).append(
+                    (key, candidates_per_vector[offset], lexical_index, lookup, retriever_ms)
+                )
+                continue
+            _rerank_prefetched(position, key, items, lexical_index, lookup, retriever_ms, collection_started_at)
+        collection_batches.append(
+            {
+                "key": key,
+                "queries": len(positions),
+                "retriever_ms": retriever_ms,
+                "lexical_ms": round((time.perf_counter() - lexical_started_at) * 1000, 3),
+            }
+        )
+
+    # Questions in global MMR scope pick one diversified set across all their collections.
+    for position, pending in pending_global.items():
+        vector = embeddings[position][0]
+        per_collection_k, _per_collection_fetch_k = _budget_search_k(resolved_budgets[position])
+        if position in global_fallback:
+            global_mmr_infos[position] = {"fallback": "vector_store_without_raw_collection"}
+            selected_by_key = {
+                key: _select_collection_mmr(vector, candidates, k=per_collection_k)
+                for key, candidates, _index, _lookup, _ms in pending
+            }
+        else:
+            selected_by_key, global_mmr_infos[position] = _select_global_mmr(
+                vector,
+                [(key, candidates) for key, candidates, _index, _lookup, _ms in pending],
+                k=per_collection_k * len(collection_keys[position]),
+            )
+        for key, _candidates, lexical_index, lookup, retriever_ms in pending:
+            _rerank_prefetched(position, key, selected_by_key[key], lexical_index, lookup, retriever_ms, time.perf_counter())
+
+    results: list[list[Document]] = []
+    for position, question in enumerate(questions):
+        vector, cache_hit = embeddings[position]
+        results.append(
+            retrieve_collection_documents(
+                question,
+                collection_keys[position],
+                trace=traces[position] if traces else None,
+                budget=resolved_budgets[position],
+                query_embedding=index_service.QueryEmbedding(
+                    question,
+                    vector=vector,
+                    cache_status="hit" if cache_hit else "miss",
+                ),
+                prefetched_results=prefetched[position],
+                analysis=analyses[position],
+                prefetched_global_mmr=global_mmr_infos.get(position),
+            )
+        )
+    if batch_trace is not None:
+        batch_trace.update(
+            {
+                "batch_size": len(questions),
+                "batch_embedding_ms": embedding_ms,
+                "batch_embedding_misses": sum(1 for _vector, cache_hit in embeddings if not cache_hit),
+                "batch_collections": collection_batches,
+                "batch_retrieval_ms": round((time.perf_counter() - started_at) * 1000, 3),
+            }
+        )
+    return results
 
 
 def build_collection_context(
@@ -963,46 +1458,156 @@ def build_collection_context(
     collection_keys: list[str],
     trace: dict[str, Any] | None = None,
     budget: dict[str, object] | None = None,
+    query_embedding: index_service.QueryEmbedding | None = None,
+    analysis: QueryAnalysis | None = None,
 ) -> str:
     docs = retrieve_collection_documents(
         question=question,
         collection_keys=collection_keys,
         trace=trace,
         budget=budget,
+        query_embedding=query_embedding,
+        analysis=analysis,
     )
-    max_context_chars = (
-        int(budget["max_context_chars"])
-        if budget and isinstance(budget.get("max_context_chars"), int)
-        else runtime_service.get_max_context_chars()
+    packed_context = _packed_context_for(docs, budget, question=question, analysis=analysis)
+    if trace is not None:
+        trace.update(packed_context.to_trace())
+    return packed_context.text
+
+
+def build_collection_contexts_batch(
+    questions: list[str],
+    collection_keys: list[list[str]],
+    traces: list[dict[str, Any] | None] | None = None,
+    budgets: list[dict[str, object] | None] | None = None,
+    batch_trace: dict[str, Any] | None = None,
+    analyses: list[QueryAnalysis | None] | None = None,
+) -> list[str]:
+    """Batch counterpart of `build_collection_context` built on `retrieve_collection_documents_batch`."""
+    resolved_budgets = budgets or [None] * len(questions)
+    docs_per_question = retrieve_collection_documents_batch(
+        questions,
+        collection_keys,
+        traces=traces,
+        budgets=resolved_budgets,
+        batch_trace=batch_trace,
+        analyses=analyses,
+    )
+    contexts: list[str] = []
+    for position, docs in enumerate(docs_per_question):
+        packed_context = _packed_context_for(
+            docs,
+            resolved_budgets[position],
+            question=questions[position],
+            analysis=analyses[position] if analyses else None,
+        )
+        if traces and traces[position] is not None:
+            traces[position].update(packed_context.to_trace())
+        contexts.append(packed_context.text)
+    return contexts
+
+
+async def aretrieve_collection_documents(
+    question: str,
+    collection_keys: list[str],
+    trace: dict[str, Any] | None = None,
+    budget: dict[str, object] | None = None,
+    analysis: QueryAnalysis | None = None,
+) -> list[Document]:
+    """Async entry point for retrieval; Chroma and bge-m3 are blocking, so the work runs off the event loop."""
+    return await asyncio.to_thread(
+        retrieve_collection_documents,
+        question,
+        collection_keys,
+        trace=trace,
+        budget=budget,
+        analysis=analysis,
+    )
+
+
+def get_answer_pipeline(llm, query_profile: str | None = None, trace: dict[str, Any] | None = None):
+    resolved_profile = get_query_profile(query_profile)
+    pipeline, cache_hit = llm_client_cache_service.get_or_create_answer_pipeline(
+        llm,
+        resolved_profile,
+        lambda: get_prompt_template(resolved_profile) | llm | StrOutputParser(),
     )
-    context = format_docs_with_limit(docs, max_chars=max_context_chars)
     if trace is not None:
-        trace["context_chars"] = len(context)
-    return context
+        trace["query_chain_cache"] = "hit" if cache_hit else "miss"
+    return pipeline
 
 
-def build_query_chain(context_builder, llm, query_profile: str | None = None):
+def build_query_chain(
+    context_builder,
+    llm,
+    query_profile: str | None = None,
+    trace: dict[str, Any] | None = None,
+):
     context_runnable = context_builder
     if callable(context_builder):
         context_runnable = RunnableLambda(context_builder)
-    return (
-        {"context": context_runnable, "question": RunnablePassthrough()}
-        | get_prompt_template(query_profile)
-        | llm
-        | StrOutputParser()
+    return {"context": context_runnable, "question": RunnablePassthrough()} | get_answer_pipeline(
+        llm,
+        query_profile,
+        trace=trace,
     )
 
 
+def stream_query_answer(
+    llm,
+    question: str,
+    context: str,
+    *,
+    timeout_seconds: int = DEFAULT_QUERY_TIMEOUT_SECONDS,
+    trace: dict[str, Any] | None = None,
+    query_profile: str | None = None,
+    deadline: QueryDeadline | None = None,
+) -> Iterator[str]:
+    """Stream raw answer deltas for an already-built context; callers post-process the joined text.
+
+    With a `deadline`, the stream stops at the request deadline instead of a
+    fresh `timeout_seconds` window and the LLM call is sized from the time left.
+    """
+    started_at = time.perf_counter()
+    if deadline is not None:
+        timeout_seconds = min(timeout_seconds, deadline.check("llm"))
+    chain = get_answer_pipeline(llm, query_profile)
+    config = deadline.runnable_config() if deadline is not None else None
+    first_token_ms: float | None = None
+    for delta in chain.stream({"context": context, "question": question}, config=config):
+        elapsed_seconds = time.perf_counter() - started_at
+        if elapsed_seconds > timeout_seconds:
+            if trace is not None:
+                trace["invoke_ms"] = round(elapsed_seconds * 1000, 3)
+                trace["status"] = "timeout"
+            raise TimeoutError("LLM invocation timed out.")
+        if not delta:
+            continue
+        if first_token_ms is None:
+            first_token_ms = round(elapsed_seconds * 1000, 3)
+            if trace is not None:
+                trace["first_token_ms"] = first_token_ms
+        yield str(delta)
+    if trace is not None:
+        trace["invoke_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+        trace["status"] = "ok"
+        trace["streamed"] = True
+
+
 def invoke_query_chain(
     chain,
     question: str,
     timeout_seconds: int = DEFAULT_QUERY_TIMEOUT_SECONDS,
     trace: dict[str, Any] | None = None,
     query_profile: str | None = None,
+    deadline: QueryDeadline | None = None,
 ) -> str:
     started_at = time.perf_counter()
+    if deadline is not None:
+        timeout_seconds = min(timeout_seconds, deadline.check("context"))
+    invoke_args = (question,) if deadline is None else (question, deadline.runnable_config())
     executor = ThreadPoolExecutor(max_workers=1)
-    future = executor.submit(chain.invoke, question)
+    future = executor.submit(chain.invoke, *invoke_args)
     try:
         answer = future.result(timeout=timeout_seconds)
         elapsed_ms = round((time.perf_counter() - started_at) * 1000, 3)
@@ -1019,3 +1624,36 @@ def invoke_query_chain(
         raise TimeoutError("LLM invocation timed out.") from exc
     finally:
         executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def ainvoke_query_chain(
+    chain,
+    question: str,
+    timeout_seconds: int = DEFAULT_QUERY_TIMEOUT_SECONDS,
+    trace: dict[str, Any] | None = None,
+    query_profile: str | None = None,
+    deadline: QueryDeadline | None = None,
+) -> str:
+    """Async counterpart of `invoke_query_chain`; on timeout the awaiting task is cancelled, which closes the LLM request.
+
+    The chain builds its context before calling the LLM, so with a `deadline`
+    both share what is left of the request timeout.
+    """
+    started_at = time.perf_counter()
+    if deadline is not None:
+        timeout_seconds = min(timeout_seconds, deadline.check("context"))
+    invoke_args = (question,) if deadline is None else (question, deadline.runnable_config())
+    try:
+        async with asyncio.timeout(timeout_seconds):
+            answer = await chain.ainvoke(*invoke_args)
+    except TimeoutError as exc:
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000, 3)
+        if trace is not None:
+            trace["invoke_ms"] = elapsed_ms
+            trace["status"] = "timeout"
+        raise TimeoutError("LLM invocation timed out.") from exc
+    elapsed_ms = round((time.perf_counter() - started_at) * 1000, 3)
+    if trace is not None:
+        trace["invoke_ms"] = elapsed_ms
+        trace["status"] = "ok"
+    return postprocess_answer(question, str(answer or ""), query_profile=query_profile)
@@ -16,18 +16,39 @@ from common import (
     resolve_llm_config,
 )
 from core.settings import (
+    ADAPTIVE_BUDGET_ENV_KEY,
     ADMIN_CODE_ENV_KEY,
+    ANSWER_CACHE_TTL_SECONDS_ENV_KEY,
     AUTO_APPROVE_ENV_KEY,
     CHUNK_TOKEN_ENCODING_ENV_KEY,
     CHUNKING_MODE_ENV_KEY,
+    CONTEXT_COMPRESSION_AUTO,
+    CONTEXT_COMPRESSION_ENV_KEY,
+    CONTEXT_COMPRESSION_ON,
+    DEFAULT_ANSWER_CACHE_TTL_SECONDS,
+    DEFAULT_CONTEXT_COMPRESSION_MODE,
+    DEFAULT_LLM_MAX_CONCURRENCY,
+    DEFAULT_LLM_MAX_QUEUE_DEPTH,
     DEFAULT_MAX_CONTEXT_CHARS,
+    DEFAULT_MAX_CONTEXT_TOKENS,
+    DEFAULT_QUERY_BATCH_MAX_CONCURRENCY,
     DEFAULT_QUERY_TIMEOUT_SECONDS,
+    DEFAULT_RETRIEVAL_MAX_WORKERS,
+    DEFAULT_RETRIEVAL_MMR_SCOPE,
     DEFAULT_EMBEDDING_MODEL,
     EMBEDDING_MODEL_ENV_KEY,
+    LLM_MAX_CONCURRENCY_ENV_KEY,
+    LLM_MAX_QUEUE_DEPTH_ENV_KEY,
     SEARCH_FETCH_K,
     SEARCH_K,
+    SUPPORTED_CONTEXT_COMPRESSION_MODES,
     MAX_CONTEXT_CHARS_ENV_KEY,
+    MAX_CONTEXT_TOKENS_ENV_KEY,
+    QUERY_BATCH_MAX_CONCURRENCY_ENV_KEY,
     QUERY_TIMEOUT_SECONDS_ENV_KEY,
+    RETRIEVAL_MAX_WORKERS_ENV_KEY,
+    RETRIEVAL_MMR_SCOPE_ENV_KEY,
+    SUPPORTED_RETRIEVAL_MMR_SCOPES,
 )
 
 logger = logging.getLogger("doc_rag.api")
@@ -80,6 +101,10 @@ def is_auto_approve_enabled() -> bool:
     return parse_bool_env(AUTO_APPROVE_ENV_KEY, default=False)
 
 
+def is_adaptive_budget_enabled() -> bool:
+    return parse_bool_env(ADAPTIVE_BUDGET_ENV_KEY, default=False)
+
+
 def get_query_timeout_seconds() -> int:
     raw = os.getenv(QUERY_TIMEOUT_SECONDS_ENV_KEY, str(DEFAULT_QUERY_TIMEOUT_SECONDS))
     try:
@@ -120,6 +145,127 @@ def get_max_context_chars() -> int | None:
     return value
 
 
+def get_max_context_tokens() -> int:
+    raw = os.getenv(MAX_CONTEXT_TOKENS_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_MAX_CONTEXT_TOKENS
+    try:
+        value = int(raw.strip())
+    except (TypeError, ValueError):
+        logger.warning("invalid max context tokens: %s (fallback=%s)", raw, DEFAULT_MAX_CONTEXT_TOKENS)
+        return DEFAULT_MAX_CONTEXT_TOKENS
+    if value <= 0:
+        logger.warning("max context tokens must be > 0: %s (fallback=%s)", value, DEFAULT_MAX_CONTEXT_TOKENS)
+        return DEFAULT_MAX_CONTEXT_TOKENS
+    return value
+
+
+def get_retrieval_max_workers() -> int:
+    raw = os.getenv(RETRIEVAL_MAX_WORKERS_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_RETRIEVAL_MAX_WORKERS
+    try:
+        value = int(raw.strip())
+    except (TypeError, ValueError):
+        logger.warning("invalid retrieval max workers: %s (fallback=%s)", raw, DEFAULT_RETRIEVAL_MAX_WORKERS)
+        return DEFAULT_RETRIEVAL_MAX_WORKERS
+    if value <= 0:
+        logger.warning("retrieval max workers must be > 0: %s (fallback=%s)", value, DEFAULT_RETRIEVAL_MAX_WORKERS)
+        return DEFAULT_RETRIEVAL_MAX_WORKERS
+    return value
+
+
+def get_retrieval_mmr_scope() -> str:
+    raw = os.getenv(RETRIEVAL_MMR_SCOPE_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_RETRIEVAL_MMR_SCOPE
+    value = raw.strip().lower()
+    if value not in SUPPORTED_RETRIEVAL_MMR_SCOPES:
+        logger.warning("invalid retrieval mmr scope: %s (fallback=%s)", raw, DEFAULT_RETRIEVAL_MMR_SCOPE)
+        return DEFAULT_RETRIEVAL_MMR_SCOPE
+    return value
+
+
+def get_context_compression_mode() -> str:
+    raw = os.getenv(CONTEXT_COMPRESSION_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_CONTEXT_COMPRESSION_MODE
+    value = raw.strip().lower()
+    if value not in SUPPORTED_CONTEXT_COMPRESSION_MODES:
+        logger.warning("invalid context compression mode: %s (fallback=%s)", raw, DEFAULT_CONTEXT_COMPRESSION_MODE)
+        return DEFAULT_CONTEXT_COMPRESSION_MODE
+    return value
+
+
+def _resolve_context_compression(profile_default: bool) -> bool:
+    mode = get_context_compression_mode()
+    if mode == CONTEXT_COMPRESSION_AUTO:
+        return profile_default
+    return mode == CONTEXT_COMPRESSION_ON
+
+
+def get_answer_cache_ttl_seconds() -> int:
+    raw = os.getenv(ANSWER_CACHE_TTL_SECONDS_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_ANSWER_CACHE_TTL_SECONDS
+    try:
+        value = int(raw.strip())
+    except (TypeError, ValueError):
+        logger.warning("invalid answer cache ttl: %s (fallback=%s)", raw, DEFAULT_ANSWER_CACHE_TTL_SECONDS)
+        return DEFAULT_ANSWER_CACHE_TTL_SECONDS
+    return max(0, value)
+
+
+def get_llm_max_concurrency() -> int:
+    raw = os.getenv(LLM_MAX_CONCURRENCY_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_LLM_MAX_CONCURRENCY
+    try:
+        value = int(raw.strip())
+    except (TypeError, ValueError):
+        logger.warning("invalid llm max concurrency: %s (fallback=%s)", raw, DEFAULT_LLM_MAX_CONCURRENCY)
+        return DEFAULT_LLM_MAX_CONCURRENCY
+    if value <= 0:
+        logger.warning("llm max concurrency must be > 0: %s (fallback=%s)", value, DEFAULT_LLM_MAX_CONCURRENCY)
+        return DEFAULT_LLM_MAX_CONCURRENCY
+    return value
+
+
+def get_llm_max_queue_depth() -> int:
+    raw = os.getenv(LLM_MAX_QUEUE_DEPTH_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_LLM_MAX_QUEUE_DEPTH
+    try:
+        value = int(raw.strip())
+    except (TypeError, ValueError):
+        logger.warning("invalid llm max queue depth: %s (fallback=%s)", raw, DEFAULT_LLM_MAX_QUEUE_DEPTH)
+        return DEFAULT_LLM_MAX_QUEUE_DEPTH
+    return max(0, value)
+
+
+def get_query_batch_max_concurrency() -> int:
+    raw = os.getenv(QUERY_BATCH_MAX_CONCURRENCY_ENV_KEY)
+    if raw is None or not raw.strip():
+        return DEFAULT_QUERY_BATCH_MAX_CONCURRENCY
+    try:
+        value = int(raw.strip())
+    except (TypeError, ValueError):
+        logger.warning(
+            "invalid query batch max concurrency: %s (fallback=%s)",
+            raw,
+            DEFAULT_QUERY_BATCH_MAX_CONCURRENCY,
+        )
+        return DEFAULT_QUERY_BATCH_MAX_CONCURRENCY
+    if value <= 0:
+        logger.warning(
+            "query batch max concurrency must be > 0: %s (fallback=%s)",
+            value,
+            DEFAULT_QUERY_BATCH_MAX_CONCURRENCY,
+        )
+        return DEFAULT_QUERY_BATCH_MAX_CONCURRENCY
+    return value
+
+
 def get_chunking_config() -> dict[str, str]:
     raw_mode = os.getenv(CHUNKING_MODE_ENV_KEY, CHUNKING_MODE_CHAR)
     try:
@@ -282,6 +428,10 @@ def _bounded_context_limit(target: int) -> int:
     return min(get_max_context_chars() or DEFAULT_MAX_CONTEXT_CHARS, target)
 
 
+def _bounded_context_tokens(target: int) -> int:
+    return min(get_max_context_tokens(), target)
+
+
 def _build_budget_summary(
     *,
     profile_name: str,
@@ -289,13 +439,14 @@ def _build_budget_summary(
     per_collection_fetch_k: int,
     max_total_docs: int,
     max_context_chars: int,
+    max_context_tokens: int,
     generation_budget_profile: str,
     max_output_tokens: int | None,
 ) -> str:
     output_text = "-" if max_output_tokens is None else str(max_output_tokens)
     return (
         f"profile={profile_name} | k={per_collection_k} | fetch_k={per_collection_fetch_k} | "
-        f"max_docs={max_total_docs} | context={max_context_chars} | "
+        f"max_docs={max_total_docs} | context={max_context_chars} | context_tokens={max_context_tokens} | "
         f"generation={generation_budget_profile} | max_output_tokens={output_text}"
     )
 
@@ -325,6 +476,7 @@ def plan_query_budget(
                 per_collection_fetch_k = 3
                 max_total_docs = 2
                 max_context_chars = _bounded_context_limit(900)
+                max_context_tokens = _bounded_context_tokens(384)
                 generation_budget_profile = GENERATION_BUDGET_RESTRICTED
                 max_output_tokens = 128
             else:
@@ -333,6 +485,7 @@ def plan_query_budget(
                 per_collection_fetch_k = 6
                 max_total_docs = 2
                 max_context_chars = _bounded_context_limit(1200)
+                max_context_tokens = _bounded_context_tokens(512)
                 generation_budget_profile = GENERATION_BUDGET_COMPACT
                 max_output_tokens = 160
         elif is_multi:
@@ -341,6 +494,7 @@ def plan_query_budget(
             per_collection_fetch_k = 4
             max_total_docs = 4
             max_context_chars = min(default_context, 1200)
+            max_context_tokens = _bounded_context_tokens(768)
             generation_budget_profile = GENERATION_BUDGET_COMPACT
             max_output_tokens = 160
         else:
@@ -349,6 +503,7 @@ def plan_query_budget(
             per_collection_fetch_k = SEARCH_FETCH_K
             max_total_docs = SEARCH_K
             max_context_chars = default_context
+            max_context_tokens = _bounded_context_tokens(1024)
             generation_budget_profile = GENERATION_BUDGET_STANDARD
             max_output_tokens = 192
     elif runtime_profile["status"] == RUNTIME_PROFILE_VERIFIED and runtime_profile["scope"] == "cloud":
@@ -358,6 +513,7 @@ def plan_query_budget(
             per_collection_fetch_k = 5
             max_total_docs = 4
             max_context_chars = min(default_context, 1600)
+            max_context_tokens = _bounded_context_tokens(1024)
             generation_budget_profile = GENERATION_BUDGET_CLOUD_BALANCED
             max_output_tokens = 224
         else:
@@ -366,6 +522,7 @@ def plan_query_budget(
             per_collection_fetch_k = SEARCH_FETCH_K
             max_total_docs = SEARCH_K
             max_context_chars = min(default_context, 1800)
+            max_context_tokens = _bounded_context_tokens(1280)
             generation_budget_profile = GENERATION_BUDGET_CLOUD_BALANCED
             max_output_tokens = 256
     elif runtime_profile["status"] == RUNTIME_PROFILE_NOT_RECOMMENDED and runtime_profile["scope"] == "local":
@@ -374,6 +531,7 @@ def plan_query_budget(
         per_collection_fetch_k = 2 if is_multi else 3
         max_total_docs = 2 if is_multi else 1
         max_context_chars = _bounded_context_limit(700 if is_multi else 900)
+        max_context_tokens = _bounded_context_tokens(256 if is_multi else 320)
         generation_budget_profile = GENERATION_BUDGET_RESTRICTED
         max_output_tokens = 96
     elif runtime_profile["scope"] == "local":
@@ -383,6 +541,7 @@ def plan_query_budget(
             per_collection_fetch_k = 3
             max_total_docs = 2
             max_context_chars = _bounded_context_limit(900)
+            max_context_tokens = _bounded_context_tokens(384)
             generation_budget_profile = GENERATION_BUDGET_RESTRICTED
             max_output_tokens = 128
         else:
@@ -391,6 +550,7 @@ def plan_query_budget(
             per_collection_fetch_k = 6
             max_total_docs = 2
             max_context_chars = _bounded_context_limit(1200)
+            max_context_tokens = _bounded_context_tokens(512)
             generation_budget_profile = GENERATION_BUDGET_COMPACT
             max_output_tokens = 160
     else:
@@ -400,6 +560,7 @@ def plan_query_budget(
             per_collection_fetch_k = 5
             max_total_docs = 4
             max_context_chars = min(default_context, 1500)
+            max_context_tokens = _bounded_context_tokens(960)
             generation_budget_profile = GENERATION_BUDGET_CLOUD_BALANCED
             max_output_tokens = 192
         else:
@@ -408,15 +569,21 @@ def plan_query_budget(
             per_collection_fetch_k = SEARCH_FETCH_K
             max_total_docs = SEARCH_K
             max_context_chars = min(default_context, 1600)
+            max_context_tokens = _bounded_context_tokens(1024)
             generation_budget_profile = GENERATION_BUDGET_CLOUD_BALANCED
             max_output_tokens = 224
 
+    # Small local models pay the most prefill per irrelevant sentence, so they compress by default.
+    context_compression = _resolve_context_compression(
+        generation_budget_profile == GENERATION_BUDGET_RESTRICTED or profile_name.startswith("verified_fast_local")
+    )
     summary = _build_budget_summary(
         profile_name=profile_name,
         per_collection_k=per_collection_k,
         per_collection_fetch_k=per_collection_fetch_k,
         max_total_docs=max_total_docs,
         max_context_chars=max_context_chars,
+        max_context_tokens=max_context_tokens,
         generation_budget_profile=generation_budget_profile,
         max_output_tokens=max_output_tokens,
     )
@@ -430,6 +597,8 @@ def plan_query_budget(
         "per_collection_fetch_k": per_collection_fetch_k,
         "max_total_docs": max_total_docs,
         "max_context_chars": max_context_chars,
+        "max_context_tokens": max_context_tokens,
+        "context_compression": context_compression,
         "generation_budget_profile": generation_budget_profile,
         "max_output_tokens": max_output_tokens,
     }
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+SINGLE_FLIGHT_ROLE_LEADER = "leader"
+SINGLE_FLIGHT_ROLE_FOLLOWER = "follower"
+
+
+@dataclass(frozen=True)
+class SingleFlightInfo:
+    role: str
+    leader_request_id: str
+
+    @property
+    def coalesced(self) -> bool:
+        return self.role == SINGLE_FLIGHT_ROLE_FOLLOWER
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    loop: asyncio.AbstractEventLoop
+    leader_request_id: str
+    followers: int = 0
+
+
+_IN_FLIGHT: dict[Hashable, _Flight] = {}
+_SINGLE_FLIGHT_STATS = {"leaders": 0, "followers": 0}
+_SINGLE_FLIGHT_LOCK = threading.Lock()
+
+
+def _forget_flight(key: Hashable, flight: _Flight) -> None:
+    with _SINGLE_FLIGHT_LOCK:
+        if _IN_FLIGHT.get(key) is flight:
+            _IN_FLIGHT.pop(key, None)
+
+
+async def run_single_flight(
+    key: Hashable,
+    factory: Callable[[], Awaitable[Any]],
+    *,
+    request_id: str,
+    follower_timeout_seconds: float | None = None,
+) -> tuple[Any, SingleFlightInfo]:
+    """Run `factory()` once per key among concurrent callers and share its result.
+
+    The computation runs as its own task and every caller awaits it through
+    `asyncio.shield`, so a disconnecting caller never cancels the work for the
+    others. Followers may bound their wait with `follower_timeout_seconds`;
+    exceeding it raises `TimeoutError` for that follower only. Exceptions from
+    the computation are re-raised to every caller.
+    """
+    loop = asyncio.get_running_loop()
+    with _SINGLE_FLIGHT_LOCK:
+        flight = _IN_FLIGHT.get(key)
+        if flight is not None and flight.loop is loop and not flight.task.done():
+            flight.followers += 1
+            _SINGLE_FLIGHT_STATS["followers"] += 1
+            role = SINGLE_FLIGHT_ROLE_FOLLOWER
+        else:
+            flight = _Flight(
+                task=loop.create_task(factory()),
+                loop=loop,
+                leader_request_id=request_id,
+            )
+            _IN_FLIGHT[key] = flight
+            _SINGLE_FLIGHT_STATS["leaders"] += 1
+            role = SINGLE_FLIGHT_ROLE_LEADER
+
+    if role == SINGLE_FLIGHT_ROLE_LEADER:
+        current = flight
+        flight.task.add_done_callback(lambda _task: _forget_flight(key, current))
+
+    info = SingleFlightInfo(role=role, leader_request_id=flight.leader_request_id)
+    if role == SINGLE_FLIGHT_ROLE_FOLLOWER and follower_timeout_seconds is not None:
+        async with asyncio.timeout(follower_timeout_seconds):
+            return await asyncio.shield(flight.task), info
+    return await asyncio.shield(flight.task), info
+
+
+def get_single_flight_stats() -> dict[str, int]:
+    with _SINGLE_FLIGHT_LOCK:
+        return {**_SINGLE_FLIGHT_STATS, "in_flight": len(_IN_FLIGHT)}
+
+
+def clear_single_flight_state() -> None:
+    with _SINGLE_FLIGHT_LOCK:
+        _IN_FLIGHT.clear()
+        for name in _SINGLE_FLIGHT_STATS:
+            _SINGLE_FLIGHT_STATS[name] = 0
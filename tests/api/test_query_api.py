@@ -1,10 +1,26 @@
 from __future__ import annotations
 
+import functools
+import json
+
 from chromadb.errors import InvalidDimensionException
 
 from api import routes_query
 
 
+def _as_async(fake):
+    @functools.wraps(fake)
+    async def _wrapper(*args, **kwargs):
+        return fake(*args, **kwargs)
+
+    return _wrapper
+
+
+class _EmptyRetriever:
+    def invoke(self, question):
+        return []
+
+
 def _assert_query_error_shape(response, expected_status: int, expected_code: str):
     assert response.status_code == expected_status
     body = response.json()
@@ -19,7 +35,7 @@ def _assert_query_error_shape(response, expected_status: int, expected_code: str
 def test_query_success_case(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
     monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
@@ -38,8 +54,8 @@ def test_query_success_case(client, monkeypatch):
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda retriever, llm: object())
     monkeypatch.setattr(
         routes_query.query_service,
-        "invoke_query_chain",
-        lambda chain, question, timeout_seconds=15: "모킹 응답",
+        "ainvoke_query_chain",
+        _as_async(lambda chain, question, timeout_seconds=15: "모킹 응답"),
     )
 
     response = client.post(
@@ -107,7 +123,7 @@ def test_query_debug_response_includes_meta(client, monkeypatch):
         return "메타 포함 응답"
 
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _invoke_query_chain)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
 
     response = client.post(
         "/query",
@@ -182,7 +198,7 @@ def test_query_guard_replaces_false_not_found_when_supported_context_exists(clie
         return "제공된 문서에서 확인되지 않습니다."
 
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _invoke_query_chain)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
 
     response = client.post(
         "/query",
@@ -203,10 +219,69 @@ def test_query_guard_replaces_false_not_found_when_supported_context_exists(clie
     assert body["meta"]["invoke"]["answer_guard"]["reason"] == "supported_context_false_not_found"
 
 
+def test_query_fast_mode_answers_extractively_without_llm(client, monkeypatch):
+    class DummyRetriever:
+        def invoke(self, question):
+            from langchain_core.documents import Document
+
+            return [
+                Document(
+                    page_content=(
+                        "| status | meaning | operator action |\n"
+                        "| --- | --- | --- |\n"
+                        "| `hit` | Quality mode found relation context and appended it to RAG context. | "
+                        "Treat transport as healthy; evaluate answer quality separately. |"
+                    ),
+                    metadata={"source": "BROWSER_COMPANION_OPERATOR_GUIDE.md", "h2": "Graph-Lite Status Meanings"},
+                )
+            ]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever()
+
+    def _llm_must_not_run(*args, **kwargs):
+        raise AssertionError("fast mode must not create or admit an LLM call")
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="project_docs": DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="project_docs": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", _llm_must_not_run)
+    monkeypatch.setattr(routes_query.admission_service, "get_admission_controller", _llm_must_not_run)
+
+    payload = {
+        "query": "Browser companion에서 graph-lite=hit는 무엇을 뜻하나?",
+        "collection": "project_docs",
+        "quality_mode": "fast",
+        "debug": True,
+    }
+    response = client.post("/query", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["answer"].startswith("문서 근거로 확인되는 내용입니다.")
+    assert "graph-lite=hit" in body["answer"]
+    assert body["meta"]["quality_mode"] == "fast"
+    assert body["meta"]["invoke"]["llm_skipped"] is True
+    assert body["meta"]["invoke"]["status"] == "ok"
+    assert body["meta"]["citations"]
+    assert body["meta"]["support_level"] in {"supported", "limited"}
+
+    stream = client.post("/query/stream", json={**payload, "query": "graph-lite=hit 상태의 의미는?"})
+    events = [json.loads(line) for line in stream.text.splitlines() if line.strip()]
+    assert [event["event"] for event in events] == ["sources", "token", "final"]
+    assert events[-1]["meta"]["invoke"]["strategy"] == "extractive_context_lines"
+
+
 def test_query_quality_mode_appends_graph_lite_context(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     captured: dict[str, object] = {}
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
@@ -274,7 +349,7 @@ def test_query_quality_mode_appends_graph_lite_context(client, monkeypatch):
         return "graph-lite quality 응답"
 
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _invoke_query_chain)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
 
     response = client.post(
         "/query",
@@ -306,7 +381,7 @@ def test_query_quality_mode_appends_graph_lite_context(client, monkeypatch):
 def test_query_quality_mode_falls_back_when_graph_lite_snapshot_missing(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     captured: dict[str, object] = {}
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
@@ -350,7 +425,7 @@ def test_query_quality_mode_falls_back_when_graph_lite_snapshot_missing(client,
         return "fallback quality 응답"
 
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _invoke_query_chain)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
 
     response = client.post(
         "/query",
@@ -377,7 +452,7 @@ def test_query_quality_mode_falls_back_when_graph_lite_snapshot_missing(client,
 def test_query_balanced_mode_does_not_load_graph_lite(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     captured: dict[str, object] = {}
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
@@ -416,7 +491,7 @@ def test_query_balanced_mode_does_not_load_graph_lite(client, monkeypatch):
         return "balanced 응답"
 
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _invoke_query_chain)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
 
     response = client.post(
         "/query",
@@ -497,6 +572,66 @@ def test_semantic_search_success_case(client, monkeypatch):
     assert "mmr" in body["meta"]["retrieval_strategy"]
 
 
+def test_semantic_search_does_not_coalesce_requests_with_different_per_collection_k(client, monkeypatch):
+    import threading
+    import time
+
+    from langchain_core.documents import Document
+
+    retrieved_k: list[int] = []
+
+    class DummyRetriever:
+        def __init__(self, k: int):
+            self.k = k
+
+        def invoke(self, question):
+            retrieved_k.append(self.k)
+            time.sleep(0.3)
+            return [
+                Document(page_content=f"프랑스 과학 기관 본문 {index}", metadata={"source": "fr_doc.md", "h2": "기관"})
+                for index in range(self.k)
+            ]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever(kwargs["search_kwargs"]["k"])
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    # "ge" is empty, so ["fr", "ge"] resolves to the same single active collection as ["fr"].
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 0 if key == "ge" else 1)
+    monkeypatch.setattr(routes_query.index_service, "get_collection_documents_from_store", lambda key="all": [])
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+
+    responses: dict[str, object] = {}
+
+    def _post(request_id: str, payload: dict[str, object]) -> None:
+        responses[request_id] = client.post(
+            "/semantic-search",
+            json={"query": "프랑스 과학 기관", "max_results": 3, **payload},
+            headers={"X-Request-ID": request_id},
+        )
+
+    threads = [
+        threading.Thread(target=_post, args=("req-multi", {"collections": ["fr", "ge"]})),
+        threading.Thread(target=_post, args=("req-single", {"collection": "fr"})),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(retrieved_k) == [2, 3]
+    assert responses["req-multi"].headers.get("X-RAG-Route-Reason") == "explicit_multi"
+    assert responses["req-single"].headers.get("X-RAG-Route-Reason") == "explicit"
+    assert len(responses["req-multi"].json()["results"]) == 2
+    assert len(responses["req-single"].json()["results"]) == 3
+
+
 def test_semantic_search_vectorstore_empty(client, monkeypatch):
     monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 0)
     response = client.post(
@@ -509,10 +644,74 @@ def test_semantic_search_vectorstore_empty(client, monkeypatch):
     assert "Reindex" in (body.get("hint") or "")
 
 
+def test_semantic_search_batch_returns_results_keyed_per_query(client, monkeypatch):
+    from langchain_core.documents import Document
+
+    from services import lexical_index_service
+
+    search_calls: list[tuple[str, int]] = []
+
+    class DummyDB:
+        def __init__(self, key: str):
+            self.key = key
+
+        def max_marginal_relevance_search_by_vector(self, embedding, k, fetch_k, lambda_mult):
+            search_calls.append((self.key, int(embedding[0])))
+            return [
+                Document(
+                    page_content=f"{self.key} 문서 본문 {int(embedding[0])}",
+                    metadata={"source": f"{self.key}_doc{int(embedding[0])}.md", "h2": self.key},
+                )
+            ]
+
+    embedding_batches: list[list[str]] = []
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB(key))
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_collection_lexical_index",
+        lambda key="all": lexical_index_service.build_lexical_index([]),
+    )
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_query_embeddings",
+        lambda questions: embedding_batches.append(list(questions))
+        or [([float(index)], False) for index, _question in enumerate(questions)],
+    )
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+
+    response = client.post(
+        "/semantic-search/batch",
+        json={"queries": ["프랑스 기관", "독일 대학", "프랑스 기관"], "collections": ["fr", "ge"], "max_results": 2},
+        headers={"X-Request-ID": "req-semantic-batch"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers.get("X-Request-ID") == "req-semantic-batch"
+    body = response.json()
+    assert list(body["results"]) == ["프랑스 기관", "독일 대학"]
+    assert [item["source"] for item in body["results"]["독일 대학"]] == ["fr_doc1.md", "ge_doc1.md"]
+    assert body["meta"]["query_count"] == 2
+    assert body["meta"]["routes"]["프랑스 기관"]["collections"] == ["fr", "ge"]
+    assert body["meta"]["routes"]["프랑스 기관"]["route_reason"] == "explicit_multi"
+    assert embedding_batches == [["프랑스 기관", "독일 대학"]]
+    assert sorted(search_calls) == [("fr", 0), ("fr", 1), ("ge", 0), ("ge", 1)]
+    assert [item["queries"] for item in body["meta"]["stage_timings"]["batch_collections"]] == [2, 2]
+
+
+def test_semantic_search_batch_rejects_invalid_collection(client):
+    response = client.post("/semantic-search/batch", json={"queries": ["질문"], "collection": "nope"})
+    _assert_query_error_shape(response, 400, "INVALID_COLLECTION")
+
+
 def test_query_supports_query_profile_override(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     captured: dict[str, object] = {}
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
@@ -539,7 +738,7 @@ def test_query_supports_query_profile_override(client, monkeypatch):
         return "profile override 응답"
 
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _invoke_query_chain)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
 
     response = client.post(
         "/query",
@@ -556,7 +755,7 @@ def test_query_supports_query_profile_override(client, monkeypatch):
 def test_query_defaults_to_generic_all_route_even_when_env_prefers_sample_pack(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     captured: dict[str, object] = {}
     monkeypatch.setenv("DOC_RAG_QUERY_PROFILE", "sample_pack")
@@ -584,7 +783,7 @@ def test_query_defaults_to_generic_all_route_even_when_env_prefers_sample_pack(c
         return "generic default 응답"
 
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _invoke_query_chain)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
 
     response = client.post(
         "/query",
@@ -619,7 +818,7 @@ def test_query_vectorstore_empty(client, monkeypatch):
 def test_query_invalid_provider(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
     monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
@@ -632,7 +831,7 @@ def test_query_invalid_provider(client, monkeypatch):
 def test_query_llm_connection_failed(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
     monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
@@ -660,7 +859,7 @@ def test_query_llm_connection_failed(client, monkeypatch):
 def test_query_timeout(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
     monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
@@ -683,7 +882,7 @@ def test_query_timeout(client, monkeypatch):
         captured["timeout_seconds"] = timeout_seconds
         raise TimeoutError("timeout")
 
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _raise_timeout)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_raise_timeout))
     response = client.post("/query", json={"query": "테스트", "llm_provider": "ollama", "timeout_seconds": 60})
     body = _assert_query_error_shape(response, 504, "LLM_TIMEOUT")
     assert "/intro" in (body.get("hint") or "")
@@ -693,7 +892,7 @@ def test_query_timeout(client, monkeypatch):
 def test_query_reports_embedding_dimension_mismatch(client, monkeypatch):
     class DummyDB:
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
     monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
@@ -714,7 +913,7 @@ def test_query_reports_embedding_dimension_mismatch(client, monkeypatch):
     def _raise_dimension_mismatch(chain, question, timeout_seconds=15):
         raise InvalidDimensionException("Embedding dimension 1024 does not match collection dimensionality 128")
 
-    monkeypatch.setattr(routes_query.query_service, "invoke_query_chain", _raise_dimension_mismatch)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_raise_dimension_mismatch))
     response = client.post("/query", json={"query": "테스트", "llm_provider": "ollama"})
     body = _assert_query_error_shape(response, 409, "VECTORSTORE_EMBEDDING_MISMATCH")
     assert "Reindex" in (body.get("hint") or "")
@@ -804,7 +1003,7 @@ def test_query_with_two_collections(client, monkeypatch):
             self.key = key
 
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB(key))
     monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
@@ -823,8 +1022,8 @@ def test_query_with_two_collections(client, monkeypatch):
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda retriever, llm: object())
     monkeypatch.setattr(
         routes_query.query_service,
-        "invoke_query_chain",
-        lambda chain, question, timeout_seconds=15: "다중 컬렉션 응답",
+        "ainvoke_query_chain",
+        _as_async(lambda chain, question, timeout_seconds=15: "다중 컬렉션 응답"),
     )
 
     response = client.post(
@@ -854,7 +1053,7 @@ def test_query_auto_routes_multi_country_keywords_only_for_sample_pack_profile(c
             self.key = key
 
         def as_retriever(self, **kwargs):
-            return object()
+            return _EmptyRetriever()
 
     monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB(key))
     monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
@@ -873,8 +1072,8 @@ def test_query_auto_routes_multi_country_keywords_only_for_sample_pack_profile(c
     monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda retriever, llm: object())
     monkeypatch.setattr(
         routes_query.query_service,
-        "invoke_query_chain",
-        lambda chain, question, timeout_seconds=15: "자동 다중 라우팅 응답",
+        "ainvoke_query_chain",
+        _as_async(lambda chain, question, timeout_seconds=15: "자동 다중 라우팅 응답"),
     )
 
     response = client.post(
@@ -912,3 +1111,715 @@ def test_query_blocks_embedding_fingerprint_mismatch(client, monkeypatch):
 
     body = _assert_query_error_shape(response, 409, "VECTORSTORE_EMBEDDING_MISMATCH")
     assert "DOC_RAG_EMBEDDING_MODEL" in (body.get("hint") or "")
+
+
+def test_query_answer_cache_hits_until_collection_is_invalidated(client, monkeypatch):
+    class DummyRetriever:
+        def invoke(self, question):
+            from langchain_core.documents import Document
+
+            return [Document(page_content="캐시 문서 본문", metadata={"source": "all.md", "h2": "개요"})]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever()
+
+    invoke_calls: list[str] = []
+
+    def _invoke_query_chain(chain, question, timeout_seconds=15, trace=None):
+        chain(question)
+        invoke_calls.append(question)
+        if trace is not None:
+            trace["status"] = "ok"
+        return f"캐시 응답 {len(invoke_calls)}"
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda context_builder, llm: context_builder)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
+
+    payload = {"query": "캐시  질문", "llm_provider": "ollama", "debug": True}
+    first = client.post("/query", json=payload)
+    second = client.post("/query", json={**payload, "query": "캐시 질문"})
+    routes_query.index_service.invalidate_runtime_state(["all"])
+    third = client.post("/query", json=payload)
+
+    assert first.headers.get("X-RAG-Answer-Cache") == "miss"
+    assert second.headers.get("X-RAG-Answer-Cache") == "hit"
+    assert second.json()["answer"] == "캐시 응답 1"
+    assert second.json()["meta"]["stage_timings"]["answer_cache"] == "hit"
+    assert second.json()["meta"]["citations"] == ["all.md > 개요"]
+    assert third.headers.get("X-RAG-Answer-Cache") == "miss"
+    assert third.json()["answer"] == "캐시 응답 2"
+    assert len(invoke_calls) == 2
+
+
+def test_query_answer_cache_separates_quality_modes_with_the_same_stage(client, monkeypatch):
+    class DummyRetriever:
+        def invoke(self, question):
+            from langchain_core.documents import Document
+
+            return [Document(page_content="캐시 문서 본문", metadata={"source": "all.md", "h2": "개요"})]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever()
+
+    invoke_calls: list[str] = []
+
+    def _invoke_query_chain(chain, question, timeout_seconds=15, trace=None):
+        chain(question)
+        invoke_calls.append(question)
+        if trace is not None:
+            trace["status"] = "ok"
+        return f"모드별 응답 {len(invoke_calls)}"
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(
+        routes_query.graph_lite_service,
+        "load_default_relation_snapshot",
+        lambda: (_ for _ in ()).throw(FileNotFoundError("missing snapshot")),
+    )
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda context_builder, llm: context_builder)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
+
+    payload = {"query": "모드 캐시 질문", "llm_provider": "ollama", "quality_stage": "balanced", "debug": True}
+    quality = client.post("/query", json={**payload, "quality_mode": "quality"})
+    balanced = client.post("/query", json={**payload, "quality_mode": "balanced"})
+    balanced_again = client.post("/query", json={**payload, "quality_mode": "balanced"})
+
+    assert quality.json()["meta"]["stage_timings"]["graph_lite_enabled"] is True
+    assert balanced.json()["meta"]["stage_timings"]["graph_lite_enabled"] is False
+    assert quality.headers.get("X-RAG-Answer-Cache") == "miss"
+    assert balanced.headers.get("X-RAG-Answer-Cache") == "miss"
+    assert balanced.json()["answer"] == "모드별 응답 2"
+    assert balanced_again.headers.get("X-RAG-Answer-Cache") == "hit"
+    assert len(invoke_calls) == 2
+
+
+def test_query_fast_mode_does_not_share_answer_cache_with_llm_fast_stage(client, monkeypatch):
+    class DummyRetriever:
+        def invoke(self, question):
+            from langchain_core.documents import Document
+
+            return [
+                Document(
+                    page_content="graph-lite=hit 상태는 Quality mode가 관계 context를 RAG context에 붙였다는 뜻이다.",
+                    metadata={"source": "guide.md", "h2": "Graph-Lite Status"},
+                )
+            ]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever()
+
+    invoke_calls: list[str] = []
+
+    def _invoke_query_chain(chain, question, timeout_seconds=15, trace=None):
+        chain(question)
+        invoke_calls.append(question)
+        if trace is not None:
+            trace["status"] = "ok"
+        return "LLM 응답"
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda context_builder, llm: context_builder)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
+
+    app_payload = {"llm_provider": "ollama", "quality_mode": "balanced", "quality_stage": "fast", "debug": True}
+    api_payload = {"llm_provider": "ollama", "quality_mode": "fast", "debug": True}
+
+    # /app sends quality_stage="fast" with an LLM answer; the no-LLM fast mode must not replay it.
+    app_first = client.post("/query", json={**app_payload, "query": "graph-lite=hit 의미는?"})
+    fast_after = client.post("/query", json={**api_payload, "query": "graph-lite=hit 의미는?"})
+    # And the reverse: an extractive answer must not be served to the /app LLM request.
+    fast_first = client.post("/query", json={**api_payload, "query": "graph-lite=hit 상태는?"})
+    app_after = client.post("/query", json={**app_payload, "query": "graph-lite=hit 상태는?"})
+
+    assert app_first.json()["answer"] == "LLM 응답"
+    assert fast_after.headers.get("X-RAG-Answer-Cache") == "miss"
+    assert fast_after.json()["answer"] != "LLM 응답"
+    assert fast_after.json()["meta"]["invoke"]["llm_skipped"] is True
+    assert fast_first.json()["meta"]["invoke"]["llm_skipped"] is True
+    assert app_after.headers.get("X-RAG-Answer-Cache") == "miss"
+    assert app_after.json()["answer"] == "LLM 응답"
+    assert "llm_skipped" not in app_after.json()["meta"]["invoke"]
+    assert invoke_calls == ["graph-lite=hit 의미는?", "graph-lite=hit 상태는?"]
+
+
+def test_query_builds_context_before_admission_and_records_generation_latency_alone(client, monkeypatch):
+    import time
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return _EmptyRetriever()
+
+    controller = routes_query.admission_service.get_admission_controller("ollama", "qwen3:4b")
+    active_during_retrieval: list[int] = []
+
+    def _build_collection_context(question, collection_keys, trace=None, budget=None):
+        active_during_retrieval.append(controller.active)
+        time.sleep(0.2)
+        if trace is not None:
+            trace["elapsed_ms"] = 200.0
+        return "느린 retrieval context"
+
+    def _invoke_query_chain(chain, question, timeout_seconds=15, trace=None):
+        started_at = time.perf_counter()
+        chain(question)
+        time.sleep(0.05)
+        if trace is not None:
+            trace["invoke_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+            trace["status"] = "ok"
+        return "지연 응답"
+
+    recorded: list[dict[str, object]] = []
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "build_collection_context", _build_collection_context)
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda context_builder, llm: context_builder)
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _as_async(_invoke_query_chain))
+    monkeypatch.setattr(
+        routes_query.budget_planner_service,
+        "record_query_latency",
+        lambda provider, model, **kwargs: recorded.append(kwargs),
+    )
+
+    response = client.post("/query", json={"query": "지연 질문", "llm_provider": "ollama", "debug": True})
+
+    assert response.status_code == 200
+    assert active_during_retrieval == [0]
+    assert response.json()["meta"]["stage_timings"]["context_build_ms"] >= 200
+    assert 40 <= response.json()["meta"]["invoke"]["invoke_ms"] < 150
+    assert len(recorded) == 1
+    assert recorded[0]["retrieval_ms"] == 200.0
+    assert 40 <= recorded[0]["generation_ms"] < 150
+    assert 40 <= controller.stats()["avg_generation_ms"] < 150
+
+
+def test_query_stream_emits_sources_tokens_and_final_event(client, monkeypatch):
+    class DummyRetriever:
+        def invoke(self, question):
+            from langchain_core.documents import Document
+
+            return [Document(page_content="스트리밍 문서 본문", metadata={"source": "all.md", "h2": "개요"})]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever()
+
+    def _stream_query_answer(llm, question, context, *, timeout_seconds, trace=None, query_profile=None, deadline=None):
+        assert "스트리밍 문서 본문" in context
+        assert 0 < deadline.remaining_seconds() <= timeout_seconds
+        yield "스트리밍 "
+        yield "응답"
+        if trace is not None:
+            trace["status"] = "ok"
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "stream_query_answer", _stream_query_answer)
+
+    response = client.post(
+        "/query/stream",
+        json={"query": "스트리밍 질문", "llm_provider": "ollama"},
+        headers={"X-Request-ID": "req-stream-1"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers.get("X-Request-ID") == "req-stream-1"
+    assert response.headers.get("X-RAG-Answer-Cache") == "miss"
+    events = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+    assert [event["event"] for event in events] == ["sources", "token", "token", "final"]
+    assert events[0]["citations"] == ["all.md > 개요"]
+    assert events[0]["sources"][0]["source"] == "all.md"
+    assert events[-1]["answer"] == "스트리밍 응답"
+    assert events[-1]["meta"]["request_id"] == "req-stream-1"
+    assert events[-1]["meta"]["stage_timings"]["time_to_first_token_ms"] >= 0
+    assert set(events[-1]["meta"]["stage_timings"]["deadline_remaining_ms"]) == {"prepare", "retrieval"}
+    assert events[-1]["meta"]["stage_timings"]["deadline_adjustments"] == []
+
+
+def test_query_stream_releases_admission_when_client_disconnects_before_first_chunk(client, monkeypatch):
+    import asyncio
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return _EmptyRetriever()
+
+    def _stream_query_answer(*args, **kwargs):
+        raise AssertionError("the body must not be generated for a disconnected client")
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "stream_query_answer", _stream_query_answer)
+
+    body = json.dumps({"query": "끊긴 스트림 질문", "llm_provider": "ollama"}).encode("utf-8")
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def _receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def _send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client went away")
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/query/stream",
+        "raw_path": b"/query/stream",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"testserver")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def _run_app():
+        try:
+            await client.app(scope, _receive, _send)
+        except Exception:
+            pass
+
+    asyncio.run(_run_app())
+
+    admission = routes_query.admission_service.get_admission_stats()
+    assert admission["active"] == 0
+    assert admission["controllers"][0]["admitted"] == 1
+
+
+def test_query_stream_reports_llm_failure_as_error_event(client, monkeypatch):
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            class DummyRetriever:
+                def invoke(self, question):
+                    return []
+
+            return DummyRetriever()
+
+    def _stream_query_answer(llm, question, context, *, timeout_seconds, trace=None, query_profile=None):
+        raise TimeoutError("slow")
+        yield ""
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all": DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "stream_query_answer", _stream_query_answer)
+
+    response = client.post("/query/stream", json={"query": "느린 질문", "llm_provider": "ollama"})
+
+    events = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+    assert [event["event"] for event in events] == ["sources", "error"]
+    assert events[-1]["code"] == "LLM_TIMEOUT"
+    assert events[-1]["status_code"] == 504
+
+
+def test_query_stream_rejects_invalid_collection_before_streaming(client):
+    response = client.post("/query/stream", json={"query": "질문", "collection": "unknown"})
+
+    _assert_query_error_shape(response, 400, "INVALID_COLLECTION")
+
+
+def test_query_reuses_cached_llm_client_across_requests(client, monkeypatch):
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return _EmptyRetriever()
+
+    created: list[object] = []
+
+    def _create_chat_llm(**kwargs):
+        llm = object()
+        created.append(llm)
+        return llm
+
+    seen_llms: list[object] = []
+
+    def _build_query_chain(context_builder, llm, query_profile=None):
+        seen_llms.append(llm)
+        return object()
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", _create_chat_llm)
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", _build_query_chain)
+    monkeypatch.setattr(
+        routes_query.query_service,
+        "ainvoke_query_chain",
+        _as_async(lambda chain, question, timeout_seconds=15, trace=None, query_profile=None: "재사용 응답"),
+    )
+
+    first = client.post("/query", json={"query": "첫 질문", "llm_provider": "ollama", "debug": True})
+    second = client.post("/query", json={"query": "두번째 질문", "llm_provider": "ollama", "debug": True})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert len(created) == 1
+    assert seen_llms[0] is seen_llms[1] is created[0]
+    assert first.json()["meta"]["stage_timings"]["llm_client_cache"] == "miss"
+    second_timings = second.json()["meta"]["stage_timings"]
+    assert second_timings["llm_client_cache"] == "hit"
+    assert second_timings["llm_client_cache_hit_rate"] == 0.5
+
+
+def test_query_coalesces_identical_in_flight_requests(client, monkeypatch):
+    import asyncio
+    import threading
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return _EmptyRetriever()
+
+    invoke_calls: list[str] = []
+
+    async def _ainvoke_query_chain(chain, question, timeout_seconds=15, trace=None, query_profile=None):
+        invoke_calls.append(question)
+        await asyncio.sleep(0.3)
+        if trace is not None:
+            trace["status"] = "ok"
+        return "합쳐진 응답"
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda context_builder, llm: object())
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _ainvoke_query_chain)
+
+    responses: dict[str, object] = {}
+
+    def _post(request_id: str) -> None:
+        responses[request_id] = client.post(
+            "/query",
+            json={"query": "동시 질문", "llm_provider": "ollama", "debug": True},
+            headers={"X-Request-ID": request_id},
+        )
+
+    threads = [threading.Thread(target=_post, args=(request_id,)) for request_id in ("req-lead", "req-follow")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert invoke_calls == ["동시 질문"]
+    bodies = {request_id: response.json() for request_id, response in responses.items()}
+    assert {body["answer"] for body in bodies.values()} == {"합쳐진 응답"}
+    assert {response.headers["X-Request-ID"] for response in responses.values()} == {"req-lead", "req-follow"}
+    roles = sorted(body["meta"]["stage_timings"]["single_flight"] for body in bodies.values())
+    assert roles == ["follower", "leader"]
+    follower = next(body for body in bodies.values() if body["meta"]["stage_timings"]["single_flight"] == "follower")
+    leader_id = next(request_id for request_id, body in bodies.items() if body is not follower)
+    assert follower["meta"]["request_id"] != leader_id
+    assert follower["meta"]["stage_timings"]["single_flight_leader_request_id"] == leader_id
+
+
+def test_query_fast_mode_does_not_coalesce_with_in_flight_llm_request(client, monkeypatch):
+    import asyncio
+    import threading
+
+    class DummyRetriever:
+        def invoke(self, question):
+            from langchain_core.documents import Document
+
+            return [
+                Document(
+                    page_content="graph-lite=hit 상태는 Quality mode가 관계 context를 RAG context에 붙였다는 뜻이다.",
+                    metadata={"source": "guide.md", "h2": "Graph-Lite Status"},
+                )
+            ]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever()
+
+    llm_started = threading.Event()
+    invoke_calls: list[str] = []
+
+    async def _ainvoke_query_chain(chain, question, timeout_seconds=15, trace=None, query_profile=None):
+        invoke_calls.append(question)
+        llm_started.set()
+        await asyncio.sleep(0.3)
+        if trace is not None:
+            trace["status"] = "ok"
+        return "LLM 응답"
+
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda context_builder, llm: object())
+    monkeypatch.setattr(routes_query.query_service, "ainvoke_query_chain", _ainvoke_query_chain)
+
+    responses: dict[str, object] = {}
+    payload = {"query": "graph-lite=hit 의미는?", "llm_provider": "ollama", "debug": True}
+
+    def _post_llm() -> None:
+        responses["llm"] = client.post("/query", json={**payload, "quality_mode": "balanced", "quality_stage": "fast"})
+
+    llm_thread = threading.Thread(target=_post_llm)
+    llm_thread.start()
+    assert llm_started.wait(timeout=5)
+    responses["fast"] = client.post("/query", json={**payload, "quality_mode": "fast"})
+    llm_thread.join()
+
+    fast_body = responses["fast"].json()
+    llm_body = responses["llm"].json()
+    assert fast_body["meta"]["stage_timings"]["single_flight"] == "leader"
+    assert fast_body["meta"]["invoke"]["llm_skipped"] is True
+    assert fast_body["answer"] != "LLM 응답"
+    assert llm_body["meta"]["stage_timings"]["single_flight"] == "leader"
+    assert llm_body["answer"] == "LLM 응답"
+    assert invoke_calls == ["graph-lite=hit 의미는?"]
+
+
+def test_query_rejects_with_retry_after_when_llm_queue_is_saturated(client, monkeypatch):
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return _EmptyRetriever()
+
+    monkeypatch.setenv("DOC_RAG_LLM_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("DOC_RAG_LLM_MAX_QUEUE_DEPTH", "4")
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda *args, **kwargs: DummyDB())
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(routes_query.query_service, "build_query_chain", lambda context_builder, llm: object())
+    invoke_calls: list[str] = []
+    monkeypatch.setattr(
+        routes_query.query_service,
+        "ainvoke_query_chain",
+        _as_async(lambda chain, question, timeout_seconds=15: invoke_calls.append(question) or "응답"),
+    )
+
+    controller = routes_query.admission_service.get_admission_controller("ollama", "qwen3:4b")
+    controller.release(generation_seconds=45.0)
+    busy_ticket = controller.acquire_blocking(timeout_seconds=60)
+
+    response = client.post("/query", json={"query": "바쁜 질문", "llm_provider": "ollama", "timeout_seconds": 30})
+    body = _assert_query_error_shape(response, 429, "LLM_BUSY")
+    assert response.headers["Retry-After"] == "45"
+    assert "predicted_wait_exceeds_budget" in (body.get("hint") or "")
+    assert invoke_calls == []
+
+    admission = routes_query.admission_service.get_admission_stats()
+    assert admission["active"] == 1
+    assert admission["controllers"][0]["rejected"] == 1
+
+    busy_ticket.release()
+    ok = client.post("/query", json={"query": "한가한 질문", "llm_provider": "ollama", "debug": True})
+    assert ok.status_code == 200
+    timings = ok.json()["meta"]["stage_timings"]
+    assert timings["admission_queue_depth"] == 0
+    assert timings["admission_wait_ms"] == 0
+
+
+def test_query_batch_streams_per_question_results_with_shared_embedding(client, monkeypatch):
+    from langchain_core.documents import Document
+
+    from services import lexical_index_service
+
+    class DummyDB:
+        def __init__(self, key="all"):
+            self.key = key
+
+        def max_marginal_relevance_search_by_vector(self, embedding, k, fetch_k, lambda_mult):
+            return [Document(page_content=f"{self.key} 본문 {embedding[0]}", metadata={"source": f"{self.key}.md"})]
+
+    embedding_batches: list[list[str]] = []
+    monkeypatch.setattr(routes_query.index_service, "get_db", lambda key="all", *args, **kwargs: DummyDB(key))
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count", lambda _db: 1)
+    monkeypatch.setattr(routes_query.index_service, "get_vector_count_snapshot", lambda key="all": 1)
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_collection_lexical_index",
+        lambda key="all": lexical_index_service.build_lexical_index([]),
+    )
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_query_embeddings",
+        lambda questions: embedding_batches.append(list(questions))
+        or [([float(index)], False) for index, _question in enumerate(questions)],
+    )
+    fingerprint_checks: list[tuple[str, ...]] = []
+    monkeypatch.setattr(
+        routes_query.index_service,
+        "get_embedding_fingerprint_status",
+        lambda keys=None: fingerprint_checks.append(tuple(keys or ())) or {"status": "ready", "message": "ok"},
+    )
+    monkeypatch.setattr(
+        routes_query,
+        "resolve_llm_config",
+        lambda **kwargs: ("ollama", "qwen3:4b", None, "http://localhost:11434"),
+    )
+    monkeypatch.setattr(routes_query, "create_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(
+        routes_query.query_service,
+        "build_query_chain",
+        lambda context_builder, llm: context_builder,
+    )
+    monkeypatch.setattr(
+        routes_query.query_service,
+        "ainvoke_query_chain",
+        _as_async(lambda chain, question, timeout_seconds=15: f"{question} => {chain(question).splitlines()[-1]}"),
+    )
+
+    response = client.post(
+        "/query/batch",
+        json={
+            "queries": ["첫 질문", {"query": "둘째 질문"}, {"query": "셋째 질문", "collection": "nope"}],
+            "llm_provider": "ollama",
+            "max_concurrency": 2,
+        },
+        headers={"X-Request-ID": "batch-1"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["X-Request-ID"] == "batch-1"
+    events = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+    assert events[-1]["event"] == "done"
+    assert events[-1]["count"] == 3
+    assert events[-1]["succeeded"] == 2
+    assert events[-1]["failed"] == 1
+
+    errors = [event for event in events if event["event"] == "error"]
+    assert [(event["index"], event["code"]) for event in errors] == [(2, "INVALID_COLLECTION")]
+    results = sorted((event for event in events if event["event"] == "result"), key=lambda event: event["index"])
+    assert [event["request_id"] for event in results] == ["batch-1-0", "batch-1-1"]
+    assert results[0]["answer"] == "첫 질문 => all 본문 0.0"
+    assert results[1]["answer"] == "둘째 질문 => all 본문 1.0"
+    assert results[0]["meta"] is None
+    assert results[0]["stage_timings"]["batch_size"] == 2
+    assert [item["key"] for item in results[0]["stage_timings"]["batch_collections"]] == ["all"]
+    assert results[0]["stage_timings"]["batch_collections"][0]["queries"] == 2
+    assert embedding_batches == [["첫 질문", "둘째 질문"]]
+    assert fingerprint_checks == [("all",)]
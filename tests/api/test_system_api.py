@@ -33,6 +33,9 @@ def test_health_returns_200(client):
     assert isinstance(body["runtime_query_budget_profile"], str)
     assert isinstance(body["runtime_query_budget_summary"], str)
     assert body["embedding_fingerprint_status"] in {"ready", "missing", "mismatch", "empty"}
+    assert body["llm_admission"]["max_concurrency"] >= 1
+    assert body["llm_admission"]["queue_depth"] == 0
+    assert body["adaptive_query_budget"]["models"] == []
     assert body["compatibility_bundle_embedding_fingerprint_status"] in {"ready", "missing", "mismatch", "empty"}
     assert body["release_web_status"] in {
         "ready",
@@ -4,9 +4,34 @@ import pytest
 from fastapi.testclient import TestClient
 
 import app_api
+from api import routes_system
+from core import settings
+from services import (
+    admission_service,
+    answer_cache_service,
+    budget_planner_service,
+    feedback_service,
+    index_service,
+    llm_client_cache_service,
+    single_flight_service,
+    upload_service,
+)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_persist_dir(monkeypatch, tmp_path_factory):
+    """Keep the Chroma store and managed docs the suite writes out of the repo's `chroma_db/`."""
+    persist_dir = str(tmp_path_factory.getbasetemp() / "chroma_db")
+    for module in (settings, app_api, routes_system, feedback_service, index_service, upload_service):
+        monkeypatch.setattr(module, "PERSIST_DIR", persist_dir)
 
 
 @pytest.fixture()
 def client():
+    admission_service.clear_admission_state()
+    answer_cache_service.clear_answer_cache()
+    budget_planner_service.clear_budget_planner_state()
+    llm_client_cache_service.clear_llm_client_cache()
+    single_flight_service.clear_single_flight_state()
     with TestClient(app_api.app, raise_server_exceptions=False) as test_client:
         yield test_client
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from services import admission_service
+
+
+def _controller(max_concurrency=1, max_queue_depth=2):
+    return admission_service.AdmissionController(
+        ("ollama", "gemma4:e4b"),
+        max_concurrency=max_concurrency,
+        max_queue_depth=max_queue_depth,
+    )
+
+
+def test_admission_controller_hands_released_slot_to_oldest_waiter():
+    controller = _controller()
+
+    async def _run():
+        first = await controller.acquire(timeout_seconds=1)
+        waiter = asyncio.ensure_future(controller.acquire(timeout_seconds=1))
+        await asyncio.sleep(0.01)
+        assert controller.stats()["queue_depth"] == 1
+        first.release(generation_seconds=0.5)
+        second = await waiter
+        return first, second
+
+    first, second = asyncio.run(_run())
+
+    assert first.wait_ms == 0
+    assert second.queue_depth == 0
+    assert second.wait_ms > 0
+    stats = controller.stats()
+    assert stats["active"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["avg_generation_ms"] == 500.0
+    second.release()
+    assert controller.stats()["active"] == 0
+
+
+def test_admission_controller_rejects_when_predicted_wait_exceeds_budget():
+    controller = _controller(max_queue_depth=4)
+    controller.release(generation_seconds=12.0)
+    ticket = controller.acquire_blocking(timeout_seconds=30)
+
+    with pytest.raises(admission_service.AdmissionRejected) as rejected:
+        controller.acquire_blocking(timeout_seconds=5)
+
+    assert rejected.value.reason == admission_service.ADMISSION_REASON_PREDICTED_WAIT
+    assert rejected.value.retry_after_seconds == 12
+    assert controller.stats()["rejected"] == 1
+    ticket.release()
+
+
+def test_admission_controller_rejects_full_queue_and_times_out_waiters():
+    controller = _controller(max_queue_depth=1)
+    ticket = controller.acquire_blocking(timeout_seconds=1)
+    errors: list[admission_service.AdmissionRejected] = []
+
+    def _wait():
+        try:
+            controller.acquire_blocking(timeout_seconds=0.2)
+        except admission_service.AdmissionRejected as exc:
+            errors.append(exc)
+
+    waiter = threading.Thread(target=_wait)
+    waiter.start()
+    while controller.stats()["queue_depth"] == 0:
+        pass
+    with pytest.raises(admission_service.AdmissionRejected) as rejected:
+        controller.acquire_blocking(timeout_seconds=1)
+    waiter.join()
+
+    assert rejected.value.reason == admission_service.ADMISSION_REASON_QUEUE_FULL
+    assert [item.reason for item in errors] == [admission_service.ADMISSION_REASON_QUEUE_TIMEOUT]
+    assert controller.stats()["queue_depth"] == 0
+    ticket.release()
+    assert controller.stats()["active"] == 0
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import pytest
+
+from services import budget_planner_service
+
+
+@pytest.fixture(autouse=True)
+def _clear_planner(monkeypatch):
+    monkeypatch.delenv("DOC_RAG_ADAPTIVE_BUDGET", raising=False)
+    monkeypatch.delenv("DOC_RAG_MAX_CONTEXT_TOKENS", raising=False)
+    budget_planner_service.clear_budget_planner_state()
+    yield
+    budget_planner_service.clear_budget_planner_state()
+
+
+def _budget():
+    return {
+        "profile": "generic",
+        "max_context_tokens": 512,
+        "max_context_chars": 2000,
+        "max_output_tokens": 200,
+        "summary": "profile=generic",
+    }
+
+
+def _record(context_tokens, output_tokens, *, retrieval_ms=100.0):
+    # 200ms overhead, 1ms per prompt token, 10ms per generated token.
+    budget_planner_service.record_query_latency(
+        "ollama",
+        "gemma4:e4b",
+        context_tokens=context_tokens,
+        output_tokens=output_tokens,
+        generation_ms=200 + context_tokens + 10 * output_tokens,
+        retrieval_ms=retrieval_ms,
+        collection_count=1,
+    )
+
+
+def test_fit_latency_model_recovers_prefill_and_decode_costs():
+    for context_tokens, output_tokens in ((100, 20), (400, 50), (800, 10), (300, 120), (600, 80), (200, 200)):
+        _record(context_tokens, output_tokens)
+
+    fit = budget_planner_service.get_latency_model("ollama", "gemma4:e4b").fit()
+
+    assert fit is not None
+    assert fit.overhead_ms == pytest.approx(200, abs=1)
+    assert fit.prefill_ms_per_token == pytest.approx(1.0, abs=0.01)
+    assert fit.decode_ms_per_token == pytest.approx(10.0, abs=0.01)
+    assert fit.residual_ms == pytest.approx(0, abs=1)
+
+
+def test_adapt_query_budget_keeps_static_budget_while_warming_up(monkeypatch):
+    monkeypatch.setenv("DOC_RAG_ADAPTIVE_BUDGET", "true")
+    _record(100, 20)
+
+    adapted = budget_planner_service.adapt_query_budget(
+        _budget(), provider="ollama", model="gemma4:e4b", timeout_seconds=30, collection_count=1
+    )
+
+    assert adapted["max_context_tokens"] == 512
+    assert adapted["adaptive"]["status"] == "warming_up"
+    assert adapted["adaptive"]["applied"] is False
+    assert adapted["adaptive"]["observations"] == 1
+
+
+def test_adapt_query_budget_picks_largest_scale_within_timeout(monkeypatch):
+    monkeypatch.setenv("DOC_RAG_ADAPTIVE_BUDGET", "true")
+    monkeypatch.setenv("DOC_RAG_MAX_CONTEXT_TOKENS", "1024")
+    for context_tokens, output_tokens in ((100, 20), (400, 50), (800, 10), (300, 120), (600, 80), (200, 200)):
+        _record(context_tokens, output_tokens)
+
+    # x2.0 = 1024 ctx + 400 out -> 200 + 1024 + 4000 + 100 retrieval = 5324ms, within 0.8 * 10s.
+    roomy = budget_planner_service.adapt_query_budget(
+        _budget(), provider="ollama", model="gemma4:e4b", timeout_seconds=10, collection_count=1
+    )
+    # x0.75 = 384 ctx + 150 out -> 200 + 384 + 1500 + 100 = 2184ms is the largest fit under 2400ms.
+    tight = budget_planner_service.adapt_query_budget(
+        _budget(), provider="ollama", model="gemma4:e4b", timeout_seconds=3, collection_count=1
+    )
+
+    assert roomy["adaptive"]["status"] == "fitted"
+    assert roomy["adaptive"]["scale"] == 2.0
+    assert roomy["max_context_tokens"] == 1024
+    assert roomy["max_output_tokens"] == 400
+    assert roomy["summary"].endswith("adaptive=x2.0")
+    assert tight["adaptive"]["scale"] == 0.75
+    assert tight["max_context_tokens"] == 384
+    assert tight["max_context_chars"] == 1500
+    assert tight["adaptive"]["predicted_total_ms"] == pytest.approx(2184, abs=2)
+
+
+def test_adapt_query_budget_shadow_mode_reports_plan_without_applying():
+    for context_tokens, output_tokens in ((100, 20), (400, 50), (800, 10), (300, 120), (600, 80), (200, 200)):
+        _record(context_tokens, output_tokens)
+
+    adapted = budget_planner_service.adapt_query_budget(
+        _budget(), provider="ollama", model="gemma4:e4b", timeout_seconds=3, collection_count=1
+    )
+
+    assert adapted["adaptive"]["enabled"] is False
+    assert adapted["adaptive"]["applied"] is False
+    assert adapted["adaptive"]["scale"] == 0.75
+    assert adapted["max_context_tokens"] == 512
+    assert adapted["summary"] == "profile=generic"
+    stats = budget_planner_service.get_budget_planner_stats()
+    assert stats["models"][0]["observations"] == 6
+    assert stats["models"][0]["last_plan"]["scale"] == 0.75
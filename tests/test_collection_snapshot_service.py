@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+from langchain_core.documents import Document
+
+from services import collection_snapshot_service
+
+
+def test_build_collection_snapshot_splits_columns_and_keeps_extras_read_only():
+    snapshot = collection_snapshot_service.build_collection_snapshot(
+        ["에콜 폴리테크니크", "훔볼트 대학"],
+        [
+            {"source": "fr.md", "h2": "기관", "country": "france"},
+            {"source": "ge.md", "h1": "독일", "collection_key": "ge"},
+        ],
+        ids=["a", "b"],
+    )
+
+    assert len(snapshot) == 2
+    assert snapshot.ids == ("a", "b")
+    assert snapshot.sources == ("fr.md", "ge.md")
+    assert snapshot.collection_keys == ("", "ge")
+    assert snapshot.metadata_text_at(1) == "ge.md 독일  "
+    assert snapshot.fingerprint_positions["fr.md|기관|에콜 폴리테크니크"] == 0
+    with pytest.raises(TypeError):
+        snapshot.extras[0]["country"] = "uk"
+
+
+def test_materialize_returns_private_document_copies():
+    snapshot = collection_snapshot_service.snapshot_from_documents(
+        [Document(page_content="본문", metadata={"source": "all.md", "h2": "개요", "rank": 1})]
+    )
+
+    first = snapshot.materialize(0)
+    first.metadata["collection_key"] = "all"
+    second = snapshot.materialize(0)
+
+    assert first.page_content == "본문"
+    assert second.metadata == {"source": "all.md", "h2": "개요", "rank": 1}
+    assert snapshot.materialize_all()[0].metadata == second.metadata
+
+
+def test_positions_of_fingerprints_includes_repeated_chunks():
+    snapshot = collection_snapshot_service.build_collection_snapshot(
+        ["반복 문단", "고유 문단", "반복 문단"],
+        [{"source": "fr.md", "h2": "기관"}, {"source": "fr.md", "h2": "기관"}, {"source": "fr.md", "h2": "기관"}],
+    )
+
+    assert sorted(snapshot.positions_of_fingerprints({"fr.md|기관|반복 문단"})) == [0, 2]
+    assert snapshot.positions_of_fingerprints({"fr.md|기관|고유 문단", "missing"}) == [1]
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import json
+
+import httpx
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
-from common import build_ollama_messages, build_ollama_response_message
+import common
+from common import (
+    DEFAULT_OLLAMA_HTTP_TIMEOUT_SECONDS,
+    OLLAMA_CONNECT_TIMEOUT_ENV_KEY,
+    build_ollama_messages,
+    build_ollama_response_message,
+    iter_ollama_stream_deltas,
+    resolve_ollama_http_timeouts,
+)
 
 
 def test_build_ollama_messages_maps_roles():
@@ -34,3 +46,97 @@ def test_build_ollama_response_message_uses_thinking_when_content_empty():
 
     assert message.content == "중간 추론"
     assert message.additional_kwargs["thinking"] == "중간 추론"
+
+
+def test_iter_ollama_stream_deltas_yields_content_and_stops_on_done():
+    lines = [
+        b'{"message": {"role": "assistant", "content": "\xec\x95\x88"}, "done": false}\n',
+        '{"message": {"role": "assistant", "content": "녕"}, "done": false}\n',
+        "\n",
+        '{"message": {"role": "assistant", "content": ""}, "done": true}\n',
+        '{"message": {"role": "assistant", "content": "무시"}, "done": false}\n',
+    ]
+
+    assert list(iter_ollama_stream_deltas(lines)) == ["안", "녕"]
+
+
+def test_iter_ollama_stream_deltas_falls_back_to_thinking_without_content():
+    lines = [
+        '{"message": {"role": "assistant", "content": "", "thinking": "중간 "}, "done": false}',
+        '{"message": {"role": "assistant", "content": "", "thinking": "추론"}, "done": true}',
+    ]
+
+    assert list(iter_ollama_stream_deltas(lines)) == ["중간 추론"]
+
+
+def test_resolve_ollama_http_timeouts_follows_query_budget(monkeypatch):
+    monkeypatch.delenv(OLLAMA_CONNECT_TIMEOUT_ENV_KEY, raising=False)
+    budget_timeouts = resolve_ollama_http_timeouts(30)
+    assert budget_timeouts.read_seconds == 30.0
+    assert budget_timeouts.connect_seconds == 5.0
+
+    default_timeouts = resolve_ollama_http_timeouts(None)
+    assert default_timeouts.read_seconds == float(DEFAULT_OLLAMA_HTTP_TIMEOUT_SECONDS)
+
+    monkeypatch.setenv(OLLAMA_CONNECT_TIMEOUT_ENV_KEY, "60")
+    assert resolve_ollama_http_timeouts(10).connect_seconds == 10.0
+
+
+def test_async_ollama_runnable_uses_async_client(monkeypatch):
+    requests: list[dict[str, object]] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        if body["stream"]:
+            lines = [
+                {"message": {"content": "안녕"}, "done": False},
+                {"message": {"content": "하세요"}, "done": True},
+            ]
+            return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines).encode("utf-8"))
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "비동기 응답"}})
+
+    async def _run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        monkeypatch.setattr(common, "get_async_ollama_client", lambda: client)
+        runnable = common.build_ollama_chat_runnable(
+            model="gemma4:e4b",
+            temperature=0.0,
+            base_url="http://ollama.test",
+            request_timeout_seconds=5,
+        )
+        message = await runnable.ainvoke("질문")
+        chunks = [chunk.content async for chunk in runnable.astream("질문")]
+        await client.aclose()
+        return message, chunks
+
+    message, chunks = asyncio.run(_run())
+
+    assert message.content == "비동기 응답"
+    assert chunks == ["안녕", "하세요"]
+    assert [item["stream"] for item in requests] == [False, True]
+
+
+def test_ollama_runnable_applies_call_limits_from_config(monkeypatch):
+    calls: list[dict[str, object]] = []
+
+    def _invoke(prompt, **kwargs):
+        calls.append(kwargs)
+        return AIMessage(content="응답")
+
+    monkeypatch.setattr(common, "invoke_ollama_chat", _invoke)
+    runnable = common.build_ollama_chat_runnable(
+        model="gemma4:e4b",
+        temperature=0.0,
+        base_url="http://ollama.test",
+        num_predict=512,
+        request_timeout_seconds=30,
+    )
+
+    runnable.invoke("질문")
+    runnable.invoke(
+        "질문",
+        {"configurable": {common.LLM_CALL_LIMITS_CONFIG_KEY: lambda read_timeout, num_predict: (4.5, num_predict // 4)}},
+    )
+
+    assert [(call["read_timeout_seconds"], call["num_predict"]) for call in calls] == [(30, 512), (4.5, 128)]
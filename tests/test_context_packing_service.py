@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from langchain_core.documents import Document
+
+from common import approximate_token_count
+from services import context_packing_service
+
+
+def _doc(text: str, source: str) -> Document:
+    return Document(page_content=text, metadata={"source": source, "h2": "개요"})
+
+
+def test_pack_context_trims_only_at_sentence_boundaries():
+    docs = [
+        _doc("에콜 폴리테크니크는 1794년에 세워졌다. 공학 교육을 맡았다. 나폴레옹이 군사 학교로 바꾸었다.", "fr.md"),
+    ]
+
+    packed = context_packing_service.pack_context(docs, max_tokens=40, count_tokens=approximate_token_count)
+
+    assert packed.text.endswith("공학 교육을 맡았다.")
+    assert "나폴레옹" not in packed.text
+    assert packed.tokens <= 40
+    assert packed.trimmed_docs == 1
+    assert packed.docs[0].page_content == "에콜 폴리테크니크는 1794년에 세워졌다. 공학 교육을 맡았다."
+
+
+def test_pack_context_skips_unsplittable_chunk_and_keeps_rank_order():
+    docs = [
+        _doc("훔볼트 대학은 연구 중심 모델을 세웠다.", "ge.md"),
+        _doc("문장 경계가 없는 아주 긴 설명 " * 20, "long.md"),
+        _doc("왕립학회는 1660년에 설립됐다.", "uk.md"),
+    ]
+
+    packed = context_packing_service.pack_context(docs, max_tokens=60, count_tokens=approximate_token_count)
+
+    assert [doc.metadata["source"] for doc in packed.docs] == ["ge.md", "uk.md"]
+    assert packed.dropped_docs == 1
+    assert packed.text.startswith("[1] source=ge.md")
+    assert "\n\n[2] source=uk.md" in packed.text
+    assert packed.tokens == approximate_token_count(packed.text)
+    assert packed.tokens <= 60
+
+
+def test_pack_context_applies_character_cap_with_token_budget():
+    docs = [_doc("첫 문장이다. 둘째 문장이다. 셋째 문장이다.", "a.md")]
+
+    packed = context_packing_service.pack_context(
+        docs,
+        max_tokens=500,
+        max_chars=len("[1] source=a.md h2=개요\n첫 문장이다. 둘째 문장이다."),
+        count_tokens=approximate_token_count,
+    )
+
+    assert packed.text == "[1] source=a.md h2=개요\n첫 문장이다. 둘째 문장이다."
+    assert packed.to_trace()["context_chars"] == len(packed.text)
+
+
+def test_pack_context_stitches_overlapping_neighbours_from_one_section():
+    from common import split_by_markdown_headers
+
+    section = "## 역사\n" + " ".join(f"단어{index}" for index in range(80))
+    chunks = split_by_markdown_headers(
+        [Document(page_content=section, metadata={"source": "a.md"})],
+        chunk_size=80,
+        chunk_overlap=30,
+    )
+    assert [chunk.metadata["chunk_ordinal"] for chunk in chunks] == list(range(len(chunks)))
+    assert all(
+        section[chunk.metadata["chunk_start"] : chunk.metadata["chunk_end"]] == chunk.page_content for chunk in chunks
+    )
+
+    other = _doc("다른 문서의 근거 문장이다.", "b.md")
+    packed = context_packing_service.pack_context(
+        [chunks[2], other, chunks[1]],
+        max_tokens=1000,
+        count_tokens=approximate_token_count,
+    )
+
+    assert [doc.metadata["source"] for doc in packed.docs] == ["a.md", "b.md"]
+    assert packed.docs[0].page_content == section[chunks[1].metadata["chunk_start"] : chunks[2].metadata["chunk_end"]]
+    assert packed.text.count("source=a.md") == 1
+    assert packed.stitched_chunks == 1
+    assert packed.stitched_overlap_chars == chunks[1].metadata["chunk_end"] - chunks[2].metadata["chunk_start"]
+
+
+def test_pack_context_keeps_best_chunk_when_stitched_block_does_not_fit():
+    def count_words(text: str) -> int:
+        return len(text.split())
+
+    def chunk(text: str, ordinal: int) -> Document:
+        return Document(
+            page_content=text,
+            metadata={"source": "a.md", "h2": "역사", "chunk_section": 0, "chunk_ordinal": ordinal},
+        )
+
+    best = chunk("훔볼트는 1810년에 베를린 대학을 세웠다. 연구와 교육의 통합을 내세웠다.", 5)
+    neighbour = chunk(" ".join(f"배경 문장 {index}번이다." for index in range(6)), 4)
+
+    alone = context_packing_service.pack_context([best], max_tokens=25, count_tokens=count_words)
+    packed = context_packing_service.pack_context([best, neighbour], max_tokens=25, count_tokens=count_words)
+
+    assert [doc.page_content for doc in packed.docs] == [best.page_content]
+    assert packed.text == alone.text
+    assert packed.stitched_chunks == 0
+    assert packed.stitched_overlap_chars == 0
+
+
+def test_pack_context_compresses_chunks_to_query_sentences():
+    docs = [
+        _doc(
+            "### 설립\n파리 시내에는 카페가 많다. 에콜 폴리테크니크는 1794년에 설립됐다. "
+            "센강은 도시를 가로지른다. 폴리테크니크 졸업생은 공학자가 됐다.",
+            "fr.md",
+        ),
+        _doc("질문과 관계없는 첫 문장이다. 둘째 문장도 관계없다.", "misc.md"),
+    ]
+
+    packed = context_packing_service.pack_context(
+        docs,
+        max_tokens=1000,
+        count_tokens=approximate_token_count,
+        compress_terms=["폴리테크니크", "설립"],
+    )
+
+    assert packed.docs[0].page_content == (
+        "### 설립\n에콜 폴리테크니크는 1794년에 설립됐다. 폴리테크니크 졸업생은 공학자가 됐다."
+    )
+    assert packed.docs[1].page_content == "질문과 관계없는 첫 문장이다."
+    assert packed.compression["kept_sentences"] == 3
+    assert packed.compression["total_sentences"] == 6
+    assert packed.compression["ratio"] < 1.0
+    assert "compression_ms" in packed.compression
+
+
+def test_compress_docs_keeps_table_rows_whole_with_their_header():
+    table = (
+        "| status | meaning |\n"
+        "| --- | --- |\n"
+        "| `hit` | Relation context was appended. Check answer quality. |\n"
+        "| `disabled` | Graph-lite is off. |"
+    )
+
+    compressed, info = context_packing_service.compress_docs([_doc(table, "guide.md")], ["hit"])
+
+    assert compressed[0].page_content == (
+        "| status | meaning |\n| --- | --- |\n| `hit` | Relation context was appended. Check answer quality. |"
+    )
+    assert info["kept_sentences"] == 1
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+
+from services import deadline_service
+from services.budget_planner_service import LatencyFit
+
+
+def _deadline(timeout_seconds, *, elapsed_seconds, monkeypatch, **kwargs):
+    monkeypatch.setattr(deadline_service.time, "perf_counter", lambda: 100.0 + elapsed_seconds)
+    return deadline_service.QueryDeadline(timeout_seconds, started_at=100.0, **kwargs)
+
+
+def test_deadline_checkpoints_record_remaining_budget_and_raise_when_spent(monkeypatch):
+    deadline = _deadline(10, elapsed_seconds=4, monkeypatch=monkeypatch)
+
+    assert deadline.check("retrieval") == pytest.approx(6.0)
+    assert deadline.timeout_seconds_left() == 6
+
+    monkeypatch.setattr(deadline_service.time, "perf_counter", lambda: 111.0)
+    with pytest.raises(deadline_service.DeadlineExceeded) as exc_info:
+        deadline.check("llm")
+
+    assert exc_info.value.stage == "llm"
+    assert isinstance(exc_info.value, TimeoutError)
+    assert deadline.to_stage_timings()["deadline_remaining_ms"] == {"retrieval": 6000.0, "llm": -1000.0}
+
+
+def test_deadline_shrinks_retrieval_and_skips_graph_lite_when_time_is_short(monkeypatch):
+    budget = {"profile": "generic", "per_collection_k": 3, "per_collection_fetch_k": 12, "max_total_docs": 6}
+
+    roomy = _deadline(10, elapsed_seconds=2, monkeypatch=monkeypatch)
+    assert roomy.shrink_retrieval_budget(budget) is budget
+    assert roomy.allows_graph_lite() is True
+
+    short = _deadline(10, elapsed_seconds=8, monkeypatch=monkeypatch)
+    shrunk = short.shrink_retrieval_budget(budget)
+
+    assert shrunk["per_collection_fetch_k"] == 6
+    assert shrunk["max_total_docs"] == 3
+    assert budget["per_collection_fetch_k"] == 12
+    assert short.allows_graph_lite() is False
+    assert short.adjustments == ["retrieval_depth_halved", "graph_lite_skipped"]
+
+
+def test_llm_call_limits_size_read_timeout_and_num_predict_from_remaining_time(monkeypatch):
+    fit = LatencyFit(
+        overhead_ms=200.0,
+        prefill_ms_per_token=1.0,
+        decode_ms_per_token=10.0,
+        residual_ms=0.0,
+        observations=10,
+    )
+    deadline = _deadline(10, elapsed_seconds=7, monkeypatch=monkeypatch, generation_fit=fit, context_tokens=800)
+
+    read_timeout, num_predict = deadline.llm_call_limits(30, 512)
+
+    # 3000ms left - 200ms overhead - 800ms prefill = 2000ms of decode at 10ms/token.
+    assert read_timeout == pytest.approx(3.0)
+    assert num_predict == 200
+    assert deadline.adjustments == ["num_predict=200"]
+
+
+def test_llm_call_limits_without_fit_scale_output_only_when_time_is_short(monkeypatch):
+    roomy = _deadline(10, elapsed_seconds=1, monkeypatch=monkeypatch)
+    assert roomy.llm_call_limits(None, 400) == (pytest.approx(9.0), 400)
+
+    short = _deadline(10, elapsed_seconds=8, monkeypatch=monkeypatch)
+    assert short.llm_call_limits(30, 400) == (pytest.approx(2.0), 160)
@@ -187,3 +187,78 @@ def test_load_default_relation_snapshot_uses_env_override(tmp_path, monkeypatch)
 
     assert snapshot.source_dir == str(snapshot_dir)
     assert snapshot.stats["nodes"] == 4
+
+
+def test_load_cached_relation_snapshot_reuses_snapshot_until_files_change(tmp_path):
+    graph_lite_service.clear_relation_snapshot_cache()
+    snapshot_dir = _write_snapshot(tmp_path)
+
+    first = graph_lite_service.load_cached_relation_snapshot(snapshot_dir)
+    second = graph_lite_service.load_cached_relation_snapshot(snapshot_dir)
+    relations_path = snapshot_dir / graph_lite_service.DEFAULT_RELATIONS_FILE
+    relations_path.write_text(relations_path.read_text(encoding="utf-8").splitlines()[0] + "\n", encoding="utf-8")
+    reloaded = graph_lite_service.load_cached_relation_snapshot(snapshot_dir)
+
+    assert second is first
+    assert reloaded is not first
+    assert len(reloaded.relations) == 1
+    stats = graph_lite_service.get_relation_snapshot_cache_stats()
+    assert (stats["loads"], stats["hits"], stats["reloads"]) == (1, 1, 1)
+    graph_lite_service.clear_relation_snapshot_cache()
+
+
+def test_query_relation_snapshot_reuses_adjacency_and_traversal_per_collection_filter(tmp_path):
+    snapshot = graph_lite_service.load_relation_snapshot(_write_snapshot(tmp_path))
+    question = "뉴턴과 볼테르의 관계가 계몽주의 확산으로 어떻게 이어졌는지 설명해줘."
+
+    first = graph_lite_service.query_relation_snapshot(snapshot, question, collection_keys=["fr", "uk"], max_hops=2)
+    second = graph_lite_service.query_relation_snapshot(snapshot, question, collection_keys=["uk", "fr"], max_hops=2)
+    unfiltered = graph_lite_service.query_relation_snapshot(snapshot, question, collection_keys=["all"], max_hops=2)
+
+    assert first["relations"] == second["relations"]
+    assert set(snapshot.adjacency_by_filter) == {frozenset({"fr", "uk"}), None}
+    assert len(snapshot.traversal_cache) == 2
+    assert "humboldt_university" not in {item["source"] for item in first["relations"]}
+    assert "humboldt_university" in {item["source"] for item in unfiltered["relations"]}
+
+
+def test_binary_snapshot_matches_jsonl_query_results(tmp_path):
+    from services import graph_lite_binary_service
+
+    snapshot_dir = _write_snapshot(tmp_path)
+    jsonl_snapshot = graph_lite_service.load_relation_snapshot(snapshot_dir, prefer_binary=False)
+    graph_lite_binary_service.write_binary_snapshot(jsonl_snapshot, snapshot_dir)
+
+    binary_snapshot = graph_lite_service.load_relation_snapshot(snapshot_dir)
+
+    assert binary_snapshot.adjacency_provider is not None
+    assert binary_snapshot.stats == jsonl_snapshot.stats
+    assert dict(binary_snapshot.entities) == jsonl_snapshot.entities
+    assert list(binary_snapshot.relations) == list(jsonl_snapshot.relations)
+    for collection_keys in (None, ["fr"], ["ge"], ["kr"]):
+        expected = graph_lite_service.query_relation_snapshot(
+            jsonl_snapshot, "뉴턴과 볼테르의 관계를 설명해줘.", collection_keys=collection_keys
+        )
+        actual = graph_lite_service.query_relation_snapshot(
+            binary_snapshot, "뉴턴과 볼테르의 관계를 설명해줘.", collection_keys=collection_keys
+        )
+        expected.pop("latency_ms")
+        actual.pop("latency_ms")
+        assert actual == expected
+
+
+def test_binary_snapshot_is_ignored_when_jsonl_changed(tmp_path):
+    from services import graph_lite_binary_service
+
+    snapshot_dir = _write_snapshot(tmp_path)
+    graph_lite_binary_service.write_binary_snapshot(
+        graph_lite_service.load_relation_snapshot(snapshot_dir, prefer_binary=False), snapshot_dir
+    )
+    relations_path = snapshot_dir / "relations.jsonl"
+    relations_path.write_text(relations_path.read_text(encoding="utf-8").splitlines()[0] + "\n", encoding="utf-8")
+
+    snapshot = graph_lite_service.load_relation_snapshot(snapshot_dir)
+
+    assert graph_lite_binary_service.load_compatible_binary_snapshot(snapshot_dir) is None
+    assert snapshot.adjacency_provider is None
+    assert len(snapshot.relations) == 1
@@ -81,5 +81,7 @@ def test_build_and_export_graph_lite_snapshot_writes_loadable_snapshot(tmp_path,
     assert (tmp_path / "entities.jsonl").exists()
     assert (tmp_path / "relations.jsonl").exists()
     assert (tmp_path / "ingest_stats.json").exists()
+    assert payload["paths"]["binary"] == str(tmp_path / graph_lite_service.DEFAULT_BINARY_FILE)
+    assert snapshot.adjacency_provider is not None
     assert "summary_json" in summary_paths
     assert "summary_report" in summary_paths
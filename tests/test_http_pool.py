@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.http_pool import HTTPTimeouts, KeepAliveHTTPPool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002
+        return
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+        if self.path == "/fail":
+            payload = b"boom"
+            self.send_response(500)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if self.path == "/stream":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for index in range(3):
+                line = json.dumps({"index": index}).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        payload = json.dumps({"echo": body.decode("utf-8"), "port": self.client_address[1]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_keep_alive_pool_reuses_connection_across_requests(server_url):
+    pool = KeepAliveHTTPPool(pool_size=2)
+    client_ports = []
+    for index in range(3):
+        with pool.request("POST", f"{server_url}/chat", body=f"q{index}".encode("utf-8")) as response:
+            payload = json.loads(response.read())
+        assert payload["echo"] == f"q{index}"
+        client_ports.append(payload["port"])
+
+    assert len(set(client_ports)) == 1
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 2
+    assert stats["idle"] == 1
+    pool.close()
+
+
+def test_keep_alive_pool_streams_chunked_lines_and_returns_connection(server_url):
+    pool = KeepAliveHTTPPool(pool_size=1)
+    with pool.request("POST", f"{server_url}/stream", body=b"{}") as response:
+        lines = [json.loads(line) for line in response]
+
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert pool.idle_count() == 1
+    pool.close()
+
+
+def test_keep_alive_pool_discards_partially_read_stream(server_url):
+    pool = KeepAliveHTTPPool(pool_size=1)
+    with pool.request("POST", f"{server_url}/stream", body=b"{}") as response:
+        next(iter(response))
+
+    assert pool.idle_count() == 0
+    assert pool.stats()["discarded"] == 1
+    pool.close()
+
+
+def test_keep_alive_pool_raises_urllib_compatible_errors(server_url):
+    pool = KeepAliveHTTPPool()
+    with pytest.raises(urllib.error.HTTPError) as http_error:
+        with pool.request("POST", f"{server_url}/fail", body=b"{}"):
+            pass
+    assert http_error.value.code == 500
+    assert http_error.value.read() == b"boom"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+    with pytest.raises(urllib.error.URLError):
+        with pool.request(
+            "GET",
+            f"http://127.0.0.1:{closed_port}/health",
+            timeouts=HTTPTimeouts(connect_seconds=1, read_seconds=1),
+        ):
+            pass
+    pool.close()
@@ -210,3 +210,114 @@ def test_invalidate_runtime_state_clears_vector_count_snapshot(monkeypatch):
 
     assert cached == 5
     assert refreshed == 9
+
+
+def test_get_collection_lexical_index_persists_and_reuses_postings(monkeypatch, tmp_path: Path):
+    class DummyCollection:
+        def __init__(self):
+            self.calls = 0
+
+        def get(self, include=None):
+            self.calls += 1
+            return {
+                "ids": ["a", "b"],
+                "documents": ["에콜 폴리테크니크 과학 교육", "훔볼트 대학 연구"],
+                "metadatas": [{"source": "fr.md", "h2": "기관"}, {"source": "ge.md", "h2": "대학"}],
+            }
+
+    class DummyDB:
+        def __init__(self):
+            self._collection = DummyCollection()
+
+    db = DummyDB()
+    monkeypatch.setattr(index_service, "PERSIST_DIR", str(tmp_path))
+    monkeypatch.setattr(index_service, "get_db", lambda key: db)
+    index_service.invalidate_runtime_state()
+
+    first = index_service.get_collection_lexical_index("fr")
+    path = index_service.lexical_index_path("fr")
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    index_service.invalidate_runtime_state(["fr"])
+    second = index_service.get_collection_lexical_index("fr")
+    cached = index_service.get_collection_lexical_index("fr")
+
+    assert first.doc_ids == ("a", "b")
+    assert payload["version"] == index_service.lexical_index_service.LEXICAL_INDEX_VERSION
+    assert payload["collection_key"] == "fr"
+    assert "폴리테크니크" in payload["postings"]
+    assert second.postings == first.postings
+    assert second.snapshot.materialize(1).metadata["source"] == "ge.md"
+    assert cached is second
+    assert db._collection.calls == 2
+    index_service.invalidate_runtime_state()
+
+
+def test_invalidate_runtime_state_drops_snapshot_built_before_invalidation(monkeypatch):
+    class DummyCollection:
+        def get(self, include=None):
+            index_service.invalidate_runtime_state(["fr"])
+            return {"ids": ["a"], "documents": ["본문"], "metadatas": [{"source": "fr.md"}]}
+
+    class DummyDB:
+        _collection = DummyCollection()
+
+    monkeypatch.setattr(index_service, "get_db", lambda key: DummyDB())
+    index_service.invalidate_runtime_state()
+
+    snapshot = index_service.get_collection_snapshot("fr")
+
+    assert snapshot.ids == ("a",)
+    assert not any(key[0] == "fr" for key in index_service._COLLECTION_SNAPSHOT_CACHE)
+
+
+def test_get_query_embedding_uses_bounded_lru_keyed_by_normalized_question(monkeypatch):
+    calls: list[str] = []
+
+    class DummyEmbeddings:
+        def embed_query(self, text):
+            calls.append(text)
+            return [float(len(text)), 1.0]
+
+    monkeypatch.setattr(index_service, "get_embeddings", lambda model_name=None: DummyEmbeddings())
+    monkeypatch.setattr(index_service, "QUERY_EMBEDDING_CACHE_MAX_ENTRIES", 2)
+    index_service.clear_query_embedding_cache()
+
+    first, first_hit = index_service.get_query_embedding("훔볼트  대학 ")
+    second, second_hit = index_service.get_query_embedding("훔볼트 대학")
+    index_service.get_query_embedding("질문 둘")
+    index_service.get_query_embedding("질문 셋")
+    _, evicted_hit = index_service.get_query_embedding("훔볼트 대학")
+    stats = index_service.get_query_embedding_cache_stats()
+
+    assert first == second == [6.0, 1.0]
+    assert (first_hit, second_hit, evicted_hit) == (False, True, False)
+    assert calls == ["훔볼트 대학", "질문 둘", "질문 셋", "훔볼트 대학"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["size"] == 2
+    index_service.clear_query_embedding_cache()
+
+
+def test_get_query_embeddings_batches_cache_misses_into_one_encoder_call(monkeypatch):
+    batches: list[list[str]] = []
+
+    class DummyEmbeddings:
+        def embed_query(self, text):
+            return [float(len(text)), 0.0]
+
+        def embed_documents(self, texts):
+            batches.append(list(texts))
+            return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setattr(index_service, "get_embeddings", lambda model_name=None: DummyEmbeddings())
+    index_service.clear_query_embedding_cache()
+    index_service.get_query_embedding("캐시 질문")
+
+    results = index_service.get_query_embeddings(["캐시  질문", "새 질문", "새 질문 ", "다른 질문"])
+
+    assert batches == [["새 질문", "다른 질문"]]
+    assert [hit for _vector, hit in results] == [True, False, False, False]
+    assert results[0][0] == [5.0, 0.0]
+    assert results[1][0] == results[2][0] == [4.0, 1.0]
+    assert index_service.get_query_embedding("다른 질문") == ([5.0, 1.0], True)
+    index_service.clear_query_embedding_cache()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import random
+
+from services import collection_service, graphrag_poc_service
+from services.keyword_matcher_service import KeywordMatcher
+
+
+def test_keyword_matcher_finds_overlapping_and_nested_patterns():
+    matcher = KeywordMatcher([("he", "he"), ("she", "she"), ("his", "his"), ("hers", "hers"), ("뉴턴", "newton")])
+
+    assert matcher.matches("ushers") == ["he", "she", "hers"]
+    assert matcher.matches("뉴턴과 his") == ["his", "newton"]
+    assert matcher.matches("") == []
+
+
+def test_keyword_matcher_reports_shared_payloads_once_in_registration_order():
+    matcher = KeywordMatcher([("볼테르", "voltaire"), ("voltaire", "voltaire"), ("뉴턴", "newton"), ("", "empty")])
+
+    assert len(matcher) == 2
+    assert matcher.matches("뉴턴 newton voltaire 볼테르") == ["voltaire", "newton"]
+    assert matcher.first_match("뉴턴과 볼테르") == "voltaire"
+    assert matcher.first_match("라이프니츠") is None
+
+
+def test_keyword_matcher_matches_naive_substring_scan():
+    rng = random.Random(7)
+    for _ in range(300):
+        patterns = ["".join(rng.choice("abc가") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 10))]
+        text = "".join(rng.choice("abc가 ") for _ in range(rng.randint(0, 30)))
+        matcher = KeywordMatcher((pattern, index) for index, pattern in enumerate(patterns))
+
+        assert matcher.matches(text) == [index for index, pattern in enumerate(patterns) if pattern in text]
+
+
+def test_shared_matchers_keep_routing_and_entity_detection_order():
+    keyword_order = [
+        key
+        for key, config in collection_service.COLLECTION_CONFIGS.items()
+        if key != collection_service.DEFAULT_COLLECTION_KEY and config.get("keywords")
+    ]
+    question = " ".join(
+        str(collection_service.COLLECTION_CONFIGS[key]["keywords"][0]) for key in reversed(keyword_order)
+    )
+
+    assert collection_service.guess_collection_keys_from_query(question) == keyword_order
+    assert collection_service.guess_collection_key_from_query(question) == keyword_order[0]
+    assert graphrag_poc_service.detect_entity_ids("Voltaire는 뉴턴을 소개했다.") == ["newton", "voltaire"]
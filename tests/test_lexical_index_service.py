@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import pytest
+from langchain_core.documents import Document
+
+from services import lexical_index_service
+
+
+def _docs() -> list[Document]:
+    return [
+        Document(page_content="일반 소개 문단", metadata={"source": "all.md", "h2": "개요"}),
+        Document(
+            page_content="에콜 폴리테크니크는 프랑스 과학 인재 양성 기관이다.",
+            metadata={"source": "fr.md", "h2": "기관"},
+        ),
+        Document(page_content="훔볼트 대학은 연구 중심 대학이다.", metadata={"source": "ge.md", "h2": "대학"}),
+    ]
+
+
+def test_build_lexical_index_records_field_masks_and_lengths():
+    index = lexical_index_service.build_lexical_index(_docs())
+
+    assert index.doc_count == 3
+    assert index.doc_ids == ("0", "1", "2")
+    assert index.postings["폴리테크니크"] == ((1, lexical_index_service.FIELD_CONTENT, 1),)
+    assert index.postings["기관"][0][1] == lexical_index_service.FIELD_METADATA | lexical_index_service.FIELD_CONTENT
+    assert index.postings["대학"] == ((2, lexical_index_service.FIELD_METADATA | lexical_index_service.FIELD_CONTENT, 3),)
+    assert list(index.vocabulary) == sorted(index.postings)
+
+
+def test_lookup_query_terms_scores_metadata_hits_and_expands_prefixes():
+    index = lexical_index_service.build_lexical_index(_docs())
+    terms = lexical_index_service.extract_lexical_query_terms("에콜 폴리테크 기관")
+
+    lookup = lexical_index_service.lookup_query_terms(index, terms)
+
+    assert lookup.matched_positions() == [1]
+    assert lookup.score(1) == (5.0, ["기관", "에콜", "폴리테크"])
+    assert lookup.score(0) == (0.0, [])
+    assert lookup.bm25_scores[1] > 0
+    assert lookup.postings_touched == 3
+
+
+def test_lookup_query_terms_matches_terms_inside_tokens_like_substring_scan():
+    docs = [
+        Document(page_content="graph-lite 사이드카와 subgraph 탐색", metadata={"source": "graph.md", "h2": "개요"}),
+        Document(page_content="시민사회의 인재양성 제도와 아이작뉴턴", metadata={"source": "uk.md", "h2": "사회"}),
+        Document(page_content="관련 없는 문단", metadata={"source": "etc.md", "h2": "기타"}),
+    ]
+    index = lexical_index_service.build_lexical_index(docs)
+    terms = ["graph", "사회", "양성", "뉴턴"]
+
+    lookup = lexical_index_service.lookup_query_terms(index, terms)
+
+    for position, doc in enumerate(docs):
+        metadata_text = " ".join(str(doc.metadata.get(key, "")) for key in ("source", "h1", "h2", "h3")).lower()
+        metadata_hits = {term for term in terms if term in metadata_text}
+        content_hits = {term for term in terms if term in doc.page_content.lower()}
+        expected_score = float(len(metadata_hits) * 2 + len(content_hits))
+        assert lookup.score(position) == (expected_score, sorted(metadata_hits | content_hits))
+    assert lexical_index_service.expand_query_term(index, "graph") == ["graph", "subgraph"]
+    assert lookup.score(1) == (5.0, ["뉴턴", "사회", "양성"])
+
+
+def _lookup_view(lookup: lexical_index_service.LexicalLookup, doc_count: int) -> dict[str, object]:
+    return {
+        "matched_positions": lookup.matched_positions(),
+        "scores": [lookup.score(position) for position in range(doc_count)],
+        "bm25_scores": lookup.bm25_scores,
+        "postings_touched": lookup.postings_touched,
+    }
+
+
+def test_lookup_query_terms_batch_matches_single_lookups(monkeypatch):
+    index = lexical_index_service.build_lexical_index(_docs())
+    questions = ["에콜 폴리테크 기관", "훔볼트 대학 기관", "없는 용어"]
+    terms_list = [lexical_index_service.extract_lexical_query_terms(question) for question in questions]
+    expected = [
+        _lookup_view(lexical_index_service.lookup_query_terms(index, terms), index.doc_count) for terms in terms_list
+    ]
+
+    collected: list[str] = []
+    original_collect = lexical_index_service._collect_term_postings
+    monkeypatch.setattr(
+        lexical_index_service,
+        "_collect_term_postings",
+        lambda lexical_index, term: collected.append(term) or original_collect(lexical_index, term),
+    )
+    lookups = lexical_index_service.lookup_query_terms_batch(index, terms_list)
+
+    assert [_lookup_view(lookup, index.doc_count) for lookup in lookups] == expected
+    assert sorted(collected) == sorted({term for terms in terms_list for term in terms})
+
+
+def test_lexical_index_payload_round_trip_and_attach_snapshot():
+    docs = _docs()
+    index = lexical_index_service.build_lexical_index(docs, doc_ids=["a", "b", "c"])
+
+    payload = lexical_index_service.lexical_index_to_payload(index, collection_key="all")
+    restored = lexical_index_service.lexical_index_from_payload(payload)
+    attached = lexical_index_service.attach_snapshot(restored, index.snapshot)
+
+    assert payload["collection_key"] == "all"
+    assert len(restored.snapshot) == 0
+    assert restored.postings == index.postings
+    assert restored.doc_ids == ("a", "b", "c")
+    assert attached.position_of(docs[2]) == 2
+
+
+def test_lexical_index_from_payload_rejects_unknown_version():
+    with pytest.raises(ValueError):
+        lexical_index_service.lexical_index_from_payload({"version": "lexical_index.v0"})
+
+
+def test_normalize_lexical_token_suffix_automaton_matches_first_listed_particle():
+    def reference(token: str) -> str:
+        normalized = token.strip().lower()
+        for suffix in lexical_index_service.KOREAN_PARTICLE_SUFFIXES:
+            if normalized.endswith(suffix) and len(normalized) - len(suffix) >= 2:
+                return normalized[: -len(suffix)].strip()
+        return normalized.strip()
+
+    tokens = [
+        "에콜폴리테크니크에서는",
+        "대학으로부터",
+        "뉴턴이라고",
+        "학회에게서는",
+        "연구했는지",
+        "과학이다",
+        "대학은",
+        "이가",
+        "볼테르와",
+        "Newton",
+        "",
+    ]
+    tokens.extend(f"기관{suffix}" for suffix in lexical_index_service.KOREAN_PARTICLE_SUFFIXES)
+    for token in tokens:
+        assert lexical_index_service.normalize_lexical_token(token) == reference(token)
+
+
+def test_normalize_lexical_token_is_memoized():
+    lexical_index_service.normalize_lexical_token.cache_clear()
+
+    lexical_index_service.extract_lexical_query_terms("훔볼트 대학은 훔볼트 대학의 모델")
+
+    info = lexical_index_service.normalize_lexical_token.cache_info()
+    assert info.hits >= 1
+    assert info.currsize == 4
+
+
+def test_term_matrix_ranking_matches_postings_dict_reference():
+    from scripts import benchmark_lexical_scoring
+
+    docs, queries = benchmark_lexical_scoring.build_corpus(400, seed=3)
+    index = lexical_index_service.build_lexical_index(docs)
+
+    assert int(index.term_matrix.indptr[-1]) == sum(len(entries) for entries in index.postings.values())
+    for terms in queries:
+        assert benchmark_lexical_scoring.term_matrix_rank(index, terms) == benchmark_lexical_scoring.postings_dict_rank(
+            index,
+            terms,
+        )
+
+
+def test_rank_candidates_skips_excluded_positions():
+    index = lexical_index_service.build_lexical_index(_docs())
+    lookup = lexical_index_service.lookup_query_terms(index, ["기관", "대학"])
+
+    assert lookup.rank_candidates(exclude=[], limit=3) == ([2, 1], 2)
+    assert lookup.rank_candidates(exclude=[2], limit=3) == ([1], 1)
+    assert lookup.rank_candidates(exclude=[], limit=0) == ([], 2)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from services import llm_client_cache_service
+
+
+def _key(**overrides):
+    params = {
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "base_url": None,
+        "api_key": "sk-test",
+        "temperature": 0.0,
+        "max_output_tokens": 256,
+        "request_timeout_seconds": 30,
+    }
+    params.update(overrides)
+    return llm_client_cache_service.build_llm_client_key(**params)
+
+
+def test_llm_client_cache_reuses_client_per_key_and_hashes_api_key():
+    llm_client_cache_service.clear_llm_client_cache()
+    created: list[object] = []
+
+    def _factory():
+        client = object()
+        created.append(client)
+        return client
+
+    first, first_hit = llm_client_cache_service.get_or_create_chat_llm(_key(), _factory)
+    second, second_hit = llm_client_cache_service.get_or_create_chat_llm(_key(), _factory)
+    other, other_hit = llm_client_cache_service.get_or_create_chat_llm(_key(api_key="sk-other"), _factory)
+
+    assert first is second
+    assert other is not first
+    assert (first_hit, second_hit, other_hit) == (False, True, False)
+    assert len(created) == 2
+    assert "sk-test" not in repr(_key())
+    stats = llm_client_cache_service.get_llm_client_cache_stats()["clients"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == 0.333
+    llm_client_cache_service.clear_llm_client_cache()
+
+
+def test_llm_client_cache_is_bounded(monkeypatch):
+    llm_client_cache_service.clear_llm_client_cache()
+    monkeypatch.setattr(llm_client_cache_service._LLM_CLIENT_CACHE, "max_entries", 2)
+
+    for index in range(3):
+        llm_client_cache_service.get_or_create_chat_llm(_key(model=f"model-{index}"), object)
+
+    _, oldest_hit = llm_client_cache_service.get_or_create_chat_llm(_key(model="model-0"), object)
+    stats = llm_client_cache_service.get_llm_client_cache_stats()["clients"]
+
+    assert oldest_hit is False
+    assert stats["evictions"] >= 1
+    assert stats["size"] == 2
+    llm_client_cache_service.clear_llm_client_cache()
+
+
+def test_answer_pipeline_cache_is_keyed_by_llm_and_profile():
+    llm_client_cache_service.clear_llm_client_cache()
+    llm = object()
+    builds: list[str] = []
+
+    def _factory(profile):
+        def _build():
+            builds.append(profile)
+            return f"pipeline-{profile}"
+
+        return _build
+
+    first, first_hit = llm_client_cache_service.get_or_create_answer_pipeline(llm, "generic", _factory("generic"))
+    second, second_hit = llm_client_cache_service.get_or_create_answer_pipeline(llm, "generic", _factory("generic"))
+    sample, sample_hit = llm_client_cache_service.get_or_create_answer_pipeline(llm, "sample_pack", _factory("sample_pack"))
+
+    assert first == second == "pipeline-generic"
+    assert sample == "pipeline-sample_pack"
+    assert (first_hit, second_hit, sample_hit) == (False, True, False)
+    assert builds == ["generic", "sample_pack"]
+    llm_client_cache_service.clear_llm_client_cache()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from services import graph_lite_service, lexical_index_service, query_analysis_service
+
+
+def _snapshot() -> graph_lite_service.GraphLiteSnapshot:
+    return graph_lite_service.GraphLiteSnapshot(
+        entities={
+            "newton": graph_lite_service.GraphLiteEntity("newton", "Newton", ("뉴턴",), (), ("uk",)),
+            "voltaire": graph_lite_service.GraphLiteEntity("voltaire", "Voltaire", ("볼테르",), (), ("fr",)),
+        },
+        relations=(),
+        stats={},
+    )
+
+
+def test_analyze_query_collects_terms_relation_hits_and_routing_keys():
+    question = "뉴턴과 볼테르의 관계를 프랑스 문서 기준으로 설명해줘"
+
+    analysis = query_analysis_service.analyze_query(question)
+
+    assert analysis.query_terms == lexical_index_service.extract_lexical_query_terms(question)
+    assert analysis.relation_keyword_hits == ("관계",)
+    assert "fr" in analysis.routing_collection_keys
+    assert analysis.analysis_ms >= 0
+
+
+def test_relation_intent_matches_graph_lite_and_memoizes_entity_hits(monkeypatch):
+    question = "뉴턴과 볼테르의 관계를 설명해줘"
+    snapshot = _snapshot()
+    analysis = query_analysis_service.analyze_query(question)
+    expected = graph_lite_service.detect_relation_query_intent(snapshot, question)
+    calls: list[str] = []
+    original = graph_lite_service.detect_query_entities
+
+    def _counting_detect(snapshot_arg, question_arg):
+        calls.append(question_arg)
+        return original(snapshot_arg, question_arg)
+
+    monkeypatch.setattr(graph_lite_service, "detect_query_entities", _counting_detect)
+
+    assert analysis.relation_intent(snapshot) == expected
+    assert analysis.relation_intent(snapshot) == expected
+    assert len(calls) == 1
+
+
+def test_query_terms_for_ignores_analysis_built_for_another_question():
+    analysis = query_analysis_service.analyze_query("훔볼트 대학")
+
+    assert query_analysis_service.query_terms_for("훔볼트 대학", analysis) == ["훔볼트", "대학"]
+    assert query_analysis_service.query_terms_for("왕립학회 설립", analysis) == ["왕립학회", "설립"]
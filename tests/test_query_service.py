@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import time
 
 from langchain_core.documents import Document
 
-from services import query_service
+from services import lexical_index_service, llm_client_cache_service, query_service
 
 
 def test_postprocess_answer_strips_trailing_insufficient_note_when_answer_exists():
@@ -309,12 +310,11 @@ def test_merge_docs_with_light_hybrid_candidates_adds_matching_doc_from_collecti
     assert info["candidate_count"] == 1
     assert info["candidate_limit"] == query_service.HYBRID_LEXICAL_CANDIDATE_LIMIT
     assert info["collection_doc_count"] == 2
-    assert info["scan_doc_count"] == 2
+    assert info["postings_touched"] >= 4
     assert info["matched_doc_count"] == 1
 
 
-def test_merge_docs_with_light_hybrid_candidates_skips_large_collection(monkeypatch):
-    monkeypatch.setattr(query_service, "HYBRID_LEXICAL_SCAN_MAX_DOCS", 1)
+def test_merge_docs_with_light_hybrid_candidates_accepts_prebuilt_index_without_mutating_it():
     dense_docs = [
         Document(page_content="일반 소개 문단", metadata={"source": "all.md", "h2": "개요"}),
     ]
@@ -326,19 +326,19 @@ def test_merge_docs_with_light_hybrid_candidates_skips_large_collection(monkeypa
         ),
     ]
 
+    lexical_index = lexical_index_service.build_lexical_index(collection_docs)
+
     merged, info = query_service.merge_docs_with_light_hybrid_candidates(
         dense_docs,
-        collection_docs,
+        lexical_index,
         "에콜 폴리테크니크 과학 인재",
     )
+    merged[1].metadata["collection_key"] = "fr"
 
-    assert merged == dense_docs
-    assert info["applied"] is False
-    assert info["candidate_count"] == 0
+    assert merged[1].metadata["source"] == "fr.md"
+    assert info["applied"] is True
     assert info["collection_doc_count"] == 2
-    assert info["scan_doc_count"] == 0
-    assert info["matched_doc_count"] == 0
-    assert info["skipped"] == "collection_too_large"
+    assert "collection_key" not in lexical_index.snapshot.metadata_at(1)
 
 
 def test_build_collection_context_populates_trace(monkeypatch):
@@ -367,6 +367,7 @@ def test_build_collection_context_populates_trace(monkeypatch):
     assert trace["docs_total"] == 2
     assert trace["max_docs"] >= 1
     assert trace["context_chars"] == len(context)
+    assert 0 < trace["context_tokens"] <= trace["max_context_tokens"]
     assert trace["retrieval_strategy"] == query_service.RETRIEVAL_STRATEGY_MMR
     assert trace["lexical_boost_applied"] is False
     assert trace["coverage_rerank_applied"] is False
@@ -376,8 +377,7 @@ def test_build_collection_context_populates_trace(monkeypatch):
     assert trace["hybrid_candidate_merge_applied"] is False
     assert trace["hybrid_candidate_count"] == 0
     assert trace["hybrid_candidate_limit"] == min(query_service.HYBRID_LEXICAL_CANDIDATE_LIMIT, trace["per_collection_k"])
-    assert trace["hybrid_scan_limit"] == query_service.HYBRID_LEXICAL_SCAN_MAX_DOCS
-    assert trace["hybrid_scan_doc_count"] == 0
+    assert trace["hybrid_postings_touched"] == 0
     assert trace["hybrid_skipped_collections"] == [{"key": "fr", "reason": "empty_collection"}]
     assert trace["lexical_query_terms"] == ["테스트", "질문"]
     assert trace["elapsed_ms"] >= 0
@@ -387,14 +387,19 @@ def test_build_collection_context_populates_trace(monkeypatch):
             "retrieved_docs": 3,
             "unique_docs": 2,
             "collection_doc_count": 0,
-            "hybrid_scan_doc_count": 0,
+            "hybrid_postings_touched": 0,
             "hybrid_matched_doc_count": 0,
             "hybrid_candidate_count": 0,
             "hybrid_candidate_limit": min(query_service.HYBRID_LEXICAL_CANDIDATE_LIMIT, trace["per_collection_k"]),
             "hybrid_skipped": "empty_collection",
+            "retriever_ms": trace["collection_stats"][0]["retriever_ms"],
+            "queue_wait_ms": trace["collection_stats"][0]["queue_wait_ms"],
+            "on_critical_path": True,
             "elapsed_ms": trace["collection_stats"][0]["elapsed_ms"],
         }
     ]
+    assert trace["retrieval_parallel"] is False
+    assert trace["retrieval_critical_path_key"] == "fr"
 
 
 def test_build_collection_context_applies_light_lexical_boost(monkeypatch):
@@ -426,11 +431,96 @@ def test_build_collection_context_applies_light_lexical_boost(monkeypatch):
     assert trace["coverage_rerank_applied"] is False
     assert trace["coverage_rerank_skipped"] == "single_collection"
     assert trace["hybrid_candidate_merge_applied"] is False
-    assert trace["hybrid_scan_doc_count"] == 0
+    assert trace["hybrid_postings_touched"] == 0
     assert trace["hybrid_skipped_collections"] == [{"key": "fr", "reason": "empty_collection"}]
     assert "에콜" in trace["lexical_query_terms"]
 
 
+def test_build_collection_context_extracts_query_terms_once_per_request(monkeypatch):
+    class DummyRetriever:
+        def invoke(self, question):
+            return [
+                Document(page_content="일반 개요", metadata={"source": "all.md", "h2": "개요", "collection_key": "fr"}),
+                Document(
+                    page_content="에콜 폴리테크니크는 프랑스 과학 인재 양성 기관이다.",
+                    metadata={"source": "fr.md", "h2": "기관", "collection_key": "ge"},
+                ),
+            ]
+
+    class DummyDB:
+        def as_retriever(self, **kwargs):
+            return DummyRetriever()
+
+    calls: list[str] = []
+    original_extract = query_service.query_analysis_service.extract_lexical_query_terms
+
+    def _counting_extract(question):
+        calls.append(question)
+        return original_extract(question)
+
+    monkeypatch.setattr(query_service.query_analysis_service, "extract_lexical_query_terms", _counting_extract)
+    monkeypatch.setattr(query_service, "extract_lexical_query_terms", _counting_extract)
+    monkeypatch.setattr(query_service.index_service, "get_db", lambda key: DummyDB())
+    monkeypatch.setattr(query_service.index_service, "get_collection_documents_from_store", lambda key: [])
+    monkeypatch.setattr(query_service.runtime_service, "get_retrieval_max_workers", lambda: 1)
+
+    question = "에콜 폴리테크니크 과학 인재"
+    trace: dict[str, object] = {}
+    context = query_service.build_collection_context(question, ["fr", "ge"], trace=trace)
+    query_service.build_supported_context_fallback_answer(
+        question,
+        context,
+        analysis=query_service.query_analysis_service.analyze_query(question),
+    )
+
+    assert calls == [question, question]
+    assert "에콜" in trace["lexical_query_terms"]
+
+
+def test_build_collection_context_packs_prompt_context_once_per_question(monkeypatch):
+    docs_by_key = {
+        "fr": [Document(page_content="에콜 폴리테크니크 기관 설명", metadata={"source": "fr.md", "h2": "기관"})],
+        "ge": [Document(page_content="훔볼트 대학 연구 중심", metadata={"source": "ge.md", "h2": "대학"})],
+    }
+
+    class DummyDB:
+        def __init__(self, key):
+            self.key = key
+
+        def max_marginal_relevance_search_by_vector(self, embedding, k, fetch_k, lambda_mult):
+            return [Document(page_content=doc.page_content, metadata=dict(doc.metadata)) for doc in docs_by_key[self.key]]
+
+    pack_calls: list[int] = []
+    original_pack = query_service.pack_context
+
+    def _counting_pack(docs, **kwargs):
+        pack_calls.append(len(docs))
+        return original_pack(docs, **kwargs)
+
+    lexical_indexes = {key: lexical_index_service.build_lexical_index(docs) for key, docs in docs_by_key.items()}
+    monkeypatch.setattr(query_service, "pack_context", _counting_pack)
+    monkeypatch.setattr(query_service.index_service, "get_db", lambda key: DummyDB(key))
+    monkeypatch.setattr(query_service.index_service, "get_collection_lexical_index", lambda key: lexical_indexes[key])
+    monkeypatch.setattr(query_service.index_service, "get_query_embedding", lambda question: ([0.0], False))
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_query_embeddings",
+        lambda questions: [([0.0], False) for _ in questions],
+    )
+
+    trace: dict[str, object] = {}
+    context = query_service.build_collection_context("기관 비교", ["fr", "ge"], trace=trace)
+    assert pack_calls == [2]
+    assert trace["context_chars"] == len(context)
+
+    pack_calls.clear()
+    traces: list[dict[str, object]] = [{}, {}]
+    contexts = query_service.build_collection_contexts_batch(["기관 비교", "대학 연구"], [["fr", "ge"], ["ge"]], traces=traces)
+    assert pack_calls == [2, 1]
+    assert contexts[0] == context
+    assert [item["context_chars"] for item in traces] == [len(item) for item in contexts]
+
+
 def test_build_collection_context_applies_light_hybrid_candidate_merge(monkeypatch):
     class DummyRetriever:
         def invoke(self, question):
@@ -446,14 +536,16 @@ def test_build_collection_context_applies_light_hybrid_candidate_merge(monkeypat
     monkeypatch.setattr(query_service.index_service, "get_db", lambda key: DummyDB())
     monkeypatch.setattr(
         query_service.index_service,
-        "get_collection_documents_from_store",
-        lambda key: [
-            Document(page_content="일반 개요", metadata={"source": "all.md", "h2": "개요"}),
-            Document(
-                page_content="에콜 폴리테크니크는 프랑스 과학 인재 양성 기관이다.",
-                metadata={"source": "fr.md", "h2": "기관"},
-            ),
-        ],
+        "get_collection_lexical_index",
+        lambda key: lexical_index_service.build_lexical_index(
+            [
+                Document(page_content="일반 개요", metadata={"source": "all.md", "h2": "개요"}),
+                Document(
+                    page_content="에콜 폴리테크니크는 프랑스 과학 인재 양성 기관이다.",
+                    metadata={"source": "fr.md", "h2": "기관"},
+                ),
+            ]
+        ),
     )
     monkeypatch.setattr(query_service.runtime_service, "get_max_context_chars", lambda: 200)
 
@@ -466,12 +558,12 @@ def test_build_collection_context_applies_light_hybrid_candidate_merge(monkeypat
     assert trace["hybrid_candidate_count"] == 1
     assert trace["coverage_rerank_applied"] is False
     assert trace["coverage_rerank_skipped"] == "single_collection"
-    assert trace["hybrid_scan_doc_count"] == 2
+    assert trace["hybrid_postings_touched"] >= 4
     assert trace["hybrid_skipped_collections"] == []
     assert trace["lexical_boost_applied"] is True
 
 
-def test_build_collection_context_records_hybrid_scan_skip(monkeypatch):
+def test_build_collection_context_records_hybrid_no_match(monkeypatch):
     class DummyRetriever:
         def invoke(self, question):
             assert question == "테스트 질문"
@@ -483,15 +575,16 @@ def test_build_collection_context_records_hybrid_scan_skip(monkeypatch):
         def as_retriever(self, **kwargs):
             return DummyRetriever()
 
-    monkeypatch.setattr(query_service, "HYBRID_LEXICAL_SCAN_MAX_DOCS", 1)
     monkeypatch.setattr(query_service.index_service, "get_db", lambda key: DummyDB())
     monkeypatch.setattr(
         query_service.index_service,
-        "get_collection_documents_from_store",
-        lambda key: [
-            Document(page_content="A", metadata={"source": "fr.md", "h2": "역할"}),
-            Document(page_content="B", metadata={"source": "fr.md", "h2": "교육"}),
-        ],
+        "get_collection_lexical_index",
+        lambda key: lexical_index_service.build_lexical_index(
+            [
+                Document(page_content="A", metadata={"source": "fr.md", "h2": "역할"}),
+                Document(page_content="B", metadata={"source": "fr.md", "h2": "교육"}),
+            ]
+        ),
     )
     monkeypatch.setattr(query_service.runtime_service, "get_max_context_chars", lambda: 100)
 
@@ -502,12 +595,12 @@ def test_build_collection_context_records_hybrid_scan_skip(monkeypatch):
     assert trace["retrieval_strategy"] == query_service.RETRIEVAL_STRATEGY_MMR
     assert trace["hybrid_candidate_merge_applied"] is False
     assert trace["hybrid_candidate_count"] == 0
-    assert trace["hybrid_scan_doc_count"] == 0
-    assert trace["hybrid_skipped_collections"] == [{"key": "fr", "reason": "collection_too_large"}]
+    assert trace["hybrid_postings_touched"] == 0
+    assert trace["hybrid_skipped_collections"] == []
     assert trace["collection_stats"][0]["collection_doc_count"] == 2
-    assert trace["collection_stats"][0]["hybrid_scan_doc_count"] == 0
-    assert trace["collection_stats"][0]["hybrid_candidate_count"] == 0
-    assert trace["collection_stats"][0]["hybrid_skipped"] == "collection_too_large"
+    assert trace["collection_stats"][0]["hybrid_postings_touched"] == 0
+    assert trace["collection_stats"][0]["hybrid_matched_doc_count"] == 0
+    assert trace["collection_stats"][0]["hybrid_skipped"] is None
 
 
 def test_build_collection_context_applies_light_multi_collection_coverage_rerank(monkeypatch):
@@ -594,3 +687,394 @@ def test_invoke_query_chain_populates_timeout_trace():
 
     assert trace["status"] == "timeout"
     assert trace["invoke_ms"] >= 0
+
+
+def test_ainvoke_query_chain_timeout_cancels_pending_invocation():
+    events: list[str] = []
+
+    class SlowAsyncChain:
+        async def ainvoke(self, question):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                events.append("cancelled")
+                raise
+            return "늦은 답변"
+
+    trace: dict[str, object] = {}
+
+    async def _run():
+        try:
+            await query_service.ainvoke_query_chain(SlowAsyncChain(), "질문", timeout_seconds=0.01, trace=trace)
+        except TimeoutError:
+            return "timeout"
+        return "ok"
+
+    assert asyncio.run(_run()) == "timeout"
+    assert events == ["cancelled"]
+    assert trace["status"] == "timeout"
+
+
+def test_retrieve_collection_documents_parallel_fanout_keeps_serial_order(monkeypatch):
+    class DummyRetriever:
+        def __init__(self, key):
+            self.key = key
+
+        def invoke(self, question):
+            time.sleep(0.2 if self.key == "fr" else 0.1)
+            return [Document(page_content=f"{self.key} 본문", metadata={"source": f"{self.key}.md", "h2": "개요"})]
+
+    class DummyDB:
+        def __init__(self, key):
+            self.key = key
+
+        def as_retriever(self, **kwargs):
+            return DummyRetriever(self.key)
+
+    monkeypatch.setattr(query_service.index_service, "get_db", lambda key: DummyDB(key))
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_collection_lexical_index",
+        lambda key: lexical_index_service.build_lexical_index([]),
+    )
+    monkeypatch.setattr(query_service.runtime_service, "get_max_context_chars", lambda: 400)
+
+    serial_trace: dict[str, object] = {}
+    monkeypatch.setattr(query_service.runtime_service, "get_retrieval_max_workers", lambda: 1)
+    serial_docs = query_service.retrieve_collection_documents("본문", ["fr", "ge", "uk"], trace=serial_trace)
+    parallel_trace: dict[str, object] = {}
+    monkeypatch.setattr(query_service.runtime_service, "get_retrieval_max_workers", lambda: 4)
+    parallel_docs = query_service.retrieve_collection_documents("본문", ["fr", "ge", "uk"], trace=parallel_trace)
+
+    assert [doc.metadata["source"] for doc in parallel_docs] == [doc.metadata["source"] for doc in serial_docs]
+    assert [item["key"] for item in parallel_trace["collection_stats"]] == ["fr", "ge", "uk"]
+    assert serial_trace["retrieval_parallel"] is False
+    assert parallel_trace["retrieval_parallel"] is True
+    assert parallel_trace["retrieval_workers"] == 3
+    assert parallel_trace["retrieval_critical_path_key"] == "fr"
+    assert parallel_trace["collection_stats"][0]["on_critical_path"] is True
+    assert parallel_trace["retrieval_fanout_ms"] < serial_trace["retrieval_fanout_ms"]
+
+
+def test_retrieve_collection_documents_embeds_question_once_for_vector_search(monkeypatch):
+    embed_calls: list[str] = []
+    search_calls: list[tuple[str, list[float], int]] = []
+
+    class DummyDB:
+        def __init__(self, key):
+            self.key = key
+
+        def max_marginal_relevance_search_by_vector(self, embedding, k, fetch_k, lambda_mult):
+            search_calls.append((self.key, embedding, k))
+            return [Document(page_content=f"{self.key} 본문", metadata={"source": f"{self.key}.md", "h2": "개요"})]
+
+    monkeypatch.setattr(query_service.index_service, "get_db", lambda key: DummyDB(key))
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_query_embedding",
+        lambda question: embed_calls.append(question) or ([0.1, 0.2], False),
+    )
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_collection_lexical_index",
+        lambda key: lexical_index_service.build_lexical_index([]),
+    )
+
+    trace: dict[str, object] = {}
+    docs = query_service.retrieve_collection_documents("본문 비교", ["fr", "ge"], trace=trace)
+
+    assert [doc.metadata["collection_key"] for doc in docs] == ["fr", "ge"]
+    assert embed_calls == ["본문 비교"]
+    assert sorted(call[0] for call in search_calls) == ["fr", "ge"]
+    assert all(call[1] == [0.1, 0.2] for call in search_calls)
+    assert trace["query_embedding_cache"] == "miss"
+    assert "query_embedding_cache_hits" in trace
+
+
+def test_stream_query_answer_yields_deltas_and_records_first_token():
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="에콜 폴리테크니크 답변")]))
+    trace: dict[str, object] = {}
+
+    deltas = list(
+        query_service.stream_query_answer(
+            llm,
+            "에콜 폴리테크니크 역할",
+            "[1] source=fr.md\n에콜 폴리테크니크",
+            timeout_seconds=5,
+            trace=trace,
+        )
+    )
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "에콜 폴리테크니크 답변"
+    assert trace["status"] == "ok"
+    assert trace["streamed"] is True
+    assert trace["first_token_ms"] <= trace["invoke_ms"]
+
+
+def test_build_query_chain_reuses_answer_pipeline_per_llm():
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    llm_client_cache_service.clear_llm_client_cache()
+    llm = FakeListChatModel(responses=["첫 답변", "둘째 답변"])
+    first_trace: dict[str, object] = {}
+    second_trace: dict[str, object] = {}
+
+    first_chain = query_service.build_query_chain(lambda question: "문맥", llm, query_profile="generic", trace=first_trace)
+    second_chain = query_service.build_query_chain(lambda question: "다른 문맥", llm, query_profile="generic", trace=second_trace)
+
+    assert first_trace["query_chain_cache"] == "miss"
+    assert second_trace["query_chain_cache"] == "hit"
+    assert first_chain.invoke("질문") == "첫 답변"
+    assert second_chain.invoke("질문") == "둘째 답변"
+    llm_client_cache_service.clear_llm_client_cache()
+
+
+def test_mmr_search_many_matches_per_vector_chroma_search():
+    import uuid
+
+    import chromadb
+    from langchain_chroma import Chroma
+
+    class HashEmbeddings:
+        def embed_documents(self, texts):
+            return [self.embed_query(text) for text in texts]
+
+        def embed_query(self, text):
+            return [float((sum(map(ord, text)) * (slot + 3)) % 17) + 1.0 for slot in range(6)]
+
+    db = Chroma(
+        collection_name=f"mmr-batch-{uuid.uuid4().hex[:8]}",
+        embedding_function=HashEmbeddings(),
+        client=chromadb.EphemeralClient(),
+    )
+    db.add_texts(
+        [f"문서 {index} 본문 {index * 7}" for index in range(40)],
+        metadatas=[{"source": f"doc{index}.md"} for index in range(40)],
+        ids=[f"id-{index}" for index in range(40)],
+    )
+    vectors = [HashEmbeddings().embed_query(question) for question in ("첫 질문", "둘째 질문", "셋째")]
+
+    batched = query_service._mmr_search_many(db, vectors, k=3, fetch_k=10)
+    expected = [
+        db.max_marginal_relevance_search_by_vector(vector, k=3, fetch_k=10, lambda_mult=query_service.SEARCH_LAMBDA)
+        for vector in vectors
+    ]
+
+    assert [[doc.metadata["source"] for doc in docs] for docs in batched] == [
+        [doc.metadata["source"] for doc in docs] for docs in expected
+    ]
+    assert [[doc.page_content for doc in docs] for docs in batched] == [
+        [doc.page_content for doc in docs] for docs in expected
+    ]
+
+
+def test_mmr_indices_matches_langchain_maximal_marginal_relevance():
+    import random
+
+    import numpy as np
+    from langchain_chroma.vectorstores import maximal_marginal_relevance
+
+    rng = random.Random(11)
+    for _ in range(5):
+        query = [rng.gauss(0, 1) for _ in range(8)]
+        embeddings = [[rng.gauss(0, 1) for _ in range(8)] for _ in range(20)]
+        expected = maximal_marginal_relevance(
+            np.array(query, dtype=np.float32),
+            embeddings,
+            k=6,
+            lambda_mult=query_service.SEARCH_LAMBDA,
+        )
+        assert query_service._mmr_indices(
+            query,
+            np.asarray(embeddings, dtype=np.float64),
+            k=6,
+            lambda_mult=query_service.SEARCH_LAMBDA,
+        ) == expected
+
+
+def test_global_mmr_scope_selects_once_across_collections(monkeypatch):
+    import uuid
+
+    import chromadb
+    from langchain_chroma import Chroma
+
+    class HashEmbeddings:
+        def embed_documents(self, texts):
+            return [self.embed_query(text) for text in texts]
+
+        def embed_query(self, text):
+            return [float((sum(map(ord, text)) * (slot + 3)) % 17) + 1.0 for slot in range(6)]
+
+    client = chromadb.EphemeralClient()
+    shared = ("공유 기관 설명 본문", {"source": "shared.md", "h2": "기관"})
+    dbs: dict[str, Chroma] = {}
+    lexical_indexes = {}
+    for key in ("fr", "ge"):
+        texts = [shared[0]] + [f"{key} 문서 {index} 본문 {index * 7}" for index in range(12)]
+        metadatas = [dict(shared[1])] + [{"source": f"{key}{index}.md", "h2": "본문"} for index in range(12)]
+        db = Chroma(
+            collection_name=f"mmr-global-{key}-{uuid.uuid4().hex[:8]}",
+            embedding_function=HashEmbeddings(),
+            client=client,
+        )
+        db.add_texts(texts, metadatas=metadatas, ids=[f"{key}-{index}" for index in range(len(texts))])
+        dbs[key] = db
+        lexical_indexes[key] = lexical_index_service.build_lexical_index(
+            [Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)]
+        )
+    question = "공유 기관 설명"
+    vector = HashEmbeddings().embed_query(question)
+    monkeypatch.setattr(query_service.index_service, "get_db", lambda key: dbs[key])
+    monkeypatch.setattr(query_service.index_service, "get_collection_lexical_index", lambda key: lexical_indexes[key])
+    monkeypatch.setattr(query_service.index_service, "get_query_embedding", lambda item: (vector, False))
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_query_embeddings",
+        lambda questions: [(vector, False) for _ in questions],
+    )
+    budget = {"per_collection_k": 3, "per_collection_fetch_k": 8, "max_total_docs": 6, "max_context_chars": 4000}
+
+    collection_trace: dict[str, object] = {}
+    query_service.retrieve_collection_documents(question, ["fr", "ge"], budget=budget, trace=collection_trace)
+    assert collection_trace["mmr_scope"] == "collection"
+    assert collection_trace["global_mmr"] is None
+
+    monkeypatch.setattr(query_service.runtime_service, "get_retrieval_mmr_scope", lambda: "global")
+    trace: dict[str, object] = {}
+    docs = query_service.retrieve_collection_documents(question, ["fr", "ge"], budget=budget, trace=trace)
+    global_mmr = trace["global_mmr"]
+
+    assert trace["mmr_scope"] == "global"
+    assert global_mmr["candidate_count"] == 16
+    assert global_mmr["duplicate_candidates"] == 1
+    assert global_mmr["selected_count"] == 6
+    assert sum(global_mmr["selected_per_collection"].values()) == 6
+    assert {"fetch_ms", "mmr_ms"} <= set(global_mmr)
+    assert [doc.metadata["source"] for doc in docs].count("shared.md") <= 1
+
+    batch_traces: list[dict[str, object]] = [{}]
+    batched = query_service.retrieve_collection_documents_batch(
+        [question],
+        [["fr", "ge"]],
+        budgets=[budget],
+        traces=batch_traces,
+    )
+    assert [doc.page_content for doc in batched[0]] == [doc.page_content for doc in docs]
+    assert batch_traces[0]["mmr_scope"] == "global"
+    assert batch_traces[0]["global_mmr"]["selected_per_collection"] == global_mmr["selected_per_collection"]
+
+
+def test_global_mmr_scope_returns_no_documents_when_every_collection_is_empty(monkeypatch):
+    import uuid
+
+    import chromadb
+    from langchain_chroma import Chroma
+
+    class HashEmbeddings:
+        def embed_documents(self, texts):
+            return [self.embed_query(text) for text in texts]
+
+        def embed_query(self, text):
+            return [float((sum(map(ord, text)) * (slot + 3)) % 17) + 1.0 for slot in range(6)]
+
+    client = chromadb.EphemeralClient()
+    dbs = {
+        key: Chroma(
+            collection_name=f"mmr-empty-{key}-{uuid.uuid4().hex[:8]}",
+            embedding_function=HashEmbeddings(),
+            client=client,
+        )
+        for key in ("fr", "ge")
+    }
+    vector = HashEmbeddings().embed_query("공유 기관 설명")
+    empty_index = lexical_index_service.build_lexical_index([])
+    monkeypatch.setattr(query_service.index_service, "get_db", lambda key: dbs[key])
+    monkeypatch.setattr(query_service.index_service, "get_collection_lexical_index", lambda key: empty_index)
+    monkeypatch.setattr(query_service.index_service, "get_query_embedding", lambda item: (vector, False))
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_query_embeddings",
+        lambda questions: [(vector, False) for _ in questions],
+    )
+    monkeypatch.setattr(query_service.runtime_service, "get_retrieval_mmr_scope", lambda: "global")
+    budget = {"per_collection_k": 3, "per_collection_fetch_k": 8, "max_total_docs": 6, "max_context_chars": 4000}
+
+    trace: dict[str, object] = {}
+    docs = query_service.retrieve_collection_documents("공유 기관 설명", ["fr", "ge"], budget=budget, trace=trace)
+    batch_traces: list[dict[str, object]] = [{}]
+    batched = query_service.retrieve_collection_documents_batch(
+        ["공유 기관 설명"],
+        [["fr", "ge"]],
+        budgets=[budget],
+        traces=batch_traces,
+    )
+
+    assert list(docs) == []
+    assert list(batched[0]) == []
+    for item in (trace, batch_traces[0]):
+        assert item["mmr_scope"] == "global"
+        assert item["global_mmr"]["candidate_count"] == 0
+        assert item["global_mmr"]["selected_per_collection"] == {"fr": 0, "ge": 0}
+
+
+def test_retrieve_collection_documents_batch_matches_single_query_retrieval(monkeypatch):
+    search_calls: list[tuple[str, int]] = []
+    docs_by_key = {
+        "fr": [
+            Document(page_content="에콜 폴리테크니크 기관 설명", metadata={"source": "fr.md", "h2": "기관"}),
+            Document(page_content="프랑스 과학 아카데미", metadata={"source": "fr.md", "h2": "학회"}),
+        ],
+        "ge": [
+            Document(page_content="훔볼트 대학 연구 중심", metadata={"source": "ge.md", "h2": "대학"}),
+            Document(page_content="독일 기술 대학 기관", metadata={"source": "ge.md", "h2": "기관"}),
+        ],
+    }
+
+    class DummyDB:
+        def __init__(self, key):
+            self.key = key
+
+        def max_marginal_relevance_search_by_vector(self, embedding, k, fetch_k, lambda_mult):
+            search_calls.append((self.key, len(embedding)))
+            ordered = docs_by_key[self.key] if embedding[0] < 1 else list(reversed(docs_by_key[self.key]))
+            return [Document(page_content=doc.page_content, metadata=dict(doc.metadata)) for doc in ordered[:k]]
+
+    lexical_indexes = {key: lexical_index_service.build_lexical_index(docs) for key, docs in docs_by_key.items()}
+    vectors = {"기관 비교": [0.0], "대학 연구": [2.0]}
+    monkeypatch.setattr(query_service.index_service, "get_db", lambda key: DummyDB(key))
+    monkeypatch.setattr(query_service.index_service, "get_collection_lexical_index", lambda key: lexical_indexes[key])
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_query_embedding",
+        lambda question: (vectors[question], False),
+    )
+    embedding_batches: list[list[str]] = []
+    monkeypatch.setattr(
+        query_service.index_service,
+        "get_query_embeddings",
+        lambda questions: embedding_batches.append(list(questions)) or [(vectors[item], False) for item in questions],
+    )
+    questions = list(vectors)
+    keys = [["fr", "ge"], ["ge"]]
+
+    expected_traces = [{}, {}]
+    expected = [
+        query_service.retrieve_collection_documents(question, collection_keys, trace=trace)
+        for question, collection_keys, trace in zip(questions, keys, expected_traces)
+    ]
+    search_calls.clear()
+    traces: list[dict[str, object]] = [{}, {}]
+    batch_trace: dict[str, object] = {}
+    batched = query_service.retrieve_collection_documents_batch(questions, keys, traces=traces, batch_trace=batch_trace)
+
+    assert [[doc.page_content for doc in docs] for docs in batched] == [
+        [doc.page_content for doc in docs] for docs in expected
+    ]
+    assert embedding_batches == [questions]
+    assert [trace["retrieval_strategy"] for trace in traces] == [trace["retrieval_strategy"] for trace in expected_traces]
+    assert traces[0]["retrieval_batched"] is True
+    assert [(item["key"], item["queries"]) for item in batch_trace["batch_collections"]] == [("fr", 1), ("ge", 2)]
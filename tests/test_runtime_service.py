@@ -157,6 +157,8 @@ def test_plan_query_budget_keeps_verified_local_single_budget():
     assert budget["per_collection_k"] == 3
     assert budget["per_collection_fetch_k"] == 10
     assert budget["max_total_docs"] == 3
+    assert budget["max_context_tokens"] == runtime_service.get_max_context_tokens()
+    assert "context_tokens=" in str(budget["summary"])
     assert budget["generation_budget_profile"] == "standard"
 
 
@@ -205,3 +207,38 @@ def test_plan_query_budget_restricts_not_recommended_local_runtime():
     assert budget["per_collection_k"] == 1
     assert budget["max_total_docs"] == 1
     assert budget["generation_budget_profile"] == "restricted"
+
+
+def test_get_max_context_tokens_falls_back_on_invalid_values(monkeypatch):
+    monkeypatch.setenv("DOC_RAG_MAX_CONTEXT_TOKENS", "abc")
+    assert runtime_service.get_max_context_tokens() == 1024
+
+    monkeypatch.setenv("DOC_RAG_MAX_CONTEXT_TOKENS", "300")
+    budget = runtime_service.plan_query_budget(
+        provider="ollama",
+        model="gemma4:e4b",
+        timeout_seconds=30,
+        collection_count=2,
+        route_reason="multi",
+    )
+    assert budget["max_context_tokens"] == 300
+
+
+def test_plan_query_budget_toggles_context_compression_per_profile(monkeypatch):
+    def _budget(model: str) -> dict[str, object]:
+        return runtime_service.plan_query_budget(
+            provider="ollama",
+            model=model,
+            timeout_seconds=30,
+            collection_count=1,
+            route_reason="default",
+        )
+
+    monkeypatch.delenv("DOC_RAG_CONTEXT_COMPRESSION", raising=False)
+    assert _budget("gemma4:e2b")["context_compression"] is True
+    assert _budget("gemma4:e4b")["context_compression"] is False
+
+    monkeypatch.setenv("DOC_RAG_CONTEXT_COMPRESSION", "off")
+    assert _budget("gemma4:e2b")["context_compression"] is False
+    monkeypatch.setenv("DOC_RAG_CONTEXT_COMPRESSION", "on")
+    assert _budget("gemma4:e4b")["context_compression"] is True
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from services import single_flight_service
+
+
+def test_single_flight_shares_one_computation_between_concurrent_callers():
+    single_flight_service.clear_single_flight_state()
+    calls: list[str] = []
+
+    async def _compute():
+        calls.append("run")
+        await asyncio.sleep(0.05)
+        return {"answer": "공유 응답"}
+
+    async def _run():
+        return await asyncio.gather(
+            single_flight_service.run_single_flight("same", _compute, request_id="req-a"),
+            single_flight_service.run_single_flight("same", _compute, request_id="req-b"),
+            single_flight_service.run_single_flight("other", _compute, request_id="req-c"),
+        )
+
+    (first, first_info), (second, second_info), (_, other_info) = asyncio.run(_run())
+
+    assert calls == ["run", "run"]
+    assert first is second
+    assert first_info.role == "leader"
+    assert second_info.coalesced is True
+    assert second_info.leader_request_id == "req-a"
+    assert other_info.role == "leader"
+    assert single_flight_service.get_single_flight_stats() == {"leaders": 2, "followers": 1, "in_flight": 0}
+
+
+def test_single_flight_propagates_errors_and_bounds_follower_wait():
+    single_flight_service.clear_single_flight_state()
+
+    async def _fail():
+        await asyncio.sleep(0.02)
+        raise ValueError("boom")
+
+    async def _slow():
+        await asyncio.sleep(0.2)
+        return "늦은 응답"
+
+    async def _run_failures():
+        return await asyncio.gather(
+            single_flight_service.run_single_flight("fail", _fail, request_id="req-a"),
+            single_flight_service.run_single_flight("fail", _fail, request_id="req-b"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(_run_failures())
+    assert all(isinstance(item, ValueError) for item in results)
+
+    async def _run_timeout():
+        leader = asyncio.ensure_future(single_flight_service.run_single_flight("slow", _slow, request_id="req-a"))
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await single_flight_service.run_single_flight(
+                "slow",
+                _slow,
+                request_id="req-b",
+                follower_timeout_seconds=0.01,
+            )
+        return await leader
+
+    value, info = asyncio.run(_run_timeout())
+    assert value == "늦은 응답"
+    assert info.role == "leader"
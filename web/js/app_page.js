@@ -1,4 +1,4 @@
-import { escapeHtml, formatApiError, parseApiError } from "/js/shared.js";
+import { escapeHtml, formatApiError, parseApiError, readNdjsonStream } from "/js/shared.js";
 
 const sidebar = document.getElementById("sidebar");
 const sidebarOverlay = document.getElementById("sidebarOverlay");
@@ -985,16 +985,37 @@ async function runQueryAnswer({
     timeoutSeconds,
   );
   try {
-    const res = await fetch("/query", {
+    const res = await fetch("/query/stream", {
       method: "POST",
       headers: {"Content-Type": "application/json"},
       body: JSON.stringify(payload),
     });
-    const data = await res.json();
     if (!res.ok) {
-      const error = parseApiError(data, "요청 실패");
-      renderBotResponse(pending, buildGuidedErrorMessage(data, error), null);
-      return {ok: false, data, messageNode: pending};
+      const errorData = await res.json();
+      const error = parseApiError(errorData, "요청 실패");
+      renderBotResponse(pending, buildGuidedErrorMessage(errorData, error), null);
+      return {ok: false, data: errorData, messageNode: pending};
+    }
+    let data = null;
+    let errorData = null;
+    let streamedText = "";
+    await readNdjsonStream(res, (event) => {
+      if (event.event === "sources") {
+        const citations = Array.isArray(event.citations) && event.citations.length ? event.citations.join(" | ") : "-";
+        renderBotResponse(pending, `${pendingText}\n근거: ${citations}`, null);
+      } else if (event.event === "token") {
+        streamedText += event.delta || "";
+        renderBotResponse(pending, streamedText, null);
+      } else if (event.event === "final") {
+        data = event;
+      } else if (event.event === "error") {
+        errorData = event;
+      }
+    });
+    if (errorData || !data) {
+      const error = parseApiError(errorData, "요청 실패");
+      renderBotResponse(pending, buildGuidedErrorMessage(errorData, error), null);
+      return {ok: false, data: errorData, messageNode: pending};
     }
     const feedbackContext = buildFeedbackContext({
       question,
@@ -31,3 +31,25 @@ export function formatApiError(error) {
   if (error.requestId) parts.push(`request_id: ${error.requestId}`);
   return parts.join(" | ");
 }
+
+export async function readNdjsonStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  const emitLine = (line) => {
+    const trimmed = line.trim();
+    if (trimmed) onEvent(JSON.parse(trimmed));
+  };
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let newlineIndex = buffer.indexOf("\n");
+    while (newlineIndex >= 0) {
+      emitLine(buffer.slice(0, newlineIndex));
+      buffer = buffer.slice(newlineIndex + 1);
+      newlineIndex = buffer.indexOf("\n");
+    }
+  }
+  emitLine(buffer + decoder.decode());
+}